@@ -11,4 +11,12 @@ class CoreConfig(AppConfig):
         try:
             import core.signals
         except ImportError:
-            pass
\ No newline at end of file
+            pass
+
+        # 每个 SQLite 连接建立时应用 PRAGMA 配置
+        from django.db.backends.signals import connection_created
+        from .sqlite import configure_connection
+        connection_created.connect(configure_connection, dispatch_uid='core.sqlite.configure_connection')
+
+        # 缓存失效后按需预热（cache_invalidated 信号接收器）
+        import core.cache_warmer  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""
+异步缓存访问 - 供异步视图和中间件在事件循环中读写缓存
+
+- 缓存后端是 Redis 且安装了 redis-py 时使用 redis.asyncio 客户端（每个事件循环一个），
+  键和序列化方式与 django.core.cache 相同，同步、异步两边写入的值可以互相读取
+- 其他后端（测试中的 LocMem 等）通过 run_sync 在线程池中调用同步接口；
+  不使用 Django 自带的 cache.aget，它在共享的同步线程中执行，并发请求会排队
+- 失败时直接抛出异常，由调用方按同步版本的方式处理（见 local_cache.atiered_get）
+"""
+import asyncio
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .async_support import run_sync
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # pragma: no cover - 未安装 redis 时使用线程池
+    aioredis = None
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def _client():
+    """当前事件循环的 redis.asyncio 客户端，缓存后端不是 Redis 时返回 None"""
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if aioredis is None or 'redis' not in backend.lower():
+        return None
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = aioredis.Redis.from_url(cache._servers[0])
+    return client
+
+
+def _serializer():
+    return cache._cache._serializer
+
+
+async def aget(key, default=None):
+    """异步读取缓存，未命中时返回 default"""
+    client = _client()
+    if client is None:
+        return await run_sync(cache.get, key, default)
+    value = await client.get(cache.make_and_validate_key(key))
+    return default if value is None else _serializer().loads(value)
+
+
+async def aget_many(keys):
+    """异步批量读取缓存，返回命中的 {key: value}"""
+    client = _client()
+    if client is None:
+        return await run_sync(cache.get_many, keys)
+    keys = list(keys)
+    values = await client.mget([cache.make_and_validate_key(key) for key in keys])
+    return {key: _serializer().loads(value) for key, value in zip(keys, values) if value is not None}
+
+
+async def aset(key, value, timeout):
+    """异步写入缓存，timeout 的含义与 cache.set 相同（0 表示删除）"""
+    client = _client()
+    if client is None:
+        return await run_sync(cache.set, key, value, timeout)
+    key = cache.make_and_validate_key(key)
+    timeout = cache.get_backend_timeout(timeout)
+    if timeout == 0:
+        await client.delete(key)
+    else:
+        await client.set(key, _serializer().dumps(value), ex=timeout)
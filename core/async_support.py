@@ -0,0 +1,150 @@
+"""
+异步视图支持 - ASGI 下让慢请求不占用整个 worker
+
+- 事件循环只做缓存命中这类非阻塞工作；数据库查询、序列化等同步代码用 run_sync 放到有界线程池执行，
+  不使用 Django 默认的 thread_sensitive 同步线程（所有请求共用一个线程，会互相排队）
+- 缩略图生成等 CPU 密集的工作用 run_cpu 放到进程池（PROCESS_WORKERS 为 0 时同样使用线程池，
+  PIL 的解码和缩放会释放 GIL）
+- AsyncMiddlewareMixin：自定义中间件同时支持同步和异步调用链，ASGI 下整条中间件链不会退回同步线程
+- 异步视图默认不挂载（ENABLED），WSGI 部署时继续使用同步视图
+
+使用示例:
+    songs = await run_sync(SongService.get_songs, page=1)
+    path = await run_cpu(ThumbnailGenerator.generate_thumbnail, image_path)
+"""
+import asyncio
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+# 默认配置，可通过 settings.ASYNC_VIEWS_CONFIG 覆盖
+DEFAULT_CONFIG = {
+    'ENABLED': False,         # 是否挂载热点读接口的异步版本（需以 ASGI 方式部署）
+    'THREAD_WORKERS': 16,     # 执行同步代码的线程数，即每个 worker 同时打开的数据库连接上限
+    'PROCESS_WORKERS': 0,     # 缩略图生成的进程数，0 表示使用线程池
+}
+
+_thread_pool = None
+_process_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_config():
+    """获取异步视图配置"""
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'ASYNC_VIEWS_CONFIG', {}))
+    return config
+
+
+def pick_view(sync_view, async_view):
+    """URL 配置中按 ENABLED 选择挂载同步或异步视图"""
+    return async_view if get_config()['ENABLED'] else sync_view
+
+
+def _thread_executor():
+    global _thread_pool
+    if _thread_pool is None:
+        with _pool_lock:
+            if _thread_pool is None:
+                _thread_pool = ThreadPoolExecutor(
+                    max_workers=get_config()['THREAD_WORKERS'], thread_name_prefix='async-view'
+                )
+    return _thread_pool
+
+
+def _process_executor():
+    """进程池（spawn 启动，不复制事件循环和线程池的状态）；未配置时返回 None"""
+    global _process_pool
+    workers = get_config()['PROCESS_WORKERS']
+    if not workers:
+        return None
+    if _process_pool is None:
+        with _pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_process,
+                )
+    return _process_pool
+
+
+def _init_process():
+    import django
+    django.setup()
+
+
+def _call_in_worker(func, *args, **kwargs):
+    # 线程池中的数据库连接不经过请求周期，按 CONN_MAX_AGE 在调用前后回收
+    from .metrics import track_queries
+
+    close_old_connections()
+    try:
+        with track_queries():
+            return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(func, *args, **kwargs):
+    """
+    在线程池中执行同步函数（上下文变量随调用传递，只读路由和请求指标照常生效）
+
+    Args:
+        func: 同步函数
+        *args, **kwargs: 调用参数
+
+    Returns:
+        func 的返回值
+    """
+    call = sync_to_async(_call_in_worker, thread_sensitive=False, executor=_thread_executor())
+    return await call(func, *args, **kwargs)
+
+
+async def run_cpu(func, *args):
+    """
+    在进程池中执行 CPU 密集的函数（函数和参数需可 pickle），未配置进程池时使用 run_sync
+
+    Returns:
+        func 的返回值
+    """
+    pool = _process_executor()
+    if pool is None:
+        return await run_sync(func, *args)
+    return await asyncio.get_running_loop().run_in_executor(pool, functools.partial(func, *args))
+
+
+class AsyncMiddlewareMixin:
+    """
+    同时支持同步和异步调用链的中间件基类（判断方式与 Django 的 MiddlewareMixin 相同）
+
+    子类实现 handle（同步）和 __acall__（异步）；只在响应阶段处理的中间件
+    可以只实现 process_response（需为非阻塞的纯计算）
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        return response
@@ -0,0 +1,53 @@
+"""
+异步读接口 - 缓存命中时在事件循环中直接返回，未命中时在线程池中执行同步视图
+
+同步视图（DRF 视图、@api_view 函数）保持不变，继续负责查询、序列化和写入缓存；
+异步视图只增加一条不占用线程的命中路径，两者返回的响应体完全相同。
+DRF 不支持异步视图，因此异步视图是普通的 Django 异步视图，由 pick_view 在 URL 配置中挂载。
+
+使用示例:
+    song_list = async_read_view(SongListView.as_view(), cache_key=lambda request: song_list_cache_key(request.GET))
+"""
+from .async_support import run_sync
+from .responses import acached_response
+
+
+def call_view(view, request, *args, **kwargs):
+    """调用同步视图并完成渲染，返回可直接读取 content 的响应"""
+    response = view(request, *args, **kwargs)
+    # DRF 的 Response 需要渲染，渲染同样是同步代码，在同一个线程中完成
+    if hasattr(response, 'render') and callable(response.render):
+        response = response.render()
+    return response
+
+
+async def run_sync_view(view, request, *args, **kwargs):
+    """在线程池中执行同步视图并完成渲染"""
+    return await run_sync(call_view, view, request, *args, **kwargs)
+
+
+def async_read_view(sync_view, cache_key=None):
+    """
+    把同步读接口包装为异步视图
+
+    Args:
+        sync_view: 同步视图（as_view() 的结果或 @api_view 函数）
+        cache_key: 可选，由 (request, *args, **kwargs) 计算与同步视图相同的 cached_success_response 缓存键；
+            返回 None 表示该请求不走命中路径（例如游标分页）
+
+    Returns:
+        异步视图函数
+    """
+    async def view(request, *args, **kwargs):
+        if cache_key is not None and request.method in ('GET', 'HEAD'):
+            key = cache_key(request, *args, **kwargs)
+            if key:
+                response = await acached_response(key)
+                if response is not None:
+                    return response
+        return await run_sync_view(sync_view, request, *args, **kwargs)
+
+    view.__name__ = getattr(sync_view, '__name__', 'view')
+    view.__doc__ = sync_view.__doc__
+    view.csrf_exempt = getattr(sync_view, 'csrf_exempt', False)
+    return view
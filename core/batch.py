@@ -0,0 +1,226 @@
+"""
+批量请求接口 - 首页首屏的多个读接口合并为一次 HTTP 往返
+
+- 子请求只能是 ALLOWED_PREFIXES 下的 GET 接口，在进程内解析 URL 后直接调用视图，
+  不再经过中间件（外层批量请求只经过一次），继承外层请求的请求头、Cookie 和用户
+- 异步视图（ASYNC_VIEWS_CONFIG 开启时挂载）并发执行；同步视图在同一个工作线程中依次执行，
+  与异步视图并行
+- 整个批量请求共享一个请求级缓存作用域（core/request_cache.py），数据版本号、网站设置、
+  缩略图路径等常用查询只执行一次
+- 子响应体（JSON）原样拼接到结果中，不重新解析和序列化
+
+请求示例:
+    POST /api/batch/
+    {"requests": [{"id": "top", "path": "/api/top_songs/?range=1m"}, "/api/styles/"]}
+
+    GET /api/batch/?path=/api/styles/&path=/api/tags/
+"""
+import asyncio
+import json
+import logging
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpRequest, HttpResponse, QueryDict
+from django.urls import Resolver404, resolve
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from .async_support import run_sync
+from .async_views import call_view
+from .renderers import dumps
+from .request_cache import request_cache_scope
+from .sqlite import get_config as get_sqlite_config, read_only_routing
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.BATCH_CONFIG 覆盖
+DEFAULT_CONFIG = {
+    'MAX_REQUESTS': 20,              # 单次批量请求的子请求数上限
+    'ALLOWED_PREFIXES': ('/api/',),  # 允许的子请求路径前缀
+}
+
+BATCH_PATH = '/api/batch/'
+
+# 不传给子请求的请求头（请求体相关、条件请求）
+_DROPPED_META = {
+    'CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'HTTP_RANGE',
+}
+
+
+def get_config():
+    """获取批量请求配置"""
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'BATCH_CONFIG', {}))
+    return config
+
+
+class SubRequest(HttpRequest):
+    """批量请求中的一个 GET 子请求，继承外层请求的请求头、Cookie、会话和用户"""
+
+    def __init__(self, parent, path, query_string):
+        super().__init__()
+        self.parent = parent
+        self.method = 'GET'
+        self.path = self.path_info = path
+        self.META = {key: value for key, value in parent.META.items() if key not in _DROPPED_META}
+        self.META.update(REQUEST_METHOD='GET', PATH_INFO=path, QUERY_STRING=query_string)
+        self.GET = QueryDict(query_string)
+        self.COOKIES = parent.COOKIES
+        for attr in ('session', 'user', 'auser'):
+            if hasattr(parent, attr):
+                setattr(self, attr, getattr(parent, attr))
+
+    def _get_scheme(self):
+        return self.parent.scheme
+
+
+def _json_response(payload, status=200):
+    return HttpResponse(dumps(payload), status=status, content_type='application/json')
+
+
+def parse_requests(request):
+    """
+    解析子请求列表
+
+    Returns:
+        list[tuple[str, str]]: [(id, path), ...]，id 未指定时使用 path
+
+    Raises:
+        ValueError: 格式错误、数量超限或路径不允许
+    """
+    if request.method == 'GET':
+        items = request.GET.getlist('path')
+    else:
+        try:
+            items = json.loads(request.body or b'{}').get('requests')
+        except (ValueError, AttributeError):
+            raise ValueError('请求体必须是包含 requests 的 JSON 对象')
+
+    if not isinstance(items, list) or not items:
+        raise ValueError('requests 必须是非空数组')
+    config = get_config()
+    if len(items) > config['MAX_REQUESTS']:
+        raise ValueError(f"子请求数量不能超过 {config['MAX_REQUESTS']}")
+
+    parsed = []
+    for item in items:
+        if isinstance(item, str):
+            item = {'path': item}
+        path = item.get('path') if isinstance(item, dict) else None
+        if not isinstance(path, str) or not path.startswith(tuple(config['ALLOWED_PREFIXES'])):
+            raise ValueError(f'不允许的子请求: {path}')
+        if urlsplit(path).path == BATCH_PATH:
+            raise ValueError('子请求不能是批量接口')
+        parsed.append((str(item.get('id', path)), path))
+    return parsed
+
+
+def _prepare(request, path):
+    """构建子请求并解析视图，返回 (子请求, 视图, args, kwargs)，路径不存在时视图为 None"""
+    parts = urlsplit(path)
+    sub_request = SubRequest(request, parts.path, parts.query)
+    try:
+        match = resolve(parts.path)
+    except Resolver404:
+        return sub_request, None, (), {}
+    sub_request.resolver_match = match
+    return sub_request, match.func, match.args, match.kwargs
+
+
+def _error_status(error):
+    if isinstance(error, Http404):
+        return 404
+    if isinstance(error, PermissionDenied):
+        return 403
+    logger.error(f"Batch sub-request failed: {error}", exc_info=True)
+    return 500
+
+
+def _run_sync_one(sub_request, view, args, kwargs):
+    if view is None:
+        return 404, None
+    try:
+        return None, call_view(view, sub_request, *args, **kwargs)
+    except Exception as e:
+        return _error_status(e), None
+
+
+async def _run_async_one(sub_request, view, args, kwargs):
+    try:
+        return None, await view(sub_request, *args, **kwargs)
+    except Exception as e:
+        return _error_status(e), None
+
+
+def _encode_result(request_id, status, response):
+    """单个子请求的结果；JSON 响应体原样拼接，其他类型的响应体为 null"""
+    if response is not None:
+        status = response.status_code
+    head = dumps({'id': request_id, 'status': status})[:-1]
+    body = b'null'
+    if (
+        response is not None and not response.streaming
+        and response.get('Content-Type', '').startswith('application/json') and response.content
+    ):
+        body = response.content
+    return head + b',"body":' + body + b'}'
+
+
+async def dispatch(request, items):
+    """
+    执行子请求
+
+    Args:
+        request: 外层请求
+        items: parse_requests 的结果
+
+    Returns:
+        list[bytes]: 与 items 顺序一致的编码结果
+    """
+    prepared = [_prepare(request, path) for _, path in items]
+    async_indexes = [
+        i for i, (_, view, _, _) in enumerate(prepared)
+        if view is not None and iscoroutinefunction(view)
+    ]
+    sync_indexes = [i for i in range(len(prepared)) if i not in async_indexes]
+
+    def run_sync_group():
+        return [_run_sync_one(*prepared[i]) for i in sync_indexes]
+
+    tasks = [_run_async_one(*prepared[i]) for i in async_indexes]
+    if sync_indexes:
+        tasks.append(run_sync(run_sync_group))
+    results = await asyncio.gather(*tasks)
+    sync_results = results.pop() if sync_indexes else []
+
+    outcomes = [None] * len(prepared)
+    for i, outcome in zip(async_indexes + sync_indexes, results + sync_results):
+        outcomes[i] = outcome
+
+    return [
+        _encode_result(request_id, *outcome)
+        for (request_id, _), outcome in zip(items, outcomes)
+    ]
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+async def batch_view(request):
+    """批量读接口（只执行 GET 子请求，因此不需要 CSRF 校验）"""
+    try:
+        items = parse_requests(request)
+    except ValueError as e:
+        return _json_response({'code': 400, 'message': str(e)}, status=400)
+
+    # 子请求都是 GET，外层 POST 请求同样走只读连接
+    routing = read_only_routing() if get_sqlite_config()['READ_ONLY_ROUTING'] else nullcontext()
+    with request_cache_scope(), routing:
+        results = await dispatch(request, items)
+
+    head = dumps({'code': 200, 'message': '批量请求完成'})[:-1]
+    body = head + b',"data":{"responses":[' + b','.join(results) + b']}}'
+    return HttpResponse(body, content_type='application/json')
@@ -1,13 +1,25 @@
 """
 缓存模块 - 提供统一的缓存装饰器和缓存清理功能
 """
+import time
 from functools import wraps
 from django.core.cache import cache
 from django.conf import settings
 import logging
+from django.dispatch import Signal
+
+from .async_cache import aget_many
+from .async_support import run_sync
+from .local_cache import invalidate_local, publish_invalidation, redis_available
+from .metrics import record_cache_access
+from .request_cache import clear_request_cache, request_cached
+from .stampede import get_or_compute
 
 logger = logging.getLogger(__name__)
 
+# 缓存失效信号（pattern 为键模式或数据版本命名空间，清空全部时为 None），缓存预热使用
+cache_invalidated = Signal()
+
 
 def cache_result(timeout=600, key_prefix=None):
     """
@@ -25,46 +37,57 @@ def cache_result(timeout=600, key_prefix=None):
         def get_songs():
             # 业务逻辑
             pass
+
+        get_songs.invalidate()     # 清除与该次调用参数对应的缓存
+        get_songs.cache_clear()    # 清除该函数的全部缓存
     """
     def decorator(func):
+        prefix = key_prefix or func.__name__
+
+        def make_key(args, kwargs):
+            # 使用前缀（默认为函数名）和参数生成唯一键
+            args_str = ','.join(str(arg) for arg in args)
+            kwargs_str = ','.join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+            return f"{prefix}:{args_str}:{kwargs_str}"
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # 生成缓存键
-            if key_prefix:
-                # 使用参数生成唯一键
-                args_str = ','.join(str(arg) for arg in args)
-                kwargs_str = ','.join(f"{k}={v}" for k, v in sorted(kwargs.items()))
-                cache_key = f"{key_prefix}:{args_str}:{kwargs_str}"
-            else:
-                # 使用函数名和参数生成键
-                args_str = ','.join(str(arg) for arg in args)
-                kwargs_str = ','.join(f"{k}={v}" for k, v in sorted(kwargs.items()))
-                cache_key = f"{func.__name__}:{args_str}:{kwargs_str}"
-
-            # 尝试从缓存获取
-            try:
-                result = cache.get(cache_key)
-                if result is not None:
-                    logger.debug(f"Cache hit: {cache_key}")
-                    return result
-            except Exception as e:
-                logger.warning(f"Cache get failed: {e}")
+            cache_key = make_key(args, kwargs)
 
-            # 执行函数
-            result = func(*args, **kwargs)
-
-            # 尝试设置缓存
-            try:
-                cache.set(cache_key, result, timeout)
-                logger.debug(f"Cache set: {cache_key} (timeout={timeout}s)")
-            except Exception as e:
-                logger.warning(f"Cache set failed: {e}")
+            # 读取缓存，未命中或需要刷新时只由一个请求回源（见 stampede.get_or_compute）
+            result, hit = get_or_compute(cache_key, prefix, lambda: func(*args, **kwargs), timeout)
+            record_cache_access(prefix, hit)
+            logger.debug(f"Cache {'hit' if hit else 'set'}: {cache_key}")
 
             return result
+
+        def invalidate(*args, **kwargs):
+            """清除与给定参数对应的缓存（参数与调用时相同）"""
+            delete_cache_key(make_key(args, kwargs))
+
+        wrapper.invalidate = invalidate
+        wrapper.cache_clear = lambda: clear_cache_pattern(f"{prefix}:")
         return wrapper
     return decorator
 
 
+def delete_cache_key(cache_key):
+    """
+    删除单个缓存键（包括各 worker 的一级缓存）
+
+    先删除 Redis 中的键再通知其他 worker，否则其他 worker 可能在删除前用旧值回填一级缓存
+
+    Args:
+        cache_key: 完整的缓存键
+    """
+    invalidate_local(cache_key)
+    try:
+        cache.delete(cache_key)
+    except Exception as e:
+        logger.warning(f"Failed to delete cache key {cache_key}: {e}")
+    publish_invalidation(cache_key)
+
+
 def clear_cache_pattern(pattern):
     """
     清除匹配模式的缓存
@@ -79,6 +102,9 @@ def clear_cache_pattern(pattern):
     Example:
         clear_cache_pattern('song_detail')  # 清除所有 song_detail:* 缓存
     """
+    # 一级缓存：本进程先删除；Redis 中的键删除后再通知其他 worker 和预热任务
+    invalidate_local(pattern)
+
     try:
         # 检查缓存后端是否支持模式匹配
         cache_backend = settings.CACHES.get('default', {}).get('BACKEND', '')
@@ -113,23 +139,135 @@ def clear_cache_pattern(pattern):
         elif 'locmem' in cache_backend.lower():
             # LocMemCache 不支持模式匹配，需要遍历所有键
             if hasattr(cache, '_cache'):
-                keys_to_delete = [key for key in cache._cache.keys() if pattern in key]
+                # _cache 中保存的是 make_key 之后的完整键（KEY_PREFIX:版本:键），删除时还原为原始键
+                keys_to_delete = [key.split(':', 2)[2] for key in list(cache._cache.keys()) if pattern in key]
                 if keys_to_delete:
-                    for key in keys_to_delete:
-                        cache.delete(key)
+                    cache.delete_many(keys_to_delete)
                     logger.info(f"Cleared {len(keys_to_delete)} cache keys matching pattern: *{pattern}*")
         else:
             logger.warning("Current cache backend does not support pattern matching")
     except Exception as e:
         logger.warning(f"Failed to clear cache pattern: {e}")
 
+    publish_invalidation(pattern)
+    cache_invalidated.send(sender=None, pattern=pattern)
+
 
 def clear_all_cache():
     """
     清除所有缓存
     """
+    invalidate_local()
     try:
         cache.clear()
         logger.info("Cleared all cache")
     except Exception as e:
-        logger.warning(f"Failed to clear all cache: {e}")
\ No newline at end of file
+        logger.warning(f"Failed to clear all cache: {e}")
+    publish_invalidation()
+    cache_invalidated.send(sender=None, pattern=None)
+
+
+def _new_data_version():
+    """生成新的版本号（毫秒时间戳，版本键被淘汰后重建也不会与旧缓存冲突）"""
+    return int(time.time() * 1000)
+
+
+@request_cached
+def get_data_version(namespace):
+    """
+    获取数据版本号，用于构建版本化缓存键
+
+    数据变化时调用 bump_data_version 使版本号递增，旧版本的缓存键不再被访问，
+    无需按模式扫描删除。同一个批量请求内只读取一次（见 core/request_cache.py）。
+
+    Args:
+        namespace: 版本命名空间，例如 'fansDIY:works:all'
+
+    Returns:
+        int: 当前版本号；缓存不可用时返回 0
+
+    Example:
+        version = get_data_version('fansDIY:collections')
+        cache_key = f"fansDIY:collections:v{version}:{page}"
+    """
+    key = f"version:{namespace}"
+    if not redis_available():
+        return 0
+    try:
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, _new_data_version(), None)
+            version = cache.get(key)
+        return version or 0
+    except Exception as e:
+        logger.warning(f"Cache version get failed: {e}")
+        return 0
+
+
+def bump_data_version(*namespaces):
+    """
+    递增一个或多个数据版本号，使对应的版本化缓存整体失效
+
+    Args:
+        *namespaces: 版本命名空间
+    """
+    clear_request_cache()
+    for namespace in namespaces:
+        key = f"version:{namespace}"
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                # 版本键不存在时重新初始化
+                cache.set(key, _new_data_version(), None)
+            logger.debug(f"Cache version bumped: {key}")
+        except Exception as e:
+            logger.warning(f"Cache version bump failed: {e}")
+        cache_invalidated.send(sender=None, pattern=namespace)
+
+
+def get_data_versions(namespaces):
+    """
+    批量获取多个数据版本号（一次 get_many 往返），不存在的版本号逐个初始化
+
+    Args:
+        namespaces: 版本命名空间列表
+
+    Returns:
+        list[int]: 与 namespaces 顺序一致的版本号；缓存不可用时为 0
+    """
+    keys = [f"version:{namespace}" for namespace in namespaces]
+    if not redis_available():
+        return [0] * len(keys)
+    try:
+        found = cache.get_many(keys)
+    except Exception as e:
+        logger.warning(f"Cache version get failed: {e}")
+        return [0] * len(keys)
+    return [
+        found[key] if found.get(key) else get_data_version(namespace)
+        for key, namespace in zip(keys, namespaces)
+    ]
+
+
+async def aget_data_versions(namespaces):
+    """
+    get_data_versions 的异步版本（ASGI 下的中间件使用），有版本号需要初始化时在线程池中执行同步版本
+
+    Args:
+        namespaces: 版本命名空间列表
+
+    Returns:
+        list[int]: 与 namespaces 顺序一致的版本号；缓存不可用时为 0
+    """
+    keys = [f"version:{namespace}" for namespace in namespaces]
+    if not redis_available():
+        return [0] * len(keys)
+    try:
+        found = await aget_many(keys)
+    except Exception as e:
+        logger.warning(f"Cache version get failed: {e}")
+        return [0] * len(keys)
+    if not all(found.get(key) for key in keys):
+        return await run_sync(get_data_versions, namespaces)
+    return [found[key] for key in keys]
@@ -0,0 +1,137 @@
+"""
+缓存值编解码 - 以紧凑的 JSON 投影代替 pickle 保存 cache_result / cached 的结果
+
+- 模型实例只保存已加载的字段值（attname -> 值）和所属数据库，读取时用 Model.from_db 重建，
+  不序列化 _state、关联缓存等 ORM 内部状态；datetime / date / time / Decimal 带类型标记以便原样还原
+- 编码使用 orjson，超过 COMPRESS_MIN_SIZE 且压缩后更小时再 zlib 压缩
+- orjson 无法表示的值（非字符串键、自定义对象等）或未安装 orjson 时回退到 pickle，行为与之前一致
+
+注意：元组会还原为列表；重建的模型实例不带 select_related / prefetch_related 的缓存。
+"""
+import datetime
+import decimal
+import pickle
+import zlib
+
+from django.apps import apps
+from django.db import models
+from django.db.models.fields.files import FieldFile
+from django.utils.functional import Promise
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 未安装 orjson 时回退到 pickle
+    orjson = None
+
+# 小于该大小的值不压缩
+COMPRESS_MIN_SIZE = 1024
+ZLIB_LEVEL = 6
+
+# 格式标记（首字节）
+FORMAT_PICKLE = 0x00
+FORMAT_JSON = 0x01
+FORMAT_TAGGED_JSON = 0x02   # 含类型标记，解码时需要还原
+FLAG_ZLIB = 0x80
+
+TYPE_KEY = '__cache_type__'
+
+
+class _Encoder:
+    """orjson 的 default 回调，记录是否产生了类型标记"""
+
+    def __init__(self):
+        self.tagged = False
+
+    def _tag(self, *payload):
+        self.tagged = True
+        return {TYPE_KEY: payload}
+
+    def __call__(self, obj):
+        if isinstance(obj, models.Model):
+            fields = {
+                field.attname: obj.__dict__[field.attname]
+                for field in obj._meta.concrete_fields
+                if field.attname in obj.__dict__
+            }
+            return self._tag('model', obj._meta.label, obj._state.db, fields)
+        if isinstance(obj, datetime.datetime):
+            return self._tag('datetime', obj.isoformat())
+        if isinstance(obj, datetime.date):
+            return self._tag('date', obj.isoformat())
+        if isinstance(obj, datetime.time):
+            return self._tag('time', obj.isoformat())
+        if isinstance(obj, decimal.Decimal):
+            return self._tag('decimal', str(obj))
+        if isinstance(obj, FieldFile):
+            return obj.name
+        if isinstance(obj, Promise):
+            return str(obj)
+        raise TypeError(f"Type is not cache-encodable: {type(obj).__name__}")
+
+
+def _decode_model(label, db, fields):
+    model = apps.get_model(label)
+    names = list(fields)
+    return model.from_db(db, names, [_restore(fields[name]) for name in names])
+
+
+_DECODERS = {
+    'model': _decode_model,
+    'datetime': datetime.datetime.fromisoformat,
+    'date': datetime.date.fromisoformat,
+    'time': datetime.time.fromisoformat,
+    'decimal': decimal.Decimal,
+}
+
+
+def _restore(node):
+    """还原带类型标记的节点"""
+    if isinstance(node, list):
+        return [_restore(item) for item in node]
+    if isinstance(node, dict):
+        if len(node) == 1 and TYPE_KEY in node:
+            kind, *payload = node[TYPE_KEY]
+            return _DECODERS[kind](*payload)
+        return {key: _restore(value) for key, value in node.items()}
+    return node
+
+
+def encode(value):
+    """
+    编码缓存值
+
+    Returns:
+        bytes: 首字节为格式标记
+    """
+    fmt = FORMAT_PICKLE
+    payload = None
+    if orjson is not None:
+        encoder = _Encoder()
+        try:
+            payload = orjson.dumps(value, default=encoder, option=orjson.OPT_PASSTHROUGH_DATETIME)
+            fmt = FORMAT_TAGGED_JSON if encoder.tagged else FORMAT_JSON
+        except TypeError:
+            payload = None
+    if payload is None:
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    if len(payload) >= COMPRESS_MIN_SIZE:
+        compressed = zlib.compress(payload, ZLIB_LEVEL)
+        if len(compressed) < len(payload):
+            fmt |= FLAG_ZLIB
+            payload = compressed
+    return bytes((fmt,)) + payload
+
+
+def decode(data):
+    """解码 encode 的结果"""
+    fmt = data[0]
+    payload = memoryview(data)[1:]
+    if fmt & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+        fmt &= ~FLAG_ZLIB
+
+    if fmt == FORMAT_PICKLE:
+        return pickle.loads(payload)
+    value = orjson.loads(payload)
+    return _restore(value) if fmt == FORMAT_TAGGED_JSON else value
@@ -1,12 +1,18 @@
 """
 缓存中间件 - 提供缓存相关的 HTTP 响应头和监控
 """
+import hashlib
+import re
 import time
 from typing import Optional
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified
 from django.core.cache import cache
+from django.utils.http import parse_etags
 import logging
 
+from core.async_support import AsyncMiddlewareMixin
+from core.cache import aget_data_versions, get_data_versions
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,7 +42,7 @@ class CacheStats:
         return self.total_time / total if total > 0 else 0
 
 
-class CacheHeaderMiddleware:
+class CacheHeaderMiddleware(AsyncMiddlewareMixin):
     """
     缓存响应头中间件
     
@@ -47,19 +53,21 @@ class CacheHeaderMiddleware:
     """
     
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
         self.stats = CacheStats()
     
-    def __call__(self, request: HttpRequest):
-        start_time = time.time()
-        
+    def handle(self, request: HttpRequest):
         # 标记请求开始时间
-        request._cache_start_time = start_time
-        
-        response = self.get_response(request)
-        
+        request._cache_start_time = time.time()
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request: HttpRequest):
+        request._cache_start_time = time.time()
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request: HttpRequest, response: HttpResponse):
         # 计算响应时间
-        duration = time.time() - start_time
+        duration = time.time() - request._cache_start_time
         
         # 添加响应头
         response['X-Response-Time'] = f'{duration:.3f}s'
@@ -71,7 +79,7 @@ class CacheHeaderMiddleware:
         return response
 
 
-class CacheControlMiddleware:
+class CacheControlMiddleware(AsyncMiddlewareMixin):
     """
     缓存控制中间件
     
@@ -89,19 +97,14 @@ class CacheControlMiddleware:
         r'^/api/gallery/$': (300, True),         # 图集列表缓存 5 分钟
         r'^/api/site-settings/$': (60, True),    # 网站设置缓存 1 分钟
         r'^/api/random-song/$': (0, False),      # 随机歌曲不缓存
+        r'^/sitemap(-[\w-]+)?\.xml$': (3600, True),  # sitemap 索引和子 sitemap 缓存 1 小时
     }
     
-    def __init__(self, get_response):
-        self.get_response = get_response
-    
-    def __call__(self, request: HttpRequest):
-        response = self.get_response(request)
-        
-        # 只处理成功的 GET 请求
-        if request.method != 'GET' or response.status_code != 200:
+    def process_response(self, request: HttpRequest, response: HttpResponse):
+        # 只处理成功的 GET 请求（304 也需要带上缓存策略）
+        if request.method != 'GET' or response.status_code not in (200, 304):
             return response
         
-        import re
         path = request.path_info
         
         # 匹配 URL 模式
@@ -117,6 +120,120 @@ class CacheControlMiddleware:
         return response
 
 
+class DataVersionETagMiddleware(AsyncMiddlewareMixin):
+    """
+    数据版本 ETag 中间件
+
+    公开读接口按 URL 模式映射到一组数据版本命名空间（由各应用的模型信号递增），
+    ETag 由版本号和请求路径、查询参数计算得出，不需要执行视图：
+    - If-None-Match 命中时直接返回 304，不进入视图、不查询数据库
+    - 否则执行视图，并在 200 响应上附加 ETag
+    缓存不可用（版本号为 0）时无法感知数据变化，不做处理
+    异步调用链中用 aget_data_versions 读取版本号，不占用线程
+    """
+
+    # URL 模式 -> 数据版本命名空间（命名空间定义见各应用的 signals 模块）
+    ETAG_PATTERNS = {
+        # 歌曲列表、演唱记录、排行榜、曲风、标签、原唱作品（随机歌曲不参与）
+        r'^/api/(songs/(\d+/records/)?|top_songs/|styles/|tags/|original-works/)$': (
+            'song_management:catalog',
+        ),
+        r'^/api/(songlist|youyou|bingjie)/(songs|languages|styles)/$': (
+            'songlist:youyousong', 'songlist:bingjiesong',
+        ),
+        r'^/api/fansDIY/(collections|works)/': ('fansDIY:collections', 'fansDIY:works:all'),
+        # 图片列表直接读取文件夹，由 GalleryListingService 按目录指纹缓存，不在此处理
+        r'^/api/gallery/(tree/|(?!thumbnail/|admin/)[^/]+/)$': ('gallery',),
+        # 直播详情包含当日歌切和截图
+        r'^/api/livestreams/': ('livestream', 'song_management:catalog', 'gallery'),
+        r'^/api/site-settings/': ('site_settings',),
+    }
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.patterns = [
+            (re.compile(pattern), namespaces)
+            for pattern, namespaces in self.ETAG_PATTERNS.items()
+        ]
+
+    def get_namespaces(self, path: str):
+        """返回路径对应的数据版本命名空间，不参与时返回 None"""
+        for pattern, namespaces in self.patterns:
+            if pattern.match(path):
+                return namespaces
+        return None
+
+    @staticmethod
+    def compute_etag(request: HttpRequest, versions) -> str:
+        """由数据版本号和请求计算弱 ETag（响应可能被压缩，只保证语义相同）"""
+        raw = '|'.join([
+            ','.join(str(version) for version in versions),
+            request.path,
+            request.META.get('QUERY_STRING', ''),
+            request.META.get('HTTP_ACCEPT', ''),
+        ])
+        return f'W/"{hashlib.md5(raw.encode("utf-8")).hexdigest()}"'
+
+    @staticmethod
+    def etag_matches(etag: str, if_none_match: str) -> bool:
+        """按弱比较判断 If-None-Match 是否命中"""
+        opaque = etag.removeprefix('W/')
+        for candidate in parse_etags(if_none_match):
+            if candidate == '*' or candidate.removeprefix('W/') == opaque:
+                return True
+        return False
+
+    def _request_namespaces(self, request: HttpRequest):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        return self.get_namespaces(request.path_info)
+
+    def _not_modified(self, request: HttpRequest, etag: str) -> Optional[HttpResponse]:
+        """If-None-Match 命中时返回 304 响应"""
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and self.etag_matches(etag, if_none_match):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+        return None
+
+    @staticmethod
+    def _set_etag(response: HttpResponse, etag: str) -> HttpResponse:
+        if response.status_code == 200 and not response.has_header('ETag'):
+            response['ETag'] = etag
+        return response
+
+    def handle(self, request: HttpRequest):
+        namespaces = self._request_namespaces(request)
+        if not namespaces:
+            return self.get_response(request)
+
+        versions = get_data_versions(namespaces)
+        if not all(versions):
+            return self.get_response(request)
+
+        etag = self.compute_etag(request, versions)
+        not_modified = self._not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return self._set_etag(self.get_response(request), etag)
+
+    async def __acall__(self, request: HttpRequest):
+        namespaces = self._request_namespaces(request)
+        if not namespaces:
+            return await self.get_response(request)
+
+        versions = await aget_data_versions(namespaces)
+        if not all(versions):
+            return await self.get_response(request)
+
+        etag = self.compute_etag(request, versions)
+        not_modified = self._not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return self._set_etag(await self.get_response(request), etag)
+
+
 class CacheMonitorMiddleware:
     """
     缓存监控中间件
@@ -8,6 +8,10 @@ from typing import Any, Callable, Optional
 from django.core.cache import cache
 import logging
 
+from .cache import clear_cache_pattern, delete_cache_key
+from .metrics import record_cache_access
+from .stampede import get_or_compute
+
 logger = logging.getLogger(__name__)
 
 
@@ -128,40 +132,29 @@ class cached:
                 **kwargs
             )
             
-            # 尝试从缓存获取
-            try:
-                cached_value = cache.get(cache_key)
-                if cached_value is not None:
-                    logger.debug(f"Cache hit: {cache_key}")
-                    return cached_value
-            except Exception as e:
-                logger.warning(f"Cache get failed: {e}")
-            
-            # 执行函数
-            result = func(*args, **kwargs)
-            
-            # 缓存结果
-            if result is not None or self.cache_none:
-                try:
-                    cache.set(cache_key, result, self.timeout)
-                    logger.debug(f"Cache set: {cache_key}")
-                except Exception as e:
-                    logger.warning(f"Cache set failed: {e}")
+            # 读取缓存，未命中或需要刷新时只由一个请求回源
+            prefix = self.key_prefix or func.__name__
+            result, hit = get_or_compute(
+                cache_key, prefix, lambda: func(*args, **kwargs), self.timeout, self.cache_none
+            )
+            record_cache_access(prefix, hit)
+            if hit:
+                logger.debug(f"Cache hit: {cache_key}")
             
             return result
         
-        # 添加清除缓存的方法
-        wrapper.invalidate = lambda *args, **kwargs: cache.delete(
-            CacheKeyBuilder.build_key(
-                self.key_prefix or func.__name__,
-                *args,
-                **kwargs
-            )
+        # 添加清除缓存的方法（参数与调用时相同）
+        prefix = self.key_prefix or func.__name__
+        wrapper.invalidate = lambda *args, **kwargs: delete_cache_key(
+            CacheKeyBuilder.build_key(prefix, *args[1:], **kwargs)
         )
         
-        wrapper.invalidate_all = lambda: cache.delete_pattern(
-            f"{self.key_prefix or func.__name__}:*"
-        ) if hasattr(cache, 'delete_pattern') else None
+        def invalidate_all():
+            # 无参数调用时键就是前缀本身
+            delete_cache_key(prefix)
+            clear_cache_pattern(f"{prefix}:")
+        
+        wrapper.invalidate_all = wrapper.cache_clear = invalidate_all
         
         return wrapper
 
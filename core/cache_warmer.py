@@ -0,0 +1,246 @@
+"""
+缓存预热 - 部署、清理缓存或批量导入后按优先级重建热点缓存
+
+- 各应用在 <app>/warmers.py 中用 register_warmer 声明预热任务（首次使用时自动发现），
+  任务可以直接调用服务方法，也可以用 warm_urls 在进程内请求公开接口，
+  由视图按与线上请求完全相同的缓存键写入缓存
+- 按优先级从小到大分组执行，同一优先级内最多 CONCURRENCY 个任务并发
+- warm_cache 管理命令手动预热；AUTO 开启时，clear_cache_pattern / clear_all_cache / bump_data_version
+  触发 cache_invalidated 信号，经 DELAY 秒防抖合并后在后台线程中只预热受影响的任务
+
+使用示例:
+    @register_warmer('top_songs', priority=10, patterns=('top_songs',))
+    def warm_top_songs():
+        return warm_urls([f'/api/top_songs/?range={key}' for key in ('all', '1m')])
+"""
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import receiver
+from django.test import RequestFactory
+from django.urls import resolve
+from django.utils.module_loading import autodiscover_modules
+
+from .cache import cache_invalidated
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.CACHE_WARMER_CONFIG 覆盖
+DEFAULT_CONFIG = {
+    'AUTO': False,       # 缓存失效后是否在后台自动预热
+    'DELAY': 2,          # 自动预热的防抖延迟（秒），合并批量导入等产生的多次失效
+    'CONCURRENCY': 2,    # 同一优先级内并发执行的任务数，1 表示在当前线程中依次执行
+}
+
+
+class Warmer(NamedTuple):
+    """预热任务"""
+    name: str
+    func: Callable[[], Optional[int]]
+    priority: int
+    patterns: Tuple[str, ...]   # 任务重建的缓存键前缀或数据版本命名空间
+    description: str
+
+
+class WarmResult(NamedTuple):
+    """预热任务执行结果"""
+    name: str
+    count: Optional[int]        # 预热的键（或请求）数量
+    duration: float
+    error: Optional[str]
+
+
+_registry = {}
+_discovered = False
+
+
+def get_config():
+    """获取缓存预热配置"""
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'CACHE_WARMER_CONFIG', {}))
+    return config
+
+
+def register_warmer(name, priority=100, patterns=(), description=''):
+    """
+    注册预热任务的装饰器
+
+    Args:
+        name: 任务名称（warm_cache 命令中使用）
+        priority: 优先级，越小越先执行
+        patterns: 任务重建的缓存键前缀 / 数据版本命名空间，失效模式与其互相包含时自动预热；默认为 name
+        description: 说明，默认取函数文档的第一行
+    """
+    def decorator(func):
+        doc = (func.__doc__ or '').strip()
+        _registry[name] = Warmer(
+            name, func, priority, tuple(patterns) or (name,),
+            description or (doc.splitlines()[0] if doc else ''),
+        )
+        return func
+    return decorator
+
+
+def autodiscover():
+    """导入各应用的 warmers 模块"""
+    global _discovered
+    if not _discovered:
+        autodiscover_modules('warmers')
+        _discovered = True
+
+
+def _matches(warmer, pattern):
+    return any(p in pattern or pattern in p for p in warmer.patterns)
+
+
+def get_warmers(names=None, pattern=None):
+    """
+    获取预热任务（按优先级、名称排序）
+
+    Args:
+        names: 只返回这些名称的任务
+        pattern: 只返回与该失效模式相关的任务
+
+    Raises:
+        KeyError: names 中有未注册的任务
+    """
+    autodiscover()
+    if names is not None:
+        unknown = set(names) - set(_registry)
+        if unknown:
+            raise KeyError(', '.join(sorted(unknown)))
+    warmers = [
+        warmer for warmer in _registry.values()
+        if (names is None or warmer.name in names) and (not pattern or _matches(warmer, pattern))
+    ]
+    return sorted(warmers, key=lambda warmer: (warmer.priority, warmer.name))
+
+
+def _host():
+    """进程内请求使用的 Host（需通过 ALLOWED_HOSTS 校验）"""
+    hosts = [host for host in settings.ALLOWED_HOSTS if host and '*' not in host and not host.startswith('.')]
+    return hosts[0] if hosts else 'localhost'
+
+
+def warm_urls(paths):
+    """
+    在进程内依次 GET 公开接口（不经过中间件），由视图写入缓存
+
+    Args:
+        paths: URL 路径（可带查询字符串）
+
+    Returns:
+        int: 成功（状态码 < 400）的请求数
+    """
+    factory = RequestFactory(HTTP_HOST=_host())
+    count = 0
+    for path in paths:
+        request = factory.get(path)
+        match = resolve(request.path_info)
+        response = match.func(request, *match.args, **match.kwargs)
+        if response.status_code < 400:
+            count += 1
+        else:
+            logger.warning(f"Cache warm request {path} returned {response.status_code}")
+    return count
+
+
+def _run_one(warmer, close_connections):
+    start = time.monotonic()
+    count, error = None, None
+    try:
+        count = warmer.func()
+    except Exception as e:
+        logger.warning(f"Cache warmer {warmer.name} failed: {e}", exc_info=True)
+        error = str(e)
+    finally:
+        if close_connections:
+            # 线程池中的数据库连接不会被请求周期回收
+            connections.close_all()
+    duration = time.monotonic() - start
+    logger.info(f"Cache warmer {warmer.name}: {count} in {duration:.2f}s")
+    return WarmResult(warmer.name, count, duration, error)
+
+
+def run_warmers(warmers, concurrency=None):
+    """
+    按优先级分组执行预热任务，组内有界并发
+
+    Args:
+        warmers: get_warmers 的结果（已按优先级排序）
+        concurrency: 并发数，默认取配置
+
+    Returns:
+        list[WarmResult]: 与 warmers 顺序一致
+    """
+    concurrency = concurrency or get_config()['CONCURRENCY']
+    results = []
+    for _, group in itertools.groupby(warmers, key=lambda warmer: warmer.priority):
+        group = list(group)
+        if concurrency <= 1 or len(group) == 1:
+            results += [_run_one(warmer, close_connections=False) for warmer in group]
+            continue
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(group)), thread_name_prefix='cache-warmer') as pool:
+            results += list(pool.map(lambda warmer: _run_one(warmer, close_connections=True), group))
+    return results
+
+
+# ==================== 自动预热 ====================
+
+_pending = set()
+_timer = None
+_pending_lock = threading.Lock()
+
+
+def schedule_warmup(pattern=None):
+    """
+    安排后台预热与 pattern 相关的任务（pattern 为空时全部），DELAY 秒内的多次调用合并执行
+
+    Returns:
+        bool: 是否有任务被安排
+    """
+    global _timer
+    config = get_config()
+    if not config['AUTO']:
+        return False
+    names = {warmer.name for warmer in get_warmers(pattern=pattern)}
+    if not names:
+        return False
+    with _pending_lock:
+        _pending.update(names)
+        if _timer is None:
+            _timer = threading.Timer(config['DELAY'], _run_in_background)
+            _timer.daemon = True
+            _timer.start()
+    return True
+
+
+def run_pending():
+    """执行已安排的预热任务"""
+    global _timer
+    with _pending_lock:
+        names = set(_pending)
+        _pending.clear()
+        _timer = None
+    if not names:
+        return []
+    return run_warmers(get_warmers(names=names))
+
+
+def _run_in_background():
+    try:
+        run_pending()
+    finally:
+        # 定时器线程中的数据库连接
+        connections.close_all()
+
+
+@receiver(cache_invalidated, dispatch_uid='core.cache_warmer.schedule_warmup')
+def _on_cache_invalidated(sender, pattern=None, **kwargs):
+    schedule_warmup(pattern)
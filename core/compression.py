@@ -0,0 +1,162 @@
+"""
+压缩模块 - 预压缩响应变体与 Accept-Encoding 协商
+
+- 可缓存的 JSON 响应在写入缓存时一次性生成 gzip、brotli 变体，与原始字节一起保存，
+  命中缓存时按 Accept-Encoding 直接返回对应变体，不产生任何压缩开销
+- 其他 JSON/XML 接口响应（未预压缩）由 CompressionMiddleware 以较快的级别即时 gzip 压缩
+- HTML 等文本响应不压缩：页面中带有 CSRF 令牌等会话相关的秘密，确定性的即时压缩会暴露于 BREACH 攻击
+- brotli 为可选依赖，未安装时只生成 gzip 变体
+"""
+import gzip
+import re
+
+from django.utils.cache import patch_vary_headers
+
+from .async_support import AsyncMiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 未安装 brotli 时只使用 gzip
+    brotli = None
+
+# 小于该大小的响应不压缩（压缩头部开销抵消收益）
+MIN_COMPRESS_SIZE = 512
+# 预压缩只执行一次，使用较高的压缩级别
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+# 即时压缩每次请求都执行，使用较快的级别
+ONLINE_GZIP_LEVEL = 5
+
+IDENTITY = 'identity'
+# 服务端偏好顺序
+ENCODING_PREFERENCE = ('br', 'gzip')
+
+# 只压缩接口响应（JSON/XML），不压缩 HTML 页面（见模块说明中的 BREACH）
+COMPRESSIBLE_TYPES = ('application/json', 'application/xml')
+
+_QVALUE_RE = re.compile(r'^\s*q\s*=\s*([0-9.]+)\s*$', re.IGNORECASE)
+
+
+def compress_variants(body):
+    """
+    生成响应体的各编码变体
+
+    Args:
+        body: 原始响应字节
+
+    Returns:
+        dict: {编码: 字节}，始终包含 identity；过小的响应只有 identity
+    """
+    variants = {IDENTITY: body}
+    if len(body) < MIN_COMPRESS_SIZE:
+        return variants
+
+    # mtime=0 使相同内容的压缩结果一致
+    variants['gzip'] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+    # 压缩后反而更大的变体没有意义
+    return {
+        encoding: data for encoding, data in variants.items()
+        if encoding == IDENTITY or len(data) < len(body)
+    }
+
+
+def parse_accept_encoding(header):
+    """
+    解析 Accept-Encoding 请求头
+
+    Returns:
+        dict: {编码（小写）: q 值}
+    """
+    accepted = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        match = _QVALUE_RE.match(params) if params else None
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate_encoding(header, available):
+    """
+    根据 Accept-Encoding 选择编码
+
+    Args:
+        header: Accept-Encoding 请求头
+        available: 可用的编码集合
+
+    Returns:
+        str: 选中的编码，没有可用的压缩编码时返回 'identity'
+    """
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+
+    best, best_quality = IDENTITY, 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in available:
+            continue
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _is_compressible(response):
+    if response.streaming or response.has_header('Content-Encoding'):
+        return False
+    if response.status_code != 200:
+        return False
+    content_type = response.get('Content-Type', '')
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def apply_encoding(response, encoding, body):
+    """将选中的编码变体写入响应"""
+    response.content = body
+    response['Content-Length'] = str(len(body))
+    if encoding != IDENTITY:
+        response['Content-Encoding'] = encoding
+
+
+class CompressionMiddleware(AsyncMiddlewareMixin):
+    """
+    响应压缩中间件
+
+    - 响应带有 encoded_variants（由 cached_success_response 从缓存中取出）时，
+      直接选择协商出的预压缩变体
+    - 其他 JSON/XML 响应即时 gzip 压缩；HTML 等文本响应不处理
+    - 图片、视频等流式响应和已编码的响应不处理
+    """
+
+    def process_response(self, request, response):
+        if not _is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+        variants = getattr(response, 'encoded_variants', None)
+        if variants:
+            encoding = negotiate_encoding(header, variants)
+            if encoding != IDENTITY:
+                apply_encoding(response, encoding, variants[encoding])
+            return response
+
+        body = response.content
+        if len(body) < MIN_COMPRESS_SIZE or negotiate_encoding(header, ('gzip',)) != 'gzip':
+            return response
+
+        compressed = gzip.compress(body, compresslevel=ONLINE_GZIP_LEVEL, mtime=0)
+        if len(compressed) < len(body):
+            apply_encoding(response, 'gzip', compressed)
+        return response
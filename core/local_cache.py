@@ -0,0 +1,332 @@
+"""
+进程内一级缓存 - 在 Redis 之前为极热的小数据提供 LRU 缓存
+
+- 只对 PREFIXES 中配置的键前缀生效（曲风/标签列表、网站设置、推荐语等），命中时不访问 Redis、
+  不反序列化；条目受 MAX_ENTRIES 和各前缀的 TTL 约束
+- 失效：信号处理器调用 clear_cache_pattern / clear_all_cache 时，本进程立即删除匹配条目，
+  并通过 Redis pub/sub 通知其他 worker（订阅线程在首次使用时按进程启动，断线重连后清空一级缓存）
+- Redis 不可用时熔断 RETRY_INTERVAL 秒，期间不再访问 Redis，所有键都以 FALLBACK_TTL 写入一级缓存，
+  避免每个请求都因连接失败而回源数据库
+- 异步视图使用 atiered_get / atiered_set，与同步版本共用一级缓存和熔断状态
+
+注意：一级缓存命中时直接返回缓存的对象本身（不是副本），调用方不能修改返回值。
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .async_cache import aget, aset
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.LOCAL_CACHE_CONFIG 覆盖
+DEFAULT_CONFIG = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 1000,
+    'PREFIXES': {},            # 键前缀 -> 一级缓存 TTL（秒）
+    'FALLBACK_TTL': 30,        # Redis 不可用时所有键在一级缓存中的 TTL
+    'RETRY_INTERVAL': 5,       # Redis 失败后多久再尝试
+    'CHANNEL': 'cache_invalidation',
+}
+
+_MISSING = object()
+
+
+def get_config():
+    """获取一级缓存配置"""
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'LOCAL_CACHE_CONFIG', {}))
+    return config
+
+
+class LocalCache:
+    """线程安全的 LRU 缓存，条目带过期时间"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """返回缓存值，未命中或已过期时返回 _MISSING"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete_matching(self, pattern):
+        """删除键中包含 pattern 的条目（与 clear_cache_pattern 的 *pattern* 语义一致）"""
+        with self._lock:
+            keys = [key for key in self._data if pattern in key]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+local_cache = LocalCache(DEFAULT_CONFIG['MAX_ENTRIES'])
+
+
+# ==================== Redis 熔断 ====================
+
+_down_until = 0.0
+
+
+def redis_available():
+    """Redis 是否可用（最近一次失败后的 RETRY_INTERVAL 内视为不可用）"""
+    return time.monotonic() >= _down_until
+
+
+def mark_redis_down(error):
+    """记录一次 Redis 失败，熔断 RETRY_INTERVAL 秒"""
+    global _down_until
+    if redis_available():
+        logger.warning(f"Cache backend unavailable, using local cache for {get_config()['RETRY_INTERVAL']}s: {error}")
+    _down_until = time.monotonic() + get_config()['RETRY_INTERVAL']
+
+
+def _local_ttl(prefix, config):
+    """键前缀在一级缓存中的 TTL；未配置且 Redis 可用时返回 None"""
+    ttl = config['PREFIXES'].get(prefix)
+    if ttl is None and not redis_available():
+        ttl = config['FALLBACK_TTL']
+    return ttl
+
+
+# ==================== 两级读写 ====================
+
+def _lookup_local(key, config):
+    if not config['ENABLED']:
+        return _MISSING
+    _ensure_subscriber()
+    local_cache.max_entries = config['MAX_ENTRIES']
+    return local_cache.get(key)
+
+
+def _fill_local(key, value, prefix, config):
+    """Redis 命中后按前缀 TTL 回填一级缓存"""
+    if value is not None and config['ENABLED']:
+        ttl = config['PREFIXES'].get(prefix)
+        if ttl:
+            local_cache.set(key, value, ttl)
+
+
+def _store_local(key, value, timeout, prefix, config):
+    """写入后按前缀（或 Redis 不可用时的 FALLBACK_TTL）写入一级缓存"""
+    if config['ENABLED']:
+        ttl = _local_ttl(prefix, config)
+        if ttl:
+            local_cache.set(key, value, min(ttl, timeout) if timeout else ttl)
+
+
+def tiered_get(key, prefix, decode=None):
+    """
+    先查一级缓存，再查 Redis（命中后按前缀 TTL 回填一级缓存）
+
+    Args:
+        key: 缓存键
+        prefix: 键前缀（决定是否使用一级缓存）
+        decode: 可选，Redis 中的值经其解码后再返回和放入一级缓存
+
+    Returns:
+        缓存值，未命中时返回 None
+    """
+    config = get_config()
+    value = _lookup_local(key, config)
+    if value is not _MISSING:
+        return value
+
+    if not redis_available():
+        return None
+    try:
+        value = cache.get(key)
+    except Exception as e:
+        mark_redis_down(e)
+        return None
+
+    if value is not None and decode is not None:
+        value = decode(value)
+    _fill_local(key, value, prefix, config)
+    return value
+
+
+def tiered_set(key, value, timeout, prefix, encode=None):
+    """
+    写入 Redis，并按前缀（或 Redis 不可用时的 FALLBACK_TTL）写入一级缓存
+
+    Args:
+        key: 缓存键
+        value: 缓存值
+        timeout: Redis 中的超时时间（秒），一级缓存 TTL 不会超过该值
+        prefix: 键前缀
+        encode: 可选，写入 Redis 前对值编码（一级缓存保存原值）
+    """
+    config = get_config()
+    if redis_available():
+        try:
+            cache.set(key, encode(value) if encode is not None else value, timeout)
+        except Exception as e:
+            mark_redis_down(e)
+    _store_local(key, value, timeout, prefix, config)
+
+
+async def atiered_get(key, prefix, decode=None):
+    """tiered_get 的异步版本（Redis 读取见 core.async_cache），参数和返回值相同"""
+    config = get_config()
+    value = _lookup_local(key, config)
+    if value is not _MISSING:
+        return value
+
+    if not redis_available():
+        return None
+    try:
+        value = await aget(key)
+    except Exception as e:
+        mark_redis_down(e)
+        return None
+
+    if value is not None and decode is not None:
+        value = decode(value)
+    _fill_local(key, value, prefix, config)
+    return value
+
+
+async def atiered_set(key, value, timeout, prefix, encode=None):
+    """tiered_set 的异步版本，参数相同"""
+    config = get_config()
+    if redis_available():
+        try:
+            await aset(key, encode(value) if encode is not None else value, timeout)
+        except Exception as e:
+            mark_redis_down(e)
+    _store_local(key, value, timeout, prefix, config)
+
+
+# ==================== 跨进程失效 ====================
+
+_subscriber_pid = None
+_subscriber_lock = threading.Lock()
+
+
+def _redis_client():
+    """获取 Redis 客户端，缓存后端不是 Redis 时返回 None"""
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if 'redis' not in backend.lower():
+        return None
+    return cache._cache.get_client(write=True)
+
+
+def _channel():
+    key_prefix = settings.CACHES.get('default', {}).get('KEY_PREFIX', '')
+    channel = get_config()['CHANNEL']
+    return f'{key_prefix}:{channel}' if key_prefix else channel
+
+
+def invalidate_local(pattern=None):
+    """删除本进程一级缓存中匹配的条目，pattern 为空时清空"""
+    if pattern:
+        local_cache.delete_matching(pattern)
+    else:
+        local_cache.clear()
+
+
+def publish_invalidation(pattern=None):
+    """
+    使所有 worker 的一级缓存失效
+
+    Args:
+        pattern: 键中包含的字符串，为空时清空全部
+    """
+    invalidate_local(pattern)
+    if not get_config()['ENABLED'] or not redis_available():
+        return
+    try:
+        client = _redis_client()
+        if client is not None:
+            client.publish(_channel(), json.dumps({'pattern': pattern, 'pid': os.getpid()}))
+    except Exception as e:
+        mark_redis_down(e)
+
+
+def _handle_message(message):
+    try:
+        payload = json.loads(message['data'])
+    except (TypeError, ValueError):
+        return
+    if payload.get('pid') != os.getpid():
+        invalidate_local(payload.get('pattern'))
+
+
+def _listen():
+    """订阅线程：接收失效通知；断线后等待重连，重连后清空一级缓存（可能漏掉了通知）"""
+    while True:
+        try:
+            client = _redis_client()
+            if client is None:
+                return
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(_channel())
+            local_cache.clear()
+            for message in pubsub.listen():
+                if message.get('type') == 'message':
+                    _handle_message(message)
+        except Exception as e:
+            mark_redis_down(e)
+            time.sleep(get_config()['RETRY_INTERVAL'])
+
+
+def _ensure_subscriber():
+    """按进程启动订阅线程（fork 出的 worker 各自启动一次）"""
+    global _subscriber_pid
+    if _subscriber_pid == os.getpid():
+        return
+    with _subscriber_lock:
+        if _subscriber_pid == os.getpid():
+            return
+        _subscriber_pid = os.getpid()
+        if not get_config()['PREFIXES']:
+            return
+        try:
+            if _redis_client() is None:
+                return
+        except Exception as e:
+            mark_redis_down(e)
+            return
+        threading.Thread(target=_listen, name='local-cache-invalidation', daemon=True).start()
+
+
+@receiver(setting_changed)
+def _reset_on_setting_changed(setting, **kwargs):
+    """缓存配置变化（测试中 override_settings）时重置一级缓存与熔断状态"""
+    global _down_until, _subscriber_pid
+    if setting in ('CACHES', 'LOCAL_CACHE_CONFIG'):
+        local_cache.clear()
+        _down_until = 0.0
+        _subscriber_pid = None
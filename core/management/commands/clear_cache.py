@@ -7,7 +7,9 @@ Django 管理命令 - 清理缓存
     python manage.py clear_cache song_detail:1      # 清理 song_detail:1 缓存
     python manage.py clear_cache top_songs          # 清理所有 top_songs 缓存
     python manage.py clear_cache original_works_list # 清理原创作品列表缓存
+    python manage.py clear_cache top_songs --warm   # 清理后立即预热相关缓存
 """
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from core.cache import clear_cache_pattern, clear_all_cache
 
@@ -22,6 +24,11 @@ class Command(BaseCommand):
             nargs='?',
             help='缓存键模式（支持通配符），不指定则清理所有缓存'
         )
+        parser.add_argument(
+            '--warm',
+            action='store_true',
+            help='清理后预热相关缓存（见 warm_cache 命令）'
+        )
 
     def handle(self, *args, **options):
         pattern = options.get('pattern')
@@ -33,4 +40,7 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.WARNING('清理所有缓存...'))
             clear_all_cache()
-            self.stdout.write(self.style.SUCCESS('✓ 所有缓存已清理'))
\ No newline at end of file
+            self.stdout.write(self.style.SUCCESS('✓ 所有缓存已清理'))
+
+        if options['warm']:
+            call_command('warm_cache', pattern=pattern, stdout=self.stdout, stderr=self.stderr)
@@ -0,0 +1,47 @@
+"""
+Django 管理命令 - 查看 SQLite 数据库状态
+
+使用方法:
+    python manage.py sqlite_stats                   # 各数据库的日志模式、大小、WAL 大小、PRAGMA
+    python manage.py sqlite_stats --checkpoint      # 先对读写库执行 WAL 检查点（截断 WAL 文件）
+"""
+from django.core.management.base import BaseCommand
+from core.sqlite import checkpoint, connection_stats, is_read_only_alias
+
+
+def _format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f'{size:.1f}{unit}' if unit != 'B' else f'{size}B'
+        size /= 1024
+
+
+class Command(BaseCommand):
+    help = '查看 SQLite 数据库连接与文件状态'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--checkpoint',
+            action='store_true',
+            help='对读写库执行 WAL 检查点（TRUNCATE）'
+        )
+
+    def handle(self, *args, **options):
+        if options['checkpoint']:
+            from django.db import connections
+            for alias in connections:
+                if connections[alias].vendor == 'sqlite' and not is_read_only_alias(alias):
+                    busy, log_pages, checkpointed = checkpoint(alias)
+                    self.stdout.write(f'{alias}: 检查点完成（busy={busy}, wal={log_pages}, 写回={checkpointed}）')
+
+        for alias, entry in connection_stats().items():
+            if 'error' in entry:
+                self.stdout.write(self.style.ERROR(f'{alias}: {entry["error"]}'))
+                continue
+            self.stdout.write(self.style.SUCCESS(f'{alias}{"（只读）" if entry["read_only"] else ""}'))
+            self.stdout.write(f'  journal_mode: {entry["journal_mode"]}')
+            self.stdout.write(f'  大小: {_format_size(entry["size"])}（空闲页 {entry["freelist_count"]}）')
+            if not entry['read_only']:
+                self.stdout.write(f'  WAL: {_format_size(entry["wal_size"])}')
+            self.stdout.write(f'  cache_size: {entry["cache_size"]}  mmap_size: {_format_size(entry["mmap_size"])}')
+            self.stdout.write(f'  CONN_MAX_AGE: {entry["conn_max_age"]}  本进程新建连接: {entry["connections_opened"]}')
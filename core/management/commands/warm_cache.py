@@ -0,0 +1,49 @@
+"""
+Django 管理命令 - 预热缓存
+
+使用方法:
+    python manage.py warm_cache                         # 按优先级执行所有预热任务
+    python manage.py warm_cache top_songs song_list     # 只执行指定任务
+    python manage.py warm_cache --pattern song          # 执行与失效模式相关的任务
+    python manage.py warm_cache --list                  # 列出已注册的任务
+    python manage.py warm_cache --concurrency 4         # 同一优先级内的并发数
+"""
+from django.core.management.base import BaseCommand, CommandError
+from core.cache_warmer import get_warmers, run_warmers
+
+
+class Command(BaseCommand):
+    help = '按优先级预热热点缓存'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='预热任务名称，不指定则执行全部')
+        parser.add_argument('--pattern', help='只执行与该缓存键模式相关的任务')
+        parser.add_argument('--list', action='store_true', help='列出已注册的预热任务')
+        parser.add_argument('--concurrency', type=int, help='同一优先级内并发执行的任务数')
+
+    def handle(self, *args, **options):
+        try:
+            warmers = get_warmers(names=options['names'] or None, pattern=options['pattern'])
+        except KeyError as e:
+            raise CommandError(f'未注册的预热任务: {e.args[0]}')
+
+        if options['list']:
+            for warmer in warmers:
+                self.stdout.write(f'[{warmer.priority:>3}] {warmer.name:<24} {warmer.description}')
+            return
+
+        if not warmers:
+            self.stdout.write(self.style.WARNING('没有匹配的预热任务'))
+            return
+
+        failed = 0
+        for result in run_warmers(warmers, options['concurrency']):
+            if result.error:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'✗ {result.name}: {result.error}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'✓ {result.name}: {result.count if result.count is not None else "-"} 项（{result.duration:.2f}s）'
+                ))
+        if failed:
+            raise CommandError(f'{failed} 个预热任务失败')
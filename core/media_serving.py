@@ -0,0 +1,262 @@
+"""
+媒体文件服务模块 - 提供支持条件请求和 Range 请求的文件响应
+
+- 基于文件大小和修改时间生成强 ETag，并返回 Last-Modified
+- If-None-Match / If-Modified-Since 命中时直接返回 304
+- 支持单段 HTTP Range 请求（视频拖动进度条），If-Range 不匹配时返回完整文件
+- 可选 X-Accel-Redirect（Nginx）/ X-Sendfile（Apache、lighttpd）模式，由前置代理发送文件字节
+"""
+import logging
+import mimetypes
+import os
+import posixpath
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# 默认配置，可通过 settings.MEDIA_SERVING_CONFIG 覆盖
+DEFAULT_CONFIG = {
+    'MODE': 'python',                  # python / x-accel / x-sendfile
+    'X_ACCEL_PREFIX': '/protected-media/',
+    'MAX_AGE': 86400,
+}
+
+
+def get_config():
+    """获取媒体服务配置"""
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'MEDIA_SERVING_CONFIG', {}))
+    return config
+
+
+def make_etag(stat_result):
+    """
+    根据文件大小和修改时间生成强 ETag
+
+    Args:
+        stat_result: os.stat 结果
+
+    Returns:
+        str: 带引号的 ETag
+    """
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def is_not_modified(request, etag, last_modified):
+    """
+    判断条件请求是否可以返回 304
+
+    If-None-Match 优先于 If-Modified-Since（RFC 9110）
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        if if_none_match.strip() == '*':
+            return True
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        # 弱比较：忽略 W/ 前缀
+        return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+    if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since:
+        since = parse_http_date_safe(if_modified_since)
+        return since is not None and int(last_modified) <= since
+
+    return False
+
+
+def parse_range(range_header, file_size):
+    """
+    解析 Range 请求头（仅支持单段 bytes 范围）
+
+    Args:
+        range_header: Range 请求头的值
+        file_size: 文件大小
+
+    Returns:
+        tuple: (start, end) 闭区间；请求头无法使用时返回 None；范围不可满足时返回 'unsatisfiable'
+    """
+    if not range_header or not range_header.startswith('bytes='):
+        return None
+
+    ranges = range_header[len('bytes='):].split(',')
+    if len(ranges) != 1:
+        return None  # 多段范围：按规范可以忽略，返回完整文件
+
+    start_str, sep, end_str = ranges[0].strip().partition('-')
+    if not sep:
+        return None
+
+    try:
+        if start_str == '':
+            # 后缀范围：bytes=-500 表示最后 500 字节
+            suffix = int(end_str)
+            if suffix <= 0:
+                return 'unsatisfiable'
+            start = max(file_size - suffix, 0)
+            end = file_size - 1
+        else:
+            start = int(start_str)
+            end = int(end_str) if end_str else file_size - 1
+            end = min(end, file_size - 1)
+    except ValueError:
+        return None
+
+    if start < 0 or start > end or start >= file_size:
+        return 'unsatisfiable'
+
+    return start, end
+
+
+def _iter_file_range(file_obj, start, length):
+    """从文件指定位置开始分块读取 length 字节"""
+    try:
+        file_obj.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = file_obj.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+def _offload_response(full_path, config):
+    """
+    构造由前置代理发送文件的响应
+
+    Returns:
+        HttpResponse 或 None（当前模式不需要代理或文件不在 MEDIA_ROOT 下）
+    """
+    mode = config['MODE']
+    if mode == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = full_path
+        return response
+
+    if mode == 'x-accel':
+        media_root = os.path.abspath(str(settings.MEDIA_ROOT))
+        abs_path = os.path.abspath(full_path)
+        if os.path.commonpath([media_root, abs_path]) != media_root:
+            return None
+        rel_path = os.path.relpath(abs_path, media_root).replace(os.sep, '/')
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = quote(posixpath.join(config['X_ACCEL_PREFIX'], rel_path))
+        return response
+
+    return None
+
+
+def serve_file(request, full_path, content_type=None, cache_control=None):
+    """
+    返回文件响应，支持 ETag/Last-Modified 校验、Range 请求和代理卸载
+
+    Args:
+        request: HTTP 请求
+        full_path: 文件的绝对路径
+        content_type: 指定 Content-Type，默认根据扩展名推断
+        cache_control: Cache-Control 响应头，默认 public, max-age=配置值
+
+    Returns:
+        HttpResponse
+
+    Raises:
+        Http404: 文件不存在
+    """
+    config = get_config()
+
+    try:
+        stat_result = os.stat(full_path)
+    except OSError:
+        raise Http404('文件不存在')
+    if not os.path.isfile(full_path):
+        raise Http404('文件不存在')
+
+    etag = make_etag(stat_result)
+    last_modified = http_date(stat_result.st_mtime)
+    cache_control = cache_control or f"public, max-age={config['MAX_AGE']}"
+
+    def set_validators(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = last_modified
+        response['Cache-Control'] = cache_control
+        return response
+
+    if is_not_modified(request, etag, stat_result.st_mtime):
+        return set_validators(HttpResponseNotModified())
+
+    if content_type is None:
+        content_type, encoding = mimetypes.guess_type(full_path)
+        content_type = content_type or 'application/octet-stream'
+
+    # 代理模式：Range、sendfile 等由前置代理处理
+    offloaded = _offload_response(full_path, config)
+    if offloaded is not None:
+        offloaded['Content-Type'] = content_type
+        return set_validators(offloaded)
+
+    file_size = stat_result.st_size
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range or if_range.strip() in (etag, last_modified):
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), file_size)
+
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{file_size}'
+        response['Accept-Ranges'] = 'bytes'
+        return set_validators(response)
+
+    if byte_range is None:
+        # 完整文件：FileResponse 会使用 wsgi.file_wrapper（如 gunicorn 的 sendfile）
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(file_size)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        if request.method == 'HEAD':
+            response = HttpResponse(status=206, content_type=content_type)
+        else:
+            response = StreamingHttpResponse(
+                _iter_file_range(open(full_path, 'rb'), start, length),
+                status=206,
+                content_type=content_type
+            )
+        response['Content-Range'] = f'bytes {start}-{end}/{file_size}'
+        response['Content-Length'] = str(length)
+
+    response['Accept-Ranges'] = 'bytes'
+    return set_validators(response)
+
+
+def serve_media(request, path, document_root=None, cache_control=None):
+    """
+    媒体文件视图，替代 django.views.static.serve
+
+    Args:
+        request: HTTP 请求
+        path: URL 中捕获的相对路径
+        document_root: 文件根目录
+        cache_control: Cache-Control 响应头
+
+    使用示例:
+        re_path(r'^gallery/(?P<path>.*)$', serve_media, {
+            'document_root': settings.MEDIA_ROOT / 'gallery',
+        }),
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(str(document_root), path)
+    except SuspiciousFileOperation:
+        raise Http404('文件不存在')
+
+    return serve_file(request, full_path, cache_control=cache_control)
@@ -0,0 +1,336 @@
+"""
+指标模块 - 跨 worker 聚合的运行指标与 Prometheus 文本格式导出
+
+- 各 worker 在进程内累加计数增量，按 FLUSH_INTERVAL 批量写入 Redis 哈希（一次 pipeline 往返），
+  所有 worker 的数据在 Redis 中合并；缓存后端不是 Redis 或不可用时只导出本进程的数据
+- 计数器与直方图的序列名直接使用 Prometheus 文本格式（名称 + 标签），导出时无需转换
+- 采集内容：按路由的请求延迟直方图、每请求数据库查询次数与耗时、按键前缀的缓存命中/未命中、
+  缩略图生成次数与耗时
+- /metrics 暴露各路由的延迟、查询次数和缓存前缀，生产环境必须配置 TOKEN（METRICS_TOKEN），
+  未配置时只在 DEBUG 下开放，否则返回 404
+"""
+import hmac
+import logging
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+
+from .async_support import AsyncMiddlewareMixin, run_sync
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.METRICS_CONFIG 覆盖
+DEFAULT_CONFIG = {
+    'ENABLED': True,
+    'FLUSH_INTERVAL': 5,     # 进程内增量写入 Redis 的最小间隔（秒）
+    'TOKEN': '',             # 导出接口要求 Authorization: Bearer <TOKEN>；为空时只在 DEBUG 下开放
+    'REDIS_KEY': 'metrics',
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_LE_RE = re.compile(r',?le="([^"]+)"')
+
+# 指标名称 -> (类型, 说明, 直方图桶)
+METRIC_DEFINITIONS = {
+    'http_requests_total': ('counter', '请求总数', None),
+    'http_request_duration_seconds': ('histogram', '请求处理耗时', LATENCY_BUCKETS),
+    'db_queries_per_request': ('histogram', '每个请求执行的数据库查询次数', QUERY_COUNT_BUCKETS),
+    'db_query_duration_seconds_total': ('counter', '数据库查询累计耗时', None),
+    'db_connections_opened_total': ('counter', '新建数据库连接次数（按数据库别名）', None),
+    'cache_requests_total': ('counter', '缓存读取次数（按键前缀和命中结果）', None),
+    'thumbnail_generation_total': ('counter', '缩略图生成次数', None),
+    'thumbnail_generation_seconds': ('histogram', '缩略图生成耗时', LATENCY_BUCKETS),
+}
+
+
+def get_config():
+    """获取指标配置"""
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'METRICS_CONFIG', {}))
+    return config
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _series(name, labels):
+    """构建 Prometheus 序列名，标签按名称排序"""
+    if not labels:
+        return name
+    body = ','.join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items()))
+    return f'{name}{{{body}}}'
+
+
+def _sort_key(item):
+    """同一序列的直方图桶按 le 数值升序排列"""
+    series = item[0]
+    match = _LE_RE.search(series)
+    if not match:
+        return (series, 0.0)
+    bound = match.group(1)
+    return (_LE_RE.sub('', series), float('inf') if bound == '+Inf' else float(bound))
+
+
+def _format_value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class MetricsRegistry:
+    """进程内指标登记表"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._local = {}
+        self._last_flush = time.monotonic()
+
+    def _add(self, series, value):
+        self._pending[series] = self._pending.get(series, 0) + value
+        self._local[series] = self._local.get(series, 0) + value
+
+    def inc(self, name, value=1, **labels):
+        """计数器递增"""
+        with self._lock:
+            self._add(_series(name, labels), value)
+
+    def observe(self, name, value, **labels):
+        """直方图记录一次观测值（桶为累计计数）"""
+        buckets = METRIC_DEFINITIONS[name][2]
+        with self._lock:
+            for bound in buckets:
+                if value <= bound:
+                    self._add(_series(f'{name}_bucket', dict(labels, le=bound)), 1)
+            self._add(_series(f'{name}_bucket', dict(labels, le='+Inf')), 1)
+            self._add(_series(f'{name}_sum', labels), value)
+            self._add(_series(f'{name}_count', labels), 1)
+
+    # ==================== 跨进程聚合 ====================
+
+    @staticmethod
+    def _redis_client():
+        """获取 Redis 客户端，缓存后端不是 Redis 时返回 None"""
+        backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+        if 'redis' not in backend.lower():
+            return None
+        return cache._cache.get_client(write=True)
+
+    @staticmethod
+    def _redis_key():
+        key_prefix = settings.CACHES.get('default', {}).get('KEY_PREFIX', '')
+        key = get_config()['REDIS_KEY']
+        return f'{key_prefix}:{key}' if key_prefix else key
+
+    def flush_due(self):
+        """距上次写入 Redis 是否已超过 FLUSH_INTERVAL"""
+        return time.monotonic() - self._last_flush >= get_config()['FLUSH_INTERVAL']
+
+    def flush(self, force=False):
+        """
+        将进程内增量写入 Redis
+
+        Args:
+            force: 为 True 时忽略 FLUSH_INTERVAL 立即写入
+
+        Returns:
+            bool: 是否已写入 Redis
+        """
+        if not force and not self.flush_due():
+            return False
+        now = time.monotonic()
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = now
+
+        try:
+            client = self._redis_client()
+            if client is None:
+                # 无法跨进程聚合，只保留本进程累计值
+                return False
+            if pending:
+                pipeline = client.pipeline(transaction=False)
+                key = self._redis_key()
+                for series, value in pending.items():
+                    pipeline.hincrbyfloat(key, series, value)
+                pipeline.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Metrics flush failed: {e}")
+            # 写入失败时保留增量，下次重试
+            with self._lock:
+                for series, value in pending.items():
+                    self._pending[series] = self._pending.get(series, 0) + value
+            return False
+
+    def collect(self):
+        """
+        读取所有 worker 合并后的指标
+
+        Returns:
+            dict: {序列名: 值}；Redis 不可用时返回本进程的数据
+        """
+        if self.flush(force=True):
+            try:
+                data = self._redis_client().hgetall(self._redis_key())
+                return {
+                    (series.decode() if isinstance(series, bytes) else series): float(value)
+                    for series, value in data.items()
+                }
+            except Exception as e:
+                logger.warning(f"Metrics collect failed: {e}")
+        with self._lock:
+            return dict(self._local)
+
+    def render(self):
+        """导出 Prometheus 文本格式"""
+        samples = self.collect()
+        lines = []
+        for name, (metric_type, help_text, _) in METRIC_DEFINITIONS.items():
+            if metric_type == 'histogram':
+                prefixes = tuple(f'{name}_{suffix}' for suffix in ('bucket', 'sum', 'count'))
+            else:
+                prefixes = (name,)
+            family = sorted(
+                ((series, value) for series, value in samples.items()
+                 if series.split('{', 1)[0] in prefixes),
+                key=_sort_key
+            )
+            if not family:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            lines.extend(f'{series} {_format_value(value)}' for series, value in family)
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """清空本进程数据（测试使用）"""
+        with self._lock:
+            self._pending.clear()
+            self._local.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def record_cache_access(prefix, hit):
+    """记录一次缓存读取（按键前缀统计命中率）"""
+    if get_config()['ENABLED']:
+        metrics.inc('cache_requests_total', prefix=prefix, result='hit' if hit else 'miss')
+
+
+def record_thumbnail(duration, success):
+    """记录一次缩略图生成（跳过已是最新的缩略图不计入）"""
+    if get_config()['ENABLED']:
+        metrics.inc('thumbnail_generation_total', result='ok' if success else 'error')
+        metrics.observe('thumbnail_generation_seconds', duration)
+
+
+class _QueryTimer:
+    """数据库 execute_wrapper，统计查询次数与耗时"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+_current_timer = ContextVar('metrics_query_timer', default=None)
+
+
+@contextmanager
+def track_queries():
+    """
+    把当前线程各数据库连接上执行的查询计入当前请求（MetricsMiddleware 开始计时后才生效）
+
+    异步视图的查询在线程池中执行，由 core.async_support.run_sync 在工作线程中调用
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+        yield
+
+
+class MetricsMiddleware(AsyncMiddlewareMixin):
+    """
+    请求指标中间件
+
+    按路由模板（而不是实际路径）记录请求数、延迟直方图和数据库查询次数/耗时，
+    响应返回后按间隔把增量写入 Redis（异步调用链中写入放到线程池，不阻塞事件循环）
+    """
+
+    def handle(self, request):
+        if not get_config()['ENABLED']:
+            return self.get_response(request)
+
+        timer = _QueryTimer()
+        token = _current_timer.set(timer)
+        start = time.perf_counter()
+        try:
+            with track_queries():
+                response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        self._record(request, response, timer, time.perf_counter() - start)
+        metrics.flush()
+        return response
+
+    async def __acall__(self, request):
+        if not get_config()['ENABLED']:
+            return await self.get_response(request)
+
+        timer = _QueryTimer()
+        token = _current_timer.set(timer)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        self._record(request, response, timer, time.perf_counter() - start)
+        if metrics.flush_due():
+            await run_sync(metrics.flush)
+        return response
+
+    @staticmethod
+    def _record(request, response, timer, duration):
+        match = getattr(request, 'resolver_match', None)
+        route = f'/{match.route}' if match and match.route else 'unmatched'
+        method = request.method
+        metrics.inc('http_requests_total', route=route, method=method, status=response.status_code)
+        metrics.observe('http_request_duration_seconds', duration, route=route, method=method)
+        metrics.observe('db_queries_per_request', timer.count, route=route)
+        metrics.inc('db_query_duration_seconds_total', timer.duration, route=route)
+
+
+def metrics_view(request):
+    """Prometheus 指标导出接口（未配置 TOKEN 时只在 DEBUG 下开放）"""
+    token = get_config()['TOKEN']
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=404)
+    else:
+        authorization = request.META.get('HTTP_AUTHORIZATION', '')
+        if not hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode()):
+            return HttpResponse(status=401)
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,167 @@
+"""
+分页模块 - 基于游标（keyset）的分页
+
+- 游标为不透明的 base64url 字符串，内容是上一页最后一行的排序键值和 ID
+- 下一页通过 WHERE (排序字段, id) 位于游标之后 + LIMIT 读取，不使用 OFFSET，深翻页耗时不变
+- 排序字段可为空：空值统一排在非空值之后
+- 总数可以缓存，翻页时不必每次执行 COUNT(*)
+"""
+import base64
+import json
+import logging
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(payload):
+    """将游标内容编码为不透明字符串"""
+    raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    解码游标
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError(f'无效的游标: {token}') from e
+    if not isinstance(payload, dict):
+        raise ValueError(f'无效的游标: {token}')
+    return payload
+
+
+class KeysetPaginator:
+    """
+    游标分页器
+
+    使用示例:
+        paginator = KeysetPaginator(queryset, '-last_performed', page_size=50)
+        items, next_cursor = paginator.get_page(request.GET.get('cursor'))
+        total = paginator.get_total(cache_key='song_list_api:count:...')
+    """
+
+    def __init__(self, queryset, ordering, page_size, tiebreaker='id'):
+        """
+        Args:
+            queryset: 已应用筛选条件的查询集（也可以是 values() 查询集，需包含排序字段和 tiebreaker）
+            ordering: 排序字段，'-' 前缀表示降序
+            page_size: 每页数量
+            tiebreaker: 排序值相同时用于区分的唯一字段
+        """
+        self.queryset = queryset
+        self.ordering = ordering
+        self.field = ordering.lstrip('-')
+        self.descending = ordering.startswith('-')
+        self.page_size = page_size
+        self.tiebreaker = tiebreaker
+        self.model_field = queryset.model._meta.get_field(self.field)
+
+    def _ordered(self):
+        expression = F(self.field)
+        if self.descending:
+            return self.queryset.order_by(
+                expression.desc(nulls_last=True), f'-{self.tiebreaker}'
+            )
+        return self.queryset.order_by(
+            expression.asc(nulls_last=True), self.tiebreaker
+        )
+
+    def _after(self, value, tiebreak_value):
+        """构造“位于游标之后”的筛选条件"""
+        compare = 'lt' if self.descending else 'gt'
+        after_tiebreak = Q(**{f'{self.tiebreaker}__{compare}': tiebreak_value})
+        if value is None:
+            # 已进入空值区间，只按 tiebreaker 继续
+            return Q(**{f'{self.field}__isnull': True}) & after_tiebreak
+        return (
+            Q(**{f'{self.field}__{compare}': value})
+            | (Q(**{self.field: value}) & after_tiebreak)
+            | Q(**{f'{self.field}__isnull': True})
+        )
+
+    @staticmethod
+    def _value_of(item, name):
+        """读取对象属性或 values() 字典中的字段"""
+        if isinstance(item, dict):
+            return item[name]
+        return getattr(item, name)
+
+    def _encode_value(self, value):
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+        return value.isoformat()
+
+    def get_page(self, cursor=None):
+        """
+        读取一页数据
+
+        Args:
+            cursor: 上一页返回的游标，为空时读取第一页
+
+        Returns:
+            tuple: (当前页对象列表, 下一页游标或 None)
+
+        Raises:
+            ValueError: 游标无效或与当前排序不匹配
+        """
+        queryset = self._ordered()
+        if cursor:
+            payload = decode_cursor(cursor)
+            if payload.get('o') != self.ordering or 'k' not in payload:
+                raise ValueError('游标与当前排序方式不匹配')
+            # 游标来自客户端，排序值和 ID 都可能被篡改
+            try:
+                value = payload.get('v')
+                if value is not None:
+                    value = self.model_field.to_python(value)
+                tiebreak_value = int(payload['k'])
+            except (ValidationError, TypeError, ValueError) as e:
+                raise ValueError('无效的游标') from e
+            queryset = queryset.filter(self._after(value, tiebreak_value))
+
+        items = list(queryset[:self.page_size + 1])
+        has_next = len(items) > self.page_size
+        items = items[:self.page_size]
+
+        next_cursor = None
+        if has_next and items:
+            last = items[-1]
+            next_cursor = encode_cursor({
+                'o': self.ordering,
+                'v': self._encode_value(self._value_of(last, self.field)),
+                'k': self._value_of(last, self.tiebreaker),
+            })
+        return items, next_cursor
+
+    def get_total(self, cache_key=None, timeout=60):
+        """
+        获取总数，提供 cache_key 时缓存 COUNT(*) 结果
+
+        缓存的总数可能略微滞后于实际数据，仅用于展示
+        """
+        if cache_key:
+            try:
+                total = cache.get(cache_key)
+                if total is not None:
+                    return total
+            except Exception as e:
+                logger.warning(f"Cache get failed: {e}")
+
+        total = self.queryset.order_by().count()
+
+        if cache_key:
+            try:
+                cache.set(cache_key, total, timeout)
+            except Exception as e:
+                logger.warning(f"Cache set failed: {e}")
+        return total
@@ -0,0 +1,150 @@
+"""
+查询分析模块 - 按请求捕获 SQL，识别 N+1 查询
+
+- 通过 execute_wrapper 捕获所有数据库连接上执行的 SQL，归一化为模板（去掉参数、
+  合并 IN 列表）后分组计数，同一模板重复次数达到阈值即视为疑似 N+1
+- QueryProfilerMiddleware：调试模式下为响应添加 X-Query-Count / X-Query-Time，
+  并记录疑似 N+1 的模板
+- QueryBudgetMixin（见 core.testing）在测试中为接口声明查询预算
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from .async_support import AsyncMiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.QUERY_PROFILER_CONFIG 覆盖
+DEFAULT_CONFIG = {
+    'ENABLED': None,          # None 表示跟随 DEBUG
+    'REPEAT_THRESHOLD': 5,    # 同一模板执行次数达到该值视为疑似 N+1
+}
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST_RE = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def get_config():
+    """获取查询分析配置"""
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'QUERY_PROFILER_CONFIG', {}))
+    if config['ENABLED'] is None:
+        config['ENABLED'] = settings.DEBUG
+    return config
+
+
+def normalize_sql(sql):
+    """
+    将 SQL 归一化为模板：字面量替换为 ?，IN 列表合并为 (...)
+
+    Example:
+        normalize_sql('SELECT * FROM t WHERE id IN (%s, %s, %s)')
+        # 'SELECT * FROM t WHERE id IN (...)'
+    """
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _PLACEHOLDER_LIST_RE.sub('(...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+class QueryCapture:
+    """捕获执行的 SQL（作为 execute_wrapper 使用）"""
+
+    def __init__(self):
+        self.queries = []
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.duration += elapsed
+            self.queries.append((context['connection'].alias, sql, elapsed))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def templates(self):
+        """按 (数据库, 归一化模板) 分组计数"""
+        return Counter((alias, normalize_sql(sql)) for alias, sql, _ in self.queries)
+
+    def repeated(self, threshold=None):
+        """
+        返回疑似 N+1 的模板
+
+        Returns:
+            list: [(数据库, 模板, 次数), ...]，按次数降序
+        """
+        if threshold is None:
+            threshold = get_config()['REPEAT_THRESHOLD']
+        return [
+            (alias, template, count)
+            for (alias, template), count in self.templates().most_common()
+            if count >= threshold
+        ]
+
+    def report(self, limit=10):
+        """生成可读的查询摘要（按模板次数降序）"""
+        lines = [f'{self.count} queries, {self.duration * 1000:.1f} ms']
+        for (alias, template), count in self.templates().most_common(limit):
+            lines.append(f'  {count:>4} x [{alias}] {template}')
+        return '\n'.join(lines)
+
+
+@contextmanager
+def capture_queries():
+    """
+    在所有数据库连接上捕获 SQL
+
+    使用示例:
+        with capture_queries() as capture:
+            RankingService.get_top_songs()
+        print(capture.report())
+    """
+    capture = QueryCapture()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(capture))
+        yield capture
+
+
+class QueryProfilerMiddleware(AsyncMiddlewareMixin):
+    """
+    查询分析中间件（仅在调试模式或显式启用时生效）
+
+    - 响应头 X-Query-Count / X-Query-Time
+    - 同一模板重复执行达到阈值时记录警告，便于定位 N+1
+    - 异步调用链中查询在线程池中执行，无法按请求捕获，直接放行（查询次数见 db_queries_per_request 指标）
+    """
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def handle(self, request):
+        config = get_config()
+        if not config['ENABLED']:
+            return self.get_response(request)
+
+        with capture_queries() as capture:
+            response = self.get_response(request)
+
+        response['X-Query-Count'] = str(capture.count)
+        response['X-Query-Time'] = f'{capture.duration * 1000:.1f}ms'
+
+        repeated = capture.repeated(config['REPEAT_THRESHOLD'])
+        if repeated:
+            details = '; '.join(f'{count} x [{alias}] {template}' for alias, template, count in repeated)
+            logger.warning(f"Possible N+1 queries on {request.method} {request.path}: {details}")
+        return response
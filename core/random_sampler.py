@@ -0,0 +1,196 @@
+"""
+随机抽样模块 - 基于缓存 ID 数组的 O(1) 随机抽取
+
+- 每种筛选条件缓存一份主键数组，键中带有数据版本号，数据变化时递增版本号即可整体失效
+- 进程内保留最近使用的 ID 数组，命中时只需一次版本号读取，无需反序列化整个数组
+- 抽取时在数组中均匀随机选一个主键，再按主键读取单行，避免 ORDER BY RANDOM() 全表排序
+"""
+import hashlib
+import json
+import logging
+import random
+import threading
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from .cache import bump_data_version, get_data_version
+from .cache_utils import CacheTimeout
+
+logger = logging.getLogger(__name__)
+
+
+class RandomIdSampler:
+    """
+    随机主键抽样器
+
+    使用示例:
+        sampler = RandomIdSampler('song_management:songs')
+        song = sampler.sample(Song.objects.filter(language='国语'), {'language': '国语'})
+
+    数据变化时调用 sampler.invalidate()（或对同一命名空间调用 bump_data_version）。
+    """
+
+    # 进程内最多保留的 ID 数组数量（所有命名空间共享）
+    LOCAL_MAX_ENTRIES = 256
+    # 主键读取失败（被并发删除）时的重试次数
+    MAX_RETRIES = 2
+
+    _local = OrderedDict()
+    _local_lock = threading.Lock()
+
+    def __init__(self, namespace, timeout=CacheTimeout.HOUR):
+        """
+        Args:
+            namespace: 数据版本命名空间，同时作为缓存键前缀
+            timeout: ID 数组在共享缓存中的过期时间（秒）
+        """
+        self.namespace = namespace
+        self.timeout = timeout
+
+    @staticmethod
+    def filter_key(filters=None):
+        """
+        将筛选条件转换为稳定的缓存键片段，空值条件会被忽略
+
+        Returns:
+            str: 无筛选条件时为 'all'，否则为条件的短哈希
+        """
+        filters = {k: v for k, v in (filters or {}).items() if v not in (None, '', [], ())}
+        if not filters:
+            return 'all'
+        raw = json.dumps(filters, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.md5(raw.encode('utf-8')).hexdigest()[:12]
+
+    def _cache_key(self, filters, version):
+        return f"random_ids:{self.namespace}:v{version}:{self.filter_key(filters)}"
+
+    @classmethod
+    def _local_get(cls, key):
+        with cls._local_lock:
+            ids = cls._local.get(key)
+            if ids is not None:
+                cls._local.move_to_end(key)
+            return ids
+
+    @classmethod
+    def _local_set(cls, key, ids):
+        with cls._local_lock:
+            cls._local[key] = ids
+            cls._local.move_to_end(key)
+            while len(cls._local) > cls.LOCAL_MAX_ENTRIES:
+                cls._local.popitem(last=False)
+
+    @classmethod
+    def clear_local(cls):
+        """清空进程内的 ID 数组（测试或手动失效时使用）"""
+        with cls._local_lock:
+            cls._local.clear()
+
+    def get_ids(self, filters, loader):
+        """
+        获取筛选条件对应的主键数组
+
+        Args:
+            filters: 筛选条件字典，用于生成缓存键
+            loader: 缓存未命中时调用，返回主键可迭代对象
+
+        Returns:
+            tuple: 主键数组
+        """
+        version = get_data_version(self.namespace)
+        key = self._cache_key(filters, version)
+
+        # 版本号为 0 表示缓存不可用，无法感知其他进程的数据变化，不使用进程内数组
+        use_local = bool(version)
+        if use_local:
+            ids = self._local_get(key)
+            if ids is not None:
+                return ids
+
+        ids = None
+        try:
+            ids = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Cache get failed: {e}")
+
+        if ids is None:
+            ids = list(loader())
+            try:
+                cache.set(key, ids, self.timeout)
+            except Exception as e:
+                logger.warning(f"Cache set failed: {e}")
+
+        ids = tuple(ids)
+        if use_local:
+            self._local_set(key, ids)
+        return ids
+
+    def pick_id(self, filters, loader):
+        """
+        均匀随机抽取一个主键
+
+        Returns:
+            主键；没有数据时返回 None
+        """
+        ids = self.get_ids(filters, loader)
+        if not ids:
+            return None
+        return ids[random.randrange(len(ids))]
+
+    @staticmethod
+    def _pk_loader(queryset):
+        """返回读取查询集主键的加载函数"""
+        return lambda: queryset.order_by().values_list('pk', flat=True).distinct()
+
+    def sample(self, queryset, filters=None):
+        """
+        从查询集中均匀随机抽取一条记录
+
+        Args:
+            queryset: 已应用筛选条件的查询集
+            filters: 与查询集筛选条件一一对应的字典，用于生成缓存键
+
+        Returns:
+            模型实例；没有数据时返回 None
+        """
+        return sample_across([(self, queryset, filters)])
+
+    def invalidate(self):
+        """递增版本号，使该命名空间下所有 ID 数组失效"""
+        bump_data_version(self.namespace)
+
+
+def sample_across(sources):
+    """
+    从多个查询集的并集中均匀随机抽取一条记录（按各自记录数加权）
+
+    Args:
+        sources: [(RandomIdSampler, 查询集, 筛选条件字典), ...]
+
+    Returns:
+        模型实例；没有数据时返回 None
+    """
+    for _ in range(RandomIdSampler.MAX_RETRIES + 1):
+        pools = []
+        for sampler, queryset, filters in sources:
+            ids = sampler.get_ids(filters, sampler._pk_loader(queryset))
+            if ids:
+                pools.append((sampler, queryset, ids))
+
+        total = sum(len(ids) for _, _, ids in pools)
+        if not total:
+            return None
+
+        index = random.randrange(total)
+        for sampler, queryset, ids in pools:
+            if index < len(ids):
+                break
+            index -= len(ids)
+
+        obj = queryset.model._default_manager.filter(pk=ids[index]).first()
+        if obj is not None:
+            return obj
+        # ID 数组已过期（记录被删除但版本号尚未递增），使其失效后重试
+        sampler.invalidate()
+    return None
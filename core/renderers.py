@@ -0,0 +1,63 @@
+"""
+渲染器模块 - 基于 orjson 的 JSON 渲染
+
+- ORJSONRenderer 替代 DRF 的 JSONRenderer，输出与其一致（紧凑分隔符、UTF-8、日期格式）
+- dumps() 供需要预编码响应体的地方使用（例如缓存完整响应字节）
+- orjson 为可选依赖，未安装时回退到标准库 json
+"""
+import json
+
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 未安装 orjson 时回退
+    orjson = None
+
+_fallback_encoder = encoders.JSONEncoder()
+
+if orjson is not None:
+    # 日期时间交给 DRF 编码器处理，保持与 JSONRenderer 相同的格式（UTC 使用 Z）
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _default(obj):
+    """orjson 无法直接编码的类型（Decimal、惰性字符串、日期时间等）交给 DRF 编码器"""
+    return _fallback_encoder.default(obj)
+
+
+def dumps(data):
+    """
+    将数据编码为 JSON 字节串
+
+    Args:
+        data: 可 JSON 序列化的数据
+
+    Returns:
+        bytes: UTF-8 编码的紧凑 JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(
+        data, cls=encoders.JSONEncoder, ensure_ascii=False,
+        allow_nan=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    使用 orjson 的 JSON 渲染器
+
+    请求带 indent 参数（如浏览器调试）时回退到 DRF 的 JSONRenderer
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return dumps(data)
@@ -0,0 +1,58 @@
+"""
+请求级记忆缓存 - 同一个批量请求内的子请求共享常用查询结果
+
+- request_cache_scope() 开启一个作用域（批量接口为每个请求开启一次），作用域内被 request_cached
+  装饰的函数按参数记忆结果；作用域外调用不受影响
+- 作用域保存在上下文变量中，run_sync 的工作线程和 asyncio 任务会复制上下文，
+  因此并发执行的子请求共享同一份结果（并发未命中时可能重复计算，结果相同）
+- 只适合一个请求内不会变化的读取（数据版本号、网站设置、缩略图路径等）
+
+使用示例:
+    @request_cached
+    def get_site_settings():
+        ...
+
+    with request_cache_scope():
+        get_site_settings()
+        get_site_settings()     # 不再查询
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+_store = ContextVar('request_cache', default=None)
+
+
+@contextmanager
+def request_cache_scope():
+    """开启请求级缓存作用域，退出时丢弃所有结果"""
+    token = _store.set({})
+    try:
+        yield
+    finally:
+        _store.reset(token)
+
+
+def clear_request_cache():
+    """清空当前作用域中的结果（数据版本号递增等写操作后调用）"""
+    store = _store.get()
+    if store is not None:
+        store.clear()
+
+
+def request_cached(func):
+    """在 request_cache_scope 内按参数记忆函数结果（参数不可哈希时直接调用）"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        store = _store.get()
+        if store is None:
+            return func(*args, **kwargs)
+        try:
+            key = (func, args, frozenset(kwargs.items()))
+            return store[key]
+        except TypeError:
+            return func(*args, **kwargs)
+        except KeyError:
+            value = store[key] = func(*args, **kwargs)
+            return value
+    return wrapper
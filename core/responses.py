@@ -1,8 +1,29 @@
 """
 统一响应格式模块 - 提供标准化的 API 响应
 """
+import logging
+from django.http import HttpResponse
 from rest_framework.response import Response
-from typing import Any, Optional, Dict, List
+from typing import Any, Callable, Optional, Dict, List, Union
+from .compression import IDENTITY, compress_variants
+from .local_cache import atiered_get, tiered_get, tiered_set
+from .metrics import record_cache_access
+from .renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+
+def _success_payload(data: Any, message: str, code: int) -> Dict[str, Any]:
+    """构建成功响应的统一结构"""
+    response_data = {
+        'code': code,
+        'message': message,
+    }
+
+    if data is not None:
+        response_data['data'] = data
+
+    return response_data
 
 
 def success_response(
@@ -27,15 +48,92 @@ def success_response(
         return success_response(data={"id": 1, "name": "test"})
         return success_response(data=[1, 2, 3], message="获取成功")
     """
-    response_data = {
-        'code': code,
-        'message': message,
-    }
+    return Response(_success_payload(data, message, code), status=status_code)
 
-    if data is not None:
-        response_data['data'] = data
 
-    return Response(response_data, status=status_code)
+def cached_success_response(
+    cache_key: str,
+    builder: Callable[[], Any],
+    message: str = "操作成功",
+    timeout: Union[int, Callable[[Any], int]] = 600,
+    cache_empty: bool = True
+) -> HttpResponse:
+    """
+    预编码的成功响应：缓存中保存完整的 JSON 响应体字节及其 gzip/brotli 预压缩变体，
+    命中时直接返回，跳过序列化器、渲染器和压缩
+
+    Args:
+        cache_key: 缓存键，数据变化时由信号按模式清理
+        builder: 缓存未命中时调用，返回响应中的 data
+        message: 响应消息
+        timeout: 缓存超时时间（秒），也可以是由 data 计算超时时间的函数
+        cache_empty: data 为空时是否缓存
+
+    Returns:
+        HttpResponse 对象（encoded_variants 属性携带各编码变体，由 CompressionMiddleware 协商）
+
+    Example:
+        return cached_success_response(
+            "style_list_simple:json",
+            lambda: list(Style.objects.values_list('name', flat=True)),
+            message="获取曲风列表成功"
+        )
+    """
+    prefix = cache_key.split(':', 1)[0]
+    variants = tiered_get(cache_key, prefix)
+    hit = isinstance(variants, dict) and IDENTITY in variants
+    record_cache_access(prefix, hit)
+    if hit:
+        return _variants_response(variants)
+
+    data = builder()
+    variants = compress_variants(dumps(_success_payload(data, message, 200)))
+
+    if data or cache_empty:
+        if callable(timeout):
+            timeout = timeout(data)
+        tiered_set(cache_key, variants, timeout, prefix)
+
+    return _variants_response(variants)
+
+
+async def acached_response(cache_key: str) -> Optional[HttpResponse]:
+    """
+    异步读取 cached_success_response 写入的预编码响应，命中时不进入同步代码
+
+    Args:
+        cache_key: 与同步视图相同的缓存键
+
+    Returns:
+        命中时返回 HttpResponse，未命中时返回 None（由同步视图构建并写入缓存，未命中也由其计数）
+    """
+    prefix = cache_key.split(':', 1)[0]
+    variants = await atiered_get(cache_key, prefix)
+    if not (isinstance(variants, dict) and IDENTITY in variants):
+        return None
+    record_cache_access(prefix, True)
+    return _variants_response(variants)
+
+
+def json_success_response(data: Any = None, message: str = "操作成功") -> HttpResponse:
+    """
+    不经过 DRF 渲染的成功响应（异步视图在事件循环中使用），响应体与 success_response 相同
+
+    Args:
+        data: 响应数据
+        message: 响应消息
+
+    Returns:
+        HttpResponse 对象
+    """
+    return HttpResponse(dumps(_success_payload(data, message, 200)), content_type='application/json')
+
+
+def _variants_response(variants: Dict[str, bytes]) -> HttpResponse:
+    """以原始字节构建响应，并附带预压缩变体"""
+    response = HttpResponse(variants[IDENTITY], content_type='application/json')
+    response.encoded_variants = variants
+    return response
 
 
 def error_response(
@@ -84,7 +182,8 @@ def paginated_response(
     page: int,
     page_size: int,
     message: str = "获取成功",
-    code: int = 200
+    code: int = 200,
+    extra: Optional[Dict[str, Any]] = None
 ) -> Response:
     """
     分页响应
@@ -96,6 +195,7 @@ def paginated_response(
         page_size: 每页数量
         message: 响应消息，默认 "获取成功"
         code: 业务响应码，默认 200
+        extra: 附加到 data 中的其他字段（例如分面计数）
 
     Returns:
         Response 对象
@@ -108,13 +208,16 @@ def paginated_response(
             page_size=20
         )
     """
+    payload = {
+        'total': total,
+        'page': page,
+        'page_size': page_size,
+        'results': data
+    }
+    if extra:
+        payload.update(extra)
     return success_response(
-        data={
-            'total': total,
-            'page': page,
-            'page_size': page_size,
-            'results': data
-        },
+        data=payload,
         message=message,
         code=code
     )
@@ -0,0 +1,236 @@
+"""
+SQLite 连接层 - PRAGMA 配置、只读连接路由与连接统计
+
+- 每个连接建立时（connection_created 信号）按数据库应用 PRAGMA 配置：WAL 日志模式让读写互不阻塞，
+  mmap_size / cache_size 减少读取的系统调用，synchronous=NORMAL 在 WAL 下兼顾安全与写入速度
+- 每个数据库可配置一个只读别名 <alias>_ro（URI mode=ro，见 settings.DATABASES），
+  ReadOnlyRoutingMiddleware 在 GET/HEAD 请求期间让 MultiDBRouter 把读取路由到只读连接，
+  写入（包括 GET 中的访客记录等）仍使用读写连接
+- 连接打开次数计入指标（db_connections_opened_total），sqlite_stats 管理命令查看各数据库状态
+"""
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .async_support import AsyncMiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+READ_ONLY_SUFFIX = '_ro'
+
+# PRAGMA 配置，按顺序执行
+PRAGMA_PROFILES = {
+    # 通用：WAL + 64MB 页缓存 + 256MB 内存映射
+    'default': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'temp_store': 'MEMORY',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+    },
+    # 读多写少、体积较大（歌曲、演唱记录、图集）
+    'read_heavy': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'temp_store': 'MEMORY',
+        'cache_size': -128000,
+        'mmap_size': 1024 * 1024 * 1024,
+    },
+    # 持续写入（爬虫指标、访客记录）：加大自动检查点间隔，限制 WAL 文件大小
+    'write_heavy': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'temp_store': 'MEMORY',
+        'cache_size': -64000,
+        'mmap_size': 512 * 1024 * 1024,
+        'wal_autocheckpoint': 4000,
+        'journal_size_limit': 64 * 1024 * 1024,
+    },
+}
+
+# 只影响写入或需要写权限的 PRAGMA，只读连接跳过
+WRITE_PRAGMAS = {'journal_mode', 'synchronous', 'wal_autocheckpoint', 'journal_size_limit'}
+
+# 默认配置，可通过 settings.SQLITE_CONFIG 覆盖
+DEFAULT_CONFIG = {
+    'PROFILES': {},               # 数据库别名 -> PRAGMA_PROFILES 中的名称，未配置时使用 default
+    'READ_ONLY_ROUTING': True,    # GET/HEAD 请求的读取是否走只读连接
+}
+
+_read_only = ContextVar('sqlite_read_only', default=False)
+
+_stats_lock = threading.Lock()
+_opened = {}
+
+
+def get_config():
+    """获取 SQLite 连接配置"""
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'SQLITE_CONFIG', {}))
+    return config
+
+
+def base_alias(alias):
+    """只读别名对应的读写别名"""
+    return alias[:-len(READ_ONLY_SUFFIX)] if alias.endswith(READ_ONLY_SUFFIX) else alias
+
+
+def is_read_only_alias(alias):
+    return alias.endswith(READ_ONLY_SUFFIX)
+
+
+def get_pragmas(alias):
+    """
+    获取连接应执行的 PRAGMA
+
+    Returns:
+        dict: PRAGMA 名称 -> 值（只读连接不含写入相关项，并附加 query_only）
+    """
+    profile = get_config()['PROFILES'].get(base_alias(alias), 'default')
+    pragmas = dict(PRAGMA_PROFILES[profile])
+    if is_read_only_alias(alias):
+        pragmas = {name: value for name, value in pragmas.items() if name not in WRITE_PRAGMAS}
+        pragmas['query_only'] = 'ON'
+    return pragmas
+
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created 信号处理：应用 PRAGMA 配置并记录连接统计"""
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        for name, value in get_pragmas(connection.alias).items():
+            try:
+                cursor.execute(f'PRAGMA {name} = {value}')
+            except Exception as e:
+                logger.warning(f"SQLite PRAGMA {name}={value} failed on {connection.alias}: {e}")
+
+    with _stats_lock:
+        _opened[connection.alias] = _opened.get(connection.alias, 0) + 1
+
+    from .metrics import get_config as get_metrics_config, metrics
+    if get_metrics_config()['ENABLED']:
+        metrics.inc('db_connections_opened_total', database=connection.alias)
+
+
+# ==================== 只读路由 ====================
+
+@contextmanager
+def read_only_routing():
+    """
+    在代码块内把读取路由到只读连接
+
+    使用示例:
+        with read_only_routing():
+            songs = list(Song.objects.all())    # 使用 default_ro
+    """
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+def read_only_alias(alias):
+    """
+    当前上下文中读取 alias 应使用的只读别名
+
+    Returns:
+        str | None: 只读别名；未启用只读路由、没有配置只读别名，或只读别名与读写连接指向
+        同一个库（测试环境中的 TEST MIRROR）时返回 None
+    """
+    if not _read_only.get():
+        return None
+
+    from django.db import connections
+
+    databases = connections.settings
+    ro_alias = f'{alias}{READ_ONLY_SUFFIX}'
+    if ro_alias not in databases or databases[ro_alias]['NAME'] == databases[alias]['NAME']:
+        return None
+    return ro_alias
+
+
+class ReadOnlyRoutingMiddleware(AsyncMiddlewareMixin):
+    """
+    GET/HEAD 请求期间启用只读路由（SQLITE_CONFIG['READ_ONLY_ROUTING'] 为 False 时不生效）
+
+    路由标记是上下文变量，异步视图经 run_sync 在线程池中执行的查询同样生效
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD')
+
+    def _enabled(self, request):
+        return request.method in self.SAFE_METHODS and get_config()['READ_ONLY_ROUTING']
+
+    def handle(self, request):
+        if not self._enabled(request):
+            return self.get_response(request)
+        with read_only_routing():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not self._enabled(request):
+            return await self.get_response(request)
+        with read_only_routing():
+            return await self.get_response(request)
+
+
+# ==================== 统计 ====================
+
+def connection_stats():
+    """
+    各数据库的连接与文件状态
+
+    Returns:
+        dict: 别名 -> {journal_mode, size, wal_size, freelist_pages, connections_opened, ...}
+    """
+    from django.db import connections
+
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+
+        entry = {
+            'read_only': is_read_only_alias(alias),
+            'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+        }
+        try:
+            with connection.cursor() as cursor:
+                for name in ('journal_mode', 'page_size', 'page_count', 'freelist_count', 'cache_size', 'mmap_size'):
+                    cursor.execute(f'PRAGMA {name}')
+                    entry[name] = cursor.fetchone()[0]
+        except Exception as e:
+            entry['error'] = str(e)
+            stats[alias] = entry
+            continue
+
+        entry['connections_opened'] = _opened.get(alias, 0)
+
+        entry['size'] = entry['page_size'] * entry['page_count']
+        path = connection.settings_dict['NAME']
+        wal_path = f'{path}-wal'
+        entry['wal_size'] = os.path.getsize(wal_path) if not is_read_only_alias(alias) and os.path.exists(wal_path) else 0
+        stats[alias] = entry
+    return stats
+
+
+def checkpoint(alias, mode='TRUNCATE'):
+    """
+    执行 WAL 检查点（把 WAL 内容写回主库并截断 WAL 文件）
+
+    Returns:
+        tuple: (busy, wal 页数, 已写回页数)
+    """
+    from django.db import connections
+
+    with connections[alias].cursor() as cursor:
+        cursor.execute(f'PRAGMA wal_checkpoint({mode})')
+        return cursor.fetchone()
@@ -0,0 +1,199 @@
+"""
+缓存击穿保护 - 单飞锁、软/硬过期与概率提前刷新
+
+cache_result / cached 未命中时不再让所有并发请求同时回源：
+- 缓存中保存 CacheEntry（值、软过期时间、上次计算耗时），Redis 中的过期时间为 timeout + STALE_TTL（硬过期），
+  写入 Redis 的值经 cache_codec 编码，一级缓存保存解码后的对象
+- 过了软过期时间，抢到锁（cache.add，Redis 上即 SET NX）的请求重新计算，其他请求继续返回旧值
+- 完全未命中（例如 clear_cache_pattern 之后）时只有抢到锁的请求计算，其他请求轮询等待结果；
+  持锁请求释放锁却没有写入结果（计算抛出异常、结果为 None 且不缓存）或超过 LOCK_WAIT 时自行计算
+- 软过期前按 XFetch 算法以一定概率提前刷新（计算越慢、越接近过期，概率越大），热点键不会在同一时刻集体过期
+
+Redis 不可用（见 local_cache 熔断）时无法加锁，直接计算。
+"""
+import logging
+import math
+import random
+import time
+import uuid
+from typing import Any, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import cache_codec
+from .local_cache import mark_redis_down, redis_available, tiered_get, tiered_set
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.CACHE_STAMPEDE_CONFIG 覆盖
+DEFAULT_CONFIG = {
+    'ENABLED': True,
+    'STALE_TTL': 60,               # 软过期后旧值还能被返回的时间（秒）
+    'LOCK_TIMEOUT': 10,            # 重新计算的锁超时（秒），计算方异常退出时锁自动释放
+    'LOCK_WAIT': 3,                # 未命中且锁被占用时最多等待的时间（秒）
+    'POLL_INTERVAL': 0.05,         # 等待期间轮询缓存的间隔（秒）
+    'EARLY_EXPIRATION_BETA': 1.0,  # XFetch 系数，0 表示关闭概率提前刷新
+}
+
+
+class CacheEntry(NamedTuple):
+    """缓存中保存的值及其刷新信息"""
+    value: Any
+    soft_expires: Optional[float]  # 时间戳，None 表示不过期
+    delta: float                   # 上次计算耗时（秒）
+
+
+def get_config():
+    """获取击穿保护配置"""
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'CACHE_STAMPEDE_CONFIG', {}))
+    return config
+
+
+def _needs_refresh(entry, beta):
+    """已过软过期时间，或按 XFetch 概率提前刷新"""
+    if entry.soft_expires is None:
+        return False
+    now = time.time()
+    if beta > 0 and entry.delta > 0:
+        # -log(u) 服从指数分布，u 取 (0, 1] 避免 log(0)
+        now -= entry.delta * beta * math.log(1.0 - random.random())
+    return now >= entry.soft_expires
+
+
+def _acquire_lock(lock_key, timeout):
+    """
+    尝试获取刷新锁
+
+    Returns:
+        str | None: 锁令牌；锁被其他请求持有时返回 None。Redis 不可用时视为获取成功（返回空字符串）
+    """
+    if not redis_available():
+        return ''
+    token = uuid.uuid4().hex
+    try:
+        return token if cache.add(lock_key, token, timeout) else None
+    except Exception as e:
+        mark_redis_down(e)
+        return ''
+
+
+def _release_lock(lock_key, token):
+    """只释放自己持有的锁（锁已超时并被其他请求获取时不删除）"""
+    if not token:
+        return
+    try:
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+    except Exception as e:
+        logger.warning(f"Cache lock release failed: {e}")
+
+
+def _encode_entry(entry):
+    """写入 Redis 前把值编码为紧凑格式（见 cache_codec）"""
+    return entry._replace(value=cache_codec.encode(entry.value))
+
+
+def _decode_entry(raw):
+    """Redis 中读出的值解码；升级前写入的裸值原样返回，无法解码时视为未命中"""
+    if not isinstance(raw, CacheEntry):
+        return raw
+    try:
+        return raw._replace(value=cache_codec.decode(raw.value))
+    except Exception as e:
+        logger.warning(f"Cache value decode failed: {e}")
+        return None
+
+
+def _store(key, prefix, value, timeout, cache_none, delta, config):
+    if value is None and not cache_none:
+        return
+    if config['ENABLED']:
+        soft_expires = time.time() + timeout if timeout else None
+        hard_timeout = timeout + config['STALE_TTL'] if timeout else timeout
+    else:
+        soft_expires, hard_timeout = None, timeout
+    tiered_set(key, CacheEntry(value, soft_expires, delta), hard_timeout, prefix, encode=_encode_entry)
+
+
+def _compute(key, prefix, compute, timeout, cache_none, config):
+    start = time.monotonic()
+    value = compute()
+    _store(key, prefix, value, timeout, cache_none, time.monotonic() - start, config)
+    return value
+
+
+def _lock_held(lock_key):
+    try:
+        return cache.get(lock_key) is not None
+    except Exception as e:
+        mark_redis_down(e)
+        return False
+
+
+def _wait_for_entry(key, prefix, config):
+    """等待持锁请求写入结果；超时或锁已释放但没有结果时返回 None"""
+    deadline = time.monotonic() + config['LOCK_WAIT']
+    while time.monotonic() < deadline:
+        time.sleep(config['POLL_INTERVAL'])
+        entry = tiered_get(key, prefix, decode=_decode_entry)
+        if entry is not None:
+            return entry
+        # 持锁请求先写入结果再释放锁，锁已释放仍读不到结果说明它没有写入，不必继续等待
+        if not _lock_held(f"lock:{key}"):
+            return None
+    return None
+
+
+def _unwrap(entry):
+    """兼容升级前写入的裸值"""
+    return entry.value if isinstance(entry, CacheEntry) else entry
+
+
+def get_or_compute(key, prefix, compute, timeout, cache_none=False):
+    """
+    读取缓存，未命中或需要刷新时在单飞锁保护下调用 compute
+
+    Args:
+        key: 缓存键
+        prefix: 键前缀（一级缓存与命中率统计）
+        compute: 无参函数，返回要缓存的值
+        timeout: 软过期时间（秒），None 或 0 表示不过期
+        cache_none: 是否缓存 None
+
+    Returns:
+        tuple: (值, 是否来自缓存)
+    """
+    config = get_config()
+    entry = tiered_get(key, prefix, decode=_decode_entry)
+
+    if not config['ENABLED']:
+        if entry is not None:
+            return _unwrap(entry), True
+        return _compute(key, prefix, compute, timeout, cache_none, config), False
+
+    if entry is not None:
+        if not isinstance(entry, CacheEntry) or not _needs_refresh(entry, config['EARLY_EXPIRATION_BETA']):
+            return _unwrap(entry), True
+        token = _acquire_lock(f"lock:{key}", config['LOCK_TIMEOUT'])
+        if token is None:
+            # 其他请求正在刷新，返回旧值
+            return entry.value, True
+        try:
+            logger.debug(f"Cache refresh: {key}")
+            return _compute(key, prefix, compute, timeout, cache_none, config), False
+        finally:
+            _release_lock(f"lock:{key}", token)
+
+    token = _acquire_lock(f"lock:{key}", config['LOCK_TIMEOUT'])
+    if token is None:
+        entry = _wait_for_entry(key, prefix, config)
+        if entry is not None:
+            return _unwrap(entry), True
+        logger.debug(f"Cache lock wait ended without result: {key}")
+        return _compute(key, prefix, compute, timeout, cache_none, config), False
+    try:
+        return _compute(key, prefix, compute, timeout, cache_none, config), False
+    finally:
+        _release_lock(f"lock:{key}", token)
@@ -0,0 +1,38 @@
+"""
+测试工具 - 查询预算断言
+
+使用示例:
+    class SongApiTests(QueryBudgetMixin, TestCase):
+        def test_song_list(self):
+            with self.assertQueryBudget(5):
+                self.client.get('/api/songs/')
+"""
+from contextlib import contextmanager
+
+from .query_profiler import capture_queries, get_config
+
+
+class QueryBudgetMixin:
+    """为 TestCase 提供查询预算断言"""
+
+    @contextmanager
+    def assertQueryBudget(self, max_queries, repeat_threshold=None):
+        """
+        断言代码块内执行的查询数不超过预算，且没有疑似 N+1 的重复模板
+
+        Args:
+            max_queries: 最大查询数（所有数据库合计）
+            repeat_threshold: 同一模板的最大允许次数（达到即失败），默认使用 REPEAT_THRESHOLD
+        """
+        if repeat_threshold is None:
+            repeat_threshold = get_config()['REPEAT_THRESHOLD']
+
+        with capture_queries() as capture:
+            yield capture
+
+        if capture.count > max_queries:
+            self.fail(f'查询数超出预算（{capture.count} > {max_queries}）\n{capture.report()}')
+
+        repeated = capture.repeated(repeat_threshold)
+        if repeated:
+            self.fail(f'检测到疑似 N+1 查询（同一模板执行 {repeated[0][2]} 次）\n{capture.report()}')
@@ -2,12 +2,18 @@
 通用缩略图生成器 - 支持全站图片缩略图自动生成
 """
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Tuple, Dict, List
 from PIL import Image
 from django.core.files.storage import default_storage
 from django.conf import settings
 
+from .metrics import record_thumbnail
+from .request_cache import request_cached
+
 
 class ThumbnailGenerator:
     """通用缩略图生成器 - 支持多模块缩略图管理"""
@@ -53,6 +59,12 @@ class ThumbnailGenerator:
 
     QUALITY = 85  # 图片质量
 
+    # 后台生成缩略图的线程池（懒加载）及正在生成的路径
+    BACKGROUND_WORKERS = 2
+    _background_executor = None
+    _background_pending = set()
+    _background_lock = threading.Lock()
+
     @classmethod
     def get_module_from_path(cls, file_path: str) -> Optional[str]:
         """
@@ -172,6 +184,7 @@ class ThumbnailGenerator:
                 pass  # 文件不存在，继续生成
 
         # 读取原图片
+        start = time.perf_counter()
         try:
             with default_storage.open(original_path, 'rb') as f:
                 img = Image.open(f)
@@ -207,9 +220,11 @@ class ThumbnailGenerator:
                 elif output_ext == '.gif':
                     img.save(thumbnail_full_path, 'GIF')
 
+                record_thumbnail(time.perf_counter() - start, success=True)
                 return thumbnail_path
 
         except Exception as e:
+            record_thumbnail(time.perf_counter() - start, success=False)
             print(f"生成缩略图失败: {original_path}, 错误: {e}")
             return original_path  # 失败时返回原图路径
 
@@ -274,9 +289,10 @@ class ThumbnailGenerator:
             return False
 
     @classmethod
+    @request_cached
     def get_thumbnail_url(cls, original_url: str) -> str:
         """
-        获取缩略图 URL
+        获取缩略图 URL（同一个批量请求内相同的封面只检查一次）
 
         Args:
             original_url: 原图 URL
@@ -300,6 +316,101 @@ class ThumbnailGenerator:
         # 转换为 URL
         return f"/media/{thumbnail_path}"
 
+    @staticmethod
+    def _url_to_path(original_url: str) -> str:
+        """将媒体 URL 转换为存储路径（移除 /media/ 前缀）"""
+        original_path = original_url.lstrip('/')
+        if original_path.startswith('media/'):
+            original_path = original_path[len('media/'):]
+        return original_path
+
+    @classmethod
+    def _is_thumbnail_fresh(cls, original_path: str, thumbnail_path: str) -> Optional[bool]:
+        """
+        检查缩略图是否存在且不早于原图
+
+        Returns:
+            True/False；原图不存在时返回 None
+        """
+        try:
+            original_mtime = os.path.getmtime(os.path.join(default_storage.location, original_path))
+        except OSError:
+            return None
+        try:
+            thumbnail_mtime = os.path.getmtime(os.path.join(default_storage.location, thumbnail_path))
+        except OSError:
+            return False
+        return original_mtime <= thumbnail_mtime
+
+    @classmethod
+    def _generate_in_background(cls, original_paths: List[str]) -> None:
+        """将缩略图生成任务提交到后台线程池（同一路径不会重复提交）"""
+        with cls._background_lock:
+            paths = [p for p in original_paths if p not in cls._background_pending]
+            if not paths:
+                return
+            cls._background_pending.update(paths)
+            if cls._background_executor is None:
+                cls._background_executor = ThreadPoolExecutor(
+                    max_workers=cls.BACKGROUND_WORKERS,
+                    thread_name_prefix='thumbnail'
+                )
+
+        def task(path):
+            try:
+                cls.generate_thumbnail(path)
+            finally:
+                with cls._background_lock:
+                    cls._background_pending.discard(path)
+
+        for path in paths:
+            cls._background_executor.submit(task, path)
+
+    @classmethod
+    def resolve_thumbnail_urls(cls, original_urls: List[str], background: bool = True) -> Tuple[Dict[str, str], List[str]]:
+        """
+        批量解析缩略图 URL，只做文件状态检查，不在请求线程中编码图片
+
+        Args:
+            original_urls: 原图 URL 列表
+            background: 缺失或过期的缩略图是否提交到后台生成；为 False 时同步生成
+
+        Returns:
+            (URL 映射 {原图 URL: 缩略图 URL}, 仍在生成中的原图路径列表)
+            缩略图尚未就绪时映射为原图 URL
+        """
+        mapping = {}
+        missing = {}
+
+        for original_url in set(filter(None, original_urls)):
+            original_path = cls._url_to_path(original_url)
+            thumbnail_path = cls.get_thumbnail_path(original_path)
+
+            if thumbnail_path == original_path:
+                mapping[original_url] = original_url  # 不生成缩略图或无法识别模块
+                continue
+
+            fresh = cls._is_thumbnail_fresh(original_path, thumbnail_path)
+            if fresh:
+                mapping[original_url] = f"/media/{thumbnail_path}"
+            else:
+                mapping[original_url] = original_url
+                if fresh is False:
+                    missing[original_url] = original_path
+
+        if not missing:
+            return mapping, []
+
+        if background:
+            cls._generate_in_background(list(missing.values()))
+            return mapping, list(missing.values())
+
+        for original_url, original_path in missing.items():
+            thumbnail_path = cls.generate_thumbnail(original_path)
+            if thumbnail_path != original_path:
+                mapping[original_url] = f"/media/{thumbnail_path}"
+        return mapping, []
+
     @classmethod
     def batch_generate_thumbnails(cls, module: Optional[str] = None, force: bool = False) -> Dict[str, any]:
         """
@@ -46,8 +46,8 @@ class VisitorGeoMiddleware:
         if path.startswith('/api/') and 'geo' not in path:
             return False
         
-        # 排除robots.txt和sitemap.xml
-        if path in ['/robots.txt', '/sitemap.xml']:
+        # 排除robots.txt和sitemap（索引及子 sitemap）
+        if path == '/robots.txt' or (path.startswith('/sitemap') and path.endswith('.xml')):
             return False
         
         return True
@@ -0,0 +1,15 @@
+"""
+缓存预热任务 - 粉丝数据文件缓存（见 core/cache_warmer.py）
+"""
+from core.cache_warmer import register_warmer
+from .services.follower_service import FollowerService
+
+GRANULARITIES = ('DAY', 'WEEK', 'MONTH')
+
+
+@register_warmer('followers', priority=50)
+def warm_followers():
+    """各粒度的粉丝数据文件缓存"""
+    for granularity in GRANULARITIES:
+        FollowerService.generate_cache(granularity)
+    return len(GRANULARITIES)
@@ -1,64 +1,68 @@
 """
-信号处理器 - 自动精细化清理缓存
+信号处理器 - 递增版本号使版本化缓存失效
+
+DIYService 的缓存键中带有数据版本号，数据变化时只需递增版本号，
+旧版本的缓存不再被访问并自然过期，无需按模式扫描删除。
 """
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from .collection import Collection
 from .work import Work
-from core.cache import clear_cache_pattern
+from core.cache import bump_data_version
+
+COLLECTIONS_VERSION = 'fansDIY:collections'
+WORKS_ALL_VERSION = 'fansDIY:works:all'
+
+
+def works_version(collection_id):
+    """指定合集作品列表的版本命名空间"""
+    return f'fansDIY:works:collection:{collection_id}'
 
 
 @receiver(post_save, sender=Collection)
 def clear_cache_on_collection_save(sender, instance, created, **kwargs):
     """
-    当合集被创建或更新时，精细化清理缓存
+    当合集被创建或更新时，使合集列表和该合集的作品列表缓存失效
     """
-    # 清理该合集的详情缓存
-    clear_cache_pattern(f'collection_detail:{instance.id}')
-    # 清理合集列表缓存
-    clear_cache_pattern('get_collections')
-    # 清理该合集下的作品列表缓存
-    clear_cache_pattern(f'get_works:collection_id={instance.id}')
+    # 合集名称嵌入在作品数据中，所以作品列表也需要失效
+    bump_data_version(COLLECTIONS_VERSION, WORKS_ALL_VERSION, works_version(instance.id))
 
 
 @receiver(post_delete, sender=Collection)
 def clear_cache_on_collection_delete(sender, instance, **kwargs):
     """
-    当合集被删除时，精细化清理缓存
+    当合集被删除时，使合集列表和该合集的作品列表缓存失效
+    """
+    bump_data_version(COLLECTIONS_VERSION, WORKS_ALL_VERSION, works_version(instance.id))
+
+
+@receiver(pre_save, sender=Work)
+def remember_previous_collection(sender, instance, **kwargs):
+    """
+    保存前记录作品原来所属的合集，作品被移动到其他合集时两个合集的缓存都需要失效
     """
-    # 清理该合集的详情缓存
-    clear_cache_pattern(f'collection_detail:{instance.id}')
-    # 清理合集列表缓存
-    clear_cache_pattern('get_collections')
-    # 清理该合集下的所有作品列表缓存
-    clear_cache_pattern(f'get_works:collection_id={instance.id}')
+    instance._previous_collection_id = None
+    if instance.pk:
+        instance._previous_collection_id = Work.objects.filter(pk=instance.pk).values_list(
+            'collection_id', flat=True
+        ).first()
 
 
 @receiver(post_save, sender=Work)
 def clear_cache_on_work_save(sender, instance, created, **kwargs):
     """
-    当作品被创建或更新时，精细化清理缓存
+    当作品被创建或更新时，使作品列表、作品详情和合集列表（作品数量）缓存失效
     """
-    # 清理该作品的详情缓存
-    clear_cache_pattern(f'get_work_by_id:{instance.id}')
-    # 清理合集列表缓存（因为作品数量可能变化）
-    clear_cache_pattern('get_collections')
-    # 清理该合集下的作品列表缓存
-    clear_cache_pattern(f'get_works:collection_id={instance.collection.id}')
-    # 清理作品列表缓存（所有作品）
-    clear_cache_pattern('get_works:')
+    namespaces = [COLLECTIONS_VERSION, WORKS_ALL_VERSION, works_version(instance.collection_id)]
+    previous_collection_id = getattr(instance, '_previous_collection_id', None)
+    if previous_collection_id and previous_collection_id != instance.collection_id:
+        namespaces.append(works_version(previous_collection_id))
+    bump_data_version(*namespaces)
 
 
 @receiver(post_delete, sender=Work)
 def clear_cache_on_work_delete(sender, instance, **kwargs):
     """
-    当作品被删除时，精细化清理缓存
+    当作品被删除时，使作品列表、作品详情和合集列表缓存失效
     """
-    # 清理该作品的详情缓存
-    clear_cache_pattern(f'get_work_by_id:{instance.id}')
-    # 清理合集列表缓存
-    clear_cache_pattern('get_collections')
-    # 清理该合集下的作品列表缓存
-    clear_cache_pattern(f'get_works:collection_id={instance.collection.id}')
-    # 清理作品列表缓存（所有作品）
-    clear_cache_pattern('get_works:')
\ No newline at end of file
+    bump_data_version(COLLECTIONS_VERSION, WORKS_ALL_VERSION, works_version(instance.collection_id))
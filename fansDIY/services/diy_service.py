@@ -1,20 +1,98 @@
+import logging
+
+from django.core.cache import cache
 from django.core.paginator import Paginator
 from django.db import transaction
 
-from core.cache import cache_result
+from core.cache import get_data_version
 from core.exceptions import CollectionNotFoundException, WorkNotFoundException, DatabaseException
+from core.thumbnail_generator import ThumbnailGenerator
 
 from fansDIY.models import Collection, Work
+from fansDIY.models.signals import COLLECTIONS_VERSION, WORKS_ALL_VERSION, works_version
+
+logger = logging.getLogger(__name__)
 
 
 class DIYService:
     """粉丝二创服务类"""
-    
+
+    CACHE_TIMEOUT = 300
+    # 列表中存在仍在后台生成的缩略图时，缩短缓存时间以便尽快拿到缩略图 URL
+    PENDING_THUMBNAIL_TIMEOUT = 30
+
+    # 版本化缓存命名空间（由 fansDIY/models/signals.py 递增）
+    COLLECTIONS_VERSION = COLLECTIONS_VERSION
+    WORKS_ALL_VERSION = WORKS_ALL_VERSION
+
+    WORK_FIELDS = (
+        'id', 'title', 'cover_url', 'view_url', 'author', 'notes',
+        'position', 'display_order', 'collection_id', 'collection__name',
+    )
+    COLLECTION_FIELDS = (
+        'id', 'name', 'works_count', 'position', 'display_order', 'created_at', 'updated_at',
+    )
+
+    works_version_namespace = staticmethod(works_version)
+
     @staticmethod
-    @cache_result(timeout=300)
-    def get_collections(page=1, page_size=20):
+    def _get_or_build(cache_key, builder):
+        """
+        读取版本化缓存，未命中时构建并写入
+
+        Args:
+            cache_key: 缓存键
+            builder: 返回 (数据, 缓存超时) 的函数
+        """
+        try:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Cache hit: {cache_key}")
+                return cached
+        except Exception as e:
+            logger.warning(f"Cache get failed: {e}")
+
+        result, timeout = builder()
+
+        try:
+            cache.set(cache_key, result, timeout)
+        except Exception as e:
+            logger.warning(f"Cache set failed: {e}")
+
+        return result
+
+    @classmethod
+    def _serialize_works(cls, rows):
+        """
+        将 values() 行批量转换为作品数据，缩略图通过一次批量查找解析
+
+        Returns:
+            tuple: (作品列表, 是否有缩略图仍在生成)
         """
-        获取合集列表
+        thumbnails, pending = ThumbnailGenerator.resolve_thumbnail_urls(
+            [row['cover_url'] for row in rows]
+        )
+        results = [{
+            "id": row['id'],
+            "title": row['title'],
+            "cover_url": row['cover_url'],
+            "cover_thumbnail_url": thumbnails.get(row['cover_url'], row['cover_url']),
+            "view_url": row['view_url'],
+            "author": row['author'],
+            "notes": row['notes'],
+            "position": row['position'],
+            "display_order": row['display_order'],
+            "collection": {
+                "id": row['collection_id'],
+                "name": row['collection__name'],
+            },
+        } for row in rows]
+        return results, bool(pending)
+
+    @classmethod
+    def get_collections(cls, page=1, page_size=20):
+        """
+        获取合集列表（按版本缓存分页结果）
         
         Args:
             page: 页码
@@ -23,35 +101,30 @@ class DIYService:
         Returns:
             dict: 包含分页信息和合集列表的字典
         """
-        try:
-            collections = Collection.objects.all().order_by('position', 'display_order', '-created_at')
+        version = get_data_version(cls.COLLECTIONS_VERSION)
+        cache_key = f"fansDIY:collections:v{version}:{page}:{page_size}"
+
+        def build():
+            collections = Collection.objects.order_by(
+                'position', 'display_order', '-created_at'
+            ).values(*cls.COLLECTION_FIELDS)
             paginator = Paginator(collections, page_size)
-            page = paginator.get_page(page)
-            
-            results = []
-            for collection in page.object_list:
-                results.append({
-                    "id": collection.id,
-                    "name": collection.name,
-                    "works_count": collection.works_count,
-                    "position": collection.position,
-                    "display_order": collection.display_order,
-                    "created_at": collection.created_at,
-                    "updated_at": collection.updated_at,
-                })
-            
+            page_obj = paginator.get_page(page)
+
             return {
                 "total": paginator.count,
-                "page": page.number,
+                "page": page_obj.number,
                 "page_size": paginator.per_page,
-                "results": results
-            }
+                "results": list(page_obj.object_list)
+            }, cls.CACHE_TIMEOUT
+
+        try:
+            return cls._get_or_build(cache_key, build)
         except Exception as e:
             raise DatabaseException(f"获取合集列表失败: {str(e)}")
     
-    @staticmethod
-    @cache_result(timeout=300)
-    def get_collection_by_id(collection_id):
+    @classmethod
+    def get_collection_by_id(cls, collection_id):
         """
         根据ID获取合集详情
         
@@ -64,28 +137,30 @@ class DIYService:
         Raises:
             CollectionNotFoundException: 合集不存在
         """
+        version = get_data_version(cls.COLLECTIONS_VERSION)
+        cache_key = f"fansDIY:collection:v{version}:{collection_id}"
+
+        def build():
+            collection = Collection.objects.filter(id=collection_id).values(*cls.COLLECTION_FIELDS).first()
+            if collection is None:
+                raise CollectionNotFoundException(f"合集ID {collection_id} 不存在")
+            return collection, cls.CACHE_TIMEOUT
+
         try:
-            collection = Collection.objects.get(id=collection_id)
-            return {
-                "id": collection.id,
-                "name": collection.name,
-                "works_count": collection.works_count,
-                "position": collection.position,
-                "display_order": collection.display_order,
-                "created_at": collection.created_at,
-                "updated_at": collection.updated_at,
-            }
-        except Collection.DoesNotExist:
-            raise CollectionNotFoundException(f"合集ID {collection_id} 不存在")
+            return cls._get_or_build(cache_key, build)
+        except CollectionNotFoundException:
+            raise
         except Exception as e:
             raise DatabaseException(f"获取合集详情失败: {str(e)}")
     
-    @staticmethod
-    @cache_result(timeout=300)
-    def get_works(page=1, page_size=20, collection_id=None):
+    @classmethod
+    def get_works(cls, page=1, page_size=20, collection_id=None):
         """
         获取作品列表
         
+        使用 values() 一次性连表查询合集名称，缩略图批量解析，
+        分页结果按合集版本缓存，作品或合集变化时由信号递增版本。
+
         Args:
             page: 页码
             page_size: 每页数量
@@ -94,45 +169,33 @@ class DIYService:
         Returns:
             dict: 包含分页信息和作品列表的字典
         """
-        try:
-            works = Work.objects.all().order_by('position', 'display_order', '-id')
-            
+        namespace = cls.works_version_namespace(collection_id) if collection_id else cls.WORKS_ALL_VERSION
+        version = get_data_version(namespace)
+        cache_key = f"fansDIY:works:{collection_id or 'all'}:v{version}:{page}:{page_size}"
+
+        def build():
+            works = Work.objects.order_by('position', 'display_order', '-id')
             if collection_id:
                 works = works.filter(collection_id=collection_id)
-            
-            paginator = Paginator(works, page_size)
-            page = paginator.get_page(page)
-            
-            results = []
-            for work in page.object_list:
-                results.append({
-                    "id": work.id,
-                    "title": work.title,
-                    "cover_url": work.cover_url,
-                    "cover_thumbnail_url": work.get_cover_thumbnail_url(),
-                    "view_url": work.view_url,
-                    "author": work.author,
-                    "notes": work.notes,
-                    "position": work.position,
-                    "display_order": work.display_order,
-                    "collection": {
-                        "id": work.collection.id,
-                        "name": work.collection.name,
-                    },
-                })
-            
+
+            paginator = Paginator(works.values(*cls.WORK_FIELDS), page_size)
+            page_obj = paginator.get_page(page)
+            results, pending = cls._serialize_works(list(page_obj.object_list))
+
             return {
                 "total": paginator.count,
-                "page": page.number,
+                "page": page_obj.number,
                 "page_size": paginator.per_page,
                 "results": results
-            }
+            }, cls.PENDING_THUMBNAIL_TIMEOUT if pending else cls.CACHE_TIMEOUT
+
+        try:
+            return cls._get_or_build(cache_key, build)
         except Exception as e:
             raise DatabaseException(f"获取作品列表失败: {str(e)}")
     
-    @staticmethod
-    @cache_result(timeout=300)
-    def get_work_by_id(work_id):
+    @classmethod
+    def get_work_by_id(cls, work_id):
         """
         根据ID获取作品详情
         
@@ -145,25 +208,20 @@ class DIYService:
         Raises:
             WorkNotFoundException: 作品不存在
         """
+        version = get_data_version(cls.WORKS_ALL_VERSION)
+        cache_key = f"fansDIY:work:v{version}:{work_id}"
+
+        def build():
+            row = Work.objects.filter(id=work_id).values(*cls.WORK_FIELDS).first()
+            if row is None:
+                raise WorkNotFoundException(f"作品ID {work_id} 不存在")
+            results, pending = cls._serialize_works([row])
+            return results[0], cls.PENDING_THUMBNAIL_TIMEOUT if pending else cls.CACHE_TIMEOUT
+
         try:
-            work = Work.objects.get(id=work_id)
-            return {
-                "id": work.id,
-                "title": work.title,
-                "cover_url": work.cover_url,
-                "cover_thumbnail_url": work.get_cover_thumbnail_url(),
-                "view_url": work.view_url,
-                "author": work.author,
-                "notes": work.notes,
-                "position": work.position,
-                "display_order": work.display_order,
-                "collection": {
-                    "id": work.collection.id,
-                    "name": work.collection.name,
-                },
-            }
-        except Work.DoesNotExist:
-            raise WorkNotFoundException(f"作品ID {work_id} 不存在")
+            return cls._get_or_build(cache_key, build)
+        except WorkNotFoundException:
+            raise
         except Exception as e:
             raise DatabaseException(f"获取作品详情失败: {str(e)}")
     
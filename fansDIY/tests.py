@@ -1,3 +1,120 @@
-from django.test import TestCase
-
-# Create your tests here.
+"""
+FansDIY 模块单元测试
+"""
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from core.exceptions import WorkNotFoundException
+from .models import Collection, Work
+from .services import DIYService
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class DIYServiceTests(TestCase):
+    """二创服务测试"""
+
+    def setUp(self):
+        """测试准备"""
+        cache.clear()
+        self.collection = Collection.objects.create(name='合集A')
+        self.other = Collection.objects.create(name='合集B', position=1)
+        for i in range(5):
+            Work.objects.create(
+                collection=self.collection,
+                title=f'作品{i}',
+                author='作者',
+                cover_url='https://i0.hdslb.com/cover.jpg',
+            )
+
+    def test_get_works_constant_queries(self):
+        """测试作品列表查询次数与作品数量无关"""
+        # 1 次 COUNT + 1 次连表查询
+        with self.assertNumQueries(2):
+            result = DIYService.get_works(page=1, page_size=20)
+
+        self.assertEqual(result['total'], 5)
+        self.assertEqual(result['results'][0]['collection']['name'], '合集A')
+        self.assertEqual(
+            result['results'][0]['cover_thumbnail_url'], 'https://i0.hdslb.com/cover.jpg'
+        )
+
+    def test_get_works_served_from_cache(self):
+        """测试作品列表命中缓存时不查询数据库"""
+        DIYService.get_works(page=1, page_size=20, collection_id=self.collection.id)
+
+        with self.assertNumQueries(0):
+            DIYService.get_works(page=1, page_size=20, collection_id=self.collection.id)
+
+    def test_work_save_invalidates_collection_pages(self):
+        """测试作品变化后该合集的缓存页失效"""
+        DIYService.get_works(page=1, page_size=20, collection_id=self.collection.id)
+        Work.objects.create(collection=self.collection, title='新作品', author='作者')
+
+        result = DIYService.get_works(page=1, page_size=20, collection_id=self.collection.id)
+        self.assertEqual(result['total'], 6)
+
+    def test_moving_work_invalidates_both_collections(self):
+        """测试作品移动到其他合集时两个合集的缓存都失效"""
+        DIYService.get_works(page=1, page_size=20, collection_id=self.collection.id)
+        DIYService.get_works(page=1, page_size=20, collection_id=self.other.id)
+
+        work = Work.objects.filter(collection=self.collection).first()
+        work.collection = self.other
+        work.save()
+
+        self.assertEqual(
+            DIYService.get_works(page=1, page_size=20, collection_id=self.collection.id)['total'], 4
+        )
+        self.assertEqual(
+            DIYService.get_works(page=1, page_size=20, collection_id=self.other.id)['total'], 1
+        )
+
+    def test_collection_rename_invalidates_works(self):
+        """测试合集改名后作品中的合集名称更新"""
+        DIYService.get_works(page=1, page_size=20)
+        self.collection.name = '合集A改'
+        self.collection.save()
+
+        result = DIYService.get_works(page=1, page_size=20)
+        self.assertEqual(result['results'][0]['collection']['name'], '合集A改')
+
+    def test_get_work_by_id_not_found(self):
+        """测试获取不存在的作品"""
+        with self.assertRaises(WorkNotFoundException):
+            DIYService.get_work_by_id(99999)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class FansDIYViewTests(APITestCase):
+    """二创 API 视图测试"""
+
+    def setUp(self):
+        """测试准备"""
+        cache.clear()
+        self.collection = Collection.objects.create(name='合集A')
+        self.work = Work.objects.create(collection=self.collection, title='作品', author='作者')
+
+    def test_collection_list(self):
+        """测试合集列表"""
+        response = self.client.get(reverse('fansDIY:collection_list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['total'], 1)
+        self.assertEqual(response.data['data']['results'][0]['works_count'], 1)
+
+    def test_work_list_by_collection(self):
+        """测试按合集获取作品列表"""
+        response = self.client.get(reverse('fansDIY:work_list'), {'collection': self.collection.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['results'][0]['id'], self.work.id)
+
+    def test_work_detail_not_found(self):
+        """测试作品不存在返回 404"""
+        response = self.client.get(reverse('fansDIY:work_detail', args=[99999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
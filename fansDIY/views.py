@@ -1,9 +1,7 @@
 from django.shortcuts import render
 from rest_framework.decorators import api_view
-from django.core.paginator import Paginator
 from core.responses import success_response, error_response, paginated_response
-from core.exceptions import CollectionNotFoundException, WorkNotFoundException
-from .models import Collection, Work
+from .services import DIYService
 
 # Create your views here.
 
@@ -13,28 +11,14 @@ def collection_list_api(request):
     page_num = request.GET.get("page", 1)
     page_size = request.GET.get("limit", 20)
 
-    # 按照 position 升序排列，再按 display_order 升序排列，最后按创建时间降序排列
-    collections = Collection.objects.all().order_by('position', 'display_order', '-created_at')
-    paginator = Paginator(collections, page_size)
-    page = paginator.get_page(page_num)
-
-    results = []
-    for collection in page.object_list:
-        results.append({
-            "id": collection.id,
-            "name": collection.name,
-            "works_count": collection.works_count,
-            "position": collection.position,
-            "display_order": collection.display_order,
-            "created_at": collection.created_at,
-            "updated_at": collection.updated_at,
-        })
+    # 按照 position 升序排列，再按 display_order 升序排列，最后按创建时间降序排列（结果按版本缓存）
+    result = DIYService.get_collections(page=page_num, page_size=page_size)
 
     return paginated_response(
-        data=results,
-        total=paginator.count,
-        page=page.number,
-        page_size=page_size,
+        data=result["results"],
+        total=result["total"],
+        page=result["page"],
+        page_size=result["page_size"],
         message="获取合集列表成功"
     )
 
@@ -42,21 +26,8 @@ def collection_list_api(request):
 @api_view(['GET'])
 def collection_detail_api(request, collection_id):
     """获取合集详情"""
-    try:
-        # 优化: 使用 select_related 预取关联数据
-        collection = Collection.objects.get(id=collection_id)
-        data = {
-            "id": collection.id,
-            "name": collection.name,
-            "works_count": collection.works_count,
-            "position": collection.position,
-            "display_order": collection.display_order,
-            "created_at": collection.created_at,
-            "updated_at": collection.updated_at,
-        }
-        return success_response(data=data, message="获取合集详情成功")
-    except Collection.DoesNotExist:
-        raise CollectionNotFoundException(f"合集不存在: {collection_id}")
+    data = DIYService.get_collection_by_id(collection_id)
+    return success_response(data=data, message="获取合集详情成功")
 
 
 @api_view(['GET'])
@@ -66,38 +37,14 @@ def work_list_api(request):
     page_size = request.GET.get("limit", 20)
     collection_id = request.GET.get("collection")
 
-    # 优化: 使用 select_related 预取外键，避免 N+1 查询
-    works = Work.objects.select_related('collection').order_by('position', 'display_order', '-id')
-
-    if collection_id:
-        works = works.filter(collection_id=collection_id)
-
-    paginator = Paginator(works, page_size)
-    page = paginator.get_page(page_num)
-
-    results = []
-    for work in page.object_list:
-        results.append({
-            "id": work.id,
-            "title": work.title,
-            "cover_url": work.cover_url,
-            "cover_thumbnail_url": work.get_cover_thumbnail_url(),
-            "view_url": work.view_url,
-            "author": work.author,
-            "notes": work.notes,
-            "position": work.position,
-            "display_order": work.display_order,
-            "collection": {
-                "id": work.collection.id,
-                "name": work.collection.name,
-            },
-        })
+    # 连表查询合集名称、批量解析缩略图，结果按合集版本缓存
+    result = DIYService.get_works(page=page_num, page_size=page_size, collection_id=collection_id)
 
     return paginated_response(
-        data=results,
-        total=paginator.count,
-        page=page.number,
-        page_size=page_size,
+        data=result["results"],
+        total=result["total"],
+        page=result["page"],
+        page_size=result["page_size"],
         message="获取作品列表成功"
     )
 
@@ -105,23 +52,5 @@ def work_list_api(request):
 @api_view(['GET'])
 def work_detail_api(request, work_id):
     """获取作品详情"""
-    try:
-        work = Work.objects.get(id=work_id)
-        data = {
-            "id": work.id,
-            "title": work.title,
-            "cover_url": work.cover_url,
-            "cover_thumbnail_url": work.get_cover_thumbnail_url(),
-            "view_url": work.view_url,
-            "author": work.author,
-            "notes": work.notes,
-            "position": work.position,
-            "display_order": work.display_order,
-            "collection": {
-                "id": work.collection.id,
-                "name": work.collection.name,
-            },
-        }
-        return success_response(data=data, message="获取作品详情成功")
-    except Work.DoesNotExist:
-        raise WorkNotFoundException(f"作品不存在: {work_id}")
\ No newline at end of file
+    data = DIYService.get_work_by_id(work_id)
+    return success_response(data=data, message="获取作品详情成功")
@@ -0,0 +1,15 @@
+"""
+缓存预热任务 - 二创合集与作品列表首页（见 core/cache_warmer.py）
+"""
+from core.cache_warmer import register_warmer, warm_urls
+
+PAGE_SIZE = 20
+
+
+@register_warmer('fansdiy_lists', priority=30, patterns=('fansDIY',))
+def warm_fansdiy_lists():
+    """合集列表与作品列表首页"""
+    return warm_urls([
+        f'/api/fansDIY/collections/?page=1&limit={PAGE_SIZE}',
+        f'/api/fansDIY/works/?page=1&limit={PAGE_SIZE}',
+    ])
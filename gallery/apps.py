@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class GalleryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gallery'
+
+    def ready(self):
+        # 导入信号处理器
+        from . import signals  # noqa: F401
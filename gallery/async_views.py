@@ -0,0 +1,34 @@
+"""
+图集读接口的异步版本（ASYNC_VIEWS_CONFIG['ENABLED'] 时挂载，见 core/async_views.py）
+
+- 图集树、图片列表需要读取数据库和文件夹指纹，整体在线程池中执行同步视图
+- 缩略图生成（PIL）放到进程池，文件响应在线程池中构建，事件循环不被阻塞
+"""
+from django.http import HttpResponse
+
+from core.async_support import run_cpu, run_sync
+from core.async_views import async_read_view, run_sync_view
+from . import views
+from .utils import ThumbnailGenerator
+
+
+gallery_tree = async_read_view(views.gallery_tree)
+gallery_detail = async_read_view(views.gallery_detail)
+gallery_images = async_read_view(views.gallery_images)
+gallery_children_images = async_read_view(views.gallery_children_images)
+
+
+async def get_thumbnail(request):
+    """获取图片缩略图（支持 ETag/304 校验和 Range 请求）"""
+    if request.method != 'GET':
+        return await run_sync_view(views.get_thumbnail, request)
+
+    image_path = request.GET.get('path')
+    if not image_path:
+        return HttpResponse('Missing path parameter', status=400)
+
+    thumbnail_path = await run_cpu(ThumbnailGenerator.generate_thumbnail, image_path)
+    return await run_sync(views.thumbnail_response, request, image_path, thumbnail_path)
+
+
+get_thumbnail.csrf_exempt = True
@@ -0,0 +1,49 @@
+"""
+Django 管理命令 - 全量校准图集图片数量
+
+日常上传/删除只做增量更新，本命令用于修复计数漂移（例如直接在文件系统中增删文件）。
+
+使用方法:
+    python manage.py reconcile_gallery_image_count                 # 校准所有图集
+    python manage.py reconcile_gallery_image_count LiveMoment      # 只校准指定图集子树
+    python manage.py reconcile_gallery_image_count --dry-run       # 只显示差异，不写入
+"""
+from django.core.management.base import BaseCommand, CommandError
+from gallery.models import Gallery
+
+
+class Command(BaseCommand):
+    help = '全量校准图集图片数量（修复增量计数漂移）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'gallery_ids',
+            type=str,
+            nargs='*',
+            help='需要校准的图集 ID，不指定则校准所有图集',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='只显示差异，不写入数据库',
+        )
+
+    def handle(self, *args, **options):
+        gallery_ids = options.get('gallery_ids') or None
+        dry_run = options.get('dry_run', False)
+
+        if gallery_ids:
+            existing = set(Gallery.objects.filter(id__in=gallery_ids).values_list('id', flat=True))
+            missing = [gallery_id for gallery_id in gallery_ids if gallery_id not in existing]
+            if missing:
+                raise CommandError(f'图集不存在: {", ".join(missing)}')
+
+        drifted = Gallery.reconcile_image_counts(root_ids=gallery_ids, dry_run=dry_run)
+
+        for gallery_id, old_count, new_count in drifted:
+            self.stdout.write(f'{gallery_id}: {old_count} -> {new_count}')
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'预览完成，共 {len(drifted)} 个图集数量不一致（未写入）'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'校准完成，共修正 {len(drifted)} 个图集'))
@@ -2,12 +2,24 @@ import os
 import logging
 from collections import deque
 from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.core.files.storage import default_storage
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 
+from core.cache import bump_data_version
+
 logger = logging.getLogger(__name__)
 
 
+def _bump_gallery_version():
+    """批量 UPDATE 不触发模型信号，需要手动递增图集数据版本号"""
+    # 延迟导入，signals 模块依赖本模块
+    from .signals import GALLERY_VERSION
+    bump_data_version(GALLERY_VERSION)
+
+
 class Gallery(models.Model):
     """图集模型 - 支持多级分类"""
 
@@ -154,27 +166,36 @@ class Gallery(models.Model):
             return ''
         return self.folder_path.replace('/gallery/', '/media/gallery/', 1)
 
-    def get_images(self):
-        """获取图集下的所有图片"""
+    def _list_image_files(self):
+        """列出图集文件夹下的图片文件名（已排序，不含封面）"""
         folder_path = self.folder_path.lstrip('/')
 
         if not folder_path or not default_storage.exists(folder_path):
             return []
 
+        # 尝试使用 listdir，如果存储后端不支持则返回空列表
         try:
-            # 尝试使用 listdir，如果存储后端不支持则返回空列表
-            try:
-                dirs, files = default_storage.listdir(folder_path)
-            except (NotImplementedError, OSError):
-                return []
+            dirs, files = default_storage.listdir(folder_path)
+        except (NotImplementedError, OSError):
+            return []
 
-            image_files = sorted([
-                f for f in files
-                if f.lower().endswith(self.SUPPORTED_EXTENSIONS)
-                and f != self.COVER_FILENAME
-            ])
+        return sorted([
+            f for f in files
+            if self.is_image_filename(f)
+        ])
 
-            from .utils import ThumbnailGenerator
+    @classmethod
+    def is_image_filename(cls, filename):
+        """判断文件名是否计入图集图片（支持的格式且不是封面）"""
+        return (
+            filename.lower().endswith(cls.SUPPORTED_EXTENSIONS)
+            and filename != cls.COVER_FILENAME
+        )
+
+    def get_images(self):
+        """获取图集下的所有图片"""
+        try:
+            image_files = self._list_image_files()
 
             # 使用统一方法转换路径
             media_folder_path = self._get_media_folder_path()
@@ -199,7 +220,7 @@ class Gallery(models.Model):
             existing_numbers = set()
             
             for f in files:
-                if f.lower().endswith(self.SUPPORTED_EXTENSIONS) and f != self.COVER_FILENAME:
+                if self.is_image_filename(f):
                     # 提取数字前缀（如 "001.jpg" -> 1）
                     name_without_ext = os.path.splitext(f)[0]
                     if name_without_ext.isdigit():
@@ -260,8 +281,9 @@ class Gallery(models.Model):
         # 保存图片
         default_storage.save(save_path, image_file)
 
-        # 更新图片数量
-        self.refresh_image_count()
+        # 增量更新图片数量（只影响当前节点及其祖先链）
+        if self.is_image_filename(final_filename):
+            self.adjust_image_count(1)
 
         return final_filename
 
@@ -276,7 +298,8 @@ class Gallery(models.Model):
 
         if default_storage.exists(file_path):
             default_storage.delete(file_path)
-            self.refresh_image_count()
+            if self.is_image_filename(filename):
+                self.adjust_image_count(-1)
             return True
 
         return False
@@ -297,40 +320,147 @@ class Gallery(models.Model):
         self.cover_url = f"{self.folder_path}{self.COVER_FILENAME}"
         self.save(update_fields=['cover_url', 'updated_at'])
 
-    def refresh_image_count(self):
-        """刷新图片数量（迭代实现，支持任意深度）"""
-        # 收集所有需要更新的节点（当前节点及其所有后代）
-        nodes_to_update = []
-        stack = [self]
-        
-        # DFS 收集所有节点
+    def _get_ancestor_ids(self):
+        """沿 parent_id 向上收集祖先 ID（只查询主键，不加载完整对象）"""
+        ancestor_ids = []
+        parent_id = self.parent_id
+
+        # 防止循环引用导致的无限循环
+        visited = {self.pk}
+        while parent_id and parent_id not in visited:
+            visited.add(parent_id)
+            ancestor_ids.append(parent_id)
+            parent_id = Gallery.objects.filter(pk=parent_id).values_list(
+                'parent_id', flat=True
+            ).first()
+
+        return ancestor_ids
+
+    def adjust_image_count(self, delta):
+        """
+        增量更新图片数量
+
+        将 delta 同时应用到当前节点及其所有祖先节点，使用一条批量 UPDATE 完成，
+        不重新扫描文件夹。计数漂移由 reconcile_image_counts 负责校准。
+
+        Args:
+            delta: 图片数量变化值（上传为正，删除为负）
+        """
+        if not delta:
+            return
+
+        gallery_ids = [self.pk] + self._get_ancestor_ids()
+        Gallery.objects.filter(pk__in=gallery_ids).update(
+            image_count=Greatest(F('image_count') + delta, 0),
+            updated_at=timezone.now()
+        )
+        self.image_count = max(self.image_count + delta, 0)
+        _bump_gallery_version()
+
+    @classmethod
+    def reconcile_image_counts(cls, root_ids=None, leaf_counts=None, dry_run=False):
+        """
+        全量校准图片数量（迭代实现，支持任意深度）
+
+        一次性加载图集树，叶子节点重新统计文件夹中的图片，父节点在内存中自底向上汇总，
+        仅对数量发生变化的节点执行批量更新。
+
+        Args:
+            root_ids: 需要校准的子树根节点 ID 列表，为 None 时校准整棵树
+            leaf_counts: 已知的叶子节点图片数量 {gallery_id: count}，命中时不再扫描文件夹
+            dry_run: 为 True 时只计算差异，不写入数据库
+
+        Returns:
+            list: 发生漂移的节点 [(gallery_id, 旧数量, 新数量), ...]
+        """
+        leaf_counts = leaf_counts or {}
+        nodes = {
+            node.id: node
+            for node in cls.objects.only('id', 'parent_id', 'folder_path', 'image_count', 'level')
+        }
+
+        children_map = {}
+        for node in nodes.values():
+            if node.parent_id:
+                children_map.setdefault(node.parent_id, []).append(node.id)
+
+        if root_ids is None:
+            root_ids = [node_id for node_id, node in nodes.items() if not node.parent_id]
+        root_ids = [node_id for node_id in root_ids if node_id in nodes]
+
+        # DFS 收集子树内所有节点
+        subtree_ids = []
+        stack = list(root_ids)
+        visited = set()
         while stack:
-            node = stack.pop()
-            nodes_to_update.append(node)
-            # 预取子节点减少查询
-            stack.extend(node.children.all())
-        
+            node_id = stack.pop()
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+            subtree_ids.append(node_id)
+            stack.extend(children_map.get(node_id, []))
+
         # 按层级降序排序（叶子节点在前）
-        nodes_to_update.sort(key=lambda x: x.level, reverse=True)
-        
-        # 创建一个字典来缓存每个节点的计数
+        subtree_ids.sort(key=lambda node_id: nodes[node_id].level, reverse=True)
+
         count_cache = {}
-        
-        for node in nodes_to_update:
-            if node.is_leaf():
-                # 叶子节点：统计当前目录的图片数量
-                images = node.get_images()
-                count_cache[node.id] = len(images)
-                node.image_count = len(images)
-                node.save(update_fields=['image_count', 'updated_at'])
-            else:
+        for node_id in subtree_ids:
+            children = children_map.get(node_id)
+            if children:
                 # 父节点：汇总所有子节点的数量
-                total = 0
-                for child in node.children.all():
-                    total += count_cache.get(child.id, 0)
-                count_cache[node.id] = total
-                node.image_count = total
-                node.save(update_fields=['image_count', 'updated_at'])
+                count_cache[node_id] = sum(count_cache.get(child_id, 0) for child_id in children)
+            elif node_id in leaf_counts:
+                count_cache[node_id] = leaf_counts[node_id]
+            else:
+                # 叶子节点：统计当前目录的图片数量
+                count_cache[node_id] = len(nodes[node_id]._list_image_files())
+
+        drifted = [
+            (node_id, nodes[node_id].image_count, count_cache[node_id])
+            for node_id in subtree_ids
+            if nodes[node_id].image_count != count_cache[node_id]
+        ]
+
+        if dry_run or not drifted:
+            return drifted
+
+        now = timezone.now()
+        changed_nodes = []
+        for node_id, _, new_count in drifted:
+            node = nodes[node_id]
+            node.image_count = new_count
+            node.updated_at = now
+            changed_nodes.append(node)
+
+        with transaction.atomic():
+            cls.objects.bulk_update(changed_nodes, ['image_count', 'updated_at'], batch_size=500)
+
+            # 子树根节点的变化需要继续传递到子树之外的祖先
+            deltas = {node_id: new - old for node_id, old, new in drifted}
+            for root_id in root_ids:
+                root = nodes[root_id]
+                delta = deltas.get(root_id, 0)
+                if delta and root.parent_id:
+                    ancestor_ids = [
+                        ancestor_id for ancestor_id in root._get_ancestor_ids()
+                        if ancestor_id not in visited
+                    ]
+                    cls.objects.filter(pk__in=ancestor_ids).update(
+                        image_count=Greatest(F('image_count') + delta, 0),
+                        updated_at=now
+                    )
+
+        _bump_gallery_version()
+        return drifted
+
+    def refresh_image_count(self):
+        """刷新图片数量（全量校准当前子树，并把差值传递给祖先）"""
+        drifted = Gallery.reconcile_image_counts(root_ids=[self.pk])
+        for node_id, _, new_count in drifted:
+            if node_id == self.pk:
+                self.image_count = new_count
+                break
+        return drifted
 
     def get_all_children_images(self):
         """获取父图集下所有子图集的图片，按子图集分组返回（迭代实现）"""
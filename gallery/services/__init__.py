@@ -0,0 +1,4 @@
+from .folder_sync_service import GalleryFolderSyncService
+from .listing_service import GalleryListingService
+
+__all__ = ['GalleryFolderSyncService', 'GalleryListingService']
@@ -0,0 +1,348 @@
+"""
+图集文件夹增量同步服务
+
+- 使用 os.scandir 扫描目录，为每个目录计算指纹（mtime、条目数、文件名哈希）
+- 与上次同步保存的指纹对比，未变化的目录跳过数据库写入和缩略图处理
+- 各顶层子树在线程池中并行扫描，数据库写入在主线程按层级顺序执行（SQLite 单写者）
+- 输出变更日志（change journal），驱动缩略图生成和缓存失效
+"""
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import clear_cache_pattern, bump_data_version
+from core.cache_utils import CacheKeys
+from ..models import Gallery
+from ..signals import GALLERY_VERSION
+from ..utils import ThumbnailGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class GalleryFolderSyncService:
+    """图集文件夹增量同步服务"""
+
+    STATE_VERSION = 1
+    # 图集根目录下不参与同步的目录（缩略图由 ThumbnailGenerator 维护）
+    SKIP_DIRS = ('thumbnails',)
+    # 可以生成缩略图的格式（视频不生成）
+    THUMBNAIL_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+
+    def __init__(self, gallery_root=None, state_file=None, journal_file=None, max_workers=None):
+        """
+        初始化同步服务
+
+        Args:
+            gallery_root: 图集根目录，默认 MEDIA_ROOT/gallery
+            state_file: 目录指纹状态文件路径
+            journal_file: 变更日志文件路径（JSON Lines），为空时不落盘
+            max_workers: 并行扫描/生成缩略图的线程数
+        """
+        config = getattr(settings, 'GALLERY_SYNC_CONFIG', {})
+        self.media_root = str(settings.MEDIA_ROOT)
+        self.gallery_root = gallery_root or os.path.join(self.media_root, 'gallery')
+        self.state_file = state_file or config.get('STATE_FILE') or os.path.join(
+            self.gallery_root, '.sync_state.json'
+        )
+        self.journal_file = journal_file or config.get('JOURNAL_FILE')
+        self.max_workers = max_workers or config.get('MAX_WORKERS', 4)
+
+    # ==================== 指纹与状态 ====================
+
+    @staticmethod
+    def compute_fingerprint(stat_result, names):
+        """
+        计算目录指纹
+
+        Args:
+            stat_result: 目录的 os.stat 结果
+            names: 目录下的所有条目名称
+
+        Returns:
+            str: 指纹字符串 "mtime_ns:条目数:名称哈希"
+        """
+        names_hash = hashlib.sha1('\n'.join(sorted(names)).encode('utf-8')).hexdigest()[:16]
+        return f"{stat_result.st_mtime_ns}:{len(names)}:{names_hash}"
+
+    def load_state(self):
+        """读取上次同步保存的目录状态"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == self.STATE_VERSION:
+                return state.get('dirs', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取图集同步状态失败，将执行全量同步: {e}")
+        return {}
+
+    def save_state(self, dirs):
+        """原子写入目录状态"""
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.STATE_VERSION, 'dirs': dirs}, f, ensure_ascii=False)
+        os.replace(tmp_file, self.state_file)
+
+    # ==================== 扫描 ====================
+
+    def _scan_dir(self, path, stat_result, depth):
+        """扫描单个目录，返回目录记录和子目录列表"""
+        with os.scandir(path) as it:
+            entries = list(it)
+
+        names = [entry.name for entry in entries]
+        subdirs = []
+        files = []
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir():
+                subdirs.append(entry)
+            elif entry.is_file():
+                files.append(entry.name)
+
+        rel_path = os.path.relpath(path, self.media_root).replace('\\', '/')
+        record = {
+            'rel_path': rel_path,
+            'name': os.path.basename(path),
+            'depth': depth,
+            'fingerprint': self.compute_fingerprint(stat_result, names),
+            'images': sorted(f for f in files if Gallery.is_image_filename(f)),
+            'has_cover': Gallery.COVER_FILENAME in files,
+        }
+        return record, subdirs
+
+    def _scan_subtree(self, path, stat_result, depth):
+        """迭代扫描一个子树（在线程池中执行，不访问数据库）"""
+        records = []
+        errors = []
+        stack = [(path, stat_result, depth)]
+
+        while stack:
+            current, current_stat, current_depth = stack.pop()
+            try:
+                record, subdirs = self._scan_dir(current, current_stat, current_depth)
+            except OSError as e:
+                errors.append({'path': current, 'error': str(e)})
+                continue
+
+            records.append(record)
+            for entry in subdirs:
+                try:
+                    stack.append((entry.path, entry.stat(), current_depth + 1))
+                except OSError as e:
+                    errors.append({'path': entry.path, 'error': str(e)})
+
+        return records, errors
+
+    def scan(self):
+        """
+        并行扫描图集根目录下的所有子树
+
+        Returns:
+            tuple: (目录记录列表, 错误列表)
+        """
+        with os.scandir(self.gallery_root) as it:
+            top_dirs = [
+                entry for entry in it
+                if entry.is_dir()
+                and not entry.name.startswith('.')
+                and entry.name not in self.SKIP_DIRS
+            ]
+
+        records = []
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._scan_subtree, entry.path, entry.stat(), 0)
+                for entry in top_dirs
+            ]
+            for future in futures:
+                subtree_records, subtree_errors = future.result()
+                records.extend(subtree_records)
+                errors.extend(subtree_errors)
+
+        return records, errors
+
+    # ==================== 同步 ====================
+
+    @staticmethod
+    def gallery_id_for(rel_path):
+        """根据相对 MEDIA_ROOT 的路径生成图集 ID"""
+        return rel_path.replace('\\', '-').replace('/', '-')
+
+    def _upsert_gallery(self, record):
+        """根据目录记录创建或更新图集"""
+        folder_url = f"/{record['rel_path']}/"
+        parent_rel = os.path.dirname(record['rel_path'])
+        parent_id = self.gallery_id_for(parent_rel) if record['depth'] > 0 else None
+
+        return Gallery.objects.update_or_create(
+            id=self.gallery_id_for(record['rel_path']),
+            defaults={
+                'title': record['name'],
+                'description': f"{record['name']}图集",
+                'cover_url': f"{folder_url}{Gallery.COVER_FILENAME}" if record['has_cover'] else '',
+                'parent_id': parent_id,
+                'level': record['depth'],
+                'image_count': len(record['images']),
+                'folder_path': folder_url,
+                'tags': [],
+                'is_active': True
+            }
+        )
+
+    def sync(self, full=False):
+        """
+        执行增量同步
+
+        Args:
+            full: 为 True 时忽略已保存的指纹，处理所有目录
+
+        Returns:
+            dict: 同步结果，包含统计信息和变更日志 journal
+        """
+        previous = {} if full else self.load_state()
+        records, errors = self.scan()
+        existing_ids = set(Gallery.objects.values_list('id', flat=True))
+
+        result = {
+            'created': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'removed': 0,
+            'errors': errors,
+            'journal': [],
+        }
+
+        # 父目录先于子目录写入，保证外键存在
+        records.sort(key=lambda r: (r['depth'], r['rel_path']))
+
+        with transaction.atomic():
+            for record in records:
+                gallery_id = self.gallery_id_for(record['rel_path'])
+                old = previous.get(record['rel_path'])
+                if old and old.get('fingerprint') == record['fingerprint'] and gallery_id in existing_ids:
+                    result['unchanged'] += 1
+                    continue
+
+                gallery, created = self._upsert_gallery(record)
+                result['created' if created else 'updated'] += 1
+
+                old_images = set(old.get('images', [])) if old else set()
+                new_images = set(record['images'])
+                result['journal'].append({
+                    'action': 'created' if created else 'updated',
+                    'gallery_id': gallery.id,
+                    'folder_path': gallery.folder_path,
+                    'added': sorted(new_images - old_images),
+                    'removed': sorted(old_images - new_images),
+                    'cover_changed': (old or {}).get('has_cover') != record['has_cover'],
+                    'has_cover': record['has_cover'],
+                })
+
+            # 目录消失的图集标记为禁用；扫描出错时无法判断，跳过
+            scanned = {record['rel_path'] for record in records}
+            vanished = [rel_path for rel_path in previous if rel_path not in scanned]
+            if vanished and not errors:
+                vanished_ids = [self.gallery_id_for(rel_path) for rel_path in vanished]
+                Gallery.objects.filter(id__in=vanished_ids).update(
+                    is_active=False, updated_at=timezone.now()
+                )
+                for rel_path in vanished:
+                    result['journal'].append({
+                        'action': 'removed',
+                        'gallery_id': self.gallery_id_for(rel_path),
+                        'folder_path': f"/{rel_path}/",
+                        'added': [],
+                        'removed': previous[rel_path].get('images', []),
+                        'cover_changed': previous[rel_path].get('has_cover', False),
+                        'has_cover': False,
+                    })
+                result['removed'] = len(vanished)
+
+            # 复用扫描得到的数量校准整棵树，无需再次访问文件系统
+            if result['journal']:
+                Gallery.reconcile_image_counts(leaf_counts={
+                    self.gallery_id_for(record['rel_path']): len(record['images'])
+                    for record in records
+                })
+
+        if not errors:
+            self.save_state({
+                record['rel_path']: {
+                    'fingerprint': record['fingerprint'],
+                    'images': record['images'],
+                    'has_cover': record['has_cover'],
+                }
+                for record in records
+            })
+        self._write_journal(result['journal'])
+
+        return result
+
+    def _write_journal(self, journal):
+        """将变更日志追加写入 JSON Lines 文件"""
+        if not journal or not self.journal_file:
+            return
+
+        synced_at = timezone.now().isoformat()
+        try:
+            os.makedirs(os.path.dirname(self.journal_file) or '.', exist_ok=True)
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                for event in journal:
+                    f.write(json.dumps(dict(event, synced_at=synced_at), ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.warning(f"写入图集变更日志失败: {e}")
+
+    # ==================== 变更日志消费 ====================
+
+    def apply_journal(self, journal, generate_thumbnails=True):
+        """
+        根据变更日志生成/删除缩略图并使图集缓存失效
+
+        Args:
+            journal: sync() 返回的变更日志
+            generate_thumbnails: 是否为新增图片生成缩略图
+
+        Returns:
+            dict: 缩略图处理统计
+        """
+        stats = {'generated': 0, 'deleted': 0}
+        if not journal:
+            return stats
+
+        to_generate = []
+        for event in journal:
+            folder = event['folder_path'].lstrip('/')
+            for filename in event['removed']:
+                if ThumbnailGenerator.delete_thumbnail(f"{folder}{filename}"):
+                    stats['deleted'] += 1
+            if generate_thumbnails:
+                to_generate.extend(
+                    f"{folder}{filename}" for filename in event['added']
+                    if filename.lower().endswith(self.THUMBNAIL_EXTENSIONS)
+                )
+                if event['cover_changed'] and event['has_cover']:
+                    to_generate.append(f"{folder}{Gallery.COVER_FILENAME}")
+
+        if to_generate:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for original_path, thumbnail_path in zip(
+                    to_generate, executor.map(ThumbnailGenerator.generate_thumbnail, to_generate)
+                ):
+                    if thumbnail_path != original_path:
+                        stats['generated'] += 1
+
+        clear_cache_pattern(CacheKeys.GALLERY)
+        # 图片增删不经过模型信号（queryset.update 也不触发），这里统一递增版本号
+        bump_data_version(GALLERY_VERSION)
+        return stats
@@ -0,0 +1,255 @@
+"""
+图集图片列表服务
+
+- 以文件夹指纹（目录 mtime + 图集更新时间）为缓存键缓存图片文件列表，文件增删后键自然失效
+- 缩略图生成不改变指纹，因此缩略图 URL 不放入该缓存，分页后只为当前页解析（缺失的在后台生成）
+- 图片列表支持基于游标的分页（游标为不透明的 base64 字符串）
+- 父图集的子图集图片按整棵子树批量读取（一次数据库查询 + 一次 get_many）
+"""
+import bisect
+import logging
+import os
+from collections import deque
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+
+from core.cache_utils import CacheKeys, CacheTimeout
+from core.pagination import decode_cursor, encode_cursor
+from ..models import Gallery
+from ..utils import ThumbnailGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class GalleryListingService:
+    """图集图片列表服务"""
+
+    CACHE_TIMEOUT = CacheTimeout.DAY
+    # 有缩略图仍在生成时，响应缓存使用较短的超时，生成完成后尽快换成缩略图 URL
+    PENDING_THUMBNAIL_TIMEOUT = 30
+    MAX_PAGE_SIZE = 200
+
+    # ==================== 游标 ====================
+
+    # 游标编解码与其他列表接口共用
+    encode_cursor = staticmethod(encode_cursor)
+    decode_cursor = staticmethod(decode_cursor)
+
+    @classmethod
+    def parse_limit(cls, value):
+        """
+        解析分页大小参数，未提供时返回 None（不分页）
+
+        Raises:
+            ValueError: 参数不是正整数
+        """
+        if value in (None, ''):
+            return None
+        limit = int(value)
+        if limit <= 0:
+            raise ValueError(f'分页大小必须为正整数: {value}')
+        return min(limit, cls.MAX_PAGE_SIZE)
+
+    # ==================== 缓存 ====================
+
+    @staticmethod
+    def get_folder_fingerprint(gallery):
+        """
+        获取图集文件夹指纹
+
+        Returns:
+            str: 指纹字符串；文件夹不存在或存储后端不支持本地路径时返回 None
+        """
+        folder_path = gallery.folder_path.lstrip('/')
+        if not folder_path:
+            return None
+
+        try:
+            stat_result = os.stat(default_storage.path(folder_path))
+        except (OSError, NotImplementedError):
+            return None
+
+        updated = int(gallery.updated_at.timestamp()) if gallery.updated_at else 0
+        return f"{stat_result.st_mtime_ns}-{updated}"
+
+    @staticmethod
+    def _build_images(gallery):
+        """列出图片文件（缓存未命中时执行，不解析缩略图）"""
+        images = gallery.get_images()
+        for img in images:
+            img.pop('thumbnail_url', None)
+        return images
+
+    @staticmethod
+    def with_thumbnails(images):
+        """
+        为一页图片解析缩略图 URL（只检查文件状态，缺失的缩略图提交到后台生成）
+
+        Returns:
+            tuple: (带 thumbnail_url 的图片列表副本, 是否有缩略图仍在生成)
+        """
+        thumbnails, pending = ThumbnailGenerator.resolve_thumbnail_urls([img['url'] for img in images])
+        return [
+            {**img, 'thumbnail_url': thumbnails.get(img['url'], img['url'])} for img in images
+        ], bool(pending)
+
+    @classmethod
+    def get_images_bulk(cls, galleries):
+        """
+        批量获取多个图集的图片列表
+
+        Args:
+            galleries: 图集列表
+
+        Returns:
+            dict: {gallery_id: 图片文件列表}
+        """
+        result = {}
+        keys = {}
+        for gallery in galleries:
+            fingerprint = cls.get_folder_fingerprint(gallery)
+            if fingerprint is None:
+                result[gallery.id] = []
+            else:
+                keys[f"{CacheKeys.GALLERY}:images:{gallery.id}:{fingerprint}"] = gallery
+
+        if not keys:
+            return result
+
+        cached = {}
+        try:
+            cached = cache.get_many(list(keys))
+        except Exception as e:
+            logger.warning(f"Cache get failed: {e}")
+
+        missing = {}
+        for key, gallery in keys.items():
+            if key in cached:
+                result[gallery.id] = cached[key]
+            else:
+                images = cls._build_images(gallery)
+                result[gallery.id] = images
+                missing[key] = images
+
+        if missing:
+            try:
+                cache.set_many(missing, cls.CACHE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Cache set failed: {e}")
+
+        return result
+
+    @classmethod
+    def get_images(cls, gallery):
+        """获取单个图集的图片文件列表（带缓存，不含缩略图 URL，见 with_thumbnails）"""
+        return cls.get_images_bulk([gallery])[gallery.id]
+
+    # ==================== 分页 ====================
+
+    @classmethod
+    def paginate_images(cls, images, cursor=None, limit=None):
+        """
+        按文件名游标分页
+
+        Args:
+            images: 按文件名排序的图片列表
+            cursor: 上一页返回的游标
+            limit: 每页数量，为 None 且无游标时返回全部
+
+        Returns:
+            tuple: (当前页图片, 下一页游标或 None)
+        """
+        if cursor is None and limit is None:
+            return images, None
+
+        start = 0
+        if cursor:
+            after = cls.decode_cursor(cursor).get('after', '')
+            filenames = [img['filename'] for img in images]
+            start = bisect.bisect_right(filenames, after)
+
+        end = len(images) if limit is None else start + limit
+        page = images[start:end]
+        next_cursor = None
+        if end < len(images) and page:
+            next_cursor = cls.encode_cursor({'after': page[-1]['filename']})
+        return page, next_cursor
+
+    # ==================== 子图集批量 ====================
+
+    @staticmethod
+    def gallery_payload(gallery):
+        """子图集分组中的图集信息"""
+        return {
+            'id': gallery.id,
+            'title': gallery.title,
+            'description': gallery.description,
+            'cover_url': gallery.cover_url,
+            'cover_thumbnail_url': gallery.get_cover_thumbnail_url(),
+            'image_count': gallery.image_count,
+            'folder_path': gallery.folder_path,
+            'tags': gallery.tags,
+        }
+
+    @classmethod
+    def get_children_images(cls, gallery, cursor=None, limit=None, images_limit=None):
+        """
+        获取父图集下所有子图集的图片（整棵子树批量读取）
+
+        Args:
+            gallery: 父图集
+            cursor: 子图集批次游标
+            limit: 每批返回的子图集数量，为 None 时返回全部
+            images_limit: 每个子图集返回的图片数量，为 None 时返回全部
+
+        Returns:
+            dict: 包含 children、total_galleries、total_images、next_cursor
+        """
+        # 一次性加载所有活跃图集，在内存中构建子树
+        children_map = {}
+        for node in Gallery.objects.filter(is_active=True).order_by('sort_order', 'id'):
+            if node.parent_id:
+                children_map.setdefault(node.parent_id, []).append(node)
+
+        # 广度优先遍历，保持与逐层查询一致的顺序
+        descendants = []
+        queue = deque([gallery.id])
+        visited = {gallery.id}
+        while queue:
+            node_id = queue.popleft()
+            for child in children_map.get(node_id, []):
+                if child.id in visited:
+                    continue
+                visited.add(child.id)
+                descendants.append(child)
+                if child.id in children_map:
+                    queue.append(child.id)
+
+        images_map = cls.get_images_bulk(descendants)
+        non_empty = [child for child in descendants if images_map.get(child.id)]
+        total_images = sum(len(images_map[child.id]) for child in non_empty)
+
+        offset = 0
+        if cursor:
+            offset = int(cls.decode_cursor(cursor).get('offset', 0))
+        end = len(non_empty) if limit is None else offset + limit
+        batch = non_empty[offset:end]
+
+        children = []
+        for child in batch:
+            images, images_cursor = cls.paginate_images(images_map[child.id], limit=images_limit)
+            images, _ = cls.with_thumbnails(images)
+            children.append({
+                'gallery': cls.gallery_payload(child),
+                'images': images,
+                'total': len(images_map[child.id]),
+                'next_cursor': images_cursor,
+            })
+
+        return {
+            'children': children,
+            'total_galleries': len(non_empty),
+            'total_images': total_images,
+            'next_cursor': cls.encode_cursor({'offset': end}) if end < len(non_empty) else None,
+        }
@@ -0,0 +1,18 @@
+"""
+信号处理器 - 图集数据变化时递增版本号
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.cache import bump_data_version
+from .models import Gallery
+
+# 图集公开读接口的数据版本命名空间（ETag 使用）
+GALLERY_VERSION = 'gallery'
+
+
+@receiver(post_save, sender=Gallery, dispatch_uid='gallery:save')
+@receiver(post_delete, sender=Gallery, dispatch_uid='gallery:delete')
+def bump_gallery_version(sender, instance, **kwargs):
+    """图集被创建、更新或删除时递增版本号"""
+    bump_data_version(GALLERY_VERSION)
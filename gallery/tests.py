@@ -265,6 +265,272 @@ class GalleryModelMethodsTests(TestCase):
         self.assertEqual(parent.image_count, 0)  # 父节点汇总也是0
 
 
+class GalleryImageCountTests(TestCase):
+    """图集图片数量增量维护测试"""
+
+    def setUp(self):
+        """测试准备：使用临时媒体目录"""
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+        self.root = Gallery.objects.create(
+            id='count-root', title='根', folder_path='/gallery/count/', image_count=3
+        )
+        self.child = Gallery.objects.create(
+            id='count-child', title='子', folder_path='/gallery/count/child/',
+            parent=self.root, image_count=3
+        )
+        self.leaf = Gallery.objects.create(
+            id='count-leaf', title='叶', folder_path='/gallery/count/child/leaf/',
+            parent=self.child, image_count=3
+        )
+        self.other = Gallery.objects.create(
+            id='count-other', title='兄弟', folder_path='/gallery/count/other/',
+            parent=self.root, image_count=0
+        )
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _write_files(self, folder, names):
+        path = os.path.join(self.media_root, folder)
+        os.makedirs(path, exist_ok=True)
+        for name in names:
+            with open(os.path.join(path, name), 'wb') as f:
+                f.write(b'data')
+
+    def test_add_image_propagates_to_ancestors(self):
+        """测试上传图片只做增量更新并传递到祖先"""
+        from django.core.files.base import ContentFile
+
+        self._write_files('gallery/count/child/leaf', [])
+        filename = self.leaf.add_image(ContentFile(b'data', name='upload.jpg'))
+
+        self.assertEqual(filename, '001.jpg')
+        self.assertEqual(self.leaf.image_count, 4)
+        for gallery_id in ['count-root', 'count-child', 'count-leaf']:
+            self.assertEqual(Gallery.objects.get(id=gallery_id).image_count, 4)
+        self.assertEqual(Gallery.objects.get(id='count-other').image_count, 0)
+
+    def test_delete_image_propagates_to_ancestors(self):
+        """测试删除图片增量减少祖先数量"""
+        self._write_files('gallery/count/child/leaf', ['001.jpg'])
+
+        self.assertTrue(self.leaf.delete_image('001.jpg'))
+
+        for gallery_id in ['count-root', 'count-child', 'count-leaf']:
+            self.assertEqual(Gallery.objects.get(id=gallery_id).image_count, 2)
+
+    def test_reconcile_fixes_drift(self):
+        """测试全量校准修复计数漂移"""
+        self._write_files('gallery/count/child/leaf', ['001.jpg', '002.png', 'cover.jpg'])
+        self._write_files('gallery/count/other', ['001.mp4'])
+
+        drifted = Gallery.reconcile_image_counts()
+
+        self.assertIn(('count-leaf', 3, 2), drifted)
+        self.assertEqual(Gallery.objects.get(id='count-leaf').image_count, 2)
+        self.assertEqual(Gallery.objects.get(id='count-child').image_count, 2)
+        self.assertEqual(Gallery.objects.get(id='count-other').image_count, 1)
+        self.assertEqual(Gallery.objects.get(id='count-root').image_count, 3)
+
+    def test_refresh_subtree_updates_ancestors(self):
+        """测试校准子树时差值传递给子树外的祖先"""
+        self._write_files('gallery/count/child/leaf', ['001.jpg'])
+
+        self.child.refresh_image_count()
+
+        self.assertEqual(self.child.image_count, 1)
+        self.assertEqual(Gallery.objects.get(id='count-root').image_count, 1)
+
+    def test_reconcile_dry_run(self):
+        """测试预览模式不写入数据库"""
+        drifted = Gallery.reconcile_image_counts(dry_run=True)
+
+        self.assertTrue(drifted)
+        self.assertEqual(Gallery.objects.get(id='count-leaf').image_count, 3)
+
+
+class GalleryFolderSyncTests(TestCase):
+    """图集文件夹增量同步测试"""
+
+    def setUp(self):
+        """测试准备：使用临时媒体目录"""
+        from .services import GalleryFolderSyncService
+
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        self.service = GalleryFolderSyncService(
+            state_file=os.path.join(self.media_root, 'state.json'),
+            journal_file=os.path.join(self.media_root, 'journal.jsonl'),
+        )
+        self._write_files('gallery/Live/2024', ['001.jpg', '002.jpg'])
+        self._write_files('gallery/Live/2025', ['001.jpg'])
+        self._write_files('gallery/thumbnails/Live/2024', ['001.webp'])
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _write_files(self, folder, names):
+        path = os.path.join(self.media_root, folder)
+        os.makedirs(path, exist_ok=True)
+        for name in names:
+            with open(os.path.join(path, name), 'wb') as f:
+                f.write(b'data')
+
+    def test_initial_sync_creates_tree(self):
+        """测试首次同步创建图集树并汇总数量"""
+        result = self.service.sync()
+
+        self.assertEqual(result['created'], 3)
+        self.assertEqual(Gallery.objects.get(id='gallery-Live').image_count, 3)
+        self.assertEqual(Gallery.objects.get(id='gallery-Live-2024').parent_id, 'gallery-Live')
+        # 缩略图目录不参与同步
+        self.assertFalse(Gallery.objects.filter(id__startswith='gallery-thumbnails').exists())
+
+    def test_second_sync_skips_unchanged(self):
+        """测试目录未变化时跳过所有处理"""
+        self.service.sync()
+        result = self.service.sync()
+
+        self.assertEqual(result['unchanged'], 3)
+        self.assertEqual(result['journal'], [])
+
+    def test_changed_folder_emits_journal(self):
+        """测试目录变化时只处理该目录并输出变更日志"""
+        self.service.sync()
+        self._write_files('gallery/Live/2025', ['002.png'])
+        os.utime(os.path.join(self.media_root, 'gallery/Live/2025'), ns=(1, 1))
+
+        result = self.service.sync()
+
+        self.assertEqual(result['updated'], 1)
+        self.assertEqual(result['journal'][0]['gallery_id'], 'gallery-Live-2025')
+        self.assertEqual(result['journal'][0]['added'], ['002.png'])
+        self.assertEqual(Gallery.objects.get(id='gallery-Live').image_count, 4)
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, 'journal.jsonl')))
+
+    def test_vanished_folder_is_deactivated(self):
+        """测试目录删除后图集被禁用"""
+        self.service.sync()
+        shutil.rmtree(os.path.join(self.media_root, 'gallery/Live/2025'))
+
+        result = self.service.sync()
+
+        self.assertEqual(result['removed'], 1)
+        self.assertFalse(Gallery.objects.get(id='gallery-Live-2025').is_active)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class GalleryListingTests(APITestCase):
+    """图集图片列表缓存与分页测试"""
+
+    def setUp(self):
+        """测试准备：使用临时媒体目录"""
+        from django.core.cache import cache
+
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+        self.parent = Gallery.objects.create(
+            id='list-parent', title='父', folder_path='/gallery/list/'
+        )
+        self.leaf_a = Gallery.objects.create(
+            id='list-a', title='A', folder_path='/gallery/list/a/', parent=self.parent
+        )
+        self.leaf_b = Gallery.objects.create(
+            id='list-b', title='B', folder_path='/gallery/list/b/', parent=self.parent
+        )
+        self._write_files('gallery/list/a', ['001.mp4', '002.mp4', '003.mp4', 'cover.jpg'])
+        self._write_files('gallery/list/b', ['001.mp4'])
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _write_files(self, folder, names):
+        path = os.path.join(self.media_root, folder)
+        os.makedirs(path, exist_ok=True)
+        for name in names:
+            with open(os.path.join(path, name), 'wb') as f:
+                f.write(b'data')
+
+    def test_images_cursor_pagination(self):
+        """测试图片列表游标分页"""
+        url = reverse('gallery:images', args=['list-a'])
+        response = self.client.get(url, {'limit': 2})
+
+        data = response.json()['data']
+        self.assertEqual([img['filename'] for img in data['images']], ['001.mp4', '002.mp4'])
+        self.assertEqual(data['total'], 3)
+        self.assertIsNotNone(data['next_cursor'])
+
+        response = self.client.get(url, {'limit': 2, 'cursor': data['next_cursor']})
+        data = response.json()['data']
+        self.assertEqual([img['filename'] for img in data['images']], ['003.mp4'])
+        self.assertIsNone(data['next_cursor'])
+
+    def test_thumbnails_resolved_for_page_only(self):
+        """测试缩略图只为当前页解析，且不进入按文件夹指纹缓存的列表"""
+        from unittest import mock
+        from core.thumbnail_generator import ThumbnailGenerator
+        from .services import GalleryListingService
+
+        url = reverse('gallery:images', args=['list-a'])
+        with mock.patch.object(
+            ThumbnailGenerator, 'resolve_thumbnail_urls', wraps=ThumbnailGenerator.resolve_thumbnail_urls
+        ) as resolve, mock.patch.object(ThumbnailGenerator, 'get_thumbnail_url') as get_thumbnail_url:
+            response = self.client.get(url, {'limit': 2})
+
+        images = response.json()['data']['images']
+        self.assertTrue(all(img['thumbnail_url'] for img in images))
+        self.assertEqual(len(resolve.call_args.args[0]), 2)
+        get_thumbnail_url.assert_not_called()
+        self.assertNotIn('thumbnail_url', GalleryListingService.get_images(self.leaf_a)[0])
+
+    def test_images_invalid_cursor(self):
+        """测试无效游标返回 400"""
+        url = reverse('gallery:images', args=['list-a'])
+        response = self.client.get(url, {'cursor': '%%%'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_listing_cached_until_folder_changes(self):
+        """测试列表缓存以文件夹指纹为键"""
+        from .services import GalleryListingService
+
+        first = GalleryListingService.get_images(self.leaf_a)
+        self._write_files('gallery/list/a', ['004.mp4'])
+        os.utime(os.path.join(self.media_root, 'gallery/list/a'), ns=(1, 1))
+        second = GalleryListingService.get_images(self.leaf_a)
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 4)
+
+    def test_children_images_batches(self):
+        """测试子图集图片按批次返回"""
+        url = reverse('gallery:children_images', args=['list-parent'])
+        response = self.client.get(url, {'limit': 1, 'images_limit': 1})
+
+        data = response.data['data']
+        self.assertEqual(data['total_galleries'], 2)
+        self.assertEqual(data['total_images'], 4)
+        self.assertEqual(len(data['children']), 1)
+        self.assertEqual(data['children'][0]['gallery']['id'], 'list-a')
+        self.assertEqual(len(data['children'][0]['images']), 1)
+        self.assertEqual(data['children'][0]['total'], 3)
+
+        response = self.client.get(url, {'limit': 1, 'cursor': data['next_cursor']})
+        data = response.data['data']
+        self.assertEqual(data['children'][0]['gallery']['id'], 'list-b')
+        self.assertIsNone(data['next_cursor'])
+
+
 class GalleryAdminTests(TestCase):
     """图集后台管理测试"""
 
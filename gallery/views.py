@@ -1,9 +1,12 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from django.http import HttpResponse, FileResponse
+from django.http import HttpResponse
 from django.core.files.storage import default_storage
-from core.responses import success_response, error_response
+from core.media_serving import serve_file
+from core.cache_utils import CacheKeys
+from core.responses import success_response, error_response, cached_success_response
 from .models import Gallery
+from .services import GalleryListingService
 from .utils import ThumbnailGenerator
 
 
@@ -114,30 +117,52 @@ def gallery_detail(request, gallery_id):
 
 @api_view(['GET'])
 def gallery_images(request, gallery_id):
-    """获取图集图片列表"""
+    """
+    获取图集图片列表
+
+    查询参数:
+        limit: 每页数量（可选，不传则返回全部图片）
+        cursor: 上一页返回的 next_cursor
+    """
     try:
         gallery = Gallery.objects.get(id=gallery_id, is_active=True)
-        images = gallery.get_images()
-
-        # 构建图片列表
-        image_list = []
-        for img in images:
-            # 使用核心缩略图生成器获取缩略图 URL
-            thumbnail_url = ThumbnailGenerator.get_thumbnail_url(img['url'])
-            image_list.append({
-                'id': img['id'],
-                'url': img['url'],
-                'thumbnail_url': thumbnail_url,
-                'title': img['title'],
-                'filename': img['filename'],
-                'is_gif': img.get('is_gif', False),
-                'is_video': img.get('is_video', False),
-            })
-
-        return success_response({
-            'images': image_list,
-            'total': len(image_list)
-        }, '获取图片列表成功')
+
+        try:
+            cursor = request.GET.get('cursor') or None
+            limit = GalleryListingService.parse_limit(request.GET.get('limit'))
+
+            pending = []
+
+            def build():
+                all_images = GalleryListingService.get_images(gallery)
+                images, next_cursor = GalleryListingService.paginate_images(
+                    all_images, cursor=cursor, limit=limit
+                )
+                images, thumbnails_pending = GalleryListingService.with_thumbnails(images)
+                pending.append(thumbnails_pending)
+                return {
+                    'images': images,
+                    'total': len(all_images),
+                    'next_cursor': next_cursor,
+                }
+
+            fingerprint = GalleryListingService.get_folder_fingerprint(gallery)
+            if fingerprint is None:
+                return success_response(build(), '获取图片列表成功')
+
+            # 以文件夹指纹为键缓存完整响应（含预压缩变体），文件增删后键自然失效；
+            # 缩略图仍在生成时只短暂缓存，避免原图 URL 在生成完成后继续被返回
+            return cached_success_response(
+                f"{CacheKeys.GALLERY}:images_page:{gallery.id}:{fingerprint}:{cursor or ''}:{limit or ''}:json",
+                build,
+                message='获取图片列表成功',
+                timeout=lambda data: (
+                    GalleryListingService.PENDING_THUMBNAIL_TIMEOUT if any(pending)
+                    else GalleryListingService.CACHE_TIMEOUT
+                )
+            )
+        except ValueError as e:
+            return error_response(str(e))
     except Gallery.DoesNotExist:
         return error_response('图集不存在', status_code=404)
     except Exception as e:
@@ -147,47 +172,44 @@ def gallery_images(request, gallery_id):
 
 @api_view(['GET'])
 def gallery_children_images(request, gallery_id):
-    """获取父图集下所有子图集的图片，按子图集分组返回"""
+    """
+    获取父图集下所有子图集的图片，按子图集分组返回
+
+    查询参数:
+        limit: 每批返回的子图集数量（可选，不传则返回全部子图集）
+        cursor: 上一批返回的 next_cursor（叶子图集时为图片游标）
+        images_limit: 每个子图集返回的图片数量（可选）
+    """
     try:
         gallery = Gallery.objects.get(id=gallery_id, is_active=True)
 
-        # 如果是叶子节点，返回自己的图片
-        if gallery.is_leaf():
-            images = gallery.get_images()
-            # 为每张图片添加缩略图 URL
-            for img in images:
-                img['thumbnail_url'] = ThumbnailGenerator.get_thumbnail_url(img['url'])
-            return success_response({
-                'gallery': {
-                    'id': gallery.id,
-                    'title': gallery.title,
-                    'description': gallery.description,
-                    'cover_url': gallery.cover_url,
-                    'cover_thumbnail_url': gallery.get_cover_thumbnail_url(),
-                    'image_count': gallery.image_count,
-                    'folder_path': gallery.folder_path,
-                    'tags': gallery.tags,
-                },
-                'images': images,
-                'total': len(images)
-            }, '获取图片列表成功')
-
-        # 如果是父节点，返回所有子图集的图片
-        children_images = gallery.get_all_children_images()
-        # 为每张图片添加缩略图 URL
-        for item in children_images:
-            item['gallery']['cover_thumbnail_url'] = ThumbnailGenerator.get_thumbnail_url(
-                item['gallery']['cover_url']
+        try:
+            limit = GalleryListingService.parse_limit(request.GET.get('limit'))
+            images_limit = GalleryListingService.parse_limit(request.GET.get('images_limit'))
+            cursor = request.GET.get('cursor') or None
+
+            # 如果是叶子节点，返回自己的图片
+            if gallery.is_leaf():
+                all_images = GalleryListingService.get_images(gallery)
+                images, next_cursor = GalleryListingService.paginate_images(
+                    all_images, cursor=cursor, limit=images_limit or limit
+                )
+                images, _ = GalleryListingService.with_thumbnails(images)
+                return success_response({
+                    'gallery': GalleryListingService.gallery_payload(gallery),
+                    'images': images,
+                    'total': len(all_images),
+                    'next_cursor': next_cursor,
+                }, '获取图片列表成功')
+
+            # 如果是父节点，批量返回整棵子树的图片
+            data = GalleryListingService.get_children_images(
+                gallery, cursor=cursor, limit=limit, images_limit=images_limit
             )
-            for img in item['images']:
-                img['thumbnail_url'] = ThumbnailGenerator.get_thumbnail_url(img['url'])
-        total_images = sum(len(item['images']) for item in children_images)
-
-        return success_response({
-            'children': children_images,
-            'total_galleries': len(children_images),
-            'total_images': total_images
-        }, '获取子图集图片成功')
+        except ValueError as e:
+            return error_response(str(e))
+
+        return success_response(data, '获取子图集图片成功')
     except Gallery.DoesNotExist:
         return error_response('图集不存在', status_code=404)
     except Exception as e:
@@ -197,32 +219,37 @@ def gallery_children_images(request, gallery_id):
 
 @api_view(['GET'])
 def get_thumbnail(request):
-    """获取图片缩略图"""
+    """获取图片缩略图（支持 ETag/304 校验和 Range 请求）"""
     image_path = request.GET.get('path')
 
     if not image_path:
         return HttpResponse('Missing path parameter', status=400)
 
-    # 生成缩略图
+    # 生成缩略图（已存在且未过期时直接返回路径）
     thumbnail_path = ThumbnailGenerator.generate_thumbnail(image_path)
+    return thumbnail_response(request, image_path, thumbnail_path)
+
 
-    # 返回缩略图
+def thumbnail_response(request, image_path, thumbnail_path):
+    """返回缩略图文件，缩略图不可用时降级到原图（异步视图共用）"""
     try:
-        if default_storage.exists(thumbnail_path):
-            file = default_storage.open(thumbnail_path, 'rb')
-            response = FileResponse(file)
-            response['Cache-Control'] = 'public, max-age=31536000'
-            response['Content-Type'] = 'image/webp'
-            return response
+        if thumbnail_path != image_path.lstrip('/') and default_storage.exists(thumbnail_path):
+            return serve_file(
+                request,
+                default_storage.path(thumbnail_path),
+                content_type='image/gif' if thumbnail_path.endswith('.gif') else 'image/webp',
+                cache_control='public, max-age=31536000'
+            )
         else:
             # 降级到原图
             if default_storage.exists(image_path):
-                file = default_storage.open(image_path, 'rb')
-                response = FileResponse(file)
-                response['Cache-Control'] = 'public, max-age=86400'
-                return response
+                return serve_file(
+                    request,
+                    default_storage.path(image_path),
+                    cache_control='public, max-age=86400'
+                )
             else:
                 return HttpResponse('Image not found', status=404)
     except Exception as e:
         logger.error(f"生成缩略图失败: {e}", exc_info=True)
-        return HttpResponse(f'Error: {str(e)}', status=500)
\ No newline at end of file
+        return HttpResponse(f'Error: {str(e)}', status=500)
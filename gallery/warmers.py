@@ -0,0 +1,11 @@
+"""
+缓存预热任务 - 图集树（见 core/cache_warmer.py）
+"""
+from core.cache_utils import CacheKeys
+from core.cache_warmer import register_warmer, warm_urls
+
+
+@register_warmer('gallery_tree', priority=40, patterns=(CacheKeys.GALLERY,))
+def warm_gallery_tree():
+    """图集树（生成封面缩略图）"""
+    return warm_urls(['/api/gallery/tree/'])
@@ -0,0 +1,12 @@
+"""
+直播读接口的异步版本（ASYNC_VIEWS_CONFIG['ENABLED'] 时挂载，见 core/async_views.py）
+
+直播日历没有响应缓存，同步视图整体在线程池中执行，慢查询和封面缩略图生成不占用事件循环
+"""
+from core.async_views import async_read_view
+from .views import LivestreamConfigView, LivestreamDetailView, LivestreamListView
+
+
+livestream_config = async_read_view(LivestreamConfigView.as_view())
+livestream_list = async_read_view(LivestreamListView.as_view())
+livestream_detail = async_read_view(LivestreamDetailView.as_view())
@@ -1,8 +1,14 @@
 from django.urls import path
+from core.async_support import pick_view
+from . import async_views
 from .views import LivestreamListView, LivestreamDetailView, LivestreamConfigView
 
 urlpatterns = [
-    path('livestreams/config/', LivestreamConfigView.as_view(), name='livestream-config'),
-    path('livestreams/', LivestreamListView.as_view(), name='livestream-list'),
-    path('livestreams/<str:date_str>/', LivestreamDetailView.as_view(), name='livestream-detail'),
+    path('livestreams/config/', pick_view(LivestreamConfigView.as_view(), async_views.livestream_config), name='livestream-config'),
+    path('livestreams/', pick_view(LivestreamListView.as_view(), async_views.livestream_list), name='livestream-list'),
+    path(
+        'livestreams/<str:date_str>/',
+        pick_view(LivestreamDetailView.as_view(), async_views.livestream_detail),
+        name='livestream-detail',
+    ),
 ]
\ No newline at end of file
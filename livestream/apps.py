@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class LivestreamConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'livestream'
+
+    def ready(self):
+        # 导入信号处理器
+        from . import signals  # noqa: F401
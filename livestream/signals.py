@@ -0,0 +1,18 @@
+"""
+信号处理器 - 直播数据变化时递增版本号
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.cache import bump_data_version
+from .models import Livestream
+
+# 直播公开读接口的数据版本命名空间（ETag 使用）
+LIVESTREAM_VERSION = 'livestream'
+
+
+@receiver(post_save, sender=Livestream, dispatch_uid='livestream:save')
+@receiver(post_delete, sender=Livestream, dispatch_uid='livestream:delete')
+def bump_livestream_version(sender, instance, **kwargs):
+    """直播记录被创建、更新或删除时递增版本号"""
+    bump_data_version(LIVESTREAM_VERSION)
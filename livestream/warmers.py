@@ -0,0 +1,16 @@
+"""
+缓存预热任务 - 本月直播日历（见 core/cache_warmer.py）
+
+日历接口没有响应缓存，预热生成封面缩略图并加载直播数据，避免首批访问承担这部分开销
+"""
+from datetime import date
+
+from core.cache_warmer import register_warmer, warm_urls
+from .signals import LIVESTREAM_VERSION
+
+
+@register_warmer('livestream_calendar', priority=40, patterns=(LIVESTREAM_VERSION,))
+def warm_livestream_calendar():
+    """本月直播日历"""
+    today = date.today()
+    return warm_urls([f'/api/livestreams/?year={today.year}&month={today.month}'])
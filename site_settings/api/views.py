@@ -254,187 +254,52 @@ class MilestoneDetailView(APIView):
             return error_response(message=str(e), status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-from django.http import HttpResponse
-from django.template.loader import render_to_string
-from song_management.models import Song
-from gallery.models import Gallery
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from core.compression import IDENTITY
+from site_settings.services.sitemap_service import SitemapService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _sitemap_response(request, document):
+    """以预压缩变体返回 sitemap，If-Modified-Since 未过期时返回 304"""
+    variants = document['variants']
+    response = HttpResponse(variants[IDENTITY], content_type='application/xml; charset=utf-8')
+    response.encoded_variants = variants
+    response['Last-Modified'] = http_date(document['last_modified'])
+    return get_conditional_response(request, last_modified=document['last_modified'], response=response)
 
 
 class SitemapView(APIView):
-    """动态 Sitemap 视图"""
+    """Sitemap 索引视图（内容见 site_settings/services/sitemap_service.py）"""
 
     def get(self, request):
-        """生成 sitemap.xml"""
+        """返回 sitemap.xml 索引"""
+        try:
+            document = SitemapService.get_index()
+        except Exception as e:
+            logger.warning(f"Sitemap index generation failed: {e}")
+            # 降级为只包含固定页面的 sitemap
+            document = SitemapService.fallback_document()
+        return _sitemap_response(request, document)
+
+
+class SitemapSectionView(APIView):
+    """子 Sitemap 视图：/sitemap-<分区>-<页码>.xml"""
+
+    def get(self, request, section, page):
+        """返回分区的一个分片"""
         try:
-            from django.utils import timezone
-            from datetime import datetime, timedelta
-            from song_management.models import Song
-            from gallery.models import Gallery
-            from fansDIY.models import Collection
-
-            # 使用当前日期作为 lastmod
-            current_date = timezone.now().strftime('%Y-%m-%d')
-            yesterday = (timezone.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-
-            # 基础 URL 列表
-            base_urls = [
-                {
-                    'loc': 'https://www.xxm8777.cn/',
-                    'lastmod': current_date,
-                    'changefreq': 'daily',
-                    'priority': '1.0'
-                },
-                {
-                    'loc': 'https://www.xxm8777.cn/songs',
-                    'lastmod': current_date,
-                    'changefreq': 'daily',
-                    'priority': '0.9'
-                },
-                # 新增：歌曲标签页路由（使用查询参数）
-                {
-                    'loc': 'https://www.xxm8777.cn/songs?tab=hot',
-                    'lastmod': current_date,
-                    'changefreq': 'daily',
-                    'priority': '0.85'
-                },
-                {
-                    'loc': 'https://www.xxm8777.cn/songs?tab=originals',
-                    'lastmod': current_date,
-                    'changefreq': 'weekly',
-                    'priority': '0.85'
-                },
-                {
-                    'loc': 'https://www.xxm8777.cn/songs?tab=submit',
-                    'lastmod': current_date,
-                    'changefreq': 'weekly',
-                    'priority': '0.8'
-                },
-                {
-                    'loc': 'https://www.xxm8777.cn/originals',
-                    'lastmod': current_date,
-                    'changefreq': 'weekly',
-                    'priority': '0.8'
-                },
-                {
-                    'loc': 'https://www.xxm8777.cn/albums',
-                    'lastmod': current_date,
-                    'changefreq': 'daily',
-                    'priority': '0.8'
-                },
-                # 图集页面保留旧 URL（301 重定向到新地址）
-                {
-                    'loc': 'https://www.xxm8777.cn/gallery',
-                    'lastmod': current_date,
-                    'changefreq': 'daily',
-                    'priority': '0.7'
-                },
-                {
-                    'loc': 'https://www.xxm8777.cn/fansDIY',
-                    'lastmod': current_date,
-                    'changefreq': 'weekly',
-                    'priority': '0.8'
-                },
-                {
-                    'loc': 'https://www.xxm8777.cn/about',
-                    'lastmod': current_date,
-                    'changefreq': 'monthly',
-                    'priority': '0.6'
-                },
-                {
-                    'loc': 'https://www.xxm8777.cn/live',
-                    'lastmod': current_date,
-                    'changefreq': 'daily',
-                    'priority': '0.7'
-                },
-                {
-                    'loc': 'https://www.xxm8777.cn/data',
-                    'lastmod': current_date,
-                    'changefreq': 'daily',
-                    'priority': '0.7'
-                },
-                {
-                    'loc': 'https://www.xxm8777.cn/contact',
-                    'lastmod': current_date,
-                    'changefreq': 'monthly',
-                    'priority': '0.5'
-                },
-            ]
-
-            # 添加歌曲详情页URL（暂时注释，等待前端实现详情页）
-            # try:
-            #     songs = Song.objects.all().order_by('-id')[:500]  # 最多500首歌曲
-            #     for song in songs:
-            #         song_date = song.created_at.strftime('%Y-%m-%d') if song.created_at else current_date
-            #         base_urls.append({
-            #             'loc': f'https://www.xxm8777.cn/songs/{song.id}',
-            #             'lastmod': song_date,
-            #             'changefreq': 'monthly',
-            #             'priority': '0.7'
-            #         })
-            # except Exception as e:
-            #     print(f"获取歌曲列表失败: {e}")
-
-            # 添加图集详情页URL（使用新的 /albums/ 路径）
-            try:
-                galleries = Gallery.objects.filter(is_active=True).order_by('-updated_at')[:100]  # 最多100个图集
-                for gallery in galleries:
-                    gallery_date = gallery.updated_at.strftime('%Y-%m-%d') if gallery.updated_at else current_date
-                    # 新路径 /albums/{id}
-                    base_urls.append({
-                        'loc': f'https://www.xxm8777.cn/albums/{gallery.id}',
-                        'lastmod': gallery_date,
-                        'changefreq': 'weekly',
-                        'priority': '0.6'
-                    })
-            except Exception as e:
-                print(f"获取图集列表失败: {e}")
-
-            # 添加二创合集分类URL（使用查询参数格式）
-            try:
-                collections = Collection.objects.all()[:50]  # 最多50个合集
-                for collection in collections:
-                    base_urls.append({
-                        'loc': f'https://www.xxm8777.cn/fansDIY?collection={collection.id}',
-                        'lastmod': current_date,
-                        'changefreq': 'weekly',
-                        'priority': '0.7'
-                    })
-            except Exception as e:
-                print(f"获取合集列表失败: {e}")
-
-            # 生成 XML
-            # 注意：当前sitemap包含主要页面URL、二创合集分类URL和图集详情页URL
-            # 歌曲详情页URL（/songs/:id）暂未包含，等待前端实现
-            xml_content = render_to_string('sitemap.xml', {'urls': base_urls})
-            return HttpResponse(xml_content, content_type='application/xml')
+            document = SitemapService.get_shard(section, page)
         except Exception as e:
-            print(f"Sitemap生成失败: {e}")
-            # 返回基本的 sitemap
-            basic_urls = [
-                {'loc': 'https://www.xxm8777.cn/', 'priority': '1.0'},
-                {'loc': 'https://www.xxm8777.cn/songs', 'priority': '0.9'},
-                {'loc': 'https://www.xxm8777.cn/songs?tab=hot', 'priority': '0.85'},
-                {'loc': 'https://www.xxm8777.cn/songs?tab=originals', 'priority': '0.85'},
-                {'loc': 'https://www.xxm8777.cn/songs?tab=submit', 'priority': '0.8'},
-                {'loc': 'https://www.xxm8777.cn/albums', 'priority': '0.8'},
-                {'loc': 'https://www.xxm8777.cn/gallery', 'priority': '0.7'},
-                {'loc': 'https://www.xxm8777.cn/fansDIY', 'priority': '0.8'},
-                {'loc': 'https://www.xxm8777.cn/contact', 'priority': '0.5'},
-            ]
-            
-            # 尝试添加图集URL（降级处理）
-            try:
-                from gallery.models import Gallery
-                galleries = Gallery.objects.filter(is_active=True).order_by('-updated_at')[:50]
-                for gallery in galleries:
-                    basic_urls.append({
-                        'loc': f'https://www.xxm8777.cn/albums/{gallery.id}',
-                        'priority': '0.6'
-                    })
-            except Exception:
-                pass
-            xml_content = render_to_string('sitemap.xml', {'urls': basic_urls})
-            return HttpResponse(xml_content, content_type='application/xml')
+            logger.warning(f"Sitemap section generation failed: {section}-{page}: {e}")
+            document = SitemapService.fallback_document() if section == 'pages' and page == 1 else None
+        if document is None:
+            raise Http404
+        return _sitemap_response(request, document)
 
 
 class RobotsTxtView(APIView):
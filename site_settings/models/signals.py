@@ -4,7 +4,10 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from .settings import Recommendation, SiteSettings, Milestone
-from core.cache import clear_cache_pattern
+from core.cache import clear_cache_pattern, bump_data_version
+
+# 网站设置公开读接口的数据版本命名空间（ETag 使用）
+SETTINGS_VERSION = 'site_settings'
 
 
 @receiver(post_save, sender=Recommendation)
@@ -14,6 +17,8 @@ def clear_cache_on_recommendation_save(sender, instance, created, **kwargs):
     """
     # 清理推荐语缓存
     clear_cache_pattern('get_recommendation')
+    clear_cache_pattern('get_active_recommendations')
+    bump_data_version(SETTINGS_VERSION)
 
 
 @receiver(post_delete, sender=Recommendation)
@@ -23,6 +28,8 @@ def clear_cache_on_recommendation_delete(sender, instance, **kwargs):
     """
     # 清理推荐语缓存
     clear_cache_pattern('get_recommendation')
+    clear_cache_pattern('get_active_recommendations')
+    bump_data_version(SETTINGS_VERSION)
 
 
 @receiver(post_save, sender=SiteSettings)
@@ -32,6 +39,7 @@ def clear_cache_on_settings_save(sender, instance, created, **kwargs):
     """
     # 清理网站设置缓存
     clear_cache_pattern('get_site_settings')
+    bump_data_version(SETTINGS_VERSION)
 
 
 @receiver(post_delete, sender=SiteSettings)
@@ -41,6 +49,7 @@ def clear_cache_on_settings_delete(sender, instance, **kwargs):
     """
     # 清理网站设置缓存
     clear_cache_pattern('get_site_settings')
+    bump_data_version(SETTINGS_VERSION)
 
 
 @receiver(post_save, sender=Milestone)
@@ -50,6 +59,7 @@ def clear_cache_on_milestone_save(sender, instance, created, **kwargs):
     """
     # 清理里程碑列表缓存
     clear_cache_pattern('get_milestones')
+    bump_data_version(SETTINGS_VERSION)
     # 清理该里程碑的详情缓存
     clear_cache_pattern(f'get_milestone:{instance.id}')
 
@@ -61,5 +71,6 @@ def clear_cache_on_milestone_delete(sender, instance, **kwargs):
     """
     # 清理里程碑列表缓存
     clear_cache_pattern('get_milestones')
+    bump_data_version(SETTINGS_VERSION)
     # 清理该里程碑的详情缓存
     clear_cache_pattern(f'get_milestone:{instance.id}')
\ No newline at end of file
@@ -1,4 +1,5 @@
 from .settings_service import SettingsService, RecommendationService
 from .milestone_service import MilestoneService
+from .sitemap_service import SitemapService
 
-__all__ = ['SettingsService', 'RecommendationService', 'MilestoneService']
\ No newline at end of file
+__all__ = ['SettingsService', 'RecommendationService', 'MilestoneService', 'SitemapService']
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import List, Optional, Dict, Any
 from core.cache import cache_result
+from core.request_cache import request_cached
 from core.exceptions import ValidationException, DatabaseException
 from django.core.exceptions import ObjectDoesNotExist
 
@@ -10,10 +11,11 @@ class SettingsService:
     """网站设置服务类"""
 
     @staticmethod
+    @request_cached
     @cache_result(timeout=3600)
     def get_site_settings() -> Optional[SiteSettings]:
         """
-        获取网站设置
+        获取网站设置（同一个批量请求内只读取一次）
 
         Returns:
             SiteSettings: 网站设置对象，如果不存在则返回None
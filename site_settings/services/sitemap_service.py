@@ -0,0 +1,274 @@
+"""
+Sitemap 服务 - 预生成、分片、预压缩的 sitemap
+
+- /sitemap.xml 是 sitemap 索引，列出各分区的子 sitemap（/sitemap-<分区>-<页码>.xml）
+- 分区：固定页面、歌曲、直播日期、图集、二创合集；每个分区按 SHARD_SIZE 条拆分为多个子 sitemap
+- 每个分区的分片按其数据版本号缓存（pages 分区只按 TIMEOUT 过期），模型变化递增版本号后
+  只有对应分区在下次访问或预热（site_settings/warmers.py）时重新生成，其余分区直接复用
+- 分片和索引以 gzip/brotli 预压缩变体保存，由 CompressionMiddleware 按 Accept-Encoding 直接返回，
+  同时携带生成时间作为 Last-Modified，支持 If-Modified-Since 条件请求
+"""
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Callable, NamedTuple, Optional
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.cache import get_data_version
+from core.compression import IDENTITY, compress_variants
+from core.local_cache import tiered_get, tiered_set
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可通过 settings.SITEMAP_CONFIG 覆盖
+DEFAULT_CONFIG = {
+    'BASE_URL': 'https://www.xxm8777.cn',   # 站点地址（不含末尾斜杠）
+    'SHARD_SIZE': 5000,                      # 每个子 sitemap 的 URL 数（协议上限 50000）
+    'TIMEOUT': 86400,                        # 缓存超时时间（秒）
+}
+
+CACHE_PREFIX = 'sitemap'
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+_XMLNS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+# 固定页面：(路径, changefreq, priority)
+PAGES = (
+    ('/', 'daily', '1.0'),
+    ('/songs', 'daily', '0.9'),
+    ('/songs?tab=hot', 'daily', '0.85'),
+    ('/songs?tab=originals', 'weekly', '0.85'),
+    ('/songs?tab=submit', 'weekly', '0.8'),
+    ('/originals', 'weekly', '0.8'),
+    ('/albums', 'daily', '0.8'),
+    # 图集页面保留旧 URL（301 重定向到新地址）
+    ('/gallery', 'daily', '0.7'),
+    ('/fansDIY', 'weekly', '0.8'),
+    ('/about', 'monthly', '0.6'),
+    ('/live', 'daily', '0.7'),
+    ('/data', 'daily', '0.7'),
+    ('/contact', 'monthly', '0.5'),
+)
+
+
+def get_config():
+    """获取 sitemap 配置"""
+    config = dict(DEFAULT_CONFIG)
+    config.update(getattr(settings, 'SITEMAP_CONFIG', {}))
+    return config
+
+
+def _date(value):
+    return value.strftime('%Y-%m-%d') if value else None
+
+
+def _page_entries():
+    today = _date(timezone.localdate())
+    return [(path, today, changefreq, priority) for path, changefreq, priority in PAGES]
+
+
+def _song_entries():
+    from song_management.models import Song
+
+    rows = Song.objects.order_by('id').values_list('id', 'last_performed', 'first_perform')
+    return [
+        (f'/songs/{song_id}', _date(last_performed or first_perform), 'monthly', '0.7')
+        for song_id, last_performed, first_perform in rows.iterator()
+    ]
+
+
+def _livestream_entries():
+    from livestream.models import Livestream
+
+    rows = Livestream.objects.filter(is_active=True).order_by('date').values_list('date', 'updated_at')
+    return [
+        (f'/live/{_date(date)}', _date(updated_at), 'monthly', '0.6')
+        for date, updated_at in rows.iterator()
+    ]
+
+
+def _gallery_entries():
+    from gallery.models import Gallery
+
+    rows = Gallery.objects.filter(is_active=True).order_by('id').values_list('id', 'updated_at')
+    return [
+        (f'/albums/{gallery_id}', _date(updated_at), 'weekly', '0.6')
+        for gallery_id, updated_at in rows.iterator()
+    ]
+
+
+def _collection_entries():
+    from fansDIY.models import Collection
+
+    rows = Collection.objects.order_by('id').values_list('id', 'updated_at')
+    return [
+        (f'/fansDIY?collection={collection_id}', _date(updated_at), 'weekly', '0.7')
+        for collection_id, updated_at in rows.iterator()
+    ]
+
+
+class Section(NamedTuple):
+    """sitemap 分区"""
+    name: str
+    namespace: Optional[str]                # 数据版本命名空间，None 表示只按 TIMEOUT 过期
+    entries: Callable[[], list]             # 返回 [(路径, lastmod, changefreq, priority), ...]
+
+
+# 索引中的顺序即此处顺序；命名空间与各应用 signals.py 中的版本常量一致
+SECTIONS = {
+    section.name: section for section in (
+        Section('pages', None, _page_entries),
+        Section('songs', 'song_management:catalog', _song_entries),
+        Section('livestreams', 'livestream', _livestream_entries),
+        Section('galleries', 'gallery', _gallery_entries),
+        Section('collections', 'fansDIY:collections', _collection_entries),
+    )
+}
+
+
+def _urlset(entries, base_url):
+    parts = [_XML_HEADER, f'<urlset {_XMLNS}>\n']
+    for path, lastmod, changefreq, priority in entries:
+        parts.append(f'<url><loc>{escape(base_url + path)}</loc>')
+        if lastmod:
+            parts.append(f'<lastmod>{lastmod}</lastmod>')
+        parts.append(f'<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>\n')
+    parts.append('</urlset>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+def _sitemap_index(children, base_url):
+    parts = [_XML_HEADER, f'<sitemapindex {_XMLNS}>\n']
+    for name, page, last_modified in children:
+        lastmod = datetime.fromtimestamp(last_modified, dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+        parts.append(
+            f'<sitemap><loc>{escape(base_url)}/sitemap-{name}-{page}.xml</loc>'
+            f'<lastmod>{lastmod}</lastmod></sitemap>\n'
+        )
+    parts.append('</sitemapindex>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+class SitemapService:
+    """Sitemap 生成与缓存"""
+
+    @staticmethod
+    def _section_key(section):
+        version = get_data_version(section.namespace) if section.namespace else 0
+        return f"{CACHE_PREFIX}:{section.name}:v{version}"
+
+    @staticmethod
+    def _build(name):
+        """生成分区的全部分片并写入缓存，返回 (清单, 分片列表)"""
+        section = SECTIONS[name]
+        config = get_config()
+        key = SitemapService._section_key(section)
+        entries = section.entries()
+        size = config['SHARD_SIZE']
+        last_modified = int(time.time())
+
+        documents = [
+            {
+                'variants': compress_variants(_urlset(entries[start:start + size], config['BASE_URL'])),
+                'last_modified': last_modified,
+            }
+            for start in range(0, len(entries), size)
+        ]
+        for page, document in enumerate(documents, start=1):
+            tiered_set(f"{key}:{page}", document, config['TIMEOUT'], CACHE_PREFIX)
+
+        # 分片先于清单写入，读到清单时分片一定已存在
+        manifest = {'shards': len(documents), 'last_modified': last_modified}
+        tiered_set(key, manifest, config['TIMEOUT'], CACHE_PREFIX)
+        logger.info(f"Sitemap section built: {name} ({len(entries)} urls, {len(documents)} shards)")
+        return manifest, documents
+
+    @staticmethod
+    def build_section(name):
+        """
+        重新生成分区的全部分片并写入缓存
+
+        Returns:
+            dict: 分区清单 {'shards': 分片数, 'last_modified': 生成时间戳}
+        """
+        return SitemapService._build(name)[0]
+
+    @staticmethod
+    def get_manifest(name):
+        """获取分区清单，当前版本未生成时立即生成"""
+        manifest = tiered_get(SitemapService._section_key(SECTIONS[name]), CACHE_PREFIX)
+        if manifest is None:
+            manifest = SitemapService.build_section(name)
+        return manifest
+
+    @staticmethod
+    def get_shard(name, page):
+        """
+        获取子 sitemap
+
+        Args:
+            name: 分区名
+            page: 页码（从 1 开始）
+
+        Returns:
+            dict: {'variants': 各编码变体, 'last_modified': 生成时间戳}；分区或页码不存在时返回 None
+        """
+        if name not in SECTIONS or page < 1:
+            return None
+        key = SitemapService._section_key(SECTIONS[name])
+        manifest = tiered_get(key, CACHE_PREFIX)
+        document = None
+        if manifest is not None and page <= manifest['shards']:
+            document = tiered_get(f"{key}:{page}", CACHE_PREFIX)
+        if manifest is not None and (document is not None or page > manifest['shards']):
+            return document
+
+        # 清单或分片被淘汰、缓存不可用时重新生成整个分区
+        _, documents = SitemapService._build(name)
+        return documents[page - 1] if page <= len(documents) else None
+
+    @staticmethod
+    def get_index():
+        """
+        获取 sitemap 索引（空分区不列出）
+
+        Returns:
+            dict: {'variants': 各编码变体, 'last_modified': 各分区生成时间的最大值}
+        """
+        config = get_config()
+        manifests = {name: SitemapService.get_manifest(name) for name in SECTIONS}
+        last_modified = max(manifest['last_modified'] for manifest in manifests.values())
+
+        # 任一分区重新生成后清单变化，索引随之重建
+        stamp = '-'.join(f"{manifest['shards']}.{manifest['last_modified']}" for manifest in manifests.values())
+        key = f"{CACHE_PREFIX}:index:{stamp}"
+        document = tiered_get(key, CACHE_PREFIX)
+        if document is None:
+            children = [
+                (name, page, manifest['last_modified'])
+                for name, manifest in manifests.items()
+                for page in range(1, manifest['shards'] + 1)
+            ]
+            document = {
+                'variants': compress_variants(_sitemap_index(children, config['BASE_URL'])),
+                'last_modified': last_modified,
+            }
+            tiered_set(key, document, config['TIMEOUT'], CACHE_PREFIX)
+        return document
+
+    @staticmethod
+    def warm():
+        """预生成索引和全部分区（当前版本已生成的分区直接复用），返回分片数"""
+        SitemapService.get_index()
+        return sum(SitemapService.get_manifest(name)['shards'] for name in SECTIONS)
+
+    @staticmethod
+    def fallback_document():
+        """生成失败时的降级 sitemap：只包含固定页面，不写入缓存"""
+        return {
+            'variants': {IDENTITY: _urlset(_page_entries(), get_config()['BASE_URL'])},
+            'last_modified': int(time.time()),
+        }
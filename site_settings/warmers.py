@@ -0,0 +1,23 @@
+"""
+缓存预热任务 - 网站设置、推荐语与 sitemap（见 core/cache_warmer.py）
+"""
+from core.cache_warmer import register_warmer
+from .services.settings_service import RecommendationService, SettingsService
+from .services.sitemap_service import SitemapService
+
+
+@register_warmer('site_settings', priority=10, patterns=('get_site_settings', 'get_active_recommendations'))
+def warm_site_settings():
+    """网站设置与激活的推荐语"""
+    SettingsService.get_site_settings()
+    RecommendationService.get_active_recommendations()
+    return 2
+
+
+@register_warmer(
+    'sitemap', priority=50,
+    patterns=('song_management:catalog', 'livestream', 'gallery', 'fansDIY:collections', 'sitemap'),
+)
+def warm_sitemap():
+    """sitemap 索引及数据变化的分区"""
+    return SitemapService.warm()
@@ -0,0 +1,45 @@
+"""
+歌曲相关读接口的异步版本（ASYNC_VIEWS_CONFIG['ENABLED'] 时挂载，见 core/async_views.py）
+
+缓存命中时在事件循环中直接返回，未命中时在线程池中执行对应的同步视图
+"""
+import logging
+
+from core.async_cache import aget
+from core.async_views import async_read_view, run_sync_view
+from core.responses import json_success_response
+from .other_views import top_songs_api, top_songs_cache_key
+from .record_views import SongRecordListView, song_records_cache_key
+from .song_views import SongListView, song_list_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+song_list = async_read_view(
+    SongListView.as_view(),
+    cache_key=lambda request: song_list_cache_key(request.GET),
+)
+
+top_songs = async_read_view(
+    top_songs_api,
+    cache_key=lambda request: top_songs_cache_key(request.GET),
+)
+
+_song_record_list = SongRecordListView.as_view()
+
+
+async def song_record_list(request, song_id):
+    """获取特定歌曲的演唱记录列表（缓存中保存的是分页数据，命中时在事件循环中编码）"""
+    cache_key = song_records_cache_key(request.GET, song_id) if request.method == 'GET' else None
+    if cache_key:
+        try:
+            cached_data = await aget(cache_key)
+        except Exception as e:
+            logger.warning(f"Cache get failed for song records: {e}")
+            cached_data = None
+        if cached_data is not None:
+            return json_success_response(cached_data, message="获取演唱记录成功（缓存）")
+    return await run_sync_view(_song_record_list, request, song_id=song_id)
+
+
+song_record_list.csrf_exempt = True
@@ -2,11 +2,11 @@
 其他辅助视图（曲风、标签、排行榜、随机歌曲）
 """
 from rest_framework.decorators import api_view
-from core.responses import success_response
+from core.responses import success_response, cached_success_response
 from core.exceptions import SongNotFoundException
 from ..models import Song, Style, Tag, SongStyle
+from ..services import SongService, RankingService
 from django.db.models import Count
-from django.core.cache import cache
 from datetime import datetime, timedelta
 import logging
 
@@ -18,25 +18,25 @@ def style_list_api(request):
     """
     获取所有曲风列表，返回简单的名称数组
     """
-    # 尝试从缓存获取数据，处理Redis连接异常
-    cache_key = "style_list_simple"
-    try:
-        data = cache.get(cache_key)
-        if data is not None:
-            return success_response(data=data, message="获取曲风列表成功")
-    except Exception as e:
-        logger.warning(f"Cache get failed for styles: {e}")
+    # 缓存预编码的响应体，命中时无需再次序列化；曲风关联变化时由信号清理
+    return cached_success_response(
+        "style_list_simple:json",
+        lambda: list(Style.objects.values_list('name', flat=True).order_by('name')),
+        message="获取曲风列表成功",
+        timeout=3600,  # 缓存1小时
+    )
 
-    # 获取所有曲风名称并排序
-    style_names = list(Style.objects.values_list('name', flat=True).order_by('name'))
 
-    # 尝试缓存结果，处理Redis连接异常
+def _tag_names():
+    """获取所有标签名称，查询失败时返回空列表，确保前端不会崩溃"""
     try:
-        cache.set(cache_key, style_names, 3600)  # 缓存1小时
+        tag_names = list(Tag.objects.values_list('name', flat=True).order_by('name'))
+        if not tag_names:
+            logger.warning("No tags found in database")
+        return tag_names
     except Exception as e:
-        logger.warning(f"Cache set failed for styles: {e}")
-
-    return success_response(data=style_names, message="获取曲风列表成功")
+        logger.error(f"Database query failed for tags: {e}")
+        return []
 
 
 @api_view(['GET'])
@@ -44,40 +44,33 @@ def tag_list_api(request):
     """
     获取所有标签列表，返回简单的名称数组
     """
-    # 尝试从缓存获取数据，处理Redis连接异常
-    cache_key = "tag_list_simple"
-    try:
-        data = cache.get(cache_key)
-        if data is not None:
-            # 确保返回的数据不是空列表
-            if isinstance(data, list) and len(data) > 0:
-                return success_response(data=data, message="获取标签列表成功")
-            else:
-                logger.warning("Cache data is empty or invalid for tags")
-    except Exception as e:
-        logger.warning(f"Cache get failed for tags: {e}")
-
-    # 获取所有标签名称并排序
-    try:
-        tag_names = list(Tag.objects.values_list('name', flat=True).order_by('name'))
-
-        # 检查是否有标签数据
-        if not tag_names:
-            logger.warning("No tags found in database")
-            # 返回空列表而不是None
-            tag_names = []
-
-        # 尝试缓存结果，处理Redis连接异常
-        try:
-            cache.set(cache_key, tag_names, 3600)  # 缓存1小时
-        except Exception as e:
-            logger.warning(f"Cache set failed for tags: {e}")
-
-        return success_response(data=tag_names, message="获取标签列表成功")
-    except Exception as e:
-        logger.error(f"Database query failed for tags: {e}")
-        # 返回空列表而不是错误，确保前端不会崩溃
-        return success_response(data=[], message="获取标签列表成功")
+    # 空列表不缓存，避免数据库暂时不可用时缓存空结果
+    return cached_success_response(
+        "tag_list_simple:json",
+        _tag_names,
+        message="获取标签列表成功",
+        timeout=3600,  # 缓存1小时
+        cache_empty=False,
+    )
+
+
+# 排行榜时间范围 -> 天数
+TOP_SONGS_RANGES = {
+    'all': None,
+    '1m': 30,
+    '3m': 90,
+    '1y': 365,
+    '10d': 10,
+    '20d': 20,
+    '30d': 30,
+}
+
+
+def top_songs_cache_key(params):
+    """排行榜的响应缓存键（演唱记录或歌曲变化时由信号清理 top_songs 缓存），异步视图共用"""
+    range_key = params.get('range', 'all')
+    limit = int(params.get('limit', 10))
+    return f"top_songs:{range_key if TOP_SONGS_RANGES.get(range_key) else 'all'}:{limit}:json"
 
 
 @api_view(['GET'])
@@ -85,51 +78,53 @@ def top_songs_api(request):
     """
     获取热歌榜
     """
-    range_map = {
-        'all': None,
-        '1m': 30,
-        '3m': 90,
-        '1y': 365,
-        '10d': 10,
-        '20d': 20,
-        '30d': 30,
-    }
-    range_key = request.GET.get('range', 'all')
-    days = range_map.get(range_key, None)
+    days = TOP_SONGS_RANGES.get(request.GET.get('range', 'all'), None)
     limit = int(request.GET.get('limit', 10))  # 新增limit参数，默认10
-    qs = Song.objects.all()
-    if days:
-        since = datetime.now().date() - timedelta(days=days)
-        qs = qs.filter(records__performed_at__gte=since)
-    # annotate 统计演唱次数
-    qs = qs.annotate(recent_count=Count('records')).order_by('-recent_count', '-last_performed')[:limit]
-    result = []
-    for s in qs:
-        # 获取最新演唱记录的封面缩略图
-        latest_record = s.records.order_by('-performed_at').first()
-        cover_url = latest_record.get_cover_thumbnail_url() if latest_record else None
-        
-        result.append({
-            'id': s.id,
-            'song_name': s.song_name,
-            'singer': s.singer,
-            'perform_count': s.recent_count,
-            'first_perform': s.first_perform,
-            'last_perform': s.last_performed,
-            'cover_url': cover_url,
-        })
-    
-    return success_response(data=result, message="获取排行榜成功")
+
+    def build():
+        qs = Song.objects.all()
+        if days:
+            since = datetime.now().date() - timedelta(days=days)
+            qs = qs.filter(records__performed_at__gte=since)
+        # annotate 统计演唱次数
+        qs = qs.annotate(recent_count=Count('records'))
+        # 最新演唱记录的封面通过子查询一并取出，避免逐首查询
+        qs = RankingService.with_latest_cover(qs).order_by('-recent_count', '-last_performed')[:limit]
+        result = []
+        for s in qs:
+            cover_url = RankingService.latest_cover_thumbnail(s)
+
+            result.append({
+                'id': s.id,
+                'song_name': s.song_name,
+                'singer': s.singer,
+                'perform_count': s.recent_count,
+                'first_perform': s.first_perform,
+                'last_perform': s.last_performed,
+                'cover_url': cover_url,
+            })
+        return result
+
+    return cached_success_response(
+        top_songs_cache_key(request.GET),
+        build,
+        message="获取排行榜成功",
+    )
 
 
 @api_view(['GET'])
 def random_song_api(request):
     """
-    随机返回一首歌
+    随机返回一首歌，支持 language、style 筛选
     """
-    song = Song.objects.order_by('?').first()
+    song = SongService.get_random_song(
+        language=request.GET.get('language') or None,
+        style=request.GET.get('style') or None,
+    )
     if song:
-        styles = [s.style.name for s in SongStyle.objects.filter(song=song)]
+        styles = list(
+            SongStyle.objects.filter(song=song).values_list('style__name', flat=True)
+        )
         data = {
             "id": song.id,
             "song_name": song.song_name,
@@ -4,9 +4,13 @@
 from django.core.paginator import Paginator
 from rest_framework import generics
 from rest_framework.views import APIView
-from core.responses import success_response, paginated_response
+from core.cache_utils import CacheTimeout
+from core.pagination import KeysetPaginator
+from core.responses import success_response, paginated_response, error_response
 from core.exceptions import SongNotFoundException
+from core.thumbnail_generator import ThumbnailGenerator
 from ..models import SongRecord
+from ..services.song_record_service import SongRecordService, COMPACT_RECORD_FIELDS
 from .serializers import SongRecordSerializer
 from django.core.cache import cache
 from datetime import datetime
@@ -15,26 +19,137 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def song_records_cache_key(params, song_id):
+    """
+    页码分页模式的缓存键（缓存完整的分页数据），异步视图共用
+
+    Returns:
+        str | None: 游标分页模式返回 None
+    """
+    if 'cursor' in params or params.get('pagination') == 'cursor':
+        return None
+    cache_key = f"song_records:{song_id}:{int(params.get('page', 1))}:{int(params.get('page_size', 20))}"
+    if params.get('compact') in ('1', 'true'):
+        cache_key = f"{cache_key}:compact"
+    return cache_key
+
+
 class SongRecordListView(generics.ListAPIView):
     """
     获取特定歌曲的演唱记录列表
     """
     serializer_class = SongRecordSerializer
 
+    CACHE_TIMEOUT = 600
+    # 有封面缩略图仍在后台生成时只短暂缓存，生成完成后尽快换成缩略图 URL
+    PENDING_THUMBNAIL_TIMEOUT = 30
+
     def get_queryset(self):
         song_id = self.kwargs['song_id']
-        # 优化: 使用 select_related 预取外键，避免 N+1 查询
+        # 优化: 使用 select_related 预取外键，prefetch_related 预取歌曲的曲风和标签，避免 N+1 查询
         return SongRecord.objects.filter(
             song_id=song_id
-        ).select_related('song').order_by('-performed_at')
+        ).select_related('song').prefetch_related(
+            'song__song_styles__style',
+            'song__song_tags__tag'
+        ).order_by('-performed_at')
+
+    def compact_queryset(self):
+        """紧凑格式使用的 values() 投影，不加载歌曲"""
+        return SongRecord.objects.filter(
+            song_id=self.kwargs['song_id']
+        ).values(*COMPACT_RECORD_FIELDS).order_by('-performed_at')
+
+    @staticmethod
+    def _fill_cover_urls(records):
+        """没有封面的记录按演唱日期推导封面路径"""
+        results = []
+        for record in records:
+            performed_at = record.get('performed_at')
+            if performed_at:
+                date = datetime.strptime(performed_at, "%Y-%m-%d").date()
+                date_str = date.strftime("%Y-%m-%d")
+                year = date.strftime("%Y")
+                month = date.strftime("%m")
+                record["cover_url"] = record.get("cover_url") or f"/covers/{year}/{month}/{date_str}.jpg"
+            else:
+                record["cover_url"] = "/covers/default.jpg"
+            results.append(record)
+        return results
+
+    def _serialize(self, records):
+        """
+        序列化一页记录，封面缩略图批量解析
+
+        Returns:
+            tuple: (记录列表, 是否有缩略图仍在生成)
+        """
+        records = list(records)
+        thumbnails, pending = ThumbnailGenerator.resolve_thumbnail_urls(
+            [record.cover_url for record in records if record.cover_url]
+        )
+        context = self.get_serializer_context()
+        context['thumbnail_urls'] = thumbnails
+        serializer = self.get_serializer_class()(records, many=True, context=context)
+        return self._fill_cover_urls(serializer.data), bool(pending)
+
+    def _cursor_list(self, song_id, page_size, compact=False):
+        """游标分页：按 (performed_at, id) 降序翻页，总数缓存一分钟"""
+        queryset = self.compact_queryset() if compact else self.get_queryset()
+        paginator = KeysetPaginator(queryset, '-performed_at', page_size)
+        try:
+            records, next_cursor = paginator.get_page(self.request.GET.get('cursor'))
+        except ValueError as e:
+            return error_response(message=str(e))
+
+        data = {
+            'total': paginator.get_total(cache_key=f"song_records:{song_id}:count", timeout=CacheTimeout.SHORT),
+            'page_size': page_size,
+            'next_cursor': next_cursor,
+        }
+        if compact:
+            data['song'] = SongRecordService.get_song_header(song_id)
+            data['results'], _ = SongRecordService.compact_records(records)
+        else:
+            data['results'], _ = self._serialize(records)
+        return success_response(data=data, message="获取演唱记录成功")
+
+    def _compact_page(self, song_id, page_num, page_size):
+        """
+        紧凑格式：歌曲信息只出现一次，记录为扁平数组
+
+        Returns:
+            tuple: (分页数据, 是否有缩略图仍在生成)
+        """
+        song = SongRecordService.get_song_header(song_id)
+        paginator = Paginator(self.compact_queryset(), page_size)
+        page = paginator.get_page(page_num)
+        results, pending = SongRecordService.compact_records(page)
+        return {
+            'song': song,
+            'results': results,
+            'total': paginator.count,
+            'page': page.number,
+            'page_size': page_size,
+        }, pending
+
+    def _cache_timeout(self, pending):
+        return self.PENDING_THUMBNAIL_TIMEOUT if pending else self.CACHE_TIMEOUT
 
     def list(self, request, *args, **kwargs):
         song_id = self.kwargs['song_id']
         page_num = int(request.GET.get("page", 1))
         page_size = int(request.GET.get("page_size", 20))
 
+        # 紧凑格式（compact=1）：歌曲头部 + 扁平记录数组，不嵌套 SongSerializer
+        compact = request.GET.get('compact') in ('1', 'true')
+
+        # 游标分页模式（传入 cursor 参数或 pagination=cursor）
+        if 'cursor' in request.GET or request.GET.get('pagination') == 'cursor':
+            return self._cursor_list(song_id, page_size, compact)
+
         # 构造缓存key
-        cache_key = f"song_records:{song_id}:{page_num}:{page_size}"
+        cache_key = song_records_cache_key(request.GET, song_id)
 
         # 尝试从缓存获取完整的分页数据，处理Redis连接异常
         try:
@@ -45,27 +160,22 @@ class SongRecordListView(generics.ListAPIView):
         except Exception as e:
             logger.warning(f"Cache get failed for song records: {e}")
 
+        if compact:
+            paginated_data, pending = self._compact_page(song_id, page_num, page_size)
+            try:
+                cache.set(cache_key, paginated_data, self._cache_timeout(pending))
+            except Exception as e:
+                logger.warning(f"Cache set failed for song records: {e}")
+            return success_response(data=paginated_data, message="获取演唱记录成功")
+
         # 调用父类方法获取数据
         try:
             queryset = self.get_queryset()
             paginator = Paginator(queryset, page_size)
             page = paginator.get_page(page_num)
 
-            serializer = self.get_serializer(page, many=True)
-
-            # 处理封面URL
-            results = []
-            for record in serializer.data:
-                performed_at = record.get('performed_at')
-                if performed_at:
-                    date = datetime.strptime(performed_at, "%Y-%m-%d").date()
-                    date_str = date.strftime("%Y-%m-%d")
-                    year = date.strftime("%Y")
-                    month = date.strftime("%m")
-                    record["cover_url"] = record.get("cover_url") or f"/covers/{year}/{month}/{date_str}.jpg"
-                else:
-                    record["cover_url"] = "/covers/default.jpg"
-                results.append(record)
+            # 序列化并处理封面URL
+            results, pending = self._serialize(page)
 
             # 构建完整的分页响应对象
             paginated_data = {
@@ -77,7 +187,7 @@ class SongRecordListView(generics.ListAPIView):
 
             # 缓存完整的分页对象，处理Redis连接异常
             try:
-                cache.set(cache_key, paginated_data, 600)
+                cache.set(cache_key, paginated_data, self._cache_timeout(pending))
             except Exception as e:
                 logger.warning(f"Cache set failed for song records: {e}")
 
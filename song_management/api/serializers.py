@@ -44,7 +44,10 @@ class SongRecordSerializer(serializers.ModelSerializer):
         read_only_fields = ('song',)  # song字段在创建时由URL中的song_id确定
 
     def get_cover_thumbnail_url(self, obj):
-        """获取封面缩略图 URL"""
+        """获取封面缩略图 URL，视图批量解析过时直接使用 context 中的映射"""
+        thumbnail_urls = self.context.get('thumbnail_urls')
+        if thumbnail_urls is not None and obj.cover_url:
+            return thumbnail_urls.get(obj.cover_url, obj.cover_url)
         return obj.get_cover_thumbnail_url()
 
 
@@ -3,17 +3,38 @@
 """
 from django.core.paginator import Paginator
 from rest_framework import generics, filters
-from core.responses import paginated_response
-from core.cache_utils import cached, CacheTimeout, CacheKeys
+from core.cache import get_data_version
+from core.pagination import KeysetPaginator
+from core.responses import success_response, error_response, cached_success_response
+from core.cache_utils import cached, CacheTimeout, CacheKeys, CacheKeyBuilder
 from ..models import Song
+from ..models.signals import SONGS_VERSION, FACETS_VERSION
+from ..services.facet_service import SongFacetService
 from .serializers import SongSerializer
 from django.db.models import Q
-from django.core.cache import cache
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def song_list_cache_key(params):
+    """
+    页码分页模式的响应缓存键（歌曲、曲风、标签变化时由信号按 song_list_api 前缀清理），异步视图共用
+
+    Returns:
+        str | None: 游标分页模式返回 None（不缓存整页响应）
+    """
+    if 'cursor' in params or params.get('pagination') == 'cursor':
+        return None
+    page_num = int(params.get("page", 1))
+    page_size = min(int(params.get("limit", 50)), 50)
+    return (
+        f"song_list_api:{params.get('q', '')}:{page_num}:{page_size}:{params.get('ordering', '')}:"
+        f"{'-'.join(params.getlist('styles'))}:{'-'.join(params.getlist('tags'))}:"
+        f"{params.get('language', '')}:{params.get('facets', '')}"
+    )
+
+
 class SongListView(generics.ListAPIView):
     """
     获取歌曲列表，支持搜索、分页和排序
@@ -43,93 +64,96 @@ class SongListView(generics.ListAPIView):
 
         # 语言过滤
         language = self.request.query_params.get("language", "")
+        languages = []
         if language:
             languages = language.split(',')
             languages = [lang.strip() for lang in languages if lang.strip()]
             if languages:
                 queryset = queryset.filter(language__in=languages)
 
-        # 收集所有筛选条件
-        filters = Q()
-
         # 曲风过滤
-        styles = self.request.query_params.getlist('styles', [])
-        if not styles:
-            style_raw = self.request.query_params.get('styles')
-            if style_raw:
-                styles = style_raw.split(',')
-        styles = [s.strip() for s in styles if s.strip()]
+        # 同时支持 styles=a&styles=b 和 styles=a,b 两种形式
+        styles = [
+            s.strip() for raw in self.request.query_params.getlist('styles', [])
+            for s in raw.split(',') if s.strip()
+        ]
 
         logger.info(f"曲风筛选条件: {styles}")
 
-        if styles:
-            style_filter = Q()
-            for style in styles:
-                style_filter |= Q(song_styles__style__name=style)
-            filters &= style_filter
-
         # 标签过滤
-        tags = self.request.query_params.getlist('tags', [])
-        if not tags:
-            tags_raw = self.request.query_params.get('tags')
-            if tags_raw:
-                tags = tags_raw.split(',')
-        tags = [tag.strip() for tag in tags if tag.strip()]
+        tags = [
+            tag.strip() for raw in self.request.query_params.getlist('tags', [])
+            for tag in raw.split(',') if tag.strip()
+        ]
 
         logger.info(f"标签筛选条件: {tags}")
 
-        if tags:
-            tag_filter = Q()
-            for tag in tags:
-                tag_filter |= Q(song_tags__tag__name=tag)
-            filters &= tag_filter
-
-        # 应用所有筛选条件
-        if filters:
-            queryset = queryset.filter(filters).distinct()
+        # 曲风、标签筛选通过分面位图索引求出歌曲 ID，避免多表 JOIN + DISTINCT
+        self.facet_selection = {
+            'languages': languages,
+            'styles': styles,
+            'tags': tags,
+        }
+        if styles or tags:
+            index = SongFacetService.get_index()
+            mask = index.match({'styles': styles, 'tags': tags})
+            queryset = queryset.filter(id__in=index.ids_from_mask(mask))
 
         # 优化: 使用 count() 缓存或直接返回，避免重复计算
         # 注意: 这里不再调用 count()，让 paginator 去处理
         return queryset
 
-    def list(self, request, *args, **kwargs):
-        # 获取查询参数
-        query = self.request.query_params.get("q", "")
-        page_num = int(self.request.query_params.get("page", 1))
-        page_size = int(self.request.query_params.get("limit", 50))
-        # 限制最大页面大小为50
-        page_size = min(page_size, 50)
-        ordering = self.request.query_params.get("ordering", "")
-
-        # 获取样式过滤条件
-        styles = []
-        styles_param = self.request.query_params.get('styles')
-        if styles_param:
-            styles = [s.strip() for s in styles_param.split(',') if s.strip()]
-
-        # 获取标签过滤条件
-        tags = []
-        tags_param = self.request.query_params.get('tags')
-        if tags_param:
-            tags = [tag.strip() for tag in tags_param.split(',') if tag.strip()]
-
-        # 获取语言过滤条件
-        languages = []
-        language_param = self.request.query_params.get('language')
-        if language_param:
-            languages = [lang.strip() for lang in language_param.split(',') if lang.strip()]
+    def _facet_extra(self, query):
+        """分面计数（facets=1 时返回）：每个曲风/标签/语言在其他维度筛选条件下的命中数量"""
+        if self.request.query_params.get('facets') not in ('1', 'true'):
+            return None
+        index = SongFacetService.get_index()
+        base_mask = None
+        if query:
+            base_mask = index.mask_for_ids(
+                Song.objects.filter(
+                    Q(song_name__icontains=query) | Q(singer__icontains=query)
+                ).values_list('id', flat=True)
+            )
+        return {'facets': index.facet_counts(self.facet_selection, base_mask)}
 
-        # 使用Django的Paginator来处理分页
+    def _cursor_list(self, query, ordering, page_size):
+        """游标分页模式：按排序键 + id 翻页，不使用 OFFSET"""
+        queryset = self.get_queryset()
+        if ordering.lstrip('-') not in self.ordering_fields:
+            ordering = self.ordering[0]
+        paginator = KeysetPaginator(queryset, ordering, page_size)
+        try:
+            songs, next_cursor = paginator.get_page(self.request.query_params.get('cursor'))
+        except ValueError as e:
+            return error_response(message=str(e))
+
+        # 总数按数据版本缓存，翻页时不重复执行 COUNT(*)
+        count_key = CacheKeyBuilder.build_key(
+            'song_list_api:count',
+            get_data_version(SONGS_VERSION),
+            get_data_version(FACETS_VERSION),
+            q=query,
+            languages=self.facet_selection['languages'],
+            styles=self.facet_selection['styles'],
+            tags=self.facet_selection['tags'],
+        )
+        data = {
+            'results': self.get_serializer(songs, many=True).data,
+            'total': paginator.get_total(cache_key=count_key, timeout=CacheTimeout.MEDIUM),
+            'page_size': page_size,
+            'next_cursor': next_cursor,
+        }
+        data.update(self._facet_extra(query) or {})
+        return success_response(data=data, message="获取歌曲列表成功")
+
+    def _page_data(self, query, ordering, page_num, page_size):
+        """页码分页模式的响应数据"""
         queryset = self.get_queryset()
 
-        # 应用排序
-        if ordering:
-            # 验证排序字段是否在允许的范围内
-            allowed_ordering_fields = ['singer', 'last_performed', 'perform_count', 'first_perform']
-            # 处理降序字段（以-开头）
-            order_field = ordering.lstrip('-')
-            if order_field in allowed_ordering_fields:
-                queryset = queryset.order_by(ordering)
+        # 应用排序（验证排序字段是否在允许的范围内，处理降序字段）
+        if ordering and ordering.lstrip('-') in self.ordering_fields:
+            queryset = queryset.order_by(ordering)
 
         paginator = Paginator(queryset, page_size)
         page = paginator.get_page(page_num)
@@ -137,19 +161,31 @@ class SongListView(generics.ListAPIView):
         # 序列化数据
         serializer = self.get_serializer(page, many=True)
 
-        # 构造缓存key
-        cache_key = f"song_list_api:{query}:{page_num}:{page_size}:{ordering}:{'-'.join(styles)}:{'-'.join(tags)}:{'-'.join(languages)}"
+        data = {
+            'total': paginator.count,
+            'page': page.number,
+            'page_size': page_size,
+            'results': serializer.data,
+        }
+        data.update(self._facet_extra(query) or {})
+        return data
 
-        # 尝试缓存结果，处理Redis连接异常
-        try:
-            cache.set(cache_key, serializer.data, 600)  # 缓存10分钟
-        except Exception as e:
-            logger.warning(f"Cache set failed: {e}")
-
-        return paginated_response(
-            data=serializer.data,
-            total=paginator.count,
-            page=page.number,
-            page_size=page_size,
-            message="获取歌曲列表成功"
+    def list(self, request, *args, **kwargs):
+        # 获取查询参数
+        query = self.request.query_params.get("q", "")
+        page_num = int(self.request.query_params.get("page", 1))
+        page_size = int(self.request.query_params.get("limit", 50))
+        # 限制最大页面大小为50
+        page_size = min(page_size, 50)
+        ordering = self.request.query_params.get("ordering", "")
+
+        if 'cursor' in self.request.query_params or self.request.query_params.get('pagination') == 'cursor':
+            return self._cursor_list(query, ordering, page_size)
+
+        # 缓存预编码的响应体，命中时跳过查询、序列化和渲染
+        return cached_success_response(
+            song_list_cache_key(self.request.query_params),
+            lambda: self._page_data(query, ordering, page_num, page_size),
+            message="获取歌曲列表成功",
+            timeout=600,  # 缓存10分钟
         )
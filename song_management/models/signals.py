@@ -7,7 +7,29 @@ from .song import Song, SongRecord
 from .style import Style, SongStyle
 from .tag import Tag, SongTag
 from .original_work import OriginalWork
-from core.cache import clear_cache_pattern
+from core.cache import clear_cache_pattern, bump_data_version
+
+# 歌曲数据版本命名空间（随机歌曲 ID 数组等版本化缓存使用）
+SONGS_VERSION = 'song_management:songs'
+# 分面位图索引版本命名空间
+FACETS_VERSION = 'song_management:facets'
+# 歌曲相关公开读接口的数据版本命名空间（ETag 使用），任一相关数据变化时递增
+CATALOG_VERSION = 'song_management:catalog'
+CATALOG_MODELS = (Song, SongRecord, Style, SongStyle, Tag, SongTag, OriginalWork)
+
+
+def _apply_facet_change(dimension, instance, value_field, created=True, added=True):
+    """
+    增量更新分面索引；关联记录被修改（非新增）时旧值未知，直接使索引失效
+    """
+    # 延迟导入，避免 models 与 services 循环导入
+    from ..services.facet_service import SongFacetService
+
+    if not created:
+        SongFacetService.invalidate()
+        return
+    value = getattr(instance, value_field).name
+    SongFacetService.apply_change(dimension, value, instance.song_id, added=added)
 
 
 @receiver(post_save, sender=SongRecord)
@@ -62,7 +84,6 @@ def update_song_stats_on_record_save(sender, instance, created, **kwargs):
     clear_cache_pattern(f'song_records:{current_song.id}')  # 清理该歌曲的记录缓存
     clear_cache_pattern(f'song_detail:{current_song.id}')  # 清理该歌曲的详情缓存
     clear_cache_pattern('top_songs')  # 清理排行榜缓存
-    clear_cache_pattern('random_song')  # 清理随机歌曲缓存
     # 清理歌曲列表 API 缓存
     clear_cache_pattern('song_list_api')
 
@@ -91,7 +112,6 @@ def update_song_stats_on_record_delete(sender, instance, **kwargs):
     # 精细化清理缓存：只清理与该歌曲相关的缓存
     clear_cache_pattern(f'song_records:{song.id}')  # 清理该歌曲的记录缓存
     clear_cache_pattern('top_songs')  # 清理排行榜缓存
-    clear_cache_pattern('random_song')  # 清理随机歌曲缓存
     # 清理歌曲列表 API 缓存
     clear_cache_pattern('song_list_api')
 
@@ -103,11 +123,14 @@ def clear_cache_on_song_save(sender, instance, created, **kwargs):
     """
     # 清理该歌曲的详情缓存
     clear_cache_pattern(f'song_detail:{instance.id}')
+    # 随机歌曲 ID 数组失效（新增歌曲或语言可能变化；仅更新统计字段时跳过）
+    update_fields = kwargs.get('update_fields')
+    if created or not update_fields or 'language' in update_fields:
+        bump_data_version(SONGS_VERSION, FACETS_VERSION)
     
     # 如果更新了曲风或标签，也需要清理排行榜缓存
     if not created:
         clear_cache_pattern('top_songs')
-        clear_cache_pattern('random_song')
         # 清理歌曲列表 API 缓存
         clear_cache_pattern('song_list_api')
 
@@ -121,9 +144,9 @@ def clear_cache_on_song_delete(sender, instance, **kwargs):
     clear_cache_pattern(f'song_detail:{instance.id}')
     clear_cache_pattern(f'song_records:{instance.id}')
     
-    # 清理排行榜和随机歌曲缓存
+    # 清理排行榜缓存，随机歌曲 ID 数组和分面索引失效
     clear_cache_pattern('top_songs')
-    clear_cache_pattern('random_song')
+    bump_data_version(SONGS_VERSION, FACETS_VERSION)
     # 清理歌曲列表 API 缓存
     clear_cache_pattern('song_list_api')
 
@@ -141,6 +164,9 @@ def clear_cache_on_song_style_save(sender, instance, created, **kwargs):
     clear_cache_pattern('song_list_api')
     # 清理曲风列表缓存
     clear_cache_pattern('style_list_simple')
+    # 按曲风筛选的随机歌曲 ID 数组失效
+    bump_data_version(SONGS_VERSION)
+    _apply_facet_change('styles', instance, 'style', created=created)
 
 
 @receiver(post_delete, sender=SongStyle)
@@ -156,6 +182,9 @@ def clear_cache_on_song_style_delete(sender, instance, **kwargs):
     clear_cache_pattern('song_list_api')
     # 清理曲风列表缓存
     clear_cache_pattern('style_list_simple')
+    # 按曲风筛选的随机歌曲 ID 数组失效
+    bump_data_version(SONGS_VERSION)
+    _apply_facet_change('styles', instance, 'style', added=False)
 
 
 @receiver(post_save, sender=SongTag)
@@ -171,6 +200,7 @@ def clear_cache_on_song_tag_save(sender, instance, created, **kwargs):
     clear_cache_pattern('song_list_api')
     # 清理标签列表缓存
     clear_cache_pattern('tag_list_simple')
+    _apply_facet_change('tags', instance, 'tag', created=created)
 
 
 @receiver(post_delete, sender=SongTag)
@@ -186,6 +216,17 @@ def clear_cache_on_song_tag_delete(sender, instance, **kwargs):
     clear_cache_pattern('song_list_api')
     # 清理标签列表缓存
     clear_cache_pattern('tag_list_simple')
+    _apply_facet_change('tags', instance, 'tag', added=False)
+
+
+@receiver(post_save, sender=Style)
+@receiver(post_save, sender=Tag)
+def clear_facets_on_name_change(sender, instance, created, **kwargs):
+    """
+    曲风或标签被修改时（可能改名），分面索引失效
+    """
+    if not created:
+        bump_data_version(FACETS_VERSION)
 
 
 @receiver(post_save, sender=OriginalWork)
@@ -203,4 +244,15 @@ def clear_cache_on_original_work_delete(sender, instance, **kwargs):
     当原创作品被删除时，精细化清理缓存
     """
     # 清理原创作品列表缓存
-    clear_cache_pattern('original_works_list')
\ No newline at end of file
+    clear_cache_pattern('original_works_list')
+
+
+def bump_catalog_version(sender, **kwargs):
+    """歌曲、演唱记录、曲风、标签或原创作品变化时递增公开数据版本号"""
+    bump_data_version(CATALOG_VERSION)
+
+
+for catalog_model in CATALOG_MODELS:
+    model_name = catalog_model._meta.model_name
+    post_save.connect(bump_catalog_version, sender=catalog_model, dispatch_uid=f'{CATALOG_VERSION}:{model_name}:save')
+    post_delete.connect(bump_catalog_version, sender=catalog_model, dispatch_uid=f'{CATALOG_VERSION}:{model_name}:delete')
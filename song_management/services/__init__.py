@@ -4,9 +4,11 @@ Song Management 服务层
 from .song_service import SongService
 from .song_record_service import SongRecordService
 from .ranking_service import RankingService
+from .facet_service import SongFacetService
 
 __all__ = [
     'SongService',
     'SongRecordService',
     'RankingService',
+    'SongFacetService',
 ]
\ No newline at end of file
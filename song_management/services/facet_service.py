@@ -0,0 +1,202 @@
+"""
+歌曲分面筛选服务
+
+- 每个 worker 维护一份位图索引：每个曲风、标签、语言对应一个以 Python int 表示的位集，
+  第 i 位表示按 ID 排序后的第 i 首歌曲
+- 筛选条件在同一维度内取并集、不同维度间取交集，全部通过位运算完成，无需多表 JOIN + DISTINCT
+- 分面计数：某一维度的计数只应用其他维度的筛选条件，表示“再勾选该项会得到多少首”
+- 歌曲-曲风/标签关联变化时由信号增量更新本进程索引，其他进程通过版本号检测后重建
+"""
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from core.cache import bump_data_version, get_data_version
+from ..models import Song, SongStyle, SongTag
+from ..models.signals import FACETS_VERSION
+
+FACET_DIMENSIONS = ('languages', 'styles', 'tags')
+
+
+class SongFacetIndex:
+    """歌曲分面位图索引"""
+
+    def __init__(self, song_ids: Iterable[int], version: int = 0):
+        self.song_ids = sorted(song_ids)
+        self.positions = {song_id: index for index, song_id in enumerate(self.song_ids)}
+        self.all_mask = (1 << len(self.song_ids)) - 1
+        self.version = version
+        self.bitsets: Dict[str, Dict[str, int]] = {dimension: {} for dimension in FACET_DIMENSIONS}
+
+    @classmethod
+    def build(cls, version: int = 0) -> 'SongFacetIndex':
+        """从数据库构建索引（三次只读查询，不需要 JOIN）"""
+        songs = list(Song.objects.values_list('id', 'language'))
+        index = cls((song_id for song_id, _ in songs), version)
+
+        for song_id, language in songs:
+            if language:
+                index.set_bit('languages', language, song_id)
+        for song_id, name in SongStyle.objects.values_list('song_id', 'style__name'):
+            index.set_bit('styles', name, song_id)
+        for song_id, name in SongTag.objects.values_list('song_id', 'tag__name'):
+            index.set_bit('tags', name, song_id)
+        return index
+
+    # ==================== 位集维护 ====================
+
+    def set_bit(self, dimension: str, value: str, song_id: int) -> bool:
+        """将歌曲加入某个分面值，歌曲不在索引中时返回 False"""
+        position = self.positions.get(song_id)
+        if position is None:
+            return False
+        bitsets = self.bitsets[dimension]
+        bitsets[value] = bitsets.get(value, 0) | (1 << position)
+        return True
+
+    def clear_bit(self, dimension: str, value: str, song_id: int) -> bool:
+        """将歌曲移出某个分面值，歌曲不在索引中时返回 False"""
+        position = self.positions.get(song_id)
+        if position is None:
+            return False
+        bitsets = self.bitsets[dimension]
+        mask = bitsets.get(value, 0) & ~(1 << position)
+        if mask:
+            bitsets[value] = mask
+        else:
+            bitsets.pop(value, None)
+        return True
+
+    # ==================== 查询 ====================
+
+    def mask_for_ids(self, song_ids: Iterable[int]) -> int:
+        """将歌曲 ID 集合转换为位集"""
+        mask = 0
+        for song_id in song_ids:
+            position = self.positions.get(song_id)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def _dimension_mask(self, dimension: str, values: List[str]) -> int:
+        """维度内多个值取并集；未筛选该维度时返回全集"""
+        if not values:
+            return self.all_mask
+        bitsets = self.bitsets[dimension]
+        mask = 0
+        for value in values:
+            mask |= bitsets.get(value, 0)
+        return mask
+
+    def match(self, selected: Dict[str, List[str]], base_mask: Optional[int] = None) -> int:
+        """
+        计算筛选结果位集
+
+        Args:
+            selected: {维度: 选中的值列表}
+            base_mask: 额外的约束位集（例如关键词搜索命中的歌曲）
+
+        Returns:
+            int: 结果位集
+        """
+        mask = self.all_mask if base_mask is None else base_mask
+        for dimension in FACET_DIMENSIONS:
+            mask &= self._dimension_mask(dimension, selected.get(dimension) or [])
+        return mask
+
+    def ids_from_mask(self, mask: int) -> List[int]:
+        """将位集转换为歌曲 ID 列表（按 ID 升序）"""
+        ids = []
+        data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+        for byte_index, byte in enumerate(data):
+            while byte:
+                low_bit = byte & -byte
+                ids.append(self.song_ids[byte_index * 8 + low_bit.bit_length() - 1])
+                byte ^= low_bit
+        return ids
+
+    def facet_counts(self, selected: Dict[str, List[str]], base_mask: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """
+        计算各维度每个值的命中数量
+
+        某一维度的计数只应用其他维度的筛选条件，使同一维度内的选项可以继续多选。
+
+        Returns:
+            dict: {维度: {值: 数量}}，省略数量为 0 的值
+        """
+        base = self.all_mask if base_mask is None else base_mask
+        counts = {}
+        for dimension in FACET_DIMENSIONS:
+            others = base
+            for other in FACET_DIMENSIONS:
+                if other != dimension:
+                    others &= self._dimension_mask(other, selected.get(other) or [])
+            dimension_counts = {}
+            for value, bits in self.bitsets[dimension].items():
+                count = (bits & others).bit_count()
+                if count:
+                    dimension_counts[value] = count
+            counts[dimension] = dict(sorted(dimension_counts.items()))
+        return counts
+
+
+class SongFacetService:
+    """歌曲分面筛选服务类"""
+
+    _index: Optional[SongFacetIndex] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_index(cls) -> SongFacetIndex:
+        """
+        获取当前 worker 的分面索引，版本号变化时重建
+
+        缓存不可用时版本号恒为 0，每次都会重建，以保证结果正确
+        """
+        version = get_data_version(FACETS_VERSION)
+        index = cls._index
+        if index is not None and version and index.version == version:
+            return index
+
+        with cls._lock:
+            index = cls._index
+            if index is None or not version or index.version != version:
+                index = SongFacetIndex.build(version)
+                cls._index = index
+            return index
+
+    @classmethod
+    def reset(cls):
+        """丢弃当前进程的索引（测试使用）"""
+        with cls._lock:
+            cls._index = None
+
+    @classmethod
+    def invalidate(cls):
+        """递增版本号，所有进程在下次访问时重建索引"""
+        bump_data_version(FACETS_VERSION)
+
+    @classmethod
+    def apply_change(cls, dimension: str, value: str, song_id: int, added: bool):
+        """
+        增量更新分面索引
+
+        本进程索引与递增前的版本一致且版本号恰好加一（期间没有其他进程写入）时，
+        直接修改对应位并采用新版本号；否则只递增版本号，由下次访问时重建。
+        """
+        index = cls._index
+        old_version = get_data_version(FACETS_VERSION)
+        bump_data_version(FACETS_VERSION)
+        new_version = get_data_version(FACETS_VERSION)
+
+        if index is None or not old_version or index.version != old_version or new_version != old_version + 1:
+            return
+
+        with cls._lock:
+            if cls._index is not index:
+                return
+            if added:
+                applied = index.set_bit(dimension, value, song_id)
+            else:
+                applied = index.clear_bit(dimension, value, song_id)
+            if applied:
+                index.version = new_version
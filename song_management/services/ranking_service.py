@@ -3,14 +3,32 @@
 """
 from typing import List
 from datetime import datetime, timedelta
-from django.db.models import Count
+from django.db.models import Count, OuterRef, Subquery
 from core.cache import cache_result
-from ..models import Song
+from core.thumbnail_generator import ThumbnailGenerator
+from ..models import Song, SongRecord
 
 
 class RankingService:
     """排行榜服务类"""
 
+    @staticmethod
+    def with_latest_cover(queryset):
+        """
+        为歌曲查询集附加最新演唱记录的封面（latest_cover 字段）
+
+        使用相关子查询在同一条 SQL 中取出，避免逐首歌曲查询最新记录（N+1）
+        """
+        latest = SongRecord.objects.filter(song=OuterRef('pk')).order_by('-performed_at')
+        return queryset.annotate(latest_cover=Subquery(latest.values('cover_url')[:1]))
+
+    @staticmethod
+    def latest_cover_thumbnail(song):
+        """最新演唱记录封面的缩略图 URL（需先调用 with_latest_cover）"""
+        if not song.latest_cover:
+            return song.latest_cover
+        return ThumbnailGenerator.get_thumbnail_url(song.latest_cover)
+
     @staticmethod
     @cache_result(timeout=300, key_prefix="top_songs")
     def get_top_songs(range_key: str = 'all', limit: int = 10) -> List[dict]:
@@ -51,17 +69,16 @@ class RankingService:
             queryset = queryset.filter(records__performed_at__gte=since)
 
         # 统计演唱次数并排序
-        queryset = queryset.annotate(
+        queryset = RankingService.with_latest_cover(queryset.annotate(
             recent_count=Count('records')
-        ).order_by('-recent_count', '-last_performed')[:limit]
+        )).order_by('-recent_count', '-last_performed')[:limit]
 
         # 构建结果
         result = []
         for song in queryset:
-            # 获取最新演唱记录的封面缩略图
-            latest_record = song.records.order_by('-performed_at').first()
-            cover_url = latest_record.get_cover_thumbnail_url() if latest_record else None
-            
+            # 最新演唱记录的封面缩略图
+            cover_url = RankingService.latest_cover_thumbnail(song)
+
             result.append({
                 'id': song.id,
                 'song_name': song.song_name,
@@ -84,14 +101,13 @@ class RankingService:
         Returns:
             歌曲列表
         """
-        queryset = Song.objects.all().order_by('-perform_count')[:limit]
+        queryset = RankingService.with_latest_cover(Song.objects.all()).order_by('-perform_count')[:limit]
 
         result = []
         for song in queryset:
-            # 获取最新演唱记录的封面缩略图
-            latest_record = song.records.order_by('-performed_at').first()
-            cover_url = latest_record.get_cover_thumbnail_url() if latest_record else None
-            
+            # 最新演唱记录的封面缩略图
+            cover_url = RankingService.latest_cover_thumbnail(song)
+
             result.append({
                 'id': song.id,
                 'song_name': song.song_name,
@@ -114,14 +130,13 @@ class RankingService:
         Returns:
             歌曲列表
         """
-        queryset = Song.objects.all().order_by('-last_performed')[:limit]
+        queryset = RankingService.with_latest_cover(Song.objects.all()).order_by('-last_performed')[:limit]
 
         result = []
         for song in queryset:
-            # 获取最新演唱记录的封面缩略图
-            latest_record = song.records.order_by('-performed_at').first()
-            cover_url = latest_record.get_cover_thumbnail_url() if latest_record else None
-            
+            # 最新演唱记录的封面缩略图
+            cover_url = RankingService.latest_cover_thumbnail(song)
+
             result.append({
                 'id': song.id,
                 'song_name': song.song_name,
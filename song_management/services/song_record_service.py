@@ -1,11 +1,16 @@
 """
 演唱记录服务
 """
-from typing import List
+from typing import Iterable, List, Tuple
 from django.core.paginator import Paginator
 from core.cache import cache_result
 from core.exceptions import SongNotFoundException
-from ..models import Song, SongRecord
+from core.thumbnail_generator import ThumbnailGenerator
+from ..models import Song, SongRecord, SongStyle, SongTag
+
+# 紧凑格式中歌曲头部和演唱记录的字段
+SONG_HEADER_FIELDS = ('id', 'song_name', 'singer', 'language', 'perform_count', 'first_perform', 'last_performed')
+COMPACT_RECORD_FIELDS = ('id', 'performed_at', 'url', 'notes', 'cover_url')
 
 
 class SongRecordService:
@@ -95,4 +100,64 @@ class SongRecordService:
         Returns:
             最新演唱记录，如果没有则返回 None
         """
-        return SongRecord.objects.filter(song_id=song_id).order_by('-performed_at').first()
\ No newline at end of file
+        return SongRecord.objects.filter(song_id=song_id).order_by('-performed_at').first()
+
+    @staticmethod
+    def default_cover_url(performed_at) -> str:
+        """没有封面的记录按演唱日期推导封面路径"""
+        if not performed_at:
+            return "/covers/default.jpg"
+        return f"/covers/{performed_at.strftime('%Y')}/{performed_at.strftime('%m')}/{performed_at.strftime('%Y-%m-%d')}.jpg"
+
+    @staticmethod
+    def get_song_header(song_id: int) -> dict:
+        """
+        获取紧凑格式的歌曲头部（每个响应只发送一次）
+
+        Raises:
+            SongNotFoundException: 歌曲不存在
+        """
+        header = Song.objects.filter(id=song_id).values(*SONG_HEADER_FIELDS).first()
+        if header is None:
+            raise SongNotFoundException(f"歌曲 ID {song_id} 不存在")
+
+        for field in ('first_perform', 'last_performed'):
+            if header[field]:
+                header[field] = header[field].isoformat()
+        header['styles'] = list(
+            SongStyle.objects.filter(song_id=song_id).values_list('style__name', flat=True)
+        )
+        header['tags'] = list(
+            SongTag.objects.filter(song_id=song_id).values_list('tag__name', flat=True)
+        )
+        return header
+
+    @classmethod
+    def compact_records(cls, rows: Iterable[dict]) -> Tuple[List[dict], bool]:
+        """
+        将 values() 查询结果转换为紧凑格式的记录数组，缩略图批量解析
+
+        Args:
+            rows: 包含 COMPACT_RECORD_FIELDS 的字典序列
+
+        Returns:
+            (记录列表（不包含歌曲信息）, 是否有缩略图仍在生成)
+        """
+        rows = list(rows)
+        thumbnails, pending = ThumbnailGenerator.resolve_thumbnail_urls(
+            [row['cover_url'] for row in rows if row['cover_url']]
+        )
+
+        results = []
+        for row in rows:
+            cover_url = row['cover_url']
+            performed_at = row['performed_at']
+            results.append({
+                'id': row['id'],
+                'performed_at': performed_at.isoformat() if performed_at else None,
+                'url': row['url'],
+                'notes': row['notes'],
+                'cover_url': cover_url or cls.default_cover_url(performed_at),
+                'cover_thumbnail_url': thumbnails.get(cover_url, cover_url),
+            })
+        return results, bool(pending)
@@ -6,7 +6,12 @@ from django.db.models import Q
 from django.core.cache import cache
 from core.cache import cache_result
 from core.exceptions import SongNotFoundException, InvalidParameterException
+from core.random_sampler import RandomIdSampler
 from ..models import Song
+from ..models.signals import SONGS_VERSION
+
+# 随机歌曲抽样器，歌曲或曲风关联变化时由信号递增 SONGS_VERSION
+random_song_sampler = RandomIdSampler(SONGS_VERSION)
 
 
 class SongService:
@@ -89,15 +94,28 @@ class SongService:
             raise SongNotFoundException(f"歌曲 ID {song_id} 不存在")
 
     @staticmethod
-    @cache_result(timeout=300, key_prefix="random_song")
-    def get_random_song() -> Optional[Song]:
+    def get_random_song(
+        language: Optional[str] = None,
+        style: Optional[str] = None
+    ) -> Optional[Song]:
         """
         获取随机歌曲
 
+        从按筛选条件缓存的歌曲 ID 数组中均匀抽取，只按主键读取一行
+
+        Args:
+            language: 语言筛选
+            style: 曲风筛选
+
         Returns:
-            随机歌曲，如果没有歌曲则返回 None
+            随机歌曲，如果没有符合条件的歌曲则返回 None
         """
-        return Song.objects.order_by('?').first()
+        queryset = Song.objects.all()
+        if language:
+            queryset = queryset.filter(language=language)
+        if style:
+            queryset = queryset.filter(song_styles__style__name=style)
+        return random_song_sampler.sample(queryset, {'language': language, 'style': style})
 
     @staticmethod
     def get_all_languages() -> List[str]:
@@ -0,0 +1,241 @@
+"""
+Song Management 模块单元测试
+"""
+from datetime import date
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from core.pagination import KeysetPaginator, encode_cursor
+from core.testing import QueryBudgetMixin
+from .models import Song, SongRecord, Style, SongStyle, Tag, SongTag
+from .services import RankingService, SongFacetService
+from .services.facet_service import SongFacetIndex
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SongFacetTests(TestCase):
+    """分面位图索引测试"""
+
+    def setUp(self):
+        cache.clear()
+        SongFacetService.reset()
+        self.pop = Style.objects.create(name='流行')
+        self.rock = Style.objects.create(name='摇滚')
+        self.live = Tag.objects.create(name='现场')
+        self.a = Song.objects.create(song_name='A', language='国语')
+        self.b = Song.objects.create(song_name='B', language='粤语')
+        self.c = Song.objects.create(song_name='C', language='国语')
+        SongStyle.objects.create(song=self.a, style=self.pop)
+        SongStyle.objects.create(song=self.b, style=self.rock)
+        SongStyle.objects.create(song=self.c, style=self.rock)
+        SongTag.objects.create(song=self.c, tag=self.live)
+
+    def test_match_or_within_and_across_dimensions(self):
+        index = SongFacetIndex.build()
+        mask = index.match({'styles': ['流行', '摇滚']})
+        self.assertEqual(index.ids_from_mask(mask), [self.a.id, self.b.id, self.c.id])
+        mask = index.match({'styles': ['摇滚'], 'languages': ['国语']})
+        self.assertEqual(index.ids_from_mask(mask), [self.c.id])
+        self.assertEqual(index.match({'tags': ['不存在']}), 0)
+
+    def test_facet_counts_exclude_own_dimension(self):
+        index = SongFacetIndex.build()
+        counts = index.facet_counts({'styles': ['摇滚']})
+        # 曲风维度的计数不受已选曲风影响
+        self.assertEqual(counts['styles'], {'摇滚': 2, '流行': 1})
+        self.assertEqual(counts['languages'], {'国语': 1, '粤语': 1})
+        self.assertEqual(counts['tags'], {'现场': 1})
+
+    def test_incremental_update_from_signals(self):
+        index = SongFacetService.get_index()
+        SongTag.objects.create(song=self.a, tag=self.live)
+        # 本进程索引被增量更新，无需重建
+        self.assertIs(SongFacetService.get_index(), index)
+        self.assertEqual(index.ids_from_mask(index.match({'tags': ['现场']})), [self.a.id, self.c.id])
+
+        SongStyle.objects.filter(song=self.a).delete()
+        self.assertIs(SongFacetService.get_index(), index)
+        self.assertEqual(index.match({'styles': ['流行']}), 0)
+
+    def test_new_song_triggers_rebuild(self):
+        index = SongFacetService.get_index()
+        Song.objects.create(song_name='D', language='英语')
+        rebuilt = SongFacetService.get_index()
+        self.assertIsNot(rebuilt, index)
+        self.assertEqual(len(rebuilt.song_ids), 4)
+
+    def test_song_list_view_with_facets(self):
+        response = self.client.get('/api/songs/', {'styles': '摇滚', 'tags': '现场', 'facets': '1'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual([song['id'] for song in data['results']], [self.c.id])
+        self.assertEqual(data['facets']['styles'], {'摇滚': 1})
+
+        response = self.client.get('/api/songs/', {'styles': '摇滚,流行'})
+        self.assertEqual(response.json()['data']['total'], 3)
+        self.assertNotIn('facets', response.json()['data'])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class KeysetPaginationTests(TestCase):
+    """游标分页测试"""
+
+    def setUp(self):
+        cache.clear()
+        # 包含重复值和空值，验证 tiebreaker 与空值排序
+        dates = [date(2024, 1, 3), date(2024, 1, 3), None, date(2024, 1, 1), None, date(2024, 1, 2)]
+        self.songs = [
+            Song.objects.create(song_name=f'歌曲{i}', last_performed=d, perform_count=i % 3)
+            for i, d in enumerate(dates)
+        ]
+
+    def _walk(self, ordering, page_size):
+        ids = []
+        cursor = None
+        while True:
+            items, cursor = KeysetPaginator(Song.objects.all(), ordering, page_size).get_page(cursor)
+            ids.extend(song.id for song in items)
+            if cursor is None:
+                return ids
+
+    def test_pages_cover_all_rows_in_order(self):
+        for ordering in ('-last_performed', 'last_performed', '-perform_count', 'singer'):
+            expected = [song.id for song in KeysetPaginator(Song.objects.all(), ordering, 100).get_page()[0]]
+            self.assertEqual(len(expected), len(self.songs))
+            for page_size in (1, 2, 4):
+                self.assertEqual(self._walk(ordering, page_size), expected)
+
+    def test_cursor_bound_to_ordering(self):
+        _, cursor = KeysetPaginator(Song.objects.all(), '-last_performed', 2).get_page()
+        with self.assertRaises(ValueError):
+            KeysetPaginator(Song.objects.all(), 'singer', 2).get_page(cursor)
+
+    def test_song_list_cursor_mode(self):
+        response = self.client.get('/api/songs/', {'pagination': 'cursor', 'limit': 4})
+        data = response.json()['data']
+        self.assertEqual(len(data['results']), 4)
+        self.assertEqual(data['total'], 6)
+
+        response = self.client.get('/api/songs/', {'cursor': data['next_cursor'], 'limit': 4})
+        data = response.json()['data']
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNone(data['next_cursor'])
+
+        response = self.client.get('/api/songs/', {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_tampered_cursor_rejected(self):
+        for payload in (
+            {'o': '-last_performed', 'v': 'not-a-date', 'k': 1},
+            {'o': '-last_performed', 'v': None, 'k': 'abc'},
+            {'o': '-last_performed', 'v': None, 'k': [1]},
+        ):
+            with self.subTest(payload=payload):
+                cursor = encode_cursor(payload)
+                with self.assertRaises(ValueError):
+                    KeysetPaginator(Song.objects.all(), '-last_performed', 2).get_page(cursor)
+                response = self.client.get('/api/songs/', {'cursor': cursor, 'ordering': '-last_performed'})
+                self.assertEqual(response.status_code, 400)
+
+        cursor = encode_cursor({'o': '-performed_at', 'v': 'not-a-date', 'k': 1})
+        response = self.client.get(f'/api/songs/{self.songs[0].id}/records/', {'cursor': cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_record_list_cursor_mode(self):
+        song = self.songs[0]
+        for day in range(1, 4):
+            SongRecord.objects.create(song=song, performed_at=date(2024, 2, day))
+        url = f'/api/songs/{song.id}/records/'
+
+        response = self.client.get(url, {'pagination': 'cursor', 'page_size': 2})
+        data = response.json()['data']
+        self.assertEqual([r['performed_at'] for r in data['results']], ['2024-02-03', '2024-02-02'])
+        self.assertEqual(data['results'][0]['cover_url'], '/covers/2024/02/2024-02-03.jpg')
+
+        response = self.client.get(url, {'cursor': data['next_cursor'], 'page_size': 2})
+        data = response.json()['data']
+        self.assertEqual([r['performed_at'] for r in data['results']], ['2024-02-01'])
+        self.assertIsNone(data['next_cursor'])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SongRecordListTests(TestCase):
+    """演唱记录列表测试"""
+
+    def setUp(self):
+        cache.clear()
+        self.song = Song.objects.create(song_name='晴天', singer='周杰伦', language='国语')
+        SongStyle.objects.create(song=self.song, style=Style.objects.create(name='流行'))
+        SongTag.objects.create(song=self.song, tag=Tag.objects.create(name='现场'))
+        for day in range(1, 21):
+            SongRecord.objects.create(song=self.song, performed_at=date(2024, 3, day))
+        self.url = f'/api/songs/{self.song.id}/records/'
+        cache.clear()
+
+    def test_compact_format_sends_song_once(self):
+        # 歌曲头部 + 曲风 + 标签 + 记录 + COUNT
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url, {'compact': '1', 'page_size': 20})
+        data = response.json()['data']
+        self.assertEqual(data['song']['song_name'], '晴天')
+        self.assertEqual(data['song']['styles'], ['流行'])
+        self.assertEqual(data['song']['tags'], ['现场'])
+        self.assertEqual(data['total'], 20)
+        record = data['results'][0]
+        self.assertNotIn('song', record)
+        self.assertEqual(record['performed_at'], '2024-03-20')
+        self.assertEqual(record['cover_url'], '/covers/2024/03/2024-03-20.jpg')
+
+    def test_pending_thumbnails_cached_briefly(self):
+        from core.thumbnail_generator import ThumbnailGenerator
+        from .api.record_views import SongRecordListView
+
+        SongRecord.objects.filter(song=self.song).update(cover_url='/covers/custom.jpg')
+        for params in ({'page_size': 5}, {'page_size': 5, 'compact': '1'}):
+            for pending, timeout in ((['covers/custom.jpg'], SongRecordListView.PENDING_THUMBNAIL_TIMEOUT),
+                                     ([], SongRecordListView.CACHE_TIMEOUT)):
+                with self.subTest(params=params, pending=pending):
+                    cache.clear()
+                    with mock.patch.object(ThumbnailGenerator, 'resolve_thumbnail_urls', return_value=({}, pending)), \
+                            mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+                        self.client.get(self.url, params)
+                    self.assertEqual(cache_set.call_args.args[2], timeout)
+
+    def test_compact_format_unknown_song(self):
+        response = self.client.get('/api/songs/99999/records/', {'compact': '1'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_nested_format_query_count_is_constant(self):
+        # COUNT + 记录 + 曲风关联/曲风 + 标签关联/标签，与每页记录数无关
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url, {'page_size': 20})
+        data = response.json()['data']
+        self.assertEqual(len(data['results']), 20)
+        self.assertEqual(data['results'][0]['song']['styles'], ['流行'])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RankingQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """排行榜查询预算测试"""
+
+    def setUp(self):
+        cache.clear()
+        for i in range(12):
+            song = Song.objects.create(song_name=f'歌曲{i}')
+            SongRecord.objects.create(song=song, performed_at=date(2024, 1, 1), cover_url=f'/covers/{i}.jpg')
+            SongRecord.objects.create(song=song, performed_at=date(2024, 2, 1), cover_url=f'/covers/{i}b.jpg')
+
+    def test_top_songs_api_within_budget(self):
+        with self.assertQueryBudget(1):
+            response = self.client.get('/api/top_songs/', {'limit': 10})
+        songs = response.json()['data']
+        self.assertEqual(len(songs), 10)
+        self.assertTrue(all('b.jpg' in song['cover_url'] for song in songs))
+
+    def test_ranking_service_within_budget(self):
+        with self.assertQueryBudget(1):
+            songs = RankingService.get_most_performed_songs(limit=10)
+        self.assertTrue(all('b.jpg' in song['cover_url'] for song in songs))
@@ -2,6 +2,8 @@
 URL 配置
 """
 from django.urls import path
+from core.async_support import pick_view
+from .api import async_views
 from .api.views import (
     SongListView,
     SongRecordListView,
@@ -16,15 +18,19 @@ app_name = 'song_management'
 
 urlpatterns = [
     # 歌曲相关
-    path('songs/', SongListView.as_view(), name='song-list'),
-    path('songs/<int:song_id>/records/', SongRecordListView.as_view(), name='song-record-list'),
+    path('songs/', pick_view(SongListView.as_view(), async_views.song_list), name='song-list'),
+    path(
+        'songs/<int:song_id>/records/',
+        pick_view(SongRecordListView.as_view(), async_views.song_record_list),
+        name='song-record-list',
+    ),
 
     # 曲风和标签
     path('styles/', style_list_api, name='style-list'),
     path('tags/', tag_list_api, name='tag-list'),
 
     # 排行榜和随机
-    path('top_songs/', top_songs_api, name='top-songs'),
+    path('top_songs/', pick_view(top_songs_api, async_views.top_songs), name='top-songs'),
     path('random-song/', random_song_api, name='random-song'),
 
     # 原唱作品
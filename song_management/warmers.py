@@ -0,0 +1,51 @@
+"""
+缓存预热任务 - 曲风/标签、排行榜、歌曲列表首页、原唱作品（见 core/cache_warmer.py）
+
+请求参数与前端一致，预热后的缓存键与线上请求相同
+"""
+from urllib.parse import urlencode
+
+from core.cache_warmer import register_warmer, warm_urls
+
+# 排行榜的时间范围与每页数量
+TOP_SONGS_RANGES = ('all', '1m', '3m', '1y', '10d', '20d', '30d')
+TOP_SONGS_LIMITS = (10, 20)
+
+# 歌曲列表首页：各排序方式
+SONG_LIST_ORDERINGS = ('', '-last_performed', 'singer', 'last_performed', 'perform_count', '-perform_count')
+SONG_LIST_PAGE_SIZES = (20, 50)
+
+
+@register_warmer('styles_tags', priority=10, patterns=('style_list_simple', 'tag_list_simple'))
+def warm_styles_tags():
+    """曲风、标签列表"""
+    return warm_urls(['/api/styles/', '/api/tags/'])
+
+
+@register_warmer('top_songs', priority=10)
+def warm_top_songs():
+    """各时间范围的排行榜"""
+    return warm_urls([
+        f'/api/top_songs/?{urlencode({"range": range_key, "limit": limit})}'
+        for range_key in TOP_SONGS_RANGES
+        for limit in TOP_SONGS_LIMITS
+    ])
+
+
+@register_warmer('song_list', priority=20, patterns=('song_list_api',))
+def warm_song_list():
+    """各排序方式的歌曲列表首页"""
+    paths = []
+    for ordering in SONG_LIST_ORDERINGS:
+        for limit in SONG_LIST_PAGE_SIZES:
+            params = {'page': 1, 'limit': limit}
+            if ordering:
+                params['ordering'] = ordering
+            paths.append(f'/api/songs/?{urlencode(params)}')
+    return warm_urls(paths)
+
+
+@register_warmer('original_works', priority=30, patterns=('original_works_list',))
+def warm_original_works():
+    """原唱作品列表"""
+    return warm_urls(['/api/original-works/'])
@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class SonglistConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'songlist'
-    verbose_name = '歌单管理'
\ No newline at end of file
+    verbose_name = '歌单管理'
+
+    def ready(self):
+        # 导入信号处理器
+        from . import signals  # noqa: F401
@@ -0,0 +1,149 @@
+"""
+歌单目录快照 - 合并所有歌手歌曲表的进程内只读快照
+
+- 每个 worker 持有一份快照，行对象使用 __slots__，检索键预先转为小写
+- 预建语言、曲风倒排索引，筛选时从最小的候选集开始求交集
+- 每次访问检查各歌曲表的数据版本号（由 signals 递增），版本变化时重建；
+  缓存不可用时退化为按 CATALOG_MAX_AGE 定期重建
+"""
+import threading
+import time
+
+from core.cache import get_data_version
+from .signals import SONG_MODELS, songs_version
+
+# 缓存不可用（无法读取版本号）时快照的最长使用时间（秒）
+CATALOG_MAX_AGE = 60
+
+SONG_FIELDS = ('id', 'song_name', 'singer', 'language', 'style', 'note')
+
+
+class CatalogSong:
+    """快照中的一首歌曲"""
+
+    __slots__ = SONG_FIELDS + ('search_key',)
+
+    def __init__(self, id, song_name, singer, language, style, note):
+        self.id = id
+        self.song_name = song_name
+        self.singer = singer
+        self.language = language
+        self.style = style
+        self.note = note
+        self.search_key = f"{song_name}\n{singer}".lower()
+
+    def to_dict(self):
+        """转换为接口返回的字典"""
+        return {field: getattr(self, field) for field in SONG_FIELDS}
+
+
+class SongCatalog:
+    """合并歌单快照"""
+
+    def __init__(self, rows, version=None):
+        self.rows = tuple(rows)
+        self.version = version
+        self.built_at = time.monotonic()
+
+        by_language = {}
+        by_style = {}
+        for index, row in enumerate(self.rows):
+            by_language.setdefault(row.language, []).append(index)
+            by_style.setdefault(row.style, []).append(index)
+        self.by_language = {key: tuple(value) for key, value in by_language.items()}
+        self.by_style = {key: tuple(value) for key, value in by_style.items()}
+
+    @classmethod
+    def build(cls, version=None):
+        """从所有歌手歌曲表读取数据构建快照"""
+        rows = []
+        for song_model in SONG_MODELS:
+            rows.extend(
+                CatalogSong(*values)
+                for values in song_model.objects.values_list(*SONG_FIELDS)
+            )
+        return cls(rows, version)
+
+    @property
+    def languages(self):
+        """所有非空语言"""
+        return sorted(language for language in self.by_language if language)
+
+    @property
+    def styles(self):
+        """所有非空曲风"""
+        return sorted(style for style in self.by_style if style)
+
+    def filter(self, language='', style='', search=''):
+        """
+        按语言、曲风和关键词筛选
+
+        Args:
+            language: 语言（精确匹配）
+            style: 曲风（精确匹配）
+            search: 歌名或歌手关键词（不区分大小写）
+
+        Returns:
+            list[CatalogSong]: 按快照顺序排列的匹配歌曲
+        """
+        candidates = []
+        if language:
+            candidates.append(self.by_language.get(language, ()))
+        if style:
+            candidates.append(self.by_style.get(style, ()))
+
+        if candidates:
+            candidates.sort(key=len)
+            indexes = candidates[0]
+            for other in candidates[1:]:
+                other_set = set(other)
+                indexes = [index for index in indexes if index in other_set]
+            rows = [self.rows[index] for index in indexes]
+        else:
+            rows = self.rows
+
+        if search:
+            keyword = search.lower()
+            rows = [row for row in rows if keyword in row.search_key]
+        return list(rows)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def _current_version():
+    return tuple(get_data_version(songs_version(song_model)) for song_model in SONG_MODELS)
+
+
+def _is_fresh(catalog, version):
+    if catalog is None or catalog.version != version:
+        return False
+    # 版本号为 0 表示缓存不可用，无法感知数据变化，按时间过期
+    return all(version) or time.monotonic() - catalog.built_at < CATALOG_MAX_AGE
+
+
+def get_catalog():
+    """
+    获取当前 worker 的歌单快照，数据版本变化时重建
+
+    Returns:
+        SongCatalog
+    """
+    global _catalog
+
+    version = _current_version()
+    if _is_fresh(_catalog, version):
+        return _catalog
+
+    with _catalog_lock:
+        if not _is_fresh(_catalog, version):
+            _catalog = SongCatalog.build(version)
+        return _catalog
+
+
+def reset_catalog():
+    """丢弃当前快照（测试使用）"""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
@@ -0,0 +1,24 @@
+"""
+信号处理器 - 歌曲数据变化时递增版本号，使随机歌曲 ID 数组失效
+"""
+from django.db.models.signals import post_save, post_delete
+
+from core.cache import bump_data_version
+from .models import YouyouSong, BingjieSong
+
+SONG_MODELS = (YouyouSong, BingjieSong)
+
+
+def songs_version(song_model):
+    """歌手歌曲表的版本命名空间"""
+    return f'songlist:{song_model._meta.model_name}'
+
+
+def bump_songs_version(sender, instance, **kwargs):
+    """歌曲被创建、更新或删除时递增该歌手的版本号"""
+    bump_data_version(songs_version(sender))
+
+
+for song_model in SONG_MODELS:
+    post_save.connect(bump_songs_version, sender=song_model, dispatch_uid=f'{songs_version(song_model)}:save')
+    post_delete.connect(bump_songs_version, sender=song_model, dispatch_uid=f'{songs_version(song_model)}:delete')
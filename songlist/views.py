@@ -1,7 +1,10 @@
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.db.models import Q
+from core.random_sampler import RandomIdSampler, sample_across
 from .models import YouyouSong, BingjieSong, YouyouSiteSetting, BingjieSiteSetting
+from .catalog import get_catalog
+from .signals import songs_version
 import json
 import random
 
@@ -33,14 +36,6 @@ def get_artist_model(artist, model_type='song'):
     return None
 
 
-def get_all_songs():
-    """获取所有歌手的歌曲"""
-    all_songs = []
-    for artist_config in ARTIST_CONFIG.values():
-        all_songs.extend(list(artist_config['song_model'].objects.all()))
-    return all_songs
-
-
 def get_all_settings():
     """获取所有歌手的设置"""
     all_settings = []
@@ -77,23 +72,9 @@ def song_list(request):
             songs = songs.values()
             return JsonResponse(list(songs), safe=False)
         else:
-            # 如果没有指定歌手，返回所有数据（合并所有表）
-            songs = get_all_songs()
-            # 应用筛选
-            if language:
-                songs = [s for s in songs if s.language == language]
-            if style:
-                songs = [s for s in songs if s.style == style]
-            if search:
-                songs = [s for s in songs if search.lower() in s.song_name.lower() or search.lower() in s.singer.lower()]
-            return JsonResponse([{
-                'id': s.id,
-                'song_name': s.song_name,
-                'singer': s.singer,
-                'language': s.language,
-                'style': s.style,
-                'note': s.note,
-            } for s in songs], safe=False)
+            # 如果没有指定歌手，从合并歌单快照中筛选
+            songs = get_catalog().filter(language=language, style=style, search=search)
+            return JsonResponse([s.to_dict() for s in songs], safe=False)
 
 
 def language_list(request):
@@ -108,12 +89,8 @@ def language_list(request):
             languages = songs.values_list('language', flat=True).distinct()
             return JsonResponse(list(languages), safe=False)
         else:
-            # 合并所有表的语言
-            all_languages = set()
-            for artist_config in ARTIST_CONFIG.values():
-                languages = set(artist_config['song_model'].objects.exclude(language='').values_list('language', flat=True))
-                all_languages.update(languages)
-            return JsonResponse(list(all_languages), safe=False)
+            # 合并所有表的语言（快照中预建的语言索引）
+            return JsonResponse(get_catalog().languages, safe=False)
 
 
 def style_list(request):
@@ -128,12 +105,40 @@ def style_list(request):
             styles = songs.values_list('style', flat=True).distinct()
             return JsonResponse(list(styles), safe=False)
         else:
-            # 合并所有表的曲风
-            all_styles = set()
-            for artist_config in ARTIST_CONFIG.values():
-                styles = set(artist_config['song_model'].objects.exclude(style='').values_list('style', flat=True))
-                all_styles.update(styles)
-            return JsonResponse(list(all_styles), safe=False)
+            # 合并所有表的曲风（快照中预建的曲风索引）
+            return JsonResponse(get_catalog().styles, safe=False)
+
+
+def _song_data(song):
+    """随机歌曲返回数据"""
+    return {
+        'id': song.id,
+        'song_name': song.song_name,
+        'language': song.language,
+        'singer': song.singer,
+        'style': song.style,
+        'note': song.note,
+    }
+
+
+def _random_by_offset(querysets):
+    """
+    按 COUNT + OFFSET 从多个查询集中均匀抽取一条记录
+
+    用于搜索关键词等取值不可枚举、不适合缓存 ID 数组的筛选条件，
+    只读取被选中的一行，不加载整个结果集。
+    """
+    counts = [qs.count() for qs in querysets]
+    total = sum(counts)
+    if not total:
+        return None
+
+    index = random.randrange(total)
+    for qs, count in zip(querysets, counts):
+        if index < count:
+            return qs.order_by('pk')[index]
+        index -= count
+    return None
 
 
 def random_song(request):
@@ -147,8 +152,24 @@ def random_song(request):
 
         song_model = get_artist_model(artist, 'song')
 
+        if not song_model and search:
+            # 没有指定歌手时，关键词搜索直接在合并歌单快照中进行
+            songs = get_catalog().filter(language=language, style=style, search=search)
+            if not songs:
+                return JsonResponse({'error': 'No songs available.'}, status=404)
+            return JsonResponse(random.choice(songs).to_dict())
+
         if song_model:
-            songs = song_model.objects.all()
+            song_models = [song_model]
+        else:
+            # 没有指定歌手时从所有表中抽取（多个歌手标识可能共用同一张表，需去重）
+            song_models = list(dict.fromkeys(
+                config['song_model'] for config in ARTIST_CONFIG.values()
+            ))
+
+        querysets = []
+        for model in song_models:
+            songs = model.objects.all()
             # 应用筛选条件
             if language:
                 songs = songs.filter(language=language)
@@ -158,89 +179,22 @@ def random_song(request):
                 songs = songs.filter(
                     Q(song_name__icontains=search) | Q(singer__icontains=search)
                 )
+            querysets.append(songs)
 
-            # 如果没有符合条件的歌曲，返回404
-            if not songs.exists():
-                return JsonResponse({'error': 'No songs available.'}, status=404)
-
-            # 随机选择一首歌曲
-            random_song = random.choice(songs)
-
-            # 返回歌曲信息
-            song_data = {
-                'id': random_song.id,
-                'song_name': random_song.song_name,
-                'language': random_song.language,
-                'singer': random_song.singer,
-                'style': random_song.style,
-                'note': random_song.note,
-            }
-
-            return JsonResponse(song_data)
-        else:
-            # 如果没有指定歌手，从所有表中随机选择
-            all_songs = get_all_songs()
-            # 应用筛选
-            if language:
-                all_songs = [s for s in all_songs if s.language == language]
-            if style:
-                all_songs = [s for s in all_songs if s.style == style]
-            if search:
-                all_songs = [s for s in all_songs if search.lower() in s.song_name.lower() or search.lower() in s.singer.lower()]
-
-            if not all_songs:
-                return JsonResponse({'error': 'No songs available.'}, status=404)
-
-            random_song = random.choice(all_songs)
-            song_data = {
-                'id': random_song.id,
-                'song_name': random_song.song_name,
-                'language': random_song.language,
-                'singer': random_song.singer,
-                'style': random_song.style,
-                'note': random_song.note,
-            }
-            return JsonResponse(song_data)
-
-            random_song = random.choice(all_songs)
-            song_data = {
-                'id': random_song.id,
-                'song_name': random_song.song_name,
-                'language': random_song.language,
-                'singer': random_song.singer,
-                'style': random_song.style,
-                'note': random_song.note,
-            }
-            return JsonResponse(song_data)
-
-        # 应用筛选条件
-        if language:
-            songs = songs.filter(language=language)
-        if style:
-            songs = songs.filter(style=style)
         if search:
-            songs = songs.filter(
-                Q(song_name__icontains=search) | Q(singer__icontains=search)
-            )
+            song = _random_by_offset(querysets)
+        else:
+            filters = {'language': language, 'style': style}
+            song = sample_across([
+                (RandomIdSampler(songs_version(qs.model)), qs, filters)
+                for qs in querysets
+            ])
 
         # 如果没有符合条件的歌曲，返回404
-        if not songs.exists():
+        if song is None:
             return JsonResponse({'error': 'No songs available.'}, status=404)
 
-        # 随机选择一首歌曲
-        random_song = random.choice(songs)
-
-        # 返回歌曲信息
-        song_data = {
-            'id': random_song.id,
-            'song_name': random_song.song_name,
-            'language': random_song.language,
-            'singer': random_song.singer,
-            'style': random_song.style,
-            'note': random_song.note,
-        }
-
-        return JsonResponse(song_data)
+        return JsonResponse(_song_data(song))
 
 
 def get_artist_info(request):
@@ -1,76 +1,268 @@
-from locust import HttpUser, task, between
-import random
-import time
-
-class FansHomeUser(HttpUser):
-    wait_time = between(1, 3)  # 基础操作间隔
-
-    @task
-    def user_journey(self):
-        # 1. 歌单页（必访问，多页停留）
-        for _ in range(random.randint(1, 3)):  # 模拟翻页 1-3 次
-            page = random.choices([1, 2, 3, 4, 5], weights=[40, 30, 15, 10, 5])[0]
-            limit = 20
-            ordering = random.choice(["", "singer", "last_performed", "perform_count"])
-            q = random.choice(["","", "周深", "", "林俊杰"])
-            songs_resp = self.client.get(
-                "/api/songs/",
-                params={"page": page, "limit": limit, "ordering": ordering, "q": q},
-                name="songs_list"
-            )
-            time.sleep(random.uniform(1, 2))  # 模拟用户停留
-
-        # 2. 演唱记录（50% 概率，可能点 1-2 次）
-        if random.random() < 0.5 and songs_resp.status_code == 200:
-            results = songs_resp.json().get("results", [])
-            for _ in range(random.randint(1, 2)):
-                if results:
-                    song_id = random.choice(results)["id"]
-                    self.client.get(
-                        f"/api/songs/{song_id}/records/",
-                        name="song_records"
-                    )
-                    time.sleep(random.uniform(1, 2))
-
-        # 3. 热歌榜（必访问，可能切换 1-2 次范围）
-        for _ in range(random.randint(1, 2)):
-            range_choice = random.choices(
-                ["all", "1m", "3m", "1y"],
-                weights=[20, 40, 30, 10]
-            )[0]
-            self.client.get(
-                "/api/top_songs/",
-                params={"range": range_choice, "limit": 20},
-                name="top_songs"
-            )
-            time.sleep(random.uniform(1, 2))
-
-        # 4. 合集列表（60% 概率，翻页 1-2 次）
-        if random.random() < 0.6:
-            for _ in range(random.randint(1, 2)):
-                collections_resp = self.client.get(
-                    "/api/footprint/collections/",
-                    params={"page": random.randint(1, 3), "limit": 20},
-                    name="collections"
-                )
-                time.sleep(random.uniform(1, 2))
-
-            # 5. 合集详情（50% 概率）
-            if random.random() < 0.5 and collections_resp.status_code == 200:
-                collections = collections_resp.json().get("results", [])
-                if collections:
-                    collection_id = random.choice(collections)["id"]
-                    self.client.get(
-                        f"/api/footprint/collections/{collection_id}/",
-                        name="collection_detail"
-                    )
-                    time.sleep(random.uniform(1, 2))
-
-                    # 6. 作品列表（进入合集详情后，70% 概率再点作品）
-                    if random.random() < 0.7:
-                        self.client.get(
-                            "/api/footprint/works/",
-                            params={"collection": collection_id, "limit": 10},
-                            name="collection_works"
-                        )
-                        time.sleep(random.uniform(1, 2))
+"""
+全站压测脚本
+
+覆盖所有公开 API，按真实访问比例为各页面的用户旅程分配权重：
+歌单（含演唱记录、热歌榜、随机歌曲）> 直播日历 / 图集 > 二创合集 > 数据分析 / 独立歌单 / 站点设置。
+
+本地压测（推荐，数据可复现）:
+    python -m tools.benchmark.seed /tmp/xxm-loadtest         # 生成数据并输出启动服务器的命令
+    cd test && LOCUST_DATASET=/tmp/xxm-loadtest/dataset.json locust -f Locustfile.py --config locust.local.conf
+
+线上压测使用 locust.conf（注意控制并发）。两次结果的对比见 compare_locust.py。
+"""
+import json
+import os
+import random
+import time
+from datetime import date
+
+from locust import HttpUser, task, between
+
+
+def _load_dataset():
+    """读取 seed 命令生成的数据集摘要（可选），用于选取必然命中数据的参数"""
+    path = os.environ.get('LOCUST_DATASET')
+    if not path:
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+DATASET = _load_dataset()
+TODAY = date.today()
+MONTH = tuple(DATASET.get('month') or (TODAY.year, TODAY.month))
+PLATFORM = DATASET.get('platform', 'bilibili')
+
+SEARCH_TERMS = ["", "", "", "周深", "林俊杰", "歌曲0"]
+ORDERINGS = ["", "singer", "last_performed", "perform_count", "-perform_count"]
+LANGUAGES = ["", "", "国语", "粤语", "英语"]
+ARTISTS = ["youyou", "bingjie"]
+
+
+def _data(response):
+    """从统一响应格式中取出 data，失败时返回 None"""
+    if response.status_code != 200:
+        return None
+    try:
+        return response.json().get("data")
+    except ValueError:
+        return None
+
+
+def _results(response):
+    data = _data(response)
+    if isinstance(data, dict):
+        return data.get("results") or []
+    return data or []
+
+
+def _previous_month(year, month):
+    return (year - 1, 12) if month == 1 else (year, month - 1)
+
+
+class FansHomeUser(HttpUser):
+    wait_time = between(1, 3)  # 旅程之间的间隔
+
+    def think(self, low=1, high=2):
+        """模拟用户停留"""
+        time.sleep(random.uniform(low, high))
+
+    def on_start(self):
+        # 首页加载：站点设置、推荐语、曲风标签（前端首屏并发请求）
+        self.client.get("/api/site-settings/settings/", name="site_settings")
+        self.client.get("/api/site-settings/recommendations/", name="recommendations")
+        self.client.get("/api/styles/", name="styles")
+        self.client.get("/api/tags/", name="tags")
+
+    @task(10)
+    def song_list_journey(self):
+        """歌单页：翻页、搜索、筛选，部分用户查看演唱记录"""
+        songs_resp = None
+        for _ in range(random.randint(1, 3)):  # 模拟翻页 1-3 次
+            page = random.choices([1, 2, 3, 4, 5], weights=[40, 30, 15, 10, 5])[0]
+            params = {
+                "page": page,
+                "limit": 20,
+                "ordering": random.choice(ORDERINGS),
+                "q": random.choice(SEARCH_TERMS),
+                "language": random.choice(LANGUAGES),
+            }
+            if random.random() < 0.2:
+                params["styles"] = random.choice(["流行", "摇滚", "民谣,古风"])
+            songs_resp = self.client.get("/api/songs/", params=params, name="songs_list")
+            self.think()
+
+        # 演唱记录（50% 概率，可能点 1-2 次，部分翻页）
+        results = _results(songs_resp) if songs_resp is not None else []
+        if results and random.random() < 0.5:
+            for _ in range(random.randint(1, 2)):
+                song_id = random.choice(results)["id"]
+                self.client.get(
+                    f"/api/songs/{song_id}/records/",
+                    params={"page": random.choices([1, 2], weights=[80, 20])[0], "page_size": 20},
+                    name="song_records",
+                )
+                self.think()
+
+    @task(5)
+    def top_songs_journey(self):
+        """热歌榜：切换 1-2 次时间范围"""
+        for _ in range(random.randint(1, 2)):
+            range_choice = random.choices(["all", "1m", "3m", "1y"], weights=[20, 40, 30, 10])[0]
+            self.client.get("/api/top_songs/", params={"range": range_choice, "limit": 20}, name="top_songs")
+            self.think()
+
+    @task(3)
+    def random_song_journey(self):
+        """随机点歌：连续点 1-3 次"""
+        for _ in range(random.randint(1, 3)):
+            self.client.get("/api/random-song/", name="random_song")
+            self.think(0.5, 1.5)
+        if random.random() < 0.3:
+            self.client.get("/api/original-works/", name="original_works")
+
+    @task(4)
+    def livestream_journey(self):
+        """直播日历：本月，部分用户翻到上个月并查看某天详情"""
+        self.client.get("/api/livestreams/config/", name="livestream_config")
+        year, month = MONTH
+        response = self.client.get(
+            "/api/livestreams/", params={"year": year, "month": month}, name="livestream_month"
+        )
+        self.think()
+
+        if random.random() < 0.4:
+            year, month = _previous_month(year, month)
+            response = self.client.get(
+                "/api/livestreams/", params={"year": year, "month": month}, name="livestream_month"
+            )
+            self.think()
+
+        days = _data(response) or []
+        if days and random.random() < 0.6:
+            day = random.choice(days)
+            self.client.get(f"/api/livestreams/{day['date']}/", name="livestream_detail")
+            self.think()
+
+    @task(4)
+    def gallery_journey(self):
+        """图集：图集树 -> 父图集的子图集预览 -> 叶子图集分页浏览"""
+        tree = _data(self.client.get("/api/gallery/tree/", name="gallery_tree")) or []
+        self.think()
+
+        parents, leaves = [], []
+        stack = list(tree)
+        while stack:
+            node = stack.pop()
+            children = node.get("children") or []
+            (parents if children else leaves).append(node)
+            stack.extend(children)
+
+        if parents and random.random() < 0.5:
+            parent = random.choice(parents)
+            self.client.get(
+                f"/api/gallery/{parent['id']}/children-images/",
+                params={"limit": 6, "images_limit": 10},
+                name="gallery_children_images",
+            )
+            self.think()
+
+        if leaves:
+            leaf = random.choice(leaves)
+            self.client.get(f"/api/gallery/{leaf['id']}/", name="gallery_detail")
+            cursor = None
+            for _ in range(random.randint(1, 3)):  # 滚动加载 1-3 屏
+                params = {"limit": 30}
+                if cursor:
+                    params["cursor"] = cursor
+                data = _data(self.client.get(
+                    f"/api/gallery/{leaf['id']}/images/", params=params, name="gallery_images"
+                )) or {}
+                cursor = data.get("next_cursor")
+                self.think()
+                if not cursor:
+                    break
+
+    @task(3)
+    def fansdiy_journey(self):
+        """二创合集：列表翻页 -> 合集详情 -> 作品列表 -> 作品详情"""
+        collections_resp = None
+        for _ in range(random.randint(1, 2)):
+            collections_resp = self.client.get(
+                "/api/fansDIY/collections/",
+                params={"page": random.randint(1, 3), "limit": 20},
+                name="collections",
+            )
+            self.think()
+
+        collections = _results(collections_resp) if collections_resp is not None else []
+        if collections and random.random() < 0.5:
+            collection_id = random.choice(collections)["id"]
+            self.client.get(f"/api/fansDIY/collections/{collection_id}/", name="collection_detail")
+            self.think()
+
+            if random.random() < 0.7:
+                works = _results(self.client.get(
+                    "/api/fansDIY/works/",
+                    params={"collection": collection_id, "limit": 10},
+                    name="collection_works",
+                ))
+                self.think()
+                if works and random.random() < 0.5:
+                    self.client.get(f"/api/fansDIY/works/{random.choice(works)['id']}/", name="work_detail")
+                    self.think()
+
+    @task(2)
+    def data_analytics_journey(self):
+        """数据分析页：粉丝趋势、投稿统计、平台数据"""
+        self.client.get("/api/data-analytics/followers/accounts/", name="follower_accounts")
+        granularity, days = random.choice([("DAY", 1), ("WEEK", 7), ("MONTH", 30)])
+        self.client.get(
+            "/api/data-analytics/followers/accounts/data/",
+            params={"granularity": granularity, "days": days},
+            name="follower_accounts_data",
+        )
+        self.think()
+
+        self.client.get("/api/data-analytics/submissions/years/", name="submission_years")
+        self.client.get(
+            "/api/data-analytics/submissions/monthly/", params={"year": MONTH[0]}, name="submission_monthly"
+        )
+        self.think()
+
+        if random.random() < 0.5:
+            self.client.get(f"/api/data-analytics/platform/{PLATFORM}/statistics/", name="platform_statistics")
+            works = _data(self.client.get(
+                f"/api/data-analytics/platform/{PLATFORM}/top-works/",
+                params={"limit": 10},
+                name="top_works",
+            )) or []
+            self.think()
+            if works:
+                work_id = random.choice(works)["work_id"]
+                self.client.get(
+                    f"/api/data-analytics/works/{PLATFORM}/{work_id}/metrics/summary/",
+                    name="work_metrics_summary",
+                )
+                self.think()
+
+    @task(2)
+    def songlist_journey(self):
+        """独立歌单站（乐游 / 冰洁）：首屏配置 + 歌曲列表 + 随机歌曲"""
+        artist = random.choice(ARTISTS)
+        params = {"artist": artist}
+        self.client.get("/api/songlist/artist-info/", params=params, name="songlist_artist_info")
+        self.client.get("/api/songlist/site-settings/", params=params, name="songlist_site_settings")
+        self.client.get("/api/songlist/languages/", params=params, name="songlist_languages")
+        self.client.get("/api/songlist/styles/", params=params, name="songlist_styles")
+        self.client.get("/api/songlist/songs/", params=params, name="songlist_songs")
+        self.think()
+        for _ in range(random.randint(0, 2)):
+            self.client.get("/api/songlist/random-song/", params=params, name="songlist_random_song")
+            self.think(0.5, 1.5)
+
+    @task(1)
+    def about_journey(self):
+        """关于页：里程碑"""
+        self.client.get("/api/site-settings/milestones/", name="milestones")
+        self.think()
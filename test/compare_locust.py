@@ -0,0 +1,123 @@
+"""
+对比两次 Locust 压测结果
+
+用法:
+    python compare_locust.py before_stats.csv after_stats.csv
+    python compare_locust.py before_stats.csv after_stats.csv --output report.md --threshold 10
+
+按接口（Locust 的 name）对比 p50 / p95 / p99 响应时间、RPS 和失败率，输出 Markdown 表格；
+任一接口的 p95 变慢超过 --threshold 百分比时退出码为 1，便于在脚本中判断。
+"""
+import argparse
+import csv
+import sys
+
+METRICS = (
+    # (列名, 显示名, 越大越好, 格式)
+    ("50%", "p50 (ms)", False, "{:g}"),
+    ("95%", "p95 (ms)", False, "{:g}"),
+    ("99%", "p99 (ms)", False, "{:g}"),
+    ("Requests/s", "RPS", True, "{:.1f}"),
+)
+
+
+def load_stats(path):
+    """读取 *_stats.csv，返回 {接口名: 行}（汇总行名为 Aggregated）"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["Name"]: row for row in csv.DictReader(f)}
+
+
+def _number(row, column):
+    try:
+        return float(row[column])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _failure_rate(row):
+    requests = _number(row, "Request Count") or 0
+    failures = _number(row, "Failure Count") or 0
+    return failures / requests * 100 if requests else 0.0
+
+
+def _change(before, after):
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def _format_change(change, higher_is_better):
+    if change is None:
+        return "-"
+    marker = ""
+    if abs(change) >= 5:
+        improved = change > 0 if higher_is_better else change < 0
+        marker = " ✅" if improved else " ⚠️"
+    return f"{change:+.1f}%{marker}"
+
+
+def compare(before, after, threshold):
+    """
+    生成对比报告
+
+    Returns:
+        tuple: (Markdown 文本, 回退的接口列表)
+    """
+    names = sorted(set(before) | set(after), key=lambda name: (name == "Aggregated", name))
+    header = ["接口"]
+    for _, label, _, _ in METRICS:
+        header += [label, "变化"]
+    header += ["失败率"]
+
+    lines = [
+        "| " + " | ".join(header) + " |",
+        "|" + "---|" * len(header),
+    ]
+    regressions = []
+    for name in names:
+        old, new = before.get(name), after.get(name)
+        if old is None or new is None:
+            status = "仅在新结果中" if old is None else "仅在旧结果中"
+            lines.append(f"| {name} | {status} |" + " |" * (len(header) - 2))
+            continue
+
+        cells = [f"**{name}**" if name == "Aggregated" else name]
+        for column, _, higher_is_better, fmt in METRICS:
+            old_value, new_value = _number(old, column), _number(new, column)
+            change = _change(old_value, new_value)
+            cells += [
+                f"{fmt.format(old_value)} → {fmt.format(new_value)}" if None not in (old_value, new_value) else "-",
+                _format_change(change, higher_is_better),
+            ]
+            if column == "95%" and change is not None and change > threshold:
+                regressions.append((name, old_value, new_value, change))
+        cells.append(f"{_failure_rate(old):.1f}% → {_failure_rate(new):.1f}%")
+        lines.append("| " + " | ".join(cells) + " |")
+
+    if regressions:
+        lines += ["", f"p95 回退超过 {threshold:g}% 的接口:"]
+        lines += [f"- {name}: {old:g} ms → {new:g} ms ({change:+.1f}%)" for name, old, new, change in regressions]
+    return "\n".join(lines), regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="对比两次 Locust 压测结果")
+    parser.add_argument("before", help="基准结果（*_stats.csv）")
+    parser.add_argument("after", help="新结果（*_stats.csv）")
+    parser.add_argument("--output", help="将报告写入文件（Markdown）")
+    parser.add_argument("--threshold", type=float, default=10.0, help="允许的 p95 回退百分比")
+    args = parser.parse_args(argv)
+
+    report, regressions = compare(load_stats(args.before), load_stats(args.after), args.threshold)
+    report = f"# 压测结果对比\n\n- 基准: {args.before}\n- 新结果: {args.after}\n\n{report}\n"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"✅ 报告已生成: {args.output}")
+    else:
+        print(report)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
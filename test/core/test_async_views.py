@@ -0,0 +1,127 @@
+"""
+异步读接口测试
+"""
+import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+
+from core import async_views, local_cache as local_cache_module, metrics as metrics_module
+from core.async_support import run_sync
+from core.cache import bump_data_version
+from core.cache_middleware import DataVersionETagMiddleware
+from core.renderers import dumps
+from core.responses import cached_success_response
+from core.sqlite import _read_only, read_only_routing
+from song_management.api import async_views as song_async_views
+from song_management.api.other_views import top_songs_api
+from song_management.api.record_views import song_records_cache_key
+from song_management.api.song_views import song_list_cache_key
+from song_management.models import Song
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class _CacheTestMixin:
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(local_cache_module, '_down_until', 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, LOCAL_CACHE_CONFIG={'PREFIXES': {}})
+class AsyncCacheHitTest(_CacheTestMixin, SimpleTestCase):
+    """缓存命中时不进入同步视图"""
+
+    async def test_song_list_served_from_cache(self):
+        request = AsyncRequestFactory().get('/api/songs/', {'page': 2, 'styles': '流行'})
+        expected = await run_sync(
+            cached_success_response, song_list_cache_key(request.GET), lambda: {'results': []}, '获取歌曲列表成功'
+        )
+
+        with mock.patch.object(async_views, 'run_sync_view') as run_sync_view:
+            response = await song_async_views.song_list(request)
+
+        run_sync_view.assert_not_called()
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response.encoded_variants, expected.encoded_variants)
+
+    async def test_cursor_mode_delegates_to_sync_view(self):
+        request = AsyncRequestFactory().get('/api/songs/', {'cursor': ''})
+        with mock.patch.object(async_views, 'run_sync_view', return_value=HttpResponse()) as run_sync_view:
+            await song_async_views.song_list(request)
+        run_sync_view.assert_called_once()
+
+    async def test_song_records_served_from_cache(self):
+        request = AsyncRequestFactory().get('/api/songs/3/records/', {'compact': '1'})
+        data = {'song': {'id': 3}, 'results': [], 'total': 0, 'page': 1, 'page_size': 20}
+        await run_sync(cache.set, song_records_cache_key(request.GET, 3), data, 60)
+
+        response = await song_async_views.song_record_list(request, song_id=3)
+
+        self.assertEqual(
+            response.content,
+            dumps({'code': 200, 'message': '获取演唱记录成功（缓存）', 'data': data}),
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE, LOCAL_CACHE_CONFIG={'PREFIXES': {}})
+class AsyncMiddlewareTest(_CacheTestMixin, SimpleTestCase):
+    """中间件的异步调用链"""
+
+    async def test_etag_not_modified_without_calling_view(self):
+        async def view(request):
+            raise AssertionError('view should not run')
+
+        await run_sync(bump_data_version, 'site_settings')
+        middleware = DataVersionETagMiddleware(view)
+        request = AsyncRequestFactory().get('/api/site-settings/')
+        etag = middleware.compute_etag(request, [await run_sync(cache.get, 'version:site_settings')])
+
+        response = await middleware(AsyncRequestFactory().get('/api/site-settings/', headers={'If-None-Match': etag}))
+
+        self.assertEqual(response.status_code, 304)
+
+    async def test_run_sync_propagates_request_context(self):
+        with read_only_routing():
+            self.assertTrue(await run_sync(_read_only.get))
+        self.assertFalse(await run_sync(_read_only.get))
+
+
+@override_settings(CACHES=LOCMEM_CACHE, LOCAL_CACHE_CONFIG={'PREFIXES': {}})
+class AsyncCacheMissTest(_CacheTestMixin, TransactionTestCase):
+    """缓存未命中时在线程池中执行同步视图"""
+
+    def setUp(self):
+        super().setUp()
+        Song.objects.create(song_name='测试', singer='歌手', last_performed=datetime.date(2024, 5, 1), perform_count=2)
+
+    async def test_top_songs_matches_sync_view(self):
+        request = AsyncRequestFactory().get('/api/top_songs/', {'limit': 5})
+
+        response = await song_async_views.top_songs(request)
+        with mock.patch.object(async_views, 'run_sync_view') as run_sync_view:
+            cached = await song_async_views.top_songs(request)
+
+        run_sync_view.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(cached.content, response.content)
+        await run_sync(cache.clear)
+        sync_response = await run_sync(top_songs_api, RequestFactory().get('/api/top_songs/', {'limit': 5}))
+        self.assertEqual(sync_response.content, response.content)
+
+    async def test_worker_queries_counted_for_request(self):
+        timer = metrics_module._QueryTimer()
+        token = metrics_module._current_timer.set(timer)
+        try:
+            # 第一次调用打开连接（连接初始化的 PRAGMA 也会计入），只比较之后的查询
+            await run_sync(Song.objects.count)
+            before = timer.count
+            await run_sync(lambda: list(Song.objects.all()))
+        finally:
+            metrics_module._current_timer.reset(token)
+        self.assertEqual(timer.count - before, 1)
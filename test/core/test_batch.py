@@ -0,0 +1,81 @@
+"""
+批量请求接口与请求级缓存测试
+"""
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from core import cache as cache_module, local_cache as local_cache_module
+from core.cache import bump_data_version, get_data_version
+from core.request_cache import request_cache_scope
+from song_management.models import Style
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RequestCacheTest(SimpleTestCase):
+    """请求级缓存作用域"""
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(local_cache_module, '_down_until', 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lookups_shared_within_scope(self):
+        get_data_version('catalog')
+        with mock.patch.object(cache_module.cache, 'get', wraps=cache_module.cache.get) as cache_get:
+            with request_cache_scope():
+                first = get_data_version('catalog')
+                self.assertEqual(get_data_version('catalog'), first)
+            self.assertEqual(cache_get.call_count, 1)
+
+            get_data_version('catalog')
+            self.assertEqual(cache_get.call_count, 2)
+
+    def test_bump_clears_scope(self):
+        with request_cache_scope():
+            first = get_data_version('catalog')
+            bump_data_version('catalog')
+            self.assertEqual(get_data_version('catalog'), first + 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, LOCAL_CACHE_CONFIG={'PREFIXES': {}})
+class BatchViewTest(TransactionTestCase):
+    """批量接口"""
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(local_cache_module, '_down_until', 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        Style.objects.create(name='流行')
+
+    def post(self, requests):
+        return self.client.post('/api/batch/', {'requests': requests}, content_type='application/json')
+
+    def test_sub_responses_combined_in_order(self):
+        response = self.post([{'id': 'styles', 'path': '/api/styles/'}, '/api/tags/', '/api/missing/'])
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['data']['responses']
+        self.assertEqual([(r['id'], r['status']) for r in results], [
+            ('styles', 200), ('/api/tags/', 200), ('/api/missing/', 404),
+        ])
+        self.assertEqual(results[0]['body'], self.client.get('/api/styles/').json())
+        self.assertIsNone(results[2]['body'])
+
+    def test_get_with_repeated_path(self):
+        response = self.client.get('/api/batch/', {'path': ['/api/styles/']})
+        body = json.loads(response.content)
+        self.assertEqual(body['data']['responses'][0]['body']['data'], ['流行'])
+
+    @override_settings(BATCH_CONFIG={'MAX_REQUESTS': 2})
+    def test_invalid_requests_rejected(self):
+        for requests in ([], ['/api/styles/'] * 3, ['/admin/'], ['/api/batch/?path=/api/styles/']):
+            with self.subTest(requests=requests):
+                self.assertEqual(self.post(requests).status_code, 400)
@@ -0,0 +1,92 @@
+"""
+缓存值编解码与缓存清除方法测试
+"""
+import datetime
+import decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core import cache_codec
+from core.cache import cache_result
+from core.cache_utils import cached
+from song_management.models import Song
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class CacheCodecTest(SimpleTestCase):
+    """编解码测试"""
+
+    def test_plain_values_use_json(self):
+        value = {'songs': [{'id': 1, 'name': '歌'}], 'total': 1}
+        data = cache_codec.encode(value)
+        self.assertEqual(data[0], cache_codec.FORMAT_JSON)
+        self.assertEqual(cache_codec.decode(data), value)
+
+    def test_typed_values_restored(self):
+        value = {
+            'at': datetime.datetime(2024, 5, 1, 20, 30, tzinfo=datetime.timezone.utc),
+            'day': datetime.date(2024, 5, 1),
+            'price': decimal.Decimal('1.50'),
+        }
+        self.assertEqual(cache_codec.decode(cache_codec.encode(value)), value)
+
+    def test_model_instance_projection(self):
+        song = Song(id=7, song_name='测试', language='国语', first_perform=datetime.date(2020, 1, 2), perform_count=3)
+        song._state.db = 'default'
+        song._state.adding = False
+
+        restored = cache_codec.decode(cache_codec.encode([song]))[0]
+
+        self.assertIsInstance(restored, Song)
+        self.assertEqual((restored.pk, restored.song_name, restored.first_perform), (7, '测试', datetime.date(2020, 1, 2)))
+        self.assertEqual(restored._state.db, 'default')
+        self.assertFalse(restored._state.adding)
+
+    def test_large_values_compressed(self):
+        value = [{'name': 'song', 'language': '国语'}] * 500
+        data = cache_codec.encode(value)
+        self.assertTrue(data[0] & cache_codec.FLAG_ZLIB)
+        self.assertEqual(cache_codec.decode(data), value)
+
+    def test_unsupported_values_fall_back_to_pickle(self):
+        value = {1: 'int key'}
+        data = cache_codec.encode(value)
+        self.assertEqual(data[0], cache_codec.FORMAT_PICKLE)
+        self.assertEqual(cache_codec.decode(data), value)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, LOCAL_CACHE_CONFIG={'PREFIXES': {'codec_test': 60}})
+class CacheClearTest(SimpleTestCase):
+    """invalidate / cache_clear 测试"""
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def test_cache_result_invalidate_and_cache_clear(self):
+        @cache_result(timeout=300, key_prefix='codec_test')
+        def load(song_id):
+            self.calls += 1
+            return {'id': song_id, 'calls': self.calls}
+
+        load(1), load(2)
+        load.invalidate(1)
+        self.assertEqual(load(1)['calls'], 3)
+        self.assertEqual(load(2)['calls'], 2)
+
+        load.cache_clear()
+        self.assertEqual(load(1)['calls'], 4)
+        self.assertEqual(load(2)['calls'], 5)
+
+    def test_cached_cache_clear(self):
+        @cached(timeout=300, key_prefix='codec_cached')
+        def load():
+            self.calls += 1
+            return self.calls
+
+        load()
+        load.cache_clear()
+        self.assertEqual(load(), 2)
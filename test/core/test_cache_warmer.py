@@ -0,0 +1,84 @@
+"""
+缓存预热测试
+"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core import cache_warmer
+from core.cache import clear_cache_pattern
+from core.cache_warmer import get_warmers, register_warmer, run_warmers, schedule_warmup, warm_urls
+from song_management.models import Style
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class WarmerRegistryTest(SimpleTestCase):
+    """注册、排序与自动预热测试"""
+
+    def setUp(self):
+        # 使用空的注册表，不导入各应用的 warmers 模块
+        for target, value in (('_registry', {}), ('_discovered', True), ('_pending', set())):
+            patcher = mock.patch.object(cache_warmer, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.calls = []
+
+        for name, priority, patterns in (('lists', 20, ('song_list_api',)), ('top', 10, ()), ('tags', 10, ())):
+            register_warmer(name, priority=priority, patterns=patterns)(self._recorder(name))
+
+    def _recorder(self, name):
+        def warm():
+            """测试任务"""
+            self.calls.append(name)
+            return 1
+        return warm
+
+    def test_priority_order(self):
+        self.assertEqual([warmer.name for warmer in get_warmers()], ['tags', 'top', 'lists'])
+        self.assertEqual([warmer.name for warmer in get_warmers(pattern='song_list_api:1')], ['lists'])
+        with self.assertRaises(KeyError):
+            get_warmers(names=['missing'])
+
+    def test_failures_reported_without_stopping_later_groups(self):
+        @register_warmer('broken', priority=10)
+        def broken():
+            raise ValueError('boom')
+
+        results = run_warmers(get_warmers(), concurrency=2)
+
+        self.assertEqual([result.name for result in results], ['broken', 'tags', 'top', 'lists'])
+        self.assertEqual(results[0].error, 'boom')
+        self.assertEqual(self.calls[-1], 'lists')
+        self.assertCountEqual(self.calls[:2], ['tags', 'top'])
+
+    @override_settings(CACHES=LOCMEM_CACHE, CACHE_WARMER_CONFIG={'AUTO': True, 'DELAY': 60, 'CONCURRENCY': 1})
+    def test_invalidation_schedules_matching_warmers(self):
+        clear_cache_pattern('song_list_api')
+        clear_cache_pattern('top')
+        timer = cache_warmer._timer
+        self.addCleanup(setattr, cache_warmer, '_timer', None)
+        timer.cancel()
+
+        # 多次失效合并为一次
+        self.assertEqual(cache_warmer._pending, {'lists', 'top'})
+        cache_warmer.run_pending()
+        self.assertEqual(self.calls, ['top', 'lists'])
+
+    def test_auto_warming_disabled_by_default(self):
+        self.assertFalse(schedule_warmup('song_list_api'))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class WarmUrlsTest(TestCase):
+    """进程内请求预热测试"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_view_cache_populated(self):
+        Style.objects.create(name='流行')
+        self.assertEqual(warm_urls(['/api/styles/']), 1)
+        self.assertIsNotNone(cache.get('style_list_simple:json'))
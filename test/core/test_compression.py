@@ -0,0 +1,89 @@
+"""
+预压缩响应测试
+"""
+import gzip
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.core.cache import cache
+from core import compression
+from core.compression import CompressionMiddleware, compress_variants, negotiate_encoding, parse_accept_encoding
+from song_management.models import Style
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class NegotiationTest(TestCase):
+    """Accept-Encoding 协商测试"""
+
+    def test_parse_qvalues(self):
+        self.assertEqual(
+            parse_accept_encoding('gzip;q=0.5, br, identity;q=0'),
+            {'gzip': 0.5, 'br': 1.0, 'identity': 0.0}
+        )
+
+    def test_prefers_brotli_when_available(self):
+        self.assertEqual(negotiate_encoding('gzip, deflate, br', {'gzip', 'br'}), 'br')
+        self.assertEqual(negotiate_encoding('gzip, deflate, br', {'gzip'}), 'gzip')
+
+    def test_respects_client_quality(self):
+        self.assertEqual(negotiate_encoding('br;q=0.1, gzip', {'gzip', 'br'}), 'gzip')
+        self.assertEqual(negotiate_encoding('gzip;q=0', {'gzip'}), 'identity')
+        self.assertEqual(negotiate_encoding('', {'gzip', 'br'}), 'identity')
+        self.assertEqual(negotiate_encoding('*', {'gzip'}), 'gzip')
+
+    def test_small_body_not_compressed(self):
+        self.assertEqual(list(compress_variants(b'{}')), ['identity'])
+
+    def test_variants_roundtrip(self):
+        body = b'{"data":"' + b'x' * 2000 + b'"}'
+        variants = compress_variants(body)
+        self.assertEqual(gzip.decompress(variants['gzip']), body)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PrecompressedResponseTest(TestCase):
+    """缓存响应的预压缩变体测试"""
+
+    def setUp(self):
+        cache.clear()
+        Style.objects.bulk_create(Style(name=f'曲风{i:03d}') for i in range(100))
+
+    def test_cached_variant_served_without_compressing(self):
+        identity = self.client.get('/api/styles/')
+        self.assertFalse(identity.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', identity['Vary'])
+
+        with mock.patch.object(compression.gzip, 'compress') as compress:
+            response = self.client.get('/api/styles/', HTTP_ACCEPT_ENCODING='gzip')
+        compress.assert_not_called()
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), identity.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+
+    def test_uncached_json_compressed_on_the_fly(self):
+        body = b'{"data":"' + b'x' * 2000 + b'"}'
+        middleware = CompressionMiddleware(
+            lambda request: HttpResponse(body, content_type='application/json')
+        )
+        request = RequestFactory().get('/api/songs/', HTTP_ACCEPT_ENCODING='gzip')
+        response = middleware(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), body)
+
+    def test_html_not_compressed(self):
+        # 页面中的 CSRF 令牌等秘密不能经确定性压缩暴露（BREACH）
+        middleware = CompressionMiddleware(
+            lambda request: HttpResponse(b'<html>' + b'x' * 2000 + b'</html>', content_type='text/html')
+        )
+        request = RequestFactory().get('/admin/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(middleware(request).has_header('Content-Encoding'))
+
+    def test_images_not_compressed(self):
+        middleware = CompressionMiddleware(
+            lambda request: HttpResponse(b'x' * 2000, content_type='image/jpeg')
+        )
+        request = RequestFactory().get('/gallery/a.jpg', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(middleware(request).has_header('Content-Encoding'))
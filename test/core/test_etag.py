@@ -0,0 +1,79 @@
+"""
+数据版本 ETag 中间件测试
+"""
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from core.cache_middleware import DataVersionETagMiddleware
+from fansDIY.models.signals import COLLECTIONS_VERSION, WORKS_ALL_VERSION
+from gallery.signals import GALLERY_VERSION
+from livestream.signals import LIVESTREAM_VERSION
+from site_settings.models.signals import SETTINGS_VERSION
+from song_management.models import Song, Style
+from song_management.models.signals import CATALOG_VERSION
+from songlist.signals import SONG_MODELS, songs_version
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class DataVersionETagTest(TestCase):
+    """ETag 与 304 测试"""
+
+    def setUp(self):
+        cache.clear()
+        self.song = Song.objects.create(song_name='歌曲', language='国语')
+
+    def test_patterns_use_signal_namespaces(self):
+        namespaces = set()
+        for values in DataVersionETagMiddleware.ETAG_PATTERNS.values():
+            namespaces.update(values)
+        expected = {
+            CATALOG_VERSION, COLLECTIONS_VERSION, WORKS_ALL_VERSION,
+            GALLERY_VERSION, LIVESTREAM_VERSION, SETTINGS_VERSION,
+        }
+        expected.update(songs_version(model) for model in SONG_MODELS)
+        self.assertEqual(namespaces, expected)
+
+    def test_path_matching(self):
+        middleware = DataVersionETagMiddleware(lambda request: None)
+        self.assertIsNotNone(middleware.get_namespaces('/api/songs/'))
+        self.assertIsNotNone(middleware.get_namespaces('/api/songs/3/records/'))
+        self.assertIsNotNone(middleware.get_namespaces('/api/gallery/tree/'))
+        self.assertIsNone(middleware.get_namespaces('/api/random-song/'))
+        self.assertIsNone(middleware.get_namespaces('/api/gallery/thumbnail/'))
+        self.assertIsNone(middleware.get_namespaces('/api/gallery/g1/images/'))
+
+    def test_not_modified_until_data_changes(self):
+        response = self.client.get('/api/styles/')
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/styles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('max-age', response['Cache-Control'])
+
+        Style.objects.create(name='摇滚')
+        response = self.client.get('/api/styles/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_query(self):
+        first = self.client.get('/api/songs/', {'page': 1})['ETag']
+        second = self.client.get('/api/songs/', {'page': 2})['ETag']
+        self.assertNotEqual(first, second)
+
+    def test_random_song_has_no_etag(self):
+        response = self.client.get('/api/random-song/')
+        self.assertFalse(response.has_header('ETag'))
+
+
+class DataVersionETagCacheUnavailableTest(TestCase):
+    """缓存不可用时不输出 ETag"""
+
+    def test_no_etag_without_versions(self):
+        response = self.client.get('/api/styles/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
@@ -0,0 +1,116 @@
+"""
+进程内一级缓存测试
+"""
+import json
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core import local_cache as local_cache_module
+from core import cache as cache_module
+from core.cache import cache_invalidated, cache_result, clear_all_cache, clear_cache_pattern, delete_cache_key
+from core.local_cache import LocalCache, local_cache, redis_available, tiered_get, tiered_set
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+LOCAL_CACHE_CONFIG = {'PREFIXES': {'hot': 60}, 'FALLBACK_TTL': 10, 'RETRY_INTERVAL': 60}
+
+
+class LocalCacheTest(SimpleTestCase):
+    """LRU 与 TTL 测试"""
+
+    def test_least_recently_used_evicted(self):
+        lru = LocalCache(max_entries=2)
+        lru.set('a', 1, 60)
+        lru.set('b', 2, 60)
+        lru.get('a')
+        lru.set('c', 3, 60)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIs(lru.get('b'), local_cache_module._MISSING)
+
+    def test_expired_entry_missing(self):
+        lru = LocalCache(max_entries=2)
+        lru.set('a', 1, 60)
+        with mock.patch.object(local_cache_module.time, 'monotonic', return_value=time.monotonic() + 61):
+            self.assertIs(lru.get('a'), local_cache_module._MISSING)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, LOCAL_CACHE_CONFIG=LOCAL_CACHE_CONFIG)
+class TieredCacheTest(SimpleTestCase):
+    """两级缓存读写、失效与熔断测试"""
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        # 熔断状态是进程级的，每个测试从 Redis 可用开始
+        patcher = mock.patch.object(local_cache_module, '_down_until', 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = 0
+
+    def _loader(self, prefix):
+        @cache_result(timeout=300, key_prefix=prefix)
+        def load():
+            self.calls += 1
+            return [self.calls]
+        return load
+
+    def test_opted_in_prefix_served_locally(self):
+        load = self._loader('hot')
+        load()
+        cache.clear()  # 一级缓存不依赖 Redis 中的副本
+        self.assertEqual(load(), [1])
+        self.assertEqual(self.calls, 1)
+
+    def test_other_prefixes_not_kept_locally(self):
+        load = self._loader('cold')
+        load()
+        cache.clear()
+        self.assertEqual(load(), [2])
+
+    def test_pattern_clear_invalidates_local_entry(self):
+        load = self._loader('hot')
+        load()
+        clear_cache_pattern('hot')
+        cache.clear()  # 只验证一级缓存的失效
+        self.assertEqual(load(), [2])
+
+    def test_other_worker_cannot_refill_from_deleted_key(self):
+        real_publish = cache_module.publish_invalidation
+
+        def publish_then_refill(pattern=None):
+            real_publish(pattern)
+            # 其他 worker 收到通知后立即读取，用 Redis 中的值回填一级缓存
+            tiered_get('hot:1', 'hot')
+
+        seen = []
+        receiver = lambda pattern, **kwargs: seen.append(cache.get('hot:1'))
+        cache_invalidated.connect(receiver)
+        self.addCleanup(cache_invalidated.disconnect, receiver)
+
+        for clear in (lambda: delete_cache_key('hot:1'), lambda: clear_cache_pattern('hot'), clear_all_cache):
+            with self.subTest(clear=clear):
+                tiered_set('hot:1', 'stale', 300, 'hot')
+                with mock.patch.object(cache_module, 'publish_invalidation', publish_then_refill):
+                    clear()
+                self.assertIsNone(tiered_get('hot:1', 'hot'))
+        # 预热信号在 Redis 删除之后发出
+        self.assertEqual(seen, [None, None])
+
+    def test_invalidation_message_from_other_worker(self):
+        tiered_set('hot:1', 'value', 300, 'hot')
+        local_cache_module._handle_message({'data': json.dumps({'pattern': 'hot:', 'pid': -1})})
+        cache.clear()
+        self.assertIsNone(tiered_get('hot:1', 'hot'))
+
+    def test_backend_failure_opens_circuit_and_keeps_values_locally(self):
+        with mock.patch.object(cache, 'get', side_effect=ConnectionError('down')) as cache_get:
+            self.assertIsNone(tiered_get('cold:1', 'cold'))
+            self.assertFalse(redis_available())
+            tiered_get('cold:1', 'cold')
+            self.assertEqual(cache_get.call_count, 1)
+
+            tiered_set('cold:1', 'value', 300, 'cold')
+            self.assertEqual(tiered_get('cold:1', 'cold'), 'value')
@@ -0,0 +1,107 @@
+"""
+媒体文件服务测试
+"""
+import os
+import shutil
+import tempfile
+from django.test import TestCase, RequestFactory, override_settings
+from django.http import Http404
+from core.media_serving import serve_file, serve_media, parse_range
+
+
+class ParseRangeTest(TestCase):
+    """Range 请求头解析测试"""
+
+    def test_explicit_range(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+
+    def test_open_ended_range(self):
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+
+    def test_suffix_range(self):
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+
+    def test_end_clamped_to_file_size(self):
+        self.assertEqual(parse_range('bytes=500-5000', 1000), (500, 999))
+
+    def test_unsatisfiable_range(self):
+        self.assertEqual(parse_range('bytes=1000-', 1000), 'unsatisfiable')
+
+    def test_multi_range_ignored(self):
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 1000))
+
+    def test_invalid_header_ignored(self):
+        self.assertIsNone(parse_range('items=0-1', 1000))
+
+
+class ServeFileTest(TestCase):
+    """文件响应测试"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.path = os.path.join(self.media_root, 'gallery', 'clip.mp4')
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'wb') as f:
+            f.write(bytes(range(256)) * 4)
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_full_response_has_validators(self):
+        """测试完整响应包含 ETag、Last-Modified 和 Accept-Ranges"""
+        response = serve_file(self.factory.get('/'), self.path)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], '1024')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+
+    def test_if_none_match_returns_304(self):
+        """测试 ETag 匹配时返回 304"""
+        etag = serve_file(self.factory.get('/'), self.path)['ETag']
+        response = serve_file(self.factory.get('/', HTTP_IF_NONE_MATCH=etag), self.path)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_range_request_returns_206(self):
+        """测试 Range 请求返回部分内容"""
+        response = serve_file(self.factory.get('/', HTTP_RANGE='bytes=10-19'), self.path)
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(10, 20)))
+
+    def test_if_range_mismatch_returns_full_file(self):
+        """测试 If-Range 不匹配时返回完整文件"""
+        response = serve_file(
+            self.factory.get('/', HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"stale"'),
+            self.path
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsatisfiable_range_returns_416(self):
+        """测试范围不可满足时返回 416"""
+        response = serve_file(self.factory.get('/', HTTP_RANGE='bytes=5000-'), self.path)
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_x_accel_mode(self):
+        """测试 X-Accel-Redirect 模式不由 Django 发送文件"""
+        with override_settings(
+            MEDIA_ROOT=self.media_root,
+            MEDIA_SERVING_CONFIG={'MODE': 'x-accel', 'X_ACCEL_PREFIX': '/protected-media/'}
+        ):
+            response = serve_file(self.factory.get('/'), self.path)
+
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/gallery/clip.mp4')
+        self.assertEqual(response.content, b'')
+
+    def test_serve_media_rejects_traversal(self):
+        """测试目录遍历请求返回 404"""
+        with self.assertRaises(Http404):
+            serve_media(self.factory.get('/'), '../../etc/passwd', document_root=self.media_root)
@@ -0,0 +1,68 @@
+"""
+运行指标测试
+"""
+from django.test import TestCase, override_settings
+from core.cache_utils import cached
+from core.metrics import metrics
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class MetricsTest(TestCase):
+    """指标采集与导出测试"""
+
+    def setUp(self):
+        metrics.reset()
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics.observe('http_request_duration_seconds', 0.03, route='/a', method='GET')
+        samples = metrics.collect()
+        self.assertNotIn('http_request_duration_seconds_bucket{le="0.025",method="GET",route="/a"}', samples)
+        self.assertEqual(samples['http_request_duration_seconds_bucket{le="0.05",method="GET",route="/a"}'], 1)
+        self.assertEqual(samples['http_request_duration_seconds_bucket{le="+Inf",method="GET",route="/a"}'], 1)
+        self.assertEqual(samples['http_request_duration_seconds_count{method="GET",route="/a"}'], 1)
+
+    def test_request_recorded_by_route_template(self):
+        self.client.get('/api/songs/1/records/')
+        self.client.get('/api/songs/2/records/')
+        samples = metrics.collect()
+        key = 'http_requests_total{method="GET",route="/api/songs/<int:song_id>/records/",status="200"}'
+        self.assertEqual(samples[key], 2)
+        self.assertEqual(samples['db_queries_per_request_count{route="/api/songs/<int:song_id>/records/"}'], 2)
+
+    def test_cache_hits_counted_by_prefix(self):
+        @cached(timeout=60, key_prefix='metrics_test')
+        def load(self, value):
+            return value
+
+        load(None, 1)
+        load(None, 1)
+        samples = metrics.collect()
+        self.assertEqual(samples['cache_requests_total{prefix="metrics_test",result="miss"}'], 1)
+        self.assertEqual(samples['cache_requests_total{prefix="metrics_test",result="hit"}'], 1)
+
+    @override_settings(DEBUG=True)
+    def test_prometheus_endpoint(self):
+        self.client.get('/api/styles/')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        text = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertIn('route="/api/styles/"', text)
+
+        buckets = [line for line in text.splitlines()
+                   if line.startswith('http_request_duration_seconds_bucket') and '/api/styles/' in line]
+        self.assertTrue(buckets[-1].split('{')[1].startswith('le="+Inf"'))
+
+    def test_endpoint_hidden_without_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    @override_settings(METRICS_CONFIG={'TOKEN': 'secret'})
+    def test_endpoint_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,57 @@
+"""
+查询分析测试
+"""
+from django.test import TestCase, override_settings
+from core.query_profiler import capture_queries, normalize_sql
+from core.testing import QueryBudgetMixin
+from song_management.models import Song
+
+
+class NormalizeSqlTest(TestCase):
+    """SQL 归一化测试"""
+
+    def test_literals_and_in_lists_collapsed(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s,  %s) AND name = 'a''b' LIMIT 21"),
+            'SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?'
+        )
+
+    def test_identifiers_with_digits_kept(self):
+        self.assertIn('song_manage_song_id_c68e4c_idx', normalize_sql('DROP INDEX song_manage_song_id_c68e4c_idx'))
+
+
+class QueryProfilerTest(QueryBudgetMixin, TestCase):
+    """查询捕获、预算断言与中间件测试"""
+
+    def setUp(self):
+        self.songs = [Song.objects.create(song_name=f'歌曲{i}') for i in range(6)]
+
+    def test_repeated_templates_detected(self):
+        with capture_queries() as capture:
+            for song in self.songs:
+                Song.objects.get(pk=song.pk)
+        ((alias, template, count),) = capture.repeated(threshold=5)
+        self.assertEqual((alias, count), ('default', 6))
+        self.assertIn('WHERE "song_management_song"."id" = ?', template)
+
+    def test_budget_fails_on_n_plus_one(self):
+        with self.assertRaisesMessage(AssertionError, 'N+1'):
+            with self.assertQueryBudget(10):
+                for song in self.songs:
+                    Song.objects.get(pk=song.pk)
+
+    def test_budget_fails_when_exceeded(self):
+        with self.assertRaisesMessage(AssertionError, '查询数超出预算'):
+            with self.assertQueryBudget(1):
+                list(Song.objects.all())
+                Song.objects.count()
+
+    @override_settings(QUERY_PROFILER_CONFIG={'ENABLED': True})
+    def test_query_count_header(self):
+        response = self.client.get('/api/songs/3/records/', {'compact': 1})
+        self.assertTrue(response.has_header('X-Query-Count'))
+        self.assertGreater(int(response['X-Query-Count']), 0)
+
+    def test_header_absent_outside_debug(self):
+        response = self.client.get('/api/songs/3/records/')
+        self.assertFalse(response.has_header('X-Query-Count'))
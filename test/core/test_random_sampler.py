@@ -0,0 +1,91 @@
+"""
+随机抽样测试
+"""
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from core.random_sampler import RandomIdSampler, sample_across
+from song_management.models import Song, Style, SongStyle
+from song_management.models.signals import SONGS_VERSION
+from song_management.services import SongService
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RandomIdSamplerTest(TestCase):
+    """随机主键抽样器测试"""
+
+    def setUp(self):
+        cache.clear()
+        RandomIdSampler.clear_local()
+        self.pop = Style.objects.create(name='流行')
+        self.songs = [
+            Song.objects.create(song_name=f'歌曲{i}', language='国语' if i % 2 else '粤语')
+            for i in range(6)
+        ]
+        for song in self.songs[:2]:
+            SongStyle.objects.create(song=song, style=self.pop)
+
+    def test_filter_key_ignores_empty_values(self):
+        self.assertEqual(RandomIdSampler.filter_key({'language': '', 'style': None}), 'all')
+        self.assertEqual(
+            RandomIdSampler.filter_key({'language': '国语', 'style': ''}),
+            RandomIdSampler.filter_key({'language': '国语'})
+        )
+
+    def test_ids_loaded_once_per_version(self):
+        sampler = RandomIdSampler(SONGS_VERSION)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return Song.objects.values_list('id', flat=True)
+
+        sampler.get_ids({}, loader)
+        sampler.get_ids({}, loader)
+        self.assertEqual(len(calls), 1)
+
+        # 新增歌曲后信号递增版本号，ID 数组重新加载
+        Song.objects.create(song_name='新歌', language='国语')
+        ids = sampler.get_ids({}, loader)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(ids), 7)
+
+    def test_random_song_respects_filters(self):
+        for _ in range(10):
+            song = SongService.get_random_song(language='粤语')
+            self.assertEqual(song.language, '粤语')
+            song = SongService.get_random_song(style='流行')
+            self.assertIn(song.id, {s.id for s in self.songs[:2]})
+
+    def test_random_song_none_when_no_match(self):
+        self.assertIsNone(SongService.get_random_song(language='日语'))
+
+    def test_style_change_invalidates_ids(self):
+        SongService.get_random_song(style='流行')
+        SongStyle.objects.filter(style=self.pop).delete()
+        self.assertIsNone(SongService.get_random_song(style='流行'))
+
+    def test_stale_id_is_retried(self):
+        sampler = RandomIdSampler('test:stale')
+        queryset = Song.objects.filter(id=self.songs[5].id)
+        sampler.get_ids({}, lambda: [self.songs[5].id])
+        # 绕过信号直接删除，ID 数组中保留了已不存在的主键
+        Song.objects.filter(id=self.songs[5].id)._raw_delete(Song.objects.db)
+        self.assertIsNone(sampler.sample(queryset))
+
+    def test_sample_across_covers_all_sources(self):
+        first = RandomIdSampler('test:first')
+        second = RandomIdSampler('test:second')
+        sources = [
+            (first, Song.objects.filter(language='国语'), {'language': '国语'}),
+            (second, Song.objects.filter(language='粤语'), {'language': '粤语'}),
+        ]
+        languages = {sample_across(sources).language for _ in range(50)}
+        self.assertEqual(languages, {'国语', '粤语'})
+
+    def test_random_song_api(self):
+        response = self.client.get('/api/random-song/', {'language': '国语'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['language'], '国语')
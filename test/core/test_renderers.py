@@ -0,0 +1,67 @@
+"""
+JSON 渲染与预编码响应测试
+"""
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from core.renderers import ORJSONRenderer, dumps
+from core.responses import cached_success_response
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class ORJSONRendererTest(TestCase):
+    """orjson 渲染器测试"""
+
+    def test_output_matches_drf_renderer(self):
+        data = {
+            'name': '晴天',
+            'date': date(2024, 1, 2),
+            'updated_at': datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+            'price': Decimal('1.50'),
+            'items': (1, 2),
+            'nested': {1: 'a'},
+        }
+        expected = JSONRenderer().render(dict(data, nested={'1': 'a'}))
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), json.loads(expected))
+        self.assertIn(b'"2024-01-02T03:04:05.678901Z"', ORJSONRenderer().render(data))
+
+    def test_none_renders_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CachedSuccessResponseTest(TestCase):
+    """预编码响应测试"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_builder_runs_once(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            return ['流行', '摇滚']
+
+        first = cached_success_response('test:styles', build, message='ok')
+        second = cached_success_response('test:styles', build, message='ok')
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(json.loads(second.content), {'code': 200, 'message': 'ok', 'data': ['流行', '摇滚']})
+        self.assertEqual(second['Content-Type'], 'application/json')
+
+    def test_empty_result_not_cached_when_disabled(self):
+        cached_success_response('test:tags', list, cache_empty=False)
+        self.assertIsNone(cache.get('test:tags'))
+
+    def test_bytes_are_stored(self):
+        cached_success_response('test:bytes', lambda: {'a': 1})
+        self.assertEqual(
+            cache.get('test:bytes')['identity'],
+            dumps({'code': 200, 'message': '操作成功', 'data': {'a': 1}})
+        )
@@ -0,0 +1,79 @@
+"""
+Sitemap 索引与分片测试
+"""
+import gzip
+from datetime import date
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core import local_cache as local_cache_module
+from gallery.models import Gallery
+from livestream.models import Livestream
+from site_settings.services.sitemap_service import SitemapService
+from song_management.models import Song
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHE,
+    SITEMAP_CONFIG={'BASE_URL': 'https://example.com', 'SHARD_SIZE': 2},
+)
+class SitemapTest(TestCase):
+    """sitemap 索引、分片与增量重建"""
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(local_cache_module, '_down_until', 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for name in ('晴天', '稻香', '七里香'):
+            Song.objects.create(song_name=name)
+        Livestream.objects.create(date=date(2025, 1, 2), title='直播')
+
+    def test_index_lists_non_empty_shards(self):
+        response = self.client.get('/sitemap.xml')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('application/xml'))
+        self.assertIn('Last-Modified', response)
+        body = response.content.decode()
+        # 13 个固定页面、3 首歌曲按每片 2 条分片
+        for name in ('pages-1', 'pages-7', 'songs-1', 'songs-2', 'livestreams-1'):
+            self.assertIn(f'<loc>https://example.com/sitemap-{name}.xml</loc>', body)
+        # 空分区不列出
+        self.assertNotIn('sitemap-galleries-', body)
+        self.assertNotIn('sitemap-songs-3', body)
+
+    def test_shards_cover_all_songs(self):
+        song_ids = Song.objects.order_by('id').values_list('id', flat=True)
+        bodies = [self.client.get(f'/sitemap-songs-{page}.xml').content.decode() for page in (1, 2)]
+
+        for song_id in song_ids:
+            self.assertEqual(sum(f'/songs/{song_id}</loc>' in body for body in bodies), 1)
+        self.assertIn('https://example.com/live/2025-01-02', self.client.get('/sitemap-livestreams-1.xml').content.decode())
+        self.assertEqual(self.client.get('/sitemap-songs-3.xml').status_code, 404)
+        self.assertEqual(self.client.get('/sitemap-unknown-1.xml').status_code, 404)
+
+    @override_settings(SITEMAP_CONFIG={'BASE_URL': 'https://example.com', 'SHARD_SIZE': 100})
+    def test_precompressed_and_conditional(self):
+        response = self.client.get('/sitemap-pages-1.xml', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'https://example.com/songs?tab=hot', gzip.decompress(response.content))
+
+        not_modified = self.client.get('/sitemap-pages-1.xml', headers={'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_only_changed_section_rebuilt(self):
+        self.client.get('/sitemap.xml')
+
+        with mock.patch.object(SitemapService, '_build', wraps=SitemapService._build) as build:
+            Gallery.objects.create(id='g1', title='图集', folder_path='g1')
+            body = self.client.get('/sitemap.xml').content.decode()
+
+        self.assertEqual([call.args[0] for call in build.call_args_list], ['galleries'])
+        self.assertIn('sitemap-galleries-1.xml', body)
+        self.assertIn('https://example.com/albums/g1', self.client.get('/sitemap-galleries-1.xml').content.decode())
@@ -0,0 +1,97 @@
+"""
+SQLite 连接层测试
+"""
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.db import connections
+from django.db.utils import ConnectionHandler, OperationalError
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.sqlite import ReadOnlyRoutingMiddleware, get_pragmas, read_only_alias, read_only_routing
+from song_management.models import Song
+from xxm_fans_home.db_routers import MultiDBRouter
+
+
+class PragmaProfileTest(SimpleTestCase):
+    """PRAGMA 配置测试"""
+
+    # 临时文件库使用与项目相同的别名（允许连接，但不触及测试库）
+    databases = {'default', 'default_ro'}
+
+    @override_settings(SQLITE_CONFIG={'PROFILES': {'view_data_db': 'write_heavy'}})
+    def test_profile_per_database(self):
+        self.assertEqual(get_pragmas('view_data_db')['wal_autocheckpoint'], 4000)
+        self.assertNotIn('wal_autocheckpoint', get_pragmas('default'))
+
+    def test_read_only_connection_skips_write_pragmas(self):
+        pragmas = get_pragmas('default_ro')
+        self.assertNotIn('journal_mode', pragmas)
+        self.assertEqual(pragmas['query_only'], 'ON')
+
+    def test_pragmas_applied_on_connect(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        path = directory / 'bench.sqlite3'
+        sqlite3.connect(path).execute('CREATE TABLE t (id INTEGER)')
+
+        handler = ConnectionHandler({
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path)},
+            'default_ro': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': f'{path.as_uri()}?mode=ro'},
+        })
+        self.addCleanup(handler.close_all)
+
+        with handler['default'].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+        with handler['default_ro'].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM t')
+            with self.assertRaises(OperationalError):
+                cursor.execute('INSERT INTO t VALUES (1)')
+
+
+class ReadOnlyRoutingTest(SimpleTestCase):
+    """只读路由测试"""
+
+    def setUp(self):
+        # 测试环境中 default_ro 镜像 default，这里模拟生产环境中指向只读 URI 的配置
+        databases = dict(connections.settings)
+        databases['default_ro'] = dict(databases['default'], NAME='file:/tmp/db.sqlite3?mode=ro')
+        patcher = mock.patch.object(connections, 'settings', databases)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = MultiDBRouter()
+
+    def test_reads_routed_only_inside_context(self):
+        self.assertIsNone(self.router.db_for_read(Song))
+        with read_only_routing():
+            self.assertEqual(self.router.db_for_read(Song), 'default_ro')
+            # 没有只读别名的数据库保持原路由
+            self.assertIsNone(read_only_alias('songlist_db'))
+
+    def test_writes_always_use_read_write_alias(self):
+        with read_only_routing():
+            self.assertEqual(self.router.db_for_write(Song), 'default')
+
+    def test_mirrored_alias_not_used(self):
+        connections.settings['default_ro']['NAME'] = connections.settings['default']['NAME']
+        with read_only_routing():
+            self.assertIsNone(read_only_alias('default'))
+
+    def test_middleware_enables_routing_for_safe_methods(self):
+        seen = []
+        middleware = ReadOnlyRoutingMiddleware(lambda request: seen.append(read_only_alias('default')) or HttpResponse())
+        factory = RequestFactory()
+
+        middleware(factory.get('/api/songs/'))
+        middleware(factory.post('/api/songs/'))
+        with override_settings(SQLITE_CONFIG={'READ_ONLY_ROUTING': False}):
+            middleware(factory.get('/api/songs/'))
+        self.assertEqual(seen, ['default_ro', None, None])
@@ -0,0 +1,100 @@
+"""
+缓存击穿保护测试
+"""
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core import cache_codec, local_cache as local_cache_module
+from core.cache import cache_result
+from core.stampede import CacheEntry, get_or_compute
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+STAMPEDE_CONFIG = {'STALE_TTL': 60, 'LOCK_WAIT': 2, 'POLL_INTERVAL': 0.01, 'EARLY_EXPIRATION_BETA': 0}
+
+
+@override_settings(CACHES=LOCMEM_CACHE, LOCAL_CACHE_CONFIG={'PREFIXES': {}}, CACHE_STAMPEDE_CONFIG=STAMPEDE_CONFIG)
+class StampedeTest(SimpleTestCase):
+    """单飞锁与软/硬过期测试"""
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(local_cache_module, '_down_until', 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_concurrent_misses_compute_once(self):
+        @cache_result(timeout=300, key_prefix='top_songs')
+        def load():
+            time.sleep(0.1)
+            return self.compute()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(load())) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [1] * 5)
+
+    def test_stale_value_served_while_refresh_in_progress(self):
+        cache.set('k', CacheEntry(cache_codec.encode('old'), time.time() - 1, 0.1), 60)
+        cache.add('lock:k', 'other-worker', 10)
+
+        self.assertEqual(get_or_compute('k', 'k', self.compute, 300), ('old', True))
+        self.assertEqual(self.calls, 0)
+
+    def test_stale_value_refreshed_by_lock_holder(self):
+        cache.set('k', CacheEntry(cache_codec.encode('old'), time.time() - 1, 0.1), 60)
+
+        self.assertEqual(get_or_compute('k', 'k', self.compute, 300), (1, False))
+        self.assertIsNone(cache.get('lock:k'))
+        entry = cache.get('k')
+        self.assertEqual(cache_codec.decode(entry.value), 1)
+        self.assertGreater(entry.soft_expires, time.time() + 299)
+
+    @override_settings(CACHE_STAMPEDE_CONFIG=dict(STAMPEDE_CONFIG, EARLY_EXPIRATION_BETA=1.0))
+    def test_slow_computation_refreshed_early(self):
+        cache.set('k', CacheEntry(cache_codec.encode('old'), time.time() + 1, 1000), 60)
+        self.assertEqual(get_or_compute('k', 'k', self.compute, 300), (1, False))
+
+        cache.set('k', CacheEntry(cache_codec.encode('old'), time.time() + 300, 0), 60)
+        self.assertEqual(get_or_compute('k', 'k', self.compute, 300), ('old', True))
+
+    @override_settings(CACHE_STAMPEDE_CONFIG=dict(STAMPEDE_CONFIG, LOCK_WAIT=0.05))
+    def test_compute_after_lock_wait_timeout(self):
+        cache.add('lock:k', 'stuck-worker', 10)
+        self.assertEqual(get_or_compute('k', 'k', self.compute, 300), (1, False))
+
+    def test_waiters_stop_when_holder_raises(self):
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise LookupError('missing')
+
+        holder = threading.Thread(target=lambda: self.assertRaises(LookupError, get_or_compute, 'k', 'k', failing, 300))
+        holder.start()
+        started.wait()
+
+        begin = time.monotonic()
+        self.assertEqual(get_or_compute('k', 'k', self.compute, 300), (1, False))
+        holder.join()
+        # 锁释放后立即自行计算，不等满 LOCK_WAIT（2 秒）
+        self.assertLess(time.monotonic() - begin, 1)
+
+    def test_value_written_before_upgrade_served(self):
+        cache.set('k', ['legacy'], 60)
+        self.assertEqual(get_or_compute('k', 'k', self.compute, 300), (['legacy'], True))
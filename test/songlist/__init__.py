@@ -0,0 +1,3 @@
+"""
+Songlist 应用测试
+"""
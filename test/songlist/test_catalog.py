@@ -0,0 +1,55 @@
+"""
+合并歌单快照测试
+"""
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from songlist.catalog import SongCatalog, get_catalog, reset_catalog
+from songlist.models import YouyouSong, BingjieSong
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SongCatalogTest(TestCase):
+    """合并歌单快照测试"""
+
+    databases = {'default', 'songlist_db'}
+
+    def setUp(self):
+        cache.clear()
+        reset_catalog()
+        YouyouSong.objects.create(song_name='Hello', singer='Adele', language='英语', style='流行')
+        YouyouSong.objects.create(song_name='晴天', singer='周杰伦', language='国语', style='流行')
+        BingjieSong.objects.create(song_name='富士山下', singer='陈奕迅', language='粤语', style='抒情')
+
+    def test_filter_uses_indexes_and_search_keys(self):
+        catalog = SongCatalog.build()
+        self.assertEqual([s.song_name for s in catalog.filter(style='流行')], ['Hello', '晴天'])
+        self.assertEqual([s.song_name for s in catalog.filter(language='国语', style='流行')], ['晴天'])
+        self.assertEqual([s.song_name for s in catalog.filter(search='ADELE')], ['Hello'])
+        self.assertEqual(catalog.filter(language='日语'), [])
+        self.assertEqual(catalog.languages, sorted(['英语', '国语', '粤语']))
+
+    def test_snapshot_reloads_on_version_change(self):
+        catalog = get_catalog()
+        self.assertIs(get_catalog(), catalog)
+
+        BingjieSong.objects.create(song_name='新歌', singer='冰洁', language='国语', style='流行')
+        reloaded = get_catalog()
+        self.assertIsNot(reloaded, catalog)
+        self.assertEqual(len(reloaded.rows), 4)
+
+    def test_merged_song_list(self):
+        response = self.client.get('/api/songlist/songs/', {'style': '流行'})
+        self.assertEqual(response.status_code, 200)
+        # 同一张表只出现一次（youyou 与 leyou 共用歌曲表）
+        self.assertEqual([s['song_name'] for s in response.json()], ['Hello', '晴天'])
+
+    def test_merged_random_song_with_search(self):
+        response = self.client.get('/api/songlist/random-song/', {'search': '陈奕迅'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['song_name'], '富士山下')
+
+        response = self.client.get('/api/songlist/random-song/', {'search': '不存在'})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,6 @@
+"""
+离线基准测试套件
+
+在临时目录中创建 SQLite 数据库和媒体目录，用确定性的合成数据直接调用服务层/视图，
+不需要启动服务器。用法见 tools/benchmark/__main__.py。
+"""
@@ -0,0 +1,197 @@
+"""
+离线基准测试运行器
+
+用法（在项目根目录执行）:
+    python -m tools.benchmark                              # 运行全部用例并打印结果
+    python -m tools.benchmark --save-baseline              # 保存为基线
+    python -m tools.benchmark --threshold 15               # 与基线比较，中位数变慢超过 15% 时退出码为 1
+    python -m tools.benchmark -k song_list -k ranking      # 只运行名称包含关键字的用例
+    python -m tools.benchmark --songs 500 --records 5000   # 调整数据规模
+
+每次运行都会在临时目录中新建 SQLite 数据库和媒体目录，迁移后生成确定性的合成数据；
+默认在每次迭代前清空缓存，衡量的是未命中缓存时的代码路径（--warm 则保留缓存）。
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'results' / 'baseline.json'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='离线基准测试')
+    parser.add_argument('-k', '--keyword', action='append', default=[], help='只运行名称包含该关键字的用例（可重复）')
+    parser.add_argument('--repeat', type=int, default=20, help='每个用例的计时次数')
+    parser.add_argument('--warmup', type=int, default=2, help='计时前的预热次数')
+    parser.add_argument('--warm', action='store_true', help='迭代之间保留缓存')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='基线结果文件')
+    parser.add_argument('--save-baseline', action='store_true', help='将本次结果保存为基线')
+    parser.add_argument('--output', type=Path, help='本次结果的输出文件')
+    parser.add_argument('--threshold', type=float, default=20.0, help='允许的中位数回退百分比')
+    parser.add_argument('--keep-dir', action='store_true', help='保留临时目录（用于排查）')
+    add_spec_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def add_spec_arguments(parser):
+    """为 DatasetSpec 的每个字段添加命令行参数（--songs、--images-per-gallery 等）"""
+    from tools.benchmark.datagen import DatasetSpec
+
+    defaults = DatasetSpec()
+    for field in DatasetSpec.__dataclass_fields__:
+        parser.add_argument(f'--{field.replace("_", "-")}', type=int, default=getattr(defaults, field))
+
+
+def spec_from_args(args):
+    from tools.benchmark.datagen import DatasetSpec
+
+    return DatasetSpec(**{field: getattr(args, field) for field in DatasetSpec.__dataclass_fields__})
+
+
+def setup_django(workdir):
+    """在临时目录中初始化 Django 并迁移所有数据库"""
+    os.environ['BENCHMARK_DIR'] = str(workdir)
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'tools.benchmark.settings'
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+
+    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+    for alias, database in settings.DATABASES.items():
+        if not database.get('TEST', {}).get('MIRROR'):
+            call_command('migrate', database=alias, verbosity=0, interactive=False)
+
+
+def measure(func, repeat, warmup, warm):
+    """
+    计时一个用例
+
+    Returns:
+        dict: 耗时统计（毫秒）和每次调用的查询数
+    """
+    from django.core.cache import cache
+    from core.query_profiler import capture_queries
+
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        if not warm:
+            cache.clear()
+        with capture_queries() as capture:
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = capture.count
+
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'min_ms': round(timings[0], 3),
+        'queries': queries,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    与基线比较
+
+    Returns:
+        list: 回退的用例 [(名称, 基线中位数, 当前中位数, 变化百分比), ...]
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get('median_ms'):
+            continue
+        change = (current['median_ms'] - previous['median_ms']) / previous['median_ms'] * 100
+        current['change_pct'] = round(change, 1)
+        if change > threshold:
+            regressions.append((name, previous['median_ms'], current['median_ms'], change))
+    return regressions
+
+
+def main(argv=None):
+    sys.path.insert(0, str(PROJECT_ROOT))
+    # 生成数据和部分服务使用 naive datetime，警告会淹没输出
+    warnings.filterwarnings('ignore', message=r'.*received a naive datetime', category=RuntimeWarning)
+    args = parse_args(argv)
+    workdir = Path(tempfile.mkdtemp(prefix='xxm-benchmark-'))
+
+    try:
+        setup_django(workdir)
+
+        from tools.benchmark.cases import CASES
+        from tools.benchmark.datagen import generate
+
+        spec = spec_from_args(args)
+        start = time.perf_counter()
+        dataset = generate(spec)
+        print(f'数据生成完成（{time.perf_counter() - start:.1f}s）: {spec.to_dict()}')
+
+        results = {}
+        for name, factory in CASES.items():
+            if args.keyword and not any(keyword in name for keyword in args.keyword):
+                continue
+            results[name] = measure(factory(dataset), args.repeat, args.warmup, args.warm)
+            stats = results[name]
+            print(f"  {name:<36} median {stats['median_ms']:>9.2f} ms  "
+                  f"p95 {stats['p95_ms']:>9.2f} ms  queries {stats['queries']:>4}")
+
+        report = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'dataset': spec.to_dict(),
+            'warm_cache': args.warm,
+            'results': results,
+        }
+
+        exit_code = 0
+        if args.baseline.exists() and not args.save_baseline:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+            if baseline.get('dataset') != report['dataset']:
+                print('警告: 基线的数据规模与本次不同，比较结果仅供参考')
+            regressions = compare(results, baseline.get('results', {}), args.threshold)
+            for name, before, after, change in regressions:
+                print(f'回退: {name} {before:.2f} ms -> {after:.2f} ms (+{change:.1f}%)')
+            if regressions:
+                exit_code = 1
+            else:
+                print(f'与基线相比没有超过 {args.threshold:g}% 的回退')
+
+        targets = [args.output] if args.output else []
+        if args.save_baseline:
+            targets.append(args.baseline)
+        for target in targets:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f'结果已保存: {target}')
+        return exit_code
+    finally:
+        if args.keep_dir:
+            print(f'临时目录: {workdir}')
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+基准测试用例
+
+每个用例是一个接收数据集摘要（datagen.generate 的返回值）的函数，返回待计时的无参可调用对象。
+用例直接调用服务层或视图（RequestFactory），不经过中间件，便于单独衡量代码路径的变化。
+"""
+from django.test import RequestFactory
+
+CASES = {}
+
+
+def benchmark(name):
+    """注册基准测试用例"""
+    def decorator(func):
+        CASES[name] = func
+        return func
+    return decorator
+
+
+def _view_call(view, path, params=None, **kwargs):
+    factory = RequestFactory()
+
+    def call():
+        response = view(factory.get(path, params or {}), **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        assert response.status_code == 200, f'{path} 返回 {response.status_code}'
+        return response
+    return call
+
+
+# ==================== 歌曲 ====================
+
+@benchmark('song_list.default')
+def song_list_default(dataset):
+    from song_management.api.views import SongListView
+    return _view_call(SongListView.as_view(), '/api/songs/', {'page': 3, 'limit': 50})
+
+
+@benchmark('song_list.filtered')
+def song_list_filtered(dataset):
+    from song_management.api.views import SongListView
+    return _view_call(
+        SongListView.as_view(), '/api/songs/',
+        {'styles': '流行,摇滚', 'language': '国语', 'q': '歌曲0', 'facets': 1}
+    )
+
+
+@benchmark('song_list.cursor')
+def song_list_cursor(dataset):
+    from song_management.api.views import SongListView
+    return _view_call(SongListView.as_view(), '/api/songs/', {'pagination': 'cursor', 'limit': 50})
+
+
+@benchmark('ranking.top_songs')
+def ranking_top_songs(dataset):
+    from song_management.services import RankingService
+    return lambda: RankingService.get_top_songs(range_key='1y', limit=50)
+
+
+@benchmark('ranking.most_performed')
+def ranking_most_performed(dataset):
+    from song_management.services import RankingService
+    return lambda: RankingService.get_most_performed_songs(limit=50)
+
+
+@benchmark('song_records.nested')
+def song_records_nested(dataset):
+    from song_management.api.views import SongRecordListView
+    song_id = dataset['hot_song_id']
+    return _view_call(
+        SongRecordListView.as_view(), f'/api/songs/{song_id}/records/',
+        {'page_size': 50}, song_id=song_id
+    )
+
+
+@benchmark('song_records.compact')
+def song_records_compact(dataset):
+    from song_management.api.views import SongRecordListView
+    song_id = dataset['hot_song_id']
+    return _view_call(
+        SongRecordListView.as_view(), f'/api/songs/{song_id}/records/',
+        {'page_size': 50, 'compact': 1}, song_id=song_id
+    )
+
+
+# ==================== 直播 ====================
+
+@benchmark('livestream.month')
+def livestream_month(dataset):
+    from livestream.services.livestream_service import LivestreamService
+    year, month = dataset['month']
+    return lambda: LivestreamService.get_livestreams_by_month(year, month)
+
+
+@benchmark('livestream.month_details')
+def livestream_month_details(dataset):
+    from livestream.services.livestream_service import LivestreamService
+    year, month = dataset['month']
+    return lambda: LivestreamService.get_livestreams_by_month(year, month, include_details=True)
+
+
+# ==================== 图集 ====================
+
+@benchmark('gallery.tree')
+def gallery_tree(dataset):
+    from gallery.views import gallery_tree as view
+    return _view_call(view, '/api/gallery/tree/')
+
+
+@benchmark('gallery.images')
+def gallery_images(dataset):
+    from gallery.views import gallery_images as view
+    gallery_id = dataset['gallery_leaf_id']
+    return _view_call(view, f'/api/gallery/{gallery_id}/images/', {'limit': 50}, gallery_id=gallery_id)
+
+
+@benchmark('gallery.children_images')
+def gallery_children_images(dataset):
+    from gallery.views import gallery_children_images as view
+    gallery_id = dataset['gallery_parent_id']
+    return _view_call(
+        view, f'/api/gallery/{gallery_id}/children-images/',
+        {'limit': 6, 'images_limit': 20}, gallery_id=gallery_id
+    )
+
+
+# ==================== 数据分析 ====================
+
+@benchmark('followers.all_accounts_week')
+def followers_all_accounts_week(dataset):
+    from data_analytics.services.follower_service import FollowerService
+    return lambda: FollowerService.get_all_accounts_data('WEEK', days=7, use_cache=False)
+
+
+@benchmark('followers.all_accounts_day')
+def followers_all_accounts_day(dataset):
+    from data_analytics.services.follower_service import FollowerService
+    return lambda: FollowerService.get_all_accounts_data('DAY', days=24, use_cache=False)
+
+
+@benchmark('analytics.platform_statistics')
+def analytics_platform_statistics(dataset):
+    from data_analytics.services.analytics_service import AnalyticsService
+    return lambda: AnalyticsService.get_platform_statistics('bilibili', days=7)
+
+
+@benchmark('analytics.top_works')
+def analytics_top_works(dataset):
+    from data_analytics.services.analytics_service import AnalyticsService
+    return lambda: AnalyticsService.get_top_works('bilibili', metric='view_count', limit=20, days=7)
+
+
+@benchmark('analytics.work_metrics_summary')
+def analytics_work_metrics_summary(dataset):
+    from data_analytics.services.analytics_service import AnalyticsService
+    return lambda: AnalyticsService.get_work_metrics_summary('bilibili', 'BV0000000000')
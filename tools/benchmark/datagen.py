@@ -0,0 +1,310 @@
+"""
+合成数据生成器 - 为基准测试生成确定性的数据集
+
+- 使用固定种子的 random.Random，相同参数总是生成相同的数据（时间类数据以当前整点为锚点）
+- 全部使用 bulk_create 写入，绕过信号，生成完成后一次性回填歌曲统计字段
+- 图集在 MEDIA_ROOT/gallery 下创建真实的目录树和图片文件，供列表接口扫描
+- 演唱记录封面指向 MEDIA_ROOT/covers 下的真实图片，缩略图按正常流程生成
+"""
+import io
+import os
+import random
+from dataclasses import dataclass, asdict
+from datetime import time, timedelta
+
+from django.conf import settings
+from django.db.models import Count, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+LANGUAGES = ('国语', '粤语', '英语', '日语', '闽南语')
+STYLES = ('流行', '摇滚', '民谣', '古风', '说唱', '爵士', 'R&B', '电子')
+TAGS = ('现场', '合唱', '清唱', '返场', '生日会', '新歌')
+PLATFORM = 'bilibili'
+COVERS = 50
+
+
+@dataclass
+class DatasetSpec:
+    """数据集规模"""
+    songs: int = 2000           # N 首歌曲
+    records: int = 20000        # M 条演唱记录
+    galleries: int = 60         # K 个图集（叶子图集）
+    images_per_gallery: int = 40
+    works: int = 200            # W 个作品的小时级指标
+    hours: int = 24 * 14        # 每个作品的指标小时数
+    livestreams: int = 120      # 直播记录（按天递减）
+    collections: int = 40       # 二创合集
+    works_per_collection: int = 15
+    songlist_songs: int = 800   # 每位歌手的独立歌单歌曲数
+    seed: int = 20240101
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def _anchor():
+    """时间锚点：当前整点（使“最近 N 天”类查询命中生成的数据）"""
+    return timezone.now().replace(minute=0, second=0, microsecond=0)
+
+
+def generate_songs(spec, rng):
+    """生成歌曲、曲风、标签和演唱记录，并回填歌曲统计字段"""
+    from song_management.models import Song, SongRecord, Style, SongStyle, Tag, SongTag
+
+    styles = Style.objects.bulk_create(Style(name=name) for name in STYLES)
+    tags = Tag.objects.bulk_create(Tag(name=name) for name in TAGS)
+
+    Song.objects.bulk_create(
+        Song(
+            song_name=f'歌曲{i:05d}',
+            singer=f'歌手{rng.randrange(spec.songs // 4 + 1):04d}',
+            language=rng.choice(LANGUAGES),
+        )
+        for i in range(spec.songs)
+    )
+    song_ids = list(Song.objects.order_by('id').values_list('id', flat=True))
+
+    song_styles, song_tags = [], []
+    for song_id in song_ids:
+        for style in rng.sample(styles, rng.randint(1, 2)):
+            song_styles.append(SongStyle(song_id=song_id, style=style))
+        if rng.random() < 0.3:
+            song_tags.append(SongTag(song_id=song_id, tag=rng.choice(tags)))
+    SongStyle.objects.bulk_create(song_styles, batch_size=2000)
+    SongTag.objects.bulk_create(song_tags, batch_size=2000)
+
+    # 演唱次数呈长尾分布：少数热门歌曲占据大部分记录
+    today = _anchor().date()
+    weights = [1 / (rank + 1) for rank in range(len(song_ids))]
+    chosen = rng.choices(song_ids, weights=weights, k=spec.records)
+    SongRecord.objects.bulk_create(
+        (
+            SongRecord(
+                song_id=song_id,
+                performed_at=today - timedelta(days=rng.randrange(365 * 3)),
+                url=f'https://www.bilibili.com/video/BV{index:010d}',
+                cover_url=f'/covers/{index % COVERS:03d}.jpg',
+            )
+            for index, song_id in enumerate(chosen)
+        ),
+        batch_size=2000,
+    )
+
+    records = SongRecord.objects.filter(song=OuterRef('pk')).values('song')
+    Song.objects.update(
+        perform_count=Coalesce(Subquery(records.annotate(value=Count('id')).values('value')), 0),
+        first_perform=Subquery(records.annotate(value=Min('performed_at')).values('value')),
+        last_performed=Subquery(records.annotate(value=Max('performed_at')).values('value')),
+    )
+
+
+def generate_covers():
+    """生成封面图片（缩略图生成需要真实的图片文件）"""
+    from PIL import Image
+
+    cover_dir = os.path.join(settings.MEDIA_ROOT, 'covers')
+    os.makedirs(cover_dir, exist_ok=True)
+    for index in range(COVERS):
+        color = (index * 5 % 256, 120, 255 - index * 5 % 256)
+        Image.new('RGB', (640, 360), color).save(os.path.join(cover_dir, f'{index:03d}.jpg'), quality=85)
+
+
+def generate_galleries(spec, rng):
+    """生成三层图集树（根 -> 年 -> 月），叶子图集包含图片文件"""
+    from PIL import Image
+    from gallery.models import Gallery
+
+    gallery_root = os.path.join(settings.MEDIA_ROOT, 'gallery')
+    galleries = [Gallery(id='bench', title='基准图集', folder_path='/gallery/bench/', level=0)]
+    years = max(1, spec.galleries // 12)
+    leaves = []
+    for year_index in range(years):
+        year_id = f'bench-{2020 + year_index}'
+        galleries.append(Gallery(
+            id=year_id, title=f'{2020 + year_index}年', parent_id='bench', level=1,
+            folder_path=f'/gallery/bench/{2020 + year_index}/', sort_order=year_index,
+        ))
+        for month in range(1, 13):
+            if len(leaves) >= spec.galleries:
+                break
+            leaf_id = f'{year_id}-{month:02d}'
+            folder = f'/gallery/bench/{2020 + year_index}/{month:02d}/'
+            leaves.append(Gallery(
+                id=leaf_id, title=f'{month}月', parent_id=year_id, level=2,
+                folder_path=folder, sort_order=month, image_count=spec.images_per_gallery,
+            ))
+    Gallery.objects.bulk_create(galleries + leaves)
+
+    # 每种格式只编码一次，之后直接复制字节
+    templates = {}
+    for extension, image_format in (('.jpg', 'JPEG'), ('.png', 'PNG'), ('.webp', 'WEBP')):
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600), (200, 160, 120)).save(buffer, image_format)
+        templates[extension] = buffer.getvalue()
+
+    for leaf in leaves:
+        path = os.path.join(gallery_root, leaf.folder_path.strip('/').split('/', 1)[1])
+        os.makedirs(path, exist_ok=True)
+        for index in range(spec.images_per_gallery):
+            extension = rng.choice(('.jpg', '.jpg', '.png', '.webp'))
+            with open(os.path.join(path, f'{index:04d}{extension}'), 'wb') as f:
+                f.write(templates[extension])
+    return [leaf.id for leaf in leaves]
+
+
+def generate_livestreams(spec, rng):
+    """生成按天递减的直播记录"""
+    from livestream.models import Livestream
+
+    today = _anchor().date()
+    Livestream.objects.bulk_create(
+        Livestream(
+            date=today - timedelta(days=index * 2),
+            title=f'直播{index:04d}',
+            bvid=f'BV{rng.randrange(10 ** 9):010d}',
+            duration_seconds=rng.randint(3600, 4 * 3600),
+            parts=rng.randint(1, 4),
+            start_time=time(20, 0),
+            end_time=time(23, 30),
+        )
+        for index in range(spec.livestreams)
+    )
+
+
+def generate_analytics(spec, rng):
+    """生成作品静态信息、小时级指标和账号粉丝数"""
+    from data_analytics.models import Account, FollowerMetrics, WorkMetricsHour, WorkStatic
+
+    anchor = _anchor()
+    WorkStatic.objects.bulk_create(
+        WorkStatic(
+            platform=PLATFORM, work_id=f'BV{index:010d}', title=f'作品{index:04d}',
+            author='咻咻满', publish_time=anchor - timedelta(days=rng.randrange(30)),
+        )
+        for index in range(spec.works)
+    )
+
+    rows = []
+    for index in range(spec.works):
+        views = rng.randint(100, 10000)
+        for hour in range(spec.hours):
+            views += rng.randint(0, 200)
+            rows.append(WorkMetricsHour(
+                platform=PLATFORM, work_id=f'BV{index:010d}',
+                crawl_time=anchor - timedelta(hours=spec.hours - hour),
+                view_count=views, like_count=views // 10, coin_count=views // 30,
+                favorite_count=views // 20, danmaku_count=views // 50, comment_count=views // 40,
+                session_id=hour,
+            ))
+            if len(rows) >= 5000:
+                WorkMetricsHour.objects.bulk_create(rows)
+                rows = []
+    WorkMetricsHour.objects.bulk_create(rows)
+
+    for account in Account.objects.all():
+        followers = rng.randint(10000, 500000)
+        metrics = []
+        for hour in range(spec.hours):
+            followers += rng.randint(-5, 50)
+            metrics.append(FollowerMetrics(
+                account=account, follower_count=followers,
+                crawl_time=anchor - timedelta(hours=spec.hours - hour),
+            ))
+        FollowerMetrics.objects.bulk_create(metrics, batch_size=2000)
+
+
+def generate_fansdiy(spec, rng):
+    """生成粉丝二创合集和作品"""
+    from fansDIY.models import Collection, Work
+
+    collections = Collection.objects.bulk_create(
+        Collection(name=f'合集{index:03d}', position=index // 10, display_order=index)
+        for index in range(spec.collections)
+    )
+    works = []
+    for collection in collections:
+        # 默认每个合集 5~2n 个作品；n 较小时下限随之降低，避免空区间
+        count = rng.randint(min(5, spec.works_per_collection), max(5, 2 * spec.works_per_collection))
+        collection.works_count = count
+        for index in range(count):
+            works.append(Work(
+                collection=collection, title=f'{collection.name}-作品{index:03d}',
+                cover_url=f'/covers/{rng.randrange(COVERS):03d}.jpg',
+                view_url=f'https://www.bilibili.com/video/BV{rng.randrange(10 ** 9):010d}',
+                author=f'作者{rng.randrange(100):03d}', display_order=index,
+            ))
+    Collection.objects.bulk_update(collections, ['works_count'])
+    Work.objects.bulk_create(works, batch_size=2000)
+
+
+def generate_songlist(spec, rng):
+    """生成各歌手的独立歌单（songlist_db）"""
+    from songlist.models import BingjieSong, YouyouSong
+
+    for model in (YouyouSong, BingjieSong):
+        model.objects.bulk_create(
+            (
+                model(
+                    song_name=f'歌曲{index:05d}', singer=f'歌手{rng.randrange(200):03d}',
+                    language=rng.choice(LANGUAGES), style=rng.choice(STYLES),
+                )
+                for index in range(spec.songlist_songs)
+            ),
+            batch_size=2000,
+        )
+
+
+def generate_site_settings(spec, rng):
+    """生成站点设置、推荐语和里程碑"""
+    from site_settings.models import Milestone, Recommendation, SiteSettings
+    from song_management.models import Song
+
+    SiteSettings.objects.create(artist_name='咻咻满')
+    song_ids = list(Song.objects.order_by('-perform_count').values_list('id', flat=True)[:20])
+    for index in range(3):
+        recommendation = Recommendation.objects.create(content=f'推荐语{index}', is_active=index == 0)
+        recommendation.recommended_songs.set(rng.sample(song_ids, min(5, len(song_ids))))
+
+    today = _anchor().date()
+    Milestone.objects.bulk_create(
+        Milestone(
+            date=today - timedelta(days=30 * index), title=f'里程碑{index:02d}',
+            description=f'里程碑描述{index:02d}', display_order=index,
+        )
+        for index in range(24)
+    )
+
+
+def generate(spec=None):
+    """
+    生成完整数据集
+
+    Args:
+        spec: DatasetSpec，为空时使用默认规模
+
+    Returns:
+        dict: 生成结果摘要（供用例选取参数）
+    """
+    spec = spec or DatasetSpec()
+    rng = random.Random(spec.seed)
+
+    generate_covers()
+    generate_songs(spec, rng)
+    leaf_ids = generate_galleries(spec, rng)
+    generate_livestreams(spec, rng)
+    generate_analytics(spec, rng)
+    generate_fansdiy(spec, rng)
+    generate_songlist(spec, rng)
+    generate_site_settings(spec, rng)
+
+    from song_management.models import Song
+    anchor = _anchor()
+    return {
+        'spec': spec.to_dict(),
+        'hot_song_id': Song.objects.order_by('-perform_count').values_list('id', flat=True).first(),
+        'gallery_leaf_id': leaf_ids[0] if leaf_ids else None,
+        'gallery_parent_id': 'bench-2020',
+        'month': (anchor.year, anchor.month),
+        'platform': PLATFORM,
+    }
@@ -0,0 +1,59 @@
+"""
+压测数据准备 - 在指定目录中创建并填充数据库，供本地服务器压测使用
+
+用法（在项目根目录执行）:
+    python -m tools.benchmark.seed /tmp/xxm-loadtest                 # 默认规模
+    python -m tools.benchmark.seed /tmp/xxm-loadtest --songs 5000 --force
+
+完成后按输出的命令启动服务器，再运行 test/Locustfile.py（见 test/locust.local.conf）。
+缓存可选 BENCHMARK_CACHE=locmem / fakeredis / redis，见 tools/benchmark/settings.py。
+"""
+import argparse
+import json
+import shutil
+import sys
+import time
+import warnings
+from pathlib import Path
+
+from tools.benchmark.__main__ import PROJECT_ROOT, add_spec_arguments, setup_django, spec_from_args
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='生成压测数据')
+    parser.add_argument('directory', type=Path, help='数据目录（数据库和媒体文件）')
+    parser.add_argument('--force', action='store_true', help='目录已存在时先清空')
+    add_spec_arguments(parser)
+    args = parser.parse_args(argv)
+
+    directory = args.directory.resolve()
+    if directory.exists() and any(directory.iterdir()):
+        if not args.force:
+            print(f'目录不为空: {directory}（使用 --force 覆盖）')
+            return 1
+        shutil.rmtree(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    warnings.filterwarnings('ignore', message=r'.*received a naive datetime', category=RuntimeWarning)
+    setup_django(directory)
+
+    from tools.benchmark.datagen import generate
+
+    spec = spec_from_args(args)
+    start = time.perf_counter()
+    dataset = generate(spec)
+    with open(directory / 'dataset.json', 'w', encoding='utf-8') as f:
+        json.dump(dataset, f, ensure_ascii=False, indent=2)
+
+    print(f'数据生成完成（{time.perf_counter() - start:.1f}s）: {directory}')
+    print('启动服务器:')
+    print(f'  cd {PROJECT_ROOT}')
+    print(f'  BENCHMARK_DIR={directory} BENCHMARK_CACHE=fakeredis \\')
+    print('  DJANGO_SETTINGS_MODULE=tools.benchmark.settings python manage.py runserver --noreload 8000')
+    print('运行压测:')
+    print(f'  cd test && LOCUST_DATASET={directory / "dataset.json"} locust -f Locustfile.py --config locust.local.conf')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
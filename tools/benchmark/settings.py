@@ -0,0 +1,65 @@
+"""
+基准测试配置 - 在项目配置基础上将数据库、媒体目录和缓存指向临时目录
+
+BENCHMARK_DIR 环境变量由运行器在 django.setup() 之前设置；压测时由 seed 命令输出的
+环境变量启动服务器（见 tools/benchmark/seed.py）
+"""
+import os
+from pathlib import Path
+
+from xxm_fans_home.settings import *  # noqa: F401,F403
+
+BENCHMARK_DIR = Path(os.environ['BENCHMARK_DIR'])
+
+DEBUG = False
+
+DATABASES = {}
+for _alias in ('default', 'songlist_db', 'view_data_db'):
+    _path = BENCHMARK_DIR / f'{_alias}.sqlite3'
+    DATABASES[_alias] = dict(
+        ENGINE='django.db.backends.sqlite3', NAME=str(_path), OPTIONS={'timeout': 20},
+        CONN_MAX_AGE=None, CONN_HEALTH_CHECKS=True,
+    )
+    # 与生产一致的只读连接（GET/HEAD 请求的读取），迁移时跳过
+    DATABASES[f'{_alias}_ro'] = dict(
+        DATABASES[_alias], NAME=f'{_path.as_uri()}?mode=ro', TEST={'MIRROR': _alias},
+    )
+
+MEDIA_ROOT = BENCHMARK_DIR / 'media'
+
+# 缓存后端（BENCHMARK_CACHE 环境变量）:
+#   locmem    进程内缓存（默认，离线基准测试用，无需外部服务）
+#   fakeredis 进程内模拟的 Redis，走与生产相同的 RedisCache 代码路径（单进程服务器，需 pip install fakeredis）
+#   redis     真实的 redis-server（BENCHMARK_REDIS_URL，多 worker 压测时使用）
+BENCHMARK_CACHE = os.environ.get('BENCHMARK_CACHE', 'locmem')
+
+if BENCHMARK_CACHE == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'benchmark',
+        }
+    }
+else:
+    CACHES = {
+        'default': dict(
+            CACHES['default'],  # noqa: F405
+            LOCATION=os.environ.get('BENCHMARK_REDIS_URL', 'redis://127.0.0.1:6379/15'),
+            KEY_PREFIX='xxm_fans_benchmark',
+        )
+    }
+    if BENCHMARK_CACHE == 'fakeredis':
+        import fakeredis
+        CACHES['default']['OPTIONS'] = {'connection_class': fakeredis.FakeConnection}
+
+LIVESTREAM_CONFIG = dict(LIVESTREAM_CONFIG, LIVE_DATA_FILE=str(BENCHMARK_DIR / 'live_final.json'))  # noqa: F405
+
+METRICS_CONFIG = {'ENABLED': False}
+QUERY_PROFILER_CONFIG = {'ENABLED': False}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'null': {'class': 'logging.NullHandler'}},
+    'root': {'handlers': ['null']},
+}
@@ -2,7 +2,9 @@
 数据库路由配置
 用于将 songlist 应用的模型路由到 songlist_db 数据库
 将 data_analytics 应用的模型路由到 view_data_db 数据库
+GET/HEAD 请求期间的读取路由到对应的只读连接（见 core.sqlite）
 """
+from core.sqlite import read_only_alias
 
 
 class MultiDBRouter:
@@ -11,6 +13,7 @@ class MultiDBRouter:
     - songlist 应用使用 songlist_db 数据库
     - data_analytics 应用使用 view_data_db 数据库
     - 其他应用使用 default 数据库
+    - 启用只读路由时，读取使用 <数据库>_ro 只读连接
     """
 
     APP_DB_MAPPING = {
@@ -21,12 +24,13 @@ class MultiDBRouter:
     def db_for_read(self, model, **hints):
         """读取操作路由"""
         app_label = model._meta.app_label
-        return self.APP_DB_MAPPING.get(app_label)
+        alias = self.APP_DB_MAPPING.get(app_label)
+        return read_only_alias(alias or 'default') or alias
 
     def db_for_write(self, model, **hints):
-        """写入操作路由"""
+        """写入操作路由（显式返回读写库，避免从只读连接加载的实例被写回只读连接）"""
         app_label = model._meta.app_label
-        return self.APP_DB_MAPPING.get(app_label)
+        return self.APP_DB_MAPPING.get(app_label, 'default')
 
     def allow_relation(self, obj1, obj2, **hints):
         """允许关系"""
@@ -60,6 +60,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.metrics.MetricsMiddleware',  # 请求指标（延迟、数据库查询），跨 worker 聚合
+    'core.sqlite.ReadOnlyRoutingMiddleware',  # GET/HEAD 请求的读取走 SQLite 只读连接
+    'core.query_profiler.QueryProfilerMiddleware',  # 调试模式下输出 X-Query-Count 并提示 N+1
+    'core.compression.CompressionMiddleware',  # 响应压缩（优先使用缓存中的预压缩变体）
     'corsheaders.middleware.CorsMiddleware',  # CORS 中间件
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,6 +74,7 @@ MIDDLEWARE = [
     # 自定义缓存中间件
     'core.cache_middleware.CacheControlMiddleware',
     'core.cache_middleware.CacheHeaderMiddleware',
+    'core.cache_middleware.DataVersionETagMiddleware',
 ]
 
 ROOT_URLCONF = 'xxm_fans_home.urls'
@@ -102,28 +107,52 @@ PROJECT_ROOT = BASE_DIR.parent.parent
 DATA_DIR = PROJECT_ROOT / 'data'
 
 # SQLite 数据库配置
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': str(DATA_DIR / 'db.sqlite3'),
-        'OPTIONS': {
-            'timeout': 20,
-        },
-    },
-    'songlist_db': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': str(DATA_DIR / 'songlist.sqlite3'),
-        'OPTIONS': {
-            'timeout': 20,
-        },
-    },
-    'view_data_db': {
+SQLITE_FILES = {
+    'default': DATA_DIR / 'db.sqlite3',
+    'songlist_db': DATA_DIR / 'songlist.sqlite3',
+    'view_data_db': DATA_DIR / 'view_data.sqlite3',
+}
+
+# 持久连接：连接在请求之间复用，避免每个请求重新打开文件、执行 PRAGMA
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+
+# 为每个数据库额外配置只读别名 <alias>_ro（URI mode=ro），GET/HEAD 请求的读取走只读连接
+DB_READ_ONLY_CONNECTIONS = os.getenv('DB_READ_ONLY_CONNECTIONS', 'True').lower() == 'true'
+
+DATABASES = {}
+for _alias, _path in SQLITE_FILES.items():
+    DATABASES[_alias] = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': str(DATA_DIR / 'view_data.sqlite3'),
+        'NAME': str(_path),
         'OPTIONS': {
             'timeout': 20,
         },
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    }
+    if DB_READ_ONLY_CONNECTIONS:
+        DATABASES[f'{_alias}_ro'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': f'{_path.as_uri()}?mode=ro',
+            'OPTIONS': {
+                'timeout': 20,
+            },
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            # 测试时与读写库共用同一个测试库
+            'TEST': {'MIRROR': _alias},
+        }
+
+# SQLite PRAGMA 配置（见 core/sqlite.py）
+SQLITE_CONFIG = {
+    # 数据库别名 -> PRAGMA 配置名称（default / read_heavy / write_heavy）
+    'PROFILES': {
+        'default': 'read_heavy',
+        'songlist_db': 'default',
+        'view_data_db': 'write_heavy',
     },
+    # GET/HEAD 请求的读取走只读连接
+    'READ_ONLY_ROUTING': DB_READ_ONLY_CONNECTIONS,
 }
 
 # 数据库路由配置
@@ -173,6 +202,104 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# 媒体文件服务配置（gallery/、covers/ 及缩略图接口）
+MEDIA_SERVING_CONFIG = {
+    # python: 由 Django 直接返回文件（支持 Range）
+    # x-accel: 返回 X-Accel-Redirect，由 Nginx 发送文件
+    # x-sendfile: 返回 X-Sendfile，由 Apache/lighttpd 发送文件
+    'MODE': os.getenv('MEDIA_SERVING_MODE', 'python'),
+    # Nginx internal location 前缀，需映射到 MEDIA_ROOT
+    'X_ACCEL_PREFIX': os.getenv('MEDIA_X_ACCEL_PREFIX', '/protected-media/'),
+    # 媒体文件默认缓存时间（秒）
+    'MAX_AGE': 86400,
+}
+
+# 运行指标配置（/metrics，Prometheus 文本格式，各 worker 的数据经 Redis 聚合）
+METRICS_CONFIG = {
+    'ENABLED': os.getenv('METRICS_ENABLED', 'True').lower() == 'true',
+    # 进程内增量写入 Redis 的最小间隔（秒）
+    'FLUSH_INTERVAL': 5,
+    # 抓取需要携带 Authorization: Bearer <TOKEN>。生产环境必须设置 METRICS_TOKEN，
+    # 为空时 /metrics 只在 DEBUG 下开放，否则返回 404
+    'TOKEN': os.getenv('METRICS_TOKEN', ''),
+}
+
+# 进程内一级缓存（见 core/local_cache.py）
+LOCAL_CACHE_CONFIG = {
+    'ENABLED': os.getenv('LOCAL_CACHE_ENABLED', 'True').lower() == 'true',
+    'MAX_ENTRIES': 1000,
+    # 键前缀 -> 一级缓存 TTL（秒）：只放极热、体积小、可接受跨 worker 短暂延迟失效的数据
+    'PREFIXES': {
+        'style_list_simple': 300,
+        'tag_list_simple': 300,
+        'original_works_list': 300,
+        'get_site_settings': 300,
+        'get_active_recommendations': 300,
+    },
+    # Redis 不可用时所有缓存键在一级缓存中的 TTL，以及重试间隔
+    'FALLBACK_TTL': 30,
+    'RETRY_INTERVAL': 5,
+}
+
+# 缓存击穿保护（见 core/stampede.py）：cache_result / cached 的单飞锁与过期后返回旧值
+CACHE_STAMPEDE_CONFIG = {
+    'ENABLED': os.getenv('CACHE_STAMPEDE_ENABLED', 'True').lower() == 'true',
+    # 软过期后旧值的保留时间（秒），期间只有一个请求回源，其他请求返回旧值
+    'STALE_TTL': 60,
+    # 回源锁超时与未命中时等待其他请求结果的最长时间（秒）
+    'LOCK_TIMEOUT': 10,
+    'LOCK_WAIT': 3,
+    # 概率提前刷新系数（XFetch），0 关闭
+    'EARLY_EXPIRATION_BETA': 1.0,
+}
+
+# 缓存预热（见 core/cache_warmer.py，任务在各应用的 warmers.py 中注册，手动执行: manage.py warm_cache）
+CACHE_WARMER_CONFIG = {
+    # 缓存失效后在后台自动预热相关任务（部署后请执行 warm_cache）
+    'AUTO': os.getenv('CACHE_WARMER_AUTO', 'False').lower() == 'true',
+    # 防抖延迟（秒），批量导入期间的多次失效合并为一次预热
+    'DELAY': 2,
+    # 同一优先级内并发执行的任务数
+    'CONCURRENCY': 2,
+}
+
+# 异步读接口（见 core/async_support.py）：以 ASGI 方式部署（uvicorn xxm_fans_home.asgi:application）时开启，
+# 歌曲、演唱记录、排行榜、直播、图集接口缓存命中时不占用线程，未命中时在线程池中执行
+ASYNC_VIEWS_CONFIG = {
+    'ENABLED': os.getenv('ASYNC_VIEWS', 'False').lower() == 'true',
+    # 执行同步代码（数据库查询、序列化）的线程数，即每个 worker 的数据库连接上限
+    'THREAD_WORKERS': int(os.getenv('ASYNC_THREAD_WORKERS', '16')),
+    # 缩略图生成的进程数，0 表示使用线程池
+    'PROCESS_WORKERS': int(os.getenv('ASYNC_PROCESS_WORKERS', '0')),
+}
+
+# 批量读接口（见 core/batch.py）
+BATCH_CONFIG = {
+    # 单次批量请求的子请求数上限
+    'MAX_REQUESTS': 20,
+    # 允许的子请求路径前缀（只执行 GET）
+    'ALLOWED_PREFIXES': ('/api/',),
+}
+
+# Sitemap（见 site_settings/services/sitemap_service.py）：索引 + 按分区分片的子 sitemap，
+# 预生成并以预压缩变体缓存，数据变化时只重新生成对应分区
+SITEMAP_CONFIG = {
+    # 站点地址（sitemap 中的绝对 URL）
+    'BASE_URL': os.getenv('SITEMAP_BASE_URL', 'https://www.xxm8777.cn'),
+    # 每个子 sitemap 的 URL 数（协议上限 50000）
+    'SHARD_SIZE': 5000,
+    # 缓存超时时间（秒），固定页面分区按此周期刷新 lastmod
+    'TIMEOUT': 86400,
+}
+
+# 查询分析配置（X-Query-Count 响应头、N+1 提示）
+QUERY_PROFILER_CONFIG = {
+    # None 表示跟随 DEBUG
+    'ENABLED': None,
+    # 同一 SQL 模板在一个请求内执行达到该次数时视为疑似 N+1
+    'REPEAT_THRESHOLD': 5,
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -196,10 +323,10 @@ CACHES = {
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,
+    # orjson 渲染器；可浏览 API 仅在调试模式下启用
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    ],
+        'core.renderers.ORJSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
         'rest_framework.parsers.FormParser',
@@ -276,3 +403,14 @@ LIVESTREAM_CONFIG = {
     'MIN_YEAR': 2019,
     'MAX_YEAR': 2030,
 }
+
+
+# 图集文件夹同步配置
+GALLERY_SYNC_CONFIG = {
+    # 目录指纹状态文件（增量同步依据）
+    'STATE_FILE': str(DATA_DIR / 'gallery_sync_state.json'),
+    # 变更日志文件（JSON Lines，每行一个变更事件）
+    'JOURNAL_FILE': str(DATA_DIR / 'gallery_sync_journal.jsonl'),
+    # 并行扫描子树/生成缩略图的线程数
+    'MAX_WORKERS': 4,
+}
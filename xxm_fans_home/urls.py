@@ -20,12 +20,20 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.views.static import serve
 from rest_framework import permissions
-from site_settings.api.views import SitemapView, RobotsTxtView
+from core.batch import batch_view
+from core.media_serving import serve_media
+from core.metrics import metrics_view
+from site_settings.api.views import SitemapView, SitemapSectionView, RobotsTxtView
 
 urlpatterns = [
     # SEO 相关 - 根路径访问（直接引入视图，不通过 site_settings.urls）
     path('sitemap.xml', SitemapView.as_view(), name='sitemap'),
+    path('sitemap-<slug:section>-<int:page>.xml', SitemapSectionView.as_view(), name='sitemap-section'),
     path('robots.txt', RobotsTxtView.as_view(), name='robots-txt'),
+    # Prometheus 指标（所有 worker 聚合）
+    path('metrics', metrics_view, name='metrics'),
+    # 批量读接口（首页多个接口合并为一次请求）
+    path('api/batch/', batch_view, name='batch'),
     # API 路由
     path('api/', include('song_management.urls')),  # song_management 应用路由（替代main）
     path('api/data-analytics/', include('data_analytics.urls')),  # data_analytics 应用路由
@@ -51,12 +59,12 @@ urlpatterns = [
     re_path(r'^songlist_frontend/photos/(?P<path>.*)$', serve, {
         'document_root': settings.BASE_DIR / 'songlist_frontend' / 'photos',
     }),
-    # 为gallery目录提供静态文件服务
-    re_path(r'^gallery/(?P<path>.*)$', serve, {
+    # 为gallery目录提供媒体文件服务（支持 ETag/304、Range 请求和代理卸载）
+    re_path(r'^gallery/(?P<path>.*)$', serve_media, {
         'document_root': settings.MEDIA_ROOT / 'gallery',
     }),
-    # 为covers目录提供静态文件服务（开发和生产环境都需要）
-    re_path(r'^covers/(?P<path>.*)$', serve, {
+    # 为covers目录提供媒体文件服务（开发和生产环境都需要）
+    re_path(r'^covers/(?P<path>.*)$', serve_media, {
         'document_root': settings.MEDIA_ROOT / 'covers',
     }),
 ]